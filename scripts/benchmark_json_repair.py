@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of parsing LLM JSON responses with src.utils.llm.json_repair.
+
+Responses are taken from LLM error files written by the analyzers in debug mode
+(data/debug/llm_error_*.txt, the text after "Response:"). Relationship CSV files, such as
+the ones in results/debug_results, are turned into LLM-style responses (one per pmid and
+variant) and each one is also saved with the typical defects of model output: markdown
+code block, surrounding prose, trailing commas, single quotes, unquoted keys and a
+truncated end.
+
+The shared parser is compared with the previous regex-based repair that re-parsed the
+string after every fix.
+
+Example usage:
+    python scripts/benchmark_json_repair.py --input results/debug_results data/debug
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, List
+
+from src.utils.llm import json_repair
+from src.utils.llm.json_repair import parse_json
+
+csv.field_size_limit(sys.maxsize)
+
+
+def load_error_responses(directory: str) -> List[str]:
+    """
+    Loads responses saved in LLM error files.
+
+    Args:
+        directory: Directory with llm_error_*.txt files
+
+    Returns:
+        List of response texts
+    """
+    responses = []
+    for path in sorted(glob.glob(os.path.join(directory, "llm_error_*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        if "Response: " in content:
+            responses.append(content.split("Response: ", 1)[1])
+    return responses
+
+
+def load_csv_responses(directory: str) -> List[str]:
+    """
+    Builds LLM-style responses from relationship CSV files.
+
+    Args:
+        directory: Directory with CSV files containing entity_text and has_relationship columns
+
+    Returns:
+        List of JSON responses, one per pmid and variant
+    """
+    responses = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        groups = defaultdict(list)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if "entity_text" not in row or "has_relationship" not in row:
+                    break
+                groups[(row.get("pmid"), row.get("variant_text"))].append({
+                    "entity_type": row.get("entity_type", ""),
+                    "entity_text": row.get("entity_text", ""),
+                    "entity_id": row.get("entity_id", ""),
+                    "has_relationship": str(row.get("has_relationship")).lower() == "true",
+                    "relationship_score": int(float(row.get("relationship_score") or 0)),
+                    "explanation": row.get("explanation", "")
+                })
+        responses.extend(json.dumps({"relationships": rels}, indent=2, ensure_ascii=False)
+                         for rels in groups.values())
+    return responses
+
+
+def malformed_variants(response: str) -> List[str]:
+    """
+    Returns copies of a valid response with defects typical of model output.
+
+    Args:
+        response: Valid JSON response
+
+    Returns:
+        List of malformed responses
+    """
+    return [
+        f"```json\n{response}\n```",
+        f"Here is the analysis of the relationships:\n{response}\nLet me know if you need more.",
+        re.sub(r"(\"|\d|true|false)\n(\s*)([}\]])", r"\1,\n\2\3", response),
+        re.sub(r'"(entity_type|entity_text|entity_id|has_relationship|relationship_score|explanation)":',
+               r"\1:", response),
+        re.sub(r'"(entity_type|has_relationship)"', r"'\1'", response),
+        response[:int(len(response) * 0.8)],
+    ]
+
+
+def legacy_parse(response: str) -> object:
+    """
+    Parses a response with the repair previously copied across the analyzers.
+
+    Args:
+        response: Response text
+
+    Returns:
+        Parsed JSON value
+    """
+    if "```" in response:
+        blocks = re.findall(r"```(?:json)?(.*?)```", response, re.DOTALL)
+        if blocks:
+            response = blocks[0].strip()
+    else:
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if match:
+            response = match.group(0)
+
+    def fix_quotes(text):
+        in_string = False
+        result = []
+        for i, char in enumerate(text):
+            if char == '"' and (i == 0 or text[i - 1] != "\\"):
+                in_string = not in_string
+                result.append(char)
+            elif char == "'" and not in_string and (i == 0 or text[i - 1] != "\\"):
+                result.append('"')
+            else:
+                result.append(char)
+        return "".join(result)
+
+    fixes = [
+        fix_quotes,
+        lambda text: re.sub(r",\s*}", "}", re.sub(r",\s*]", "]", text)),
+        lambda text: re.sub(r'"\s*"', '","', re.sub(r"}\s*{", "},{", text)),
+        lambda text: re.sub(r'(\{|\,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', text),
+    ]
+    for fix in fixes:
+        try:
+            return json.loads(fix(response))
+        except json.JSONDecodeError:
+            response = fix(response)
+    return json.loads(response)
+
+
+def run(name: str, parser: Callable[[str], object], responses: List[str], repeat: int) -> None:
+    """
+    Times a parser over all responses and prints the results.
+
+    Args:
+        name: Name shown in the output
+        parser: Function parsing a response
+        responses: Responses to parse
+        repeat: Number of passes over the responses
+    """
+    parsed = 0
+    for response in responses:
+        try:
+            result = parser(response)
+            parsed += isinstance(result, dict) and "relationships" in result
+        except ValueError:
+            pass
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            try:
+                parser(response)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - started
+
+    per_response = elapsed / (repeat * len(responses)) * 1e6
+    print(f"{name:<28} parsed {parsed}/{len(responses)}  {per_response:8.1f} us/response")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of LLM JSON response parsing")
+    parser.add_argument("--input", nargs="+", default=[os.path.join("results", "debug_results"),
+                                                      os.path.join("data", "debug")],
+                        help="Directories with relationship CSV files or LLM error files")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed passes (default: 5)")
+    args = parser.parse_args()
+
+    valid, recorded = [], []
+    for directory in args.input:
+        valid.extend(load_csv_responses(directory))
+        recorded.extend(load_error_responses(directory))
+
+    malformed = recorded + [variant for response in valid for variant in malformed_variants(response)]
+    if not valid and not malformed:
+        print("No responses found")
+        sys.exit(1)
+
+    has_orjson = json_repair.HAS_ORJSON
+    for title, responses in (("Valid responses", valid), ("Malformed responses", malformed)):
+        if not responses:
+            continue
+        print(f"\n{title}: {len(responses)}")
+        run("legacy regex repair", legacy_parse, responses, args.repeat)
+        json_repair.HAS_ORJSON = False
+        run("json_repair (json)", parse_json, responses, args.repeat)
+        json_repair.HAS_ORJSON = has_orjson
+        if has_orjson:
+            run("json_repair (orjson)", parse_json, responses, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
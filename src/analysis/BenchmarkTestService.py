@@ -56,8 +56,9 @@ class BenchmarkTestService:
     def prepare_texts_from_pmids(self, pmids):
         logging.getLogger(__name__).info(f"Fetching full texts for pmids: {pmids}")
         texts = []
+        pubmed_endpoint = PubmedEndpoint()
         for pmid in pmids:
-            full_text = PubmedEndpoint.fetch_full_text_from_pubmed_id(pmid)
+            full_text = pubmed_endpoint.fetch_full_text_from_pubmed_id(pmid)
             overlap = 50
             expected_system_prompt_num_tokens = 3000
             expected_answer_num_tokens = 3000
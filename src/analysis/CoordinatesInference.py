@@ -14,10 +14,11 @@ class CoordinatesInference:
         self.context_extraction_service = ContextRetriever(llm)
         self.sequence_ontology_mapping_service = SequenceOntologyMapper(llm)
         self.links_from_query_extraction_service = KeyValueMapper(llm)
+        self.pubmed_endpoint = PubmedEndpoint()
 
     def search_coordinates(self, pmid: str, user_query_dict: dict):
         self.logger.info(f"Searching coordinates for pmid {pmid} with user query {user_query_dict}")
-        publication_text = PubmedEndpoint.fetch_full_text_from_pubmed_id(pmid)
+        publication_text = self.pubmed_endpoint.fetch_full_text_from_pubmed_id(pmid)
         return self.search_coordinates_in_text(publication_text, user_query_dict)
 
     def search_coordinates_in_text(self, text: str, user_query_dict: dict):
@@ -2,6 +2,8 @@
 Cooccurrence Context Analyzer - module for analyzing relationships between biomedical entities.
 """
 
+from src.analysis.context.cooccurrence_aggregator import CooccurrenceAggregator
 from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+from src.analysis.context.passage_prefilter import PassagePrefilter
 
-__all__ = ["CooccurrenceContextAnalyzer"] 
\ No newline at end of file
+__all__ = ["CooccurrenceAggregator", "CooccurrenceContextAnalyzer", "PassagePrefilter"] 
\ No newline at end of file
@@ -0,0 +1,337 @@
+"""
+Corpus-level aggregation of variant-entity co-occurrences.
+
+CooccurrenceContextAnalyzer reports which entities share a passage with a variant, one
+publication at a time. CooccurrenceAggregator accumulates these records over a corpus
+and ranks the entities of each variant by how strongly they are associated with it.
+
+Counts are kept per counting unit, a passage (default) or a publication:
+- N: number of units with at least one variant,
+- n(v), n(e): number of units mentioning the variant v or the entity e,
+- n(v, e): number of units in which v and e co-occur.
+Only units with a variant are seen, so entity counts are relative to the
+variant-bearing passages (or publications) of the corpus.
+
+Variants, and the entities of each category (genes, diseases, ...), are interned to
+integer IDs; variants are keyed by their identifier and can also be looked up by their
+text; the co-occurrence counts form a sparse variant x entity matrix stored as a
+dictionary of Counters per category, updated incrementally as documents stream in.
+
+Association measures, computed from the 2x2 contingency table of each pair:
+- pmi: log(n(v, e) * N / (n(v) * n(e))),
+- npmi: pmi / -log(n(v, e) / N), between -1 and 1,
+- chi2: Pearson's chi-square statistic (one degree of freedom, no continuity correction).
+
+Example usage:
+    aggregator = CooccurrenceAggregator(categories=("genes", "diseases"))
+    aggregator.update(CooccurrenceContextAnalyzer(), pmids)
+    for row in aggregator.top_k("p.V600E", "diseases", k=5, measure="npmi"):
+        print(row["entity_text"], row["count"], row["npmi"])
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Association measures accepted by top_k
+MEASURES = ("count", "pmi", "npmi", "chi2")
+
+# Counting units
+UNITS = ("passage", "document")
+
+
+class _Vocabulary:
+    """
+    Maps string keys to consecutive integer IDs and keeps a display label per key.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.labels: List[str] = []
+
+    def intern(self, key: str, label: str) -> int:
+        """Returns the ID of a key, adding it with the given label if it is new."""
+        index = self.ids.get(key)
+        if index is None:
+            index = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.labels.append(label)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def association_scores(pair_counts: np.ndarray, variant_count: int, entity_counts: np.ndarray,
+                       total: int) -> Dict[str, np.ndarray]:
+    """
+    Computes association measures of one variant with a set of entities.
+
+    Args:
+        pair_counts: Co-occurrence counts n(v, e), all greater than zero
+        variant_count: Number of units mentioning the variant, n(v)
+        entity_counts: Number of units mentioning each entity, n(e)
+        total: Number of units, N
+
+    Returns:
+        Dictionary with "pmi", "npmi" and "chi2" arrays, aligned with pair_counts
+    """
+    a = pair_counts.astype(np.float64)
+    n_v = float(variant_count)
+    n_e = entity_counts.astype(np.float64)
+    n = float(total)
+
+    pmi = np.log(a * n / (n_v * n_e))
+    # -log p(v, e) is 0 when the pair occurs in every unit; such a pair is perfectly associated
+    joint = -np.log(a / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        npmi = np.where(joint > 0, pmi / joint, 1.0)
+
+    b = n_v - a
+    c = n_e - a
+    d = n - a - b - c
+    denominator = n_v * (n - n_v) * n_e * (n - n_e)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi2 = np.where(denominator > 0, n * (a * d - b * c) ** 2 / denominator, 0.0)
+
+    return {"pmi": pmi, "npmi": npmi, "chi2": chi2}
+
+
+class CooccurrenceAggregator:
+    """
+    Incremental corpus-level counts and association statistics of co-occurrences.
+
+    Example usage:
+        aggregator = CooccurrenceAggregator()
+        for pmid, relationships in analyzer.iter_publication_relationships(pmids):
+            aggregator.add_publication(relationships)
+        aggregator.top_k("p.V600E", "genes", k=10)
+    """
+
+    def __init__(self, categories: Sequence[str] = ("genes", "diseases"), unit: str = "passage"):
+        """
+        Initializes the aggregator.
+
+        Args:
+            categories: Entity lists of the relationship records to aggregate, e.g.
+                "genes", "diseases", "tissues", "species", "chemicals"
+            unit: Counting unit, "passage" or "document"
+
+        Raises:
+            ValueError: If the unit is not supported
+        """
+        if unit not in UNITS:
+            raise ValueError(f"Unsupported unit: {unit}. Use one of {UNITS}")
+
+        self.logger = logging.getLogger(__name__)
+        self.categories = tuple(categories)
+        self.unit = unit
+        self.total = 0
+        self.variants = _Vocabulary()
+        self.variant_counts: List[int] = []
+        # Variant text -> IDs of the variants mentioned with that text
+        self.variant_texts: Dict[str, Set[int]] = defaultdict(set)
+        self.entities = {category: _Vocabulary() for category in self.categories}
+        self.entity_counts: Dict[str, List[int]] = {category: [] for category in self.categories}
+        # Sparse variant x entity count matrices: variant ID -> Counter of entity IDs
+        self.pair_counts: Dict[str, Dict[int, Counter]] = {
+            category: defaultdict(Counter) for category in self.categories
+        }
+
+    @staticmethod
+    def _variant_key(record: Dict[str, Any]) -> Tuple[str, str]:
+        """Returns the key and label of the variant of a record."""
+        text = record.get("variant_text") or ""
+        return record.get("variant_id") or text, text
+
+    @staticmethod
+    def _entity_key(entity: Dict[str, Any]) -> Tuple[str, str]:
+        """Returns the key and label of an entity; entities without an ID are keyed by text."""
+        text = entity.get("text") or ""
+        return entity.get("id") or text.lower(), text
+
+    def add_unit(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Counts the records of one unit (passage or publication).
+
+        Args:
+            records: Relationship records of CooccurrenceContextAnalyzer belonging to
+                one unit. A unit without records is not counted
+        """
+        variant_ids = set()
+        entity_ids = {category: set() for category in self.categories}
+        pairs = {category: set() for category in self.categories}
+
+        for record in records:
+            variant_key, variant_text = self._variant_key(record)
+            variant_id = self.variants.intern(variant_key, variant_text)
+            if variant_id == len(self.variant_counts):
+                self.variant_counts.append(0)
+            self.variant_texts[variant_text].add(variant_id)
+            variant_ids.add(variant_id)
+
+            for category in self.categories:
+                vocabulary = self.entities[category]
+                counts = self.entity_counts[category]
+                for entity in record.get(category) or []:
+                    entity_id = vocabulary.intern(*self._entity_key(entity))
+                    if entity_id == len(counts):
+                        counts.append(0)
+                    entity_ids[category].add(entity_id)
+                    pairs[category].add((variant_id, entity_id))
+
+        if not variant_ids:
+            return
+
+        self.total += 1
+        for variant_id in variant_ids:
+            self.variant_counts[variant_id] += 1
+        for category in self.categories:
+            counts = self.entity_counts[category]
+            for entity_id in entity_ids[category]:
+                counts[entity_id] += 1
+            matrix = self.pair_counts[category]
+            for variant_id, entity_id in pairs[category]:
+                matrix[variant_id][entity_id] += 1
+
+    def add_publication(self, relationships: List[Dict[str, Any]]) -> None:
+        """
+        Counts the relationship records of one publication.
+
+        Args:
+            relationships: Records returned by CooccurrenceContextAnalyzer for one
+                publication. With the passage unit they are grouped by passage text
+        """
+        if self.unit == "document":
+            self.add_unit(relationships)
+            return
+
+        passages = defaultdict(list)
+        for record in relationships:
+            passages[record.get("passage_text")].append(record)
+        for records in passages.values():
+            self.add_unit(records)
+
+    def update(self, analyzer: Any, pmids: List[str], batch_size: int = 100) -> int:
+        """
+        Streams publications through a co-occurrence analyzer and counts their records.
+
+        Args:
+            analyzer: CooccurrenceContextAnalyzer
+            pmids: PubMed identifiers to analyze
+            batch_size: Number of PMIDs requested from PubTator at once
+
+        Returns:
+            Number of publications counted
+        """
+        publications = 0
+        for _, relationships in analyzer.iter_publication_relationships(pmids, batch_size=batch_size):
+            self.add_publication(relationships)
+            publications += 1
+        self.logger.info(f"Aggregated {publications} publications ({self.total} {self.unit} units)")
+        return publications
+
+    def _lookup_variant(self, variant: str) -> Optional[int]:
+        """
+        Returns the ID of a variant given by its key or, failing that, by its text.
+
+        Args:
+            variant: Variant key (variant_id) or variant text
+
+        Returns:
+            Variant ID, None if the variant is unknown
+
+        Raises:
+            ValueError: If the text belongs to several variants with different IDs
+        """
+        variant_id = self.variants.ids.get(variant)
+        if variant_id is not None:
+            return variant_id
+
+        variant_ids = self.variant_texts.get(variant)
+        if not variant_ids:
+            return None
+        if len(variant_ids) > 1:
+            keys = sorted(self.variants.keys[index] for index in variant_ids)
+            raise ValueError(f"Variant text {variant!r} matches several variants, use one of {keys}")
+        return next(iter(variant_ids))
+
+    def top_k(self, variant: str, category: str = "genes", k: int = 10, measure: str = "npmi",
+              min_count: int = 1) -> List[Dict[str, Any]]:
+        """
+        Returns the entities most strongly associated with a variant.
+
+        Args:
+            variant: Variant key (variant_id, or variant_text for variants without an ID),
+                or the text of a variant with an ID
+            category: Entity category, one of the categories of the aggregator
+            k: Maximum number of entities returned
+            measure: Ranking measure, one of "count", "pmi", "npmi" and "chi2"
+            min_count: Minimum co-occurrence count of a returned pair; PMI-based
+                measures are unreliable for rare pairs
+
+        Returns:
+            List of dictionaries with entity_id, entity_text, count, pmi, npmi and chi2,
+            sorted by the measure (ties by count). Empty if the variant is unknown
+
+        Raises:
+            ValueError: If the category or measure is not supported, or the variant
+                text matches several variants
+        """
+        if category not in self.pair_counts:
+            raise ValueError(f"Unknown category: {category}. Aggregated categories: {self.categories}")
+        if measure not in MEASURES:
+            raise ValueError(f"Unsupported measure: {measure}. Use one of {MEASURES}")
+
+        variant_id = self._lookup_variant(variant)
+        if variant_id is None or variant_id not in self.pair_counts[category]:
+            return []
+
+        counter = self.pair_counts[category][variant_id]
+        entity_ids = np.fromiter(counter.keys(), dtype=np.int64, count=len(counter))
+        counts = np.fromiter(counter.values(), dtype=np.int64, count=len(counter))
+        keep = counts >= min_count
+        entity_ids, counts = entity_ids[keep], counts[keep]
+        if not len(entity_ids):
+            return []
+
+        entity_counts = np.asarray(self.entity_counts[category], dtype=np.int64)[entity_ids]
+        scores = association_scores(counts, self.variant_counts[variant_id], entity_counts, self.total)
+        scores["count"] = counts
+
+        # Sort by the measure, then by count, both descending
+        order = np.lexsort((-counts, -scores[measure]))[:k]
+        vocabulary = self.entities[category]
+        return [
+            {
+                "entity_id": vocabulary.keys[entity_ids[index]],
+                "entity_text": vocabulary.labels[entity_ids[index]],
+                "count": int(counts[index]),
+                "pmi": float(scores["pmi"][index]),
+                "npmi": float(scores["npmi"][index]),
+                "chi2": float(scores["chi2"][index]),
+            }
+            for index in order.tolist()
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns the size of the aggregated data.
+
+        Returns:
+            Dictionary with the unit, the number of units and variants, and the number
+            of entities and distinct co-occurring pairs per category
+        """
+        return {
+            "unit": self.unit,
+            "units": self.total,
+            "variants": len(self.variants),
+            "entities": {category: len(self.entities[category]) for category in self.categories},
+            "pairs": {
+                category: sum(len(counter) for counter in self.pair_counts[category].values())
+                for category in self.categories
+            },
+        }
@@ -10,13 +10,15 @@ like genes, diseases, and tissues that appear within the same passage context.
 import csv
 import json
 import logging
-from typing import List, Dict, Any, Optional, Union, Tuple, Set
-from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union, Tuple, Set
 
 import bioc
 from src.api.clients.pubtator_client import PubTatorClient
 from src.api.clients.exceptions import PubTatorError
 from src.analysis.context.context_analyzer import ContextAnalyzer
+from src.analysis.context.cooccurrence_matrix import DEFAULT_DISTANCE_SCALE, cooccurrence_matrix
+from src.analysis.context.relationship_writers import PRODUCT_FIELDS, iter_product_rows, write_relationship_pairs
+from src.models.entities.annotations import CompactAnnotation, CompactPassage, as_compact_passage
 
 class CooccurrenceContextAnalyzer(ContextAnalyzer):
     """
@@ -42,15 +44,19 @@ class CooccurrenceContextAnalyzer(ContextAnalyzer):
         "chemical": ["Chemical"]
     }
     
-    def __init__(self, pubtator_client: Optional[PubTatorClient] = None):
+    def __init__(self, pubtator_client: Optional[PubTatorClient] = None,
+                 distance_scale: float = DEFAULT_DISTANCE_SCALE):
         """
         Initialize the Cooccurrence Context Analyzer.
         
         Args:
             pubtator_client: Custom PubTator client instance (optional)
+            distance_scale: Token distance at which the co-occurrence score of a
+                variant-entity pair drops to 1/e
         """
         super().__init__(pubtator_client)
         self.logger = logging.getLogger(__name__)
+        self.distance_scale = distance_scale
     
     def analyze_publications(self, pmids: List[str]) -> List[Dict[str, Any]]:
         """
@@ -68,8 +74,8 @@ class CooccurrenceContextAnalyzer(ContextAnalyzer):
         relationships = []
         
         try:
-            # Retrieve publications from PubTator
-            publications = self.pubtator_client.get_publications_by_pmids(pmids)
+            # Retrieve publications from PubTator as compact documents
+            publications = self.pubtator_client.get_publications_by_pmids(pmids, compact=True)
             
             for publication in publications:
                 publication_relationships = self._analyze_publication(publication)
@@ -80,6 +86,35 @@ class CooccurrenceContextAnalyzer(ContextAnalyzer):
             self.logger.error(f"Error analyzing publications: {str(e)}")
             raise PubTatorError(f"Error analyzing publications: {str(e)}") from e
     
+    def iter_publication_relationships(self, pmids: List[str],
+                                       batch_size: int = 100) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Analyze publications one at a time as they are downloaded.
+
+        Publications are streamed from PubTator as compact documents, so memory use
+        does not grow with the number of PMIDs. PMIDs that PubTator does not return
+        are skipped.
+
+        Args:
+            pmids: List of PubMed IDs to analyze
+            batch_size: Number of PMIDs requested from PubTator at once
+
+        Yields:
+            Tuples of (PMID, list of relationship dictionaries of that publication)
+
+        Raises:
+            PubTatorError: If there's an error retrieving or processing publications
+        """
+        try:
+            for publication in self.pubtator_client.iter_publications_by_pmids(
+                    pmids, batch_size=batch_size, compact=True):
+                yield publication.id, self._analyze_publication(publication)
+        except PubTatorError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error analyzing publications: {str(e)}")
+            raise PubTatorError(f"Error analyzing publications: {str(e)}") from e
+
     def analyze_publication(self, pmid: str) -> List[Dict[str, Any]]:
         """
         Analyze a single publication to extract variant context relationships.
@@ -124,155 +159,170 @@ class CooccurrenceContextAnalyzer(ContextAnalyzer):
         
         return relationships
     
-    def _analyze_passage(self, pmid: str, passage: bioc.BioCPassage) -> List[Dict[str, Any]]:
+    def _analyze_passage(self, pmid: str,
+                         passage: Union[bioc.BioCPassage, CompactPassage]) -> List[Dict[str, Any]]:
         """
         Extract variant context relationships from a single passage.
         
+        Distances between the variant and entity mentions are computed for the whole
+        passage at once (see cooccurrence_matrix). Each entity gets its character and
+        token distance to the variant, a same-sentence flag and a co-occurrence score;
+        the relationship gets the best entity score in cooccurrence_score.
+        
         Args:
             pmid: PubMed ID of the publication
-            passage: BioCPassage object containing the passage with annotations
+            passage: BioCPassage or CompactPassage object containing the passage with annotations
             
         Returns:
             List of dictionaries containing variant relationship data for this passage
         """
-        relationships = []
+        passage = as_compact_passage(passage)
         
         # Group annotations in the passage by entity type
         entities_by_type = self._group_annotations_by_type(passage)
         
-        # If no variants in this passage, return empty list
-        if not any(variant_type in entities_by_type for variant_type in self.ENTITY_TYPES["variant"]):
-            return []
-        
         # Get all variants
         variants = []
         for variant_type in self.ENTITY_TYPES["variant"]:
-            if variant_type in entities_by_type:
-                variants.extend(entities_by_type[variant_type])
+            variants.extend(entities_by_type.get(variant_type, []))
         
-        # For each variant, create a relationship with other entities in the passage
-        for variant in variants:
-            variant_text = variant.text
-            variant_offset = variant.locations[0].offset if variant.locations else None
-            
+        # If no variants in this passage, return empty list
+        if not variants:
+            return []
+        
+        # Collect the other entities of the passage once, with the relationship key
+        # of their category
+        entity_keys = []
+        entities = []
+        for entity_type, type_list in self.ENTITY_TYPES.items():
+            if entity_type == "variant":
+                continue
+            # Obsługa specjalnych przypadków, żeby uniknąć "speciess" i "chemicalss"
+            if entity_type == "species":
+                key = "species"
+            elif entity_type == "chemical":
+                key = "chemicals"
+            else:
+                key = entity_type + "s"
+            for type_name in type_list:
+                for entity in entities_by_type.get(type_name, []):
+                    entity_keys.append(key)
+                    entities.append(entity)
+        
+        matrix = cooccurrence_matrix(
+            passage.text, [variant.offset for variant in variants], [entity.offset for entity in entities],
+            passage_offset=passage.offset, distance_scale=self.distance_scale)
+        char_distances = matrix["char_distance"].tolist()
+        token_distances = matrix["token_distance"].tolist()
+        same_sentences = matrix["same_sentence"].tolist()
+        scores = matrix["score"].tolist()
+        
+        relationships = []
+        for index, variant in enumerate(variants):
             relationship = {
                 "pmid": pmid,
-                "variant_text": variant_text,
-                "variant_offset": variant_offset,
-                "variant_id": variant.infons.get("identifier", ""),
+                "variant_text": variant.text,
+                "variant_offset": variant.offset,
+                "variant_id": variant.identifier or "",
                 "genes": [],
                 "diseases": [],
                 "tissues": [],
                 "species": [],
                 "chemicals": [],
-                "passage_text": passage.text
+                "passage_text": passage.text,
+                "cooccurrence_score": max(scores[index], default=0.0)
             }
             
-            # Find other entities in the same passage
-            for entity_type, type_list in self.ENTITY_TYPES.items():
-                if entity_type == "variant":
-                    continue
-                
-                entity_data = []
-                for type_name in type_list:
-                    if type_name in entities_by_type:
-                        for entity in entities_by_type[type_name]:
-                            entity_data.append({
-                                "text": entity.text,
-                                "id": entity.infons.get("identifier", ""),
-                                "offset": entity.locations[0].offset if entity.locations else None
-                            })
-                
-                if entity_data:
-                    # Obsługa specjalnych przypadków, żeby uniknąć "speciess" i "chemicalss"
-                    if entity_type == "species":
-                        relationship["species"] = entity_data
-                    elif entity_type == "chemical":
-                        relationship["chemicals"] = entity_data
-                    else:
-                        relationship[entity_type + "s"] = entity_data
+            # Entities in the same passage, with their distance to the variant
+            for entity_index, (key, entity) in enumerate(zip(entity_keys, entities)):
+                relationship.setdefault(key, []).append({
+                    "text": entity.text,
+                    "id": entity.identifier or "",
+                    "offset": entity.offset,
+                    "char_distance": char_distances[index][entity_index],
+                    "token_distance": token_distances[index][entity_index],
+                    "same_sentence": same_sentences[index][entity_index],
+                    "score": scores[index][entity_index]
+                })
             
             relationships.append(relationship)
         
         return relationships
     
-    def _group_annotations_by_type(self, passage: bioc.BioCPassage) -> Dict[str, List[bioc.BioCAnnotation]]:
+    def _group_annotations_by_type(
+            self, passage: Union[bioc.BioCPassage, CompactPassage]) -> Dict[str, List[CompactAnnotation]]:
         """
         Group annotations in a passage by their type.
         
         Args:
-            passage: BioCPassage object containing annotations
+            passage: BioCPassage or CompactPassage object containing annotations
             
         Returns:
-            Dictionary with annotation types as keys and lists of annotations as values
+            Dictionary with annotation types as keys and lists of CompactAnnotation
+            objects as values
         """
-        annotations_by_type = defaultdict(list)
-        
-        for annotation in passage.annotations:
-            anno_type = annotation.infons.get("type")
-            if anno_type:
-                annotations_by_type[anno_type].append(annotation)
-        
-        return annotations_by_type
+        return as_compact_passage(passage).annotations_by_type()
     
-    def save_relationships_to_csv(self, relationships: List[Dict[str, Any]], output_file: str):
+    def save_relationships_to_csv(self, relationships: Iterable[Dict[str, Any]], output_file: str):
         """
         Save variant relationship data to a CSV file.
         
+        The file has one row per gene x disease x tissue combination of each
+        relationship, with the passage text in every row. Rows are written as they are
+        generated; for large outputs prefer save_relationship_pairs.
+        
         Args:
-            relationships: List of variant relationship dictionaries
+            relationships: Variant relationship dictionaries (a list or any iterable)
             output_file: Path to the output CSV file
         """
-        if not relationships:
+        if isinstance(relationships, list) and not relationships:
             self.logger.warning("No relationships to save")
             return
         
-        # Define CSV columns
-        columns = ["pmid", "variant_text", "variant_offset", "variant_id", 
-                   "gene_text", "gene_id", "disease_text", "disease_id", 
-                   "tissue_text", "tissue_id", "passage_text"]
-        
-        # Flatten the relationships for CSV format
-        flattened_data = []
-        for rel in relationships:
-            # Base entry with variant information
-            base_entry = {
-                "pmid": rel["pmid"],
-                "variant_text": rel["variant_text"],
-                "variant_offset": rel["variant_offset"],
-                "variant_id": rel["variant_id"],
-                "passage_text": rel["passage_text"]
-            }
-            
-            # Create entries for each combination of entities
-            genes = rel["genes"] if rel["genes"] else [{"text": "", "id": ""}]
-            diseases = rel["diseases"] if rel["diseases"] else [{"text": "", "id": ""}]
-            tissues = rel["tissues"] if rel["tissues"] else [{"text": "", "id": ""}]
-            
-            for gene in genes:
-                for disease in diseases:
-                    for tissue in tissues:
-                        entry = base_entry.copy()
-                        entry["gene_text"] = gene.get("text", "")
-                        entry["gene_id"] = gene.get("id", "")
-                        entry["disease_text"] = disease.get("text", "")
-                        entry["disease_id"] = disease.get("id", "")
-                        entry["tissue_text"] = tissue.get("text", "")
-                        entry["tissue_id"] = tissue.get("id", "")
-                        flattened_data.append(entry)
-        
         # Write to CSV
         try:
             with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=columns)
+                writer = csv.DictWriter(csvfile, fieldnames=PRODUCT_FIELDS)
                 writer.writeheader()
-                writer.writerows(flattened_data)
+                rows = 0
+                for entry in iter_product_rows(relationships):
+                    writer.writerow(entry)
+                    rows += 1
             
-            self.logger.info(f"Saved {len(flattened_data)} relationship entries to {output_file}")
+            self.logger.info(f"Saved {rows} relationship entries to {output_file}")
         except Exception as e:
             self.logger.error(f"Error saving relationships to CSV: {str(e)}")
             raise
     
+    def save_relationship_pairs(self, relationships: Iterable[Dict[str, Any]], output_file: str,
+                                passages_file: Optional[str] = None,
+                                file_format: Optional[str] = None) -> Dict[str, int]:
+        """
+        Save variant relationship data with one row per variant-entity pair.
+        
+        Passage texts are written once to a separate table referenced by passage_id
+        (see relationship_writers). Rows are written as they are generated, so
+        relationships may be a generator over a whole corpus.
+        
+        Args:
+            relationships: Variant relationship dictionaries (a list or any iterable)
+            output_file: Path to the output file
+            passages_file: Path to the passages table (default: output_file with
+                "_passages" added before the extension)
+            file_format: "csv" or "parquet" (default: from the extension of output_file)
+            
+        Returns:
+            Dictionary with the numbers of written pair and passage rows
+        """
+        try:
+            counts = write_relationship_pairs(relationships, output_file, passages_file, file_format)
+            self.logger.info(f"Saved {counts['pairs']} relationship pairs and {counts['passages']} "
+                             f"passages to {output_file}")
+            return counts
+        except Exception as e:
+            self.logger.error(f"Error saving relationship pairs: {str(e)}")
+            raise
+    
     def save_relationships_to_json(self, relationships: List[Dict[str, Any]], output_file: str):
         """
         Save variant relationship data to a JSON file.
@@ -0,0 +1,266 @@
+"""
+Cheap pre-scoring of variant-entity pairs before LLM relationship analysis.
+
+The LLM analyzers send every passage with a variant and any other entity to the model,
+including reference lists, methods boilerplate and passages where the entities are far
+apart. PassagePrefilter scores the co-occurring pairs found by
+CooccurrenceContextAnalyzer using:
+- the token distance between the two mentions,
+- whether both mentions are in the same sentence,
+- the section of the passage (from the passage infons),
+- relation keywords in the sentences of the mentions (same or adjacent sentences only),
+and lets the analyzers drop pairs below a tunable threshold before they reach the LLM.
+"""
+
+import logging
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import bioc
+
+from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+from src.analysis.context.sentences import sentence_index, split_sentences
+
+
+class PassagePrefilter:
+    """
+    Scores variant-entity pairs of a passage and decides which ones are worth an LLM call.
+
+    The score of a pair is:
+        section_prior * (w_distance * exp(-tokens / distance_scale)
+                         + w_sentence * same_sentence + w_keyword * has_keyword)
+    and lies between 0 and 1.
+
+    Example usage:
+        prefilter = PassagePrefilter(threshold=0.3)
+        analyzer = UnifiedLlmContextAnalyzer(prefilter=prefilter)
+        analyzer.analyze_publications(pmids)
+        print(prefilter.report())
+    """
+
+    # Prior probability of a relationship statement per section. Keys are the PubTator
+    # section_type infon values; unknown sections get DEFAULT_SECTION_PRIOR.
+    SECTION_PRIORS = {
+        "TITLE": 1.0,
+        "ABSTRACT": 1.0,
+        "RESULTS": 1.0,
+        "CASE": 1.0,
+        "DISCUSS": 0.9,
+        "CONCL": 0.9,
+        "TABLE": 0.8,
+        "FIG": 0.8,
+        "INTRO": 0.7,
+        "SUPPL": 0.5,
+        "METHODS": 0.3,
+        "ABBR": 0.1,
+        "REF": 0.0,
+        "ACK_FUND": 0.0,
+        "AUTH_CONT": 0.0,
+        "COMP_INT": 0.0,
+    }
+
+    DEFAULT_SECTION_PRIOR = 0.8
+
+    # Passage "type" infon values mapped to section types, for documents without section_type
+    PASSAGE_TYPE_SECTIONS = {
+        "front": "TITLE",
+        "title": "TITLE",
+        "abstract": "ABSTRACT",
+        "ref": "REF",
+        "table": "TABLE",
+        "table_caption": "TABLE",
+        "fig_caption": "FIG",
+    }
+
+    # Words and phrases suggesting a relationship statement
+    RELATION_KEYWORDS = [
+        "associat", "caus", "pathogenic", "carrier", "harbo", "detected", "identified",
+        "found in", "mutation in", "patients with", "risk", "predispos", "resistan",
+        "sensitiv", "response to", "linked", "segregat", "confer", "result in", "lead to",
+        "led to", "responsible for", "impair", "loss of function", "gain of function",
+        "express", "diagnos", "correlat"
+    ]
+
+    # Entity lists of the CooccurrenceContextAnalyzer records
+    ENTITY_KEYS = ("genes", "diseases", "tissues", "species", "chemicals")
+
+    DEFAULT_WEIGHTS = {"distance": 0.5, "sentence": 0.3, "keyword": 0.2}
+
+    def __init__(self, threshold: float = 0.2, distance_scale: float = 25.0,
+                 weights: Optional[Dict[str, float]] = None,
+                 section_priors: Optional[Dict[str, float]] = None,
+                 keywords: Optional[List[str]] = None,
+                 cooccurrence_analyzer: Optional[CooccurrenceContextAnalyzer] = None):
+        """
+        Initializes the prefilter.
+
+        Args:
+            threshold: Minimum score of a pair sent to the LLM (0 keeps every pair)
+            distance_scale: Token distance at which the distance component drops to 1/e
+            weights: Weights of the "distance", "sentence" and "keyword" components
+            section_priors: Overrides of SECTION_PRIORS
+            keywords: Relation keywords replacing RELATION_KEYWORDS
+            cooccurrence_analyzer: Analyzer providing the co-occurring pairs, created on
+                first use if not given
+        """
+        self.logger = logging.getLogger(__name__)
+        self.threshold = threshold
+        self.distance_scale = distance_scale
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+        self.section_priors = dict(self.SECTION_PRIORS, **(section_priors or {}))
+        self.keywords = [keyword.lower() for keyword in (keywords or self.RELATION_KEYWORDS)]
+        self._keyword_pattern = re.compile("|".join(re.escape(keyword) for keyword in self.keywords))
+        self.cooccurrence_analyzer = cooccurrence_analyzer
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Resets the counters reported by report()."""
+        self.stats = {"pairs_total": 0, "pairs_kept": 0, "jobs_total": 0, "jobs_kept": 0}
+
+    def get_section(self, passage: bioc.BioCPassage) -> str:
+        """
+        Returns the section type of a passage.
+
+        Args:
+            passage: BioCPassage
+
+        Returns:
+            Upper-case section type, or an empty string if unknown
+        """
+        section = passage.infons.get("section_type")
+        if section:
+            return section.upper()
+        return self.PASSAGE_TYPE_SECTIONS.get(str(passage.infons.get("type", "")).lower(), "")
+
+    def score_passage(self, pmid: str, passage: bioc.BioCPassage) -> Dict[Tuple[int, int, str], float]:
+        """
+        Scores all co-occurring variant-entity pairs of a passage.
+
+        Args:
+            pmid: PubMed identifier
+            passage: BioCPassage with annotations
+
+        Returns:
+            Dictionary mapping (variant offset, entity offset, entity text) to the pair score.
+            Offsets are the document offsets of the BioC annotations
+        """
+        if self.cooccurrence_analyzer is None:
+            self.cooccurrence_analyzer = CooccurrenceContextAnalyzer()
+
+        records = self.cooccurrence_analyzer._analyze_passage(pmid, passage)
+        if not records:
+            return {}
+
+        text = passage.text or ""
+        section_prior = self.section_priors.get(self.get_section(passage), self.DEFAULT_SECTION_PRIOR)
+        spans = split_sentences(text)
+        lowered = text.lower()
+        # Keyword flags of sentence windows, shared by the pairs of the passage
+        keyword_windows = {}
+
+        scores = {}
+        for record in records:
+            variant_offset = record["variant_offset"]
+            for key in self.ENTITY_KEYS:
+                for entity in record.get(key, []):
+                    entity_offset = entity.get("offset")
+                    if variant_offset is None or entity_offset is None:
+                        score = section_prior * self.weights["sentence"]
+                    else:
+                        score = self._score_pair(text, lowered, spans, section_prior,
+                                                 variant_offset - passage.offset,
+                                                 entity_offset - passage.offset,
+                                                 entity.get("token_distance"), keyword_windows)
+                    scores[(variant_offset, entity_offset, entity["text"])] = score
+
+        return scores
+
+    def _score_pair(self, text: str, lowered: str, spans: List[Tuple[int, int]], section_prior: float,
+                    variant_start: int, entity_start: int, tokens_between: Optional[int] = None,
+                    keyword_windows: Optional[Dict[Tuple[int, int], float]] = None) -> float:
+        """
+        Scores a single pair of mentions.
+
+        Args:
+            text: Passage text
+            lowered: Lower-cased passage text
+            spans: Sentence spans of the passage
+            section_prior: Prior of the passage section
+            variant_start: Offset of the variant mention within the passage
+            entity_start: Offset of the entity mention within the passage
+            tokens_between: Number of tokens between the mentions, as computed by
+                CooccurrenceContextAnalyzer; counted in the text if not given
+            keyword_windows: Cache of keyword flags by (first, last) sentence index,
+                shared by the pairs of one passage
+
+        Returns:
+            Score between 0 and 1
+        """
+        if section_prior <= 0:
+            return 0.0
+
+        first, last = sorted((variant_start, entity_start))
+        if tokens_between is None:
+            # Tokens strictly between the two mentions (the first mention's own token excluded)
+            tokens_between = max(0, len(text[first:last].split()) - 1)
+        distance_score = math.exp(-tokens_between / self.distance_scale)
+
+        first_sentence = sentence_index(spans, first)
+        last_sentence = sentence_index(spans, last)
+        same_sentence = 1.0 if first_sentence == last_sentence else 0.0
+
+        # Keywords count only for mentions in the same or adjacent sentences
+        has_keyword = 0.0
+        if last_sentence - first_sentence <= 1:
+            window_key = (first_sentence, last_sentence)
+            if keyword_windows is not None and window_key in keyword_windows:
+                has_keyword = keyword_windows[window_key]
+            else:
+                window = lowered[spans[first_sentence][0]:spans[last_sentence][1]]
+                has_keyword = 1.0 if self._keyword_pattern.search(window) else 0.0
+                if keyword_windows is not None:
+                    keyword_windows[window_key] = has_keyword
+
+        return section_prior * (self.weights["distance"] * distance_score
+                                + self.weights["sentence"] * same_sentence
+                                + self.weights["keyword"] * has_keyword)
+
+    def keep(self, score: float) -> bool:
+        """
+        Checks whether a pair with the given score should be sent to the LLM.
+
+        Args:
+            score: Pair score returned by score_passage
+
+        Returns:
+            True if the score reaches the threshold
+        """
+        return score >= self.threshold
+
+    def record_job(self, pairs_total: int, pairs_kept: int) -> None:
+        """
+        Records the outcome of filtering the pairs of one variant.
+
+        Args:
+            pairs_total: Number of entity pairs of the variant
+            pairs_kept: Number of pairs that passed the filter
+        """
+        self.stats["pairs_total"] += pairs_total
+        self.stats["pairs_kept"] += pairs_kept
+        self.stats["jobs_total"] += 1
+        self.stats["jobs_kept"] += pairs_kept > 0
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns how much work the prefilter saved.
+
+        Returns:
+            Dictionary with pair and job counts, the number of LLM calls saved (one call
+            per variant job) and the threshold used
+        """
+        report = dict(self.stats)
+        report["pairs_dropped"] = report["pairs_total"] - report["pairs_kept"]
+        report["llm_calls_saved"] = report["jobs_total"] - report["jobs_kept"]
+        report["threshold"] = self.threshold
+        return report
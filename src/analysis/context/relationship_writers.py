@@ -0,0 +1,314 @@
+"""
+Streaming writers of co-occurrence relationships.
+
+The CSV format of CooccurrenceContextAnalyzer.save_relationships_to_csv has one row per
+combination of the genes, diseases and tissues of a variant, each carrying the full
+passage text: a passage with 20 genes and 15 diseases gives 300 rows with 300 copies of
+the passage.
+
+The writers below use a pair layout instead:
+- the relationships table has one row per variant-entity pair (entity_type tells the
+  category), with the distances and score computed by the analyzer, and refers to the
+  passage by passage_id,
+- the passages table stores each passage text once (passage_id, pmid, passage_text).
+Rows are produced by generators and written as they are produced, so relationships can
+be passed as any iterable, e.g. the output of iter_publication_relationships, without
+being held in memory.
+
+Both tables can be written as CSV or as Parquet (requires pyarrow), which keeps column
+types and is read directly by pandas.read_parquet.
+
+Example usage:
+    write_relationship_pairs(relationships, "pairs.parquet")
+    pairs = pandas.read_parquet("pairs.parquet")
+    passages = pandas.read_parquet("pairs_passages.parquet")
+    pairs.merge(passages, on=["passage_id", "pmid"])
+"""
+
+import csv
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None
+    pq = None
+
+# Relationship keys of the entity lists and the entity_type written for them
+ENTITY_CATEGORIES = (
+    ("genes", "gene"),
+    ("diseases", "disease"),
+    ("tissues", "tissue"),
+    ("species", "species"),
+    ("chemicals", "chemical"),
+)
+
+PAIR_FIELDS = [
+    "pmid", "passage_id", "variant_text", "variant_offset", "variant_id",
+    "entity_type", "entity_text", "entity_id", "entity_offset",
+    "char_distance", "token_distance", "same_sentence", "score",
+]
+
+PASSAGE_FIELDS = ["passage_id", "pmid", "passage_text"]
+
+# Legacy columns of save_relationships_to_csv
+PRODUCT_FIELDS = [
+    "pmid", "variant_text", "variant_offset", "variant_id",
+    "gene_text", "gene_id", "disease_text", "disease_id",
+    "tissue_text", "tissue_id", "cooccurrence_score", "passage_text",
+]
+
+# Number of rows per Parquet record batch
+PARQUET_BATCH_SIZE = 10000
+
+FILE_FORMATS = ("csv", "parquet")
+
+
+def passage_id(pmid: str, passage_text: str) -> str:
+    """
+    Returns a stable identifier of a passage.
+
+    Args:
+        pmid: PubMed identifier of the publication
+        passage_text: Text of the passage
+
+    Returns:
+        Hexadecimal digest of the PMID and the text
+    """
+    return hashlib.sha1(f"{pmid}\n{passage_text}".encode("utf-8")).hexdigest()[:16]
+
+
+def iter_product_rows(relationships: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the rows of the legacy CSV layout, one per gene x disease x tissue combination.
+
+    Args:
+        relationships: Relationship records of CooccurrenceContextAnalyzer
+
+    Yields:
+        Row dictionaries with the PRODUCT_FIELDS columns
+    """
+    empty = [{"text": "", "id": ""}]
+    for rel in relationships:
+        base_entry = {
+            "pmid": rel["pmid"],
+            "variant_text": rel["variant_text"],
+            "variant_offset": rel["variant_offset"],
+            "variant_id": rel["variant_id"],
+            "cooccurrence_score": rel.get("cooccurrence_score", ""),
+            "passage_text": rel["passage_text"]
+        }
+        for gene in rel.get("genes") or empty:
+            for disease in rel.get("diseases") or empty:
+                for tissue in rel.get("tissues") or empty:
+                    entry = base_entry.copy()
+                    entry["gene_text"] = gene.get("text", "")
+                    entry["gene_id"] = gene.get("id", "")
+                    entry["disease_text"] = disease.get("text", "")
+                    entry["disease_id"] = disease.get("id", "")
+                    entry["tissue_text"] = tissue.get("text", "")
+                    entry["tissue_id"] = tissue.get("id", "")
+                    yield entry
+
+
+def iter_pair_rows(relationships: Iterable[Dict[str, Any]]
+                   ) -> Iterator[Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Converts relationship records to the pair layout.
+
+    Args:
+        relationships: Relationship records of CooccurrenceContextAnalyzer
+
+    Yields:
+        For each record, a tuple of the passage row (None if the passage was already
+        yielded) and the pair rows. A variant without entities gets one row with empty
+        entity fields
+    """
+    seen_passages = set()
+    for rel in relationships:
+        pmid = rel["pmid"]
+        text = rel.get("passage_text") or ""
+        pid = passage_id(pmid, text)
+        passage_row = None
+        if pid not in seen_passages:
+            seen_passages.add(pid)
+            passage_row = {"passage_id": pid, "pmid": pmid, "passage_text": text}
+
+        base = {
+            "pmid": pmid,
+            "passage_id": pid,
+            "variant_text": rel.get("variant_text"),
+            "variant_offset": rel.get("variant_offset"),
+            "variant_id": rel.get("variant_id"),
+        }
+        rows = []
+        for key, entity_type in ENTITY_CATEGORIES:
+            for entity in rel.get(key) or []:
+                row = dict(base)
+                row.update({
+                    "entity_type": entity_type,
+                    "entity_text": entity.get("text"),
+                    "entity_id": entity.get("id"),
+                    "entity_offset": entity.get("offset"),
+                    "char_distance": entity.get("char_distance"),
+                    "token_distance": entity.get("token_distance"),
+                    "same_sentence": entity.get("same_sentence"),
+                    "score": entity.get("score"),
+                })
+                rows.append(row)
+        if not rows:
+            rows.append(dict(base, **{field: None for field in PAIR_FIELDS if field not in base}))
+        yield passage_row, rows
+
+
+def default_passages_file(output_file: str) -> str:
+    """
+    Returns the path of the passages table written next to a relationships table.
+
+    Args:
+        output_file: Path of the relationships table, e.g. "pairs.csv"
+
+    Returns:
+        Path with "_passages" added before the extension, e.g. "pairs_passages.csv"
+    """
+    stem, extension = os.path.splitext(output_file)
+    return f"{stem}_passages{extension}"
+
+
+def _write_pairs_csv(relationships: Iterable[Dict[str, Any]], output_file: str,
+                     passages_file: str) -> Dict[str, int]:
+    """Writes the pair and passage tables as CSV files."""
+    counts = {"pairs": 0, "passages": 0}
+    with open(output_file, "w", newline="", encoding="utf-8") as pairs_csv, \
+            open(passages_file, "w", newline="", encoding="utf-8") as passages_csv:
+        pair_writer = csv.DictWriter(pairs_csv, fieldnames=PAIR_FIELDS)
+        passage_writer = csv.DictWriter(passages_csv, fieldnames=PASSAGE_FIELDS)
+        pair_writer.writeheader()
+        passage_writer.writeheader()
+        for passage_row, rows in iter_pair_rows(relationships):
+            if passage_row is not None:
+                passage_writer.writerow(passage_row)
+                counts["passages"] += 1
+            pair_writer.writerows(rows)
+            counts["pairs"] += len(rows)
+    return counts
+
+
+def _pair_schema() -> "pa.Schema":
+    """Returns the Parquet schema of the pair table."""
+    return pa.schema([
+        ("pmid", pa.string()),
+        ("passage_id", pa.string()),
+        ("variant_text", pa.string()),
+        ("variant_offset", pa.int64()),
+        ("variant_id", pa.string()),
+        ("entity_type", pa.string()),
+        ("entity_text", pa.string()),
+        ("entity_id", pa.string()),
+        ("entity_offset", pa.int64()),
+        ("char_distance", pa.int64()),
+        ("token_distance", pa.int64()),
+        ("same_sentence", pa.bool_()),
+        ("score", pa.float64()),
+    ])
+
+
+def _passage_schema() -> "pa.Schema":
+    """Returns the Parquet schema of the passage table."""
+    return pa.schema([
+        ("passage_id", pa.string()),
+        ("pmid", pa.string()),
+        ("passage_text", pa.string()),
+    ])
+
+
+class _ParquetBatchWriter:
+    """
+    Buffers rows and writes them to a Parquet file as record batches.
+    """
+
+    def __init__(self, path: str, schema: "pa.Schema", batch_size: int):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.writer = pq.ParquetWriter(path, schema)
+        self.columns = {name: [] for name in schema.names}
+        self.buffered = 0
+        self.written = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffered:
+            return
+        self.writer.write_batch(pa.RecordBatch.from_pydict(self.columns, schema=self.schema))
+        self.written += self.buffered
+        self.columns = {name: [] for name in self.schema.names}
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+def _write_pairs_parquet(relationships: Iterable[Dict[str, Any]], output_file: str,
+                         passages_file: str, batch_size: int) -> Dict[str, int]:
+    """Writes the pair and passage tables as Parquet files."""
+    pairs = _ParquetBatchWriter(output_file, _pair_schema(), batch_size)
+    passages = _ParquetBatchWriter(passages_file, _passage_schema(), batch_size)
+    try:
+        for passage_row, rows in iter_pair_rows(relationships):
+            if passage_row is not None:
+                passages.write(passage_row)
+            for row in rows:
+                pairs.write(row)
+    finally:
+        pairs.close()
+        passages.close()
+    return {"pairs": pairs.written, "passages": passages.written}
+
+
+def write_relationship_pairs(relationships: Iterable[Dict[str, Any]], output_file: str,
+                             passages_file: Optional[str] = None, file_format: Optional[str] = None,
+                             batch_size: int = PARQUET_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Writes relationships in the pair layout, with passage texts in a separate table.
+
+    Args:
+        relationships: Relationship records of CooccurrenceContextAnalyzer, consumed
+            lazily
+        output_file: Path of the relationships table
+        passages_file: Path of the passages table (default: output_file with
+            "_passages" added before the extension)
+        file_format: "csv" or "parquet" (default: from the extension of output_file,
+            Parquet for ".parquet" and ".pq", CSV otherwise)
+        batch_size: Number of rows per Parquet record batch
+
+    Returns:
+        Dictionary with the numbers of written pair and passage rows
+
+    Raises:
+        ValueError: If the format is unknown, or Parquet is requested without pyarrow
+    """
+    if file_format is None:
+        extension = os.path.splitext(output_file)[1].lower()
+        file_format = "parquet" if extension in (".parquet", ".pq") else "csv"
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format: {file_format}. Use one of {FILE_FORMATS}")
+
+    passages_file = passages_file or default_passages_file(output_file)
+
+    if file_format == "parquet":
+        if not HAS_PYARROW:
+            raise ValueError("Parquet output requires the pyarrow package")
+        return _write_pairs_parquet(relationships, output_file, passages_file, batch_size)
+    return _write_pairs_csv(relationships, output_file, passages_file)
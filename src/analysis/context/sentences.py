@@ -0,0 +1,107 @@
+"""
+Sentence segmentation of passage texts.
+
+A lightweight, regex-based splitter used where sentence boundaries only need to be
+approximately right, e.g. to check whether two annotations are mentioned in the same
+sentence, or to cut a long passage down to the sentences around a few mentions.
+Sentences are returned as character spans, so annotation offsets can be mapped to
+them directly.
+"""
+
+import bisect
+import re
+from typing import List, Optional, Tuple
+
+# Sentence end: ., ! or ? followed by whitespace and an upper-case letter, digit or bracket.
+# Dots inside tokens such as "p.V600E" or "c.1799T>A" are not followed by whitespace.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+
+# Abbreviations after which a dot does not end a sentence
+_ABBREVIATIONS = ("et al.", "e.g.", "i.e.", "Fig.", "Figs.", "vs.", "approx.", "No.", "Ref.")
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Splits a text into sentences.
+
+    Args:
+        text: Text of a passage
+
+    Returns:
+        List of (start, end) character spans of the sentences, in order. Whitespace
+        between sentences is not part of any span.
+    """
+    spans = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        if text[:match.start()].endswith(_ABBREVIATIONS):
+            continue
+        spans.append((start, match.start()))
+        start = match.end()
+
+    if start < len(text) or not spans:
+        spans.append((start, len(text)))
+
+    return spans
+
+
+def sentence_index(spans: List[Tuple[int, int]], offset: int) -> int:
+    """
+    Returns the index of the sentence containing a character offset.
+
+    Offsets that fall between sentences are assigned to the preceding sentence.
+
+    Args:
+        spans: Sentence spans returned by split_sentences
+        offset: Character offset relative to the start of the text
+
+    Returns:
+        Index into spans
+    """
+    starts = [start for start, _ in spans]
+    return max(0, bisect.bisect_right(starts, offset) - 1)
+
+
+def context_window(text: str, offsets: List[int], window: int = 0,
+                   spans: Optional[List[Tuple[int, int]]] = None, separator: str = " ... ") -> str:
+    """
+    Extracts the sentences mentioning the given offsets, with neighbouring sentences.
+
+    Runs of consecutive selected sentences are copied from the text as they are;
+    omitted sentences between runs are replaced with the separator.
+
+    Args:
+        text: Text of a passage
+        offsets: Character offsets of the mentions, relative to the start of the text
+        window: Number of neighbouring sentences added on each side of a mentioned sentence
+        spans: Sentence spans of the text, computed with split_sentences if not given
+        separator: Text put in place of omitted sentences
+
+    Returns:
+        Text of the selected sentences, or the whole text if offsets is empty
+    """
+    if not offsets:
+        return text
+
+    if spans is None:
+        spans = split_sentences(text)
+
+    selected = set()
+    for offset in offsets:
+        index = sentence_index(spans, offset)
+        selected.update(range(max(0, index - window), min(len(spans), index + window + 1)))
+
+    parts = []
+    run_start = run_end = None
+    for index in sorted(selected):
+        if run_end is not None and index == run_end + 1:
+            run_end = index
+            continue
+        if run_start is not None:
+            parts.append(text[spans[run_start][0]:spans[run_end][1]])
+        run_start = run_end = index
+    parts.append(text[spans[run_start][0]:spans[run_end][1]])
+
+    prefix = separator.lstrip() if min(selected) > 0 else ""
+    suffix = separator.rstrip() if max(selected) < len(spans) - 1 else ""
+    return prefix + separator.join(parts) + suffix
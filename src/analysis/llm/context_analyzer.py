@@ -11,8 +11,9 @@ import csv
 import json
 import logging
 import os
-import re
-from typing import List, Dict, Any, Optional, Union, Tuple, Set
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Union, Tuple, Set
 from collections import defaultdict
 
 import bioc
@@ -20,12 +21,28 @@ from langchain.prompts import PromptTemplate
 from langchain.schema import HumanMessage, SystemMessage
 
 from src.models.data.clients.pubtator import PubTatorClient
-from src.models.data.clients.exceptions import PubTatorError
+from src.models.data.clients.exceptions import LLMError, PubTatorError
+from src.models.entities.annotations import CompactAnnotation, CompactPassage, as_compact_passage
 from src.analysis.base.analyzer import BaseAnalyzer
+from src.analysis.context.passage_prefilter import PassagePrefilter
+from src.analysis.context.sentences import context_window
+from src.utils.llm.batch import BatchSubmitter, run_batch, write_batch_file
+from src.utils.llm.cache_keys import analyzer_cache_key, stable_digest
 from src.utils.llm.manager import LlmManager
+from src.utils.llm.near_duplicate_cache import NearDuplicateCache
+from src.utils.llm.structured_output import parse_structured
 from src.api.cache.cache import CacheManager
 
 
+class FailedRelationships(list):
+    """
+    Empty result of an LLM request that failed, as opposed to an answer without
+    relationships. Returned so that callers that checkpoint results can retry the
+    publication instead of recording it as finished.
+    """
+    pass
+
+
 class UnifiedLlmContextAnalyzer(BaseAnalyzer):
     """
     Analyzer of contextual relationships between variants and other biomedical entities
@@ -58,6 +75,19 @@ class UnifiedLlmContextAnalyzer(BaseAnalyzer):
         "chemical": ["Chemical"]
     }
     
+    # Columns written first in CSV files
+    CSV_KEY_FIELDS = [
+        "pmid", "variant_id", "variant_text", 
+        "entity_id", "entity_text", "entity_type", "entity_category",
+        "has_relationship", "relationship_score", "explanation"
+    ]
+    
+    # Audit columns of relationships reused from a near-duplicate passage
+    NEAR_DUPLICATE_FIELDS = ["near_duplicate_of", "near_duplicate_similarity"]
+    
+    # Columns of CSV files written incrementally, where the header cannot depend on the data
+    STREAM_CSV_FIELDS = CSV_KEY_FIELDS + ["passage_text"] + NEAR_DUPLICATE_FIELDS
+    
     # System prompt template
     SYSTEM_PROMPT = """You are an expert in biomedical text analysis and recognizing relationships between 
 biomedical entities. Your task is to determine whether there are semantic relationships between a genetic 
@@ -104,11 +134,81 @@ Response format:
 }}
 """
     
+    # User prompt template for all variants of a passage in one request
+    PACKED_USER_PROMPT_TEMPLATE = """Analyze the provided biomedical text fragment and determine, for each of the 
+following genetic variants, whether there are semantic relationships between the variant and the following 
+biomedical entities.
+
+Variants:
+{variants_list}
+
+Entities:
+{entities_list}
+
+Respond in a strictly defined JSON format with one entry per variant, keyed by the variant text exactly as 
+listed above. For each variant and each entity specify:
+1. Whether there is a relationship with the variant (true/false)
+2. The strength of the relationship on a scale from 0 to 10 (0 = no relationship, 10 = strongest relationship)
+3. Brief justification of your decision (1-2 sentences)
+
+Text fragment: "{passage_text}"
+
+Response format:
+{{
+  "variants": {{
+    "variant text": {{
+      "relationships": [
+        {{
+          "entity_type": "entity type, e.g., gene",
+          "entity_text": "entity text",
+          "entity_id": "entity identifier",
+          "has_relationship": true/false,
+          "relationship_score": 0-10,
+          "explanation": "Brief justification of the decision"
+        }},
+        ...
+      ]
+    }},
+    ...
+  }}
+}}
+"""
+    
+    # Version of the prompts above, part of the LLM cache key
+    PROMPT_VERSION = 1
+    
+    # JSON schemas of the LLM answers, used to validate them and convert value types
+    RELATIONSHIP_SCHEMA = {
+        "type": "object",
+        "required": ["entity_text", "has_relationship"],
+        "properties": {
+            "entity_type": {"type": ["string", "null"]},
+            "entity_text": {"type": "string"},
+            "entity_id": {"type": ["string", "null"]},
+            "has_relationship": {"type": "boolean"},
+            "relationship_score": {"type": ["integer", "null"], "minimum": 0, "maximum": 10},
+            "explanation": {"type": ["string", "null"]}
+        }
+    }
+    RELATIONSHIPS_SCHEMA = {
+        "type": "object",
+        "required": ["relationships"],
+        "properties": {"relationships": {"type": "array", "items": RELATIONSHIP_SCHEMA}}
+    }
+    PACKED_RELATIONSHIPS_SCHEMA = {
+        "type": "object",
+        "required": ["variants"],
+        "properties": {"variants": {"type": "object", "additionalProperties": RELATIONSHIPS_SCHEMA}}
+    }
+    
     def __init__(self, pubtator_client: Optional[PubTatorClient] = None, 
                  llm_model_name: str = "meta-llama/Meta-Llama-3.1-8B-Instruct",
                  use_cache: bool = True, cache_ttl: int = 86400,
                  cache_storage_type: str = "memory",
-                 debug_mode: bool = False):
+                 debug_mode: bool = False, pack_variants: bool = False,
+                 prefilter: Optional[PassagePrefilter] = None,
+                 context_sentences: Optional[int] = None,
+                 near_duplicate_cache: Optional[NearDuplicateCache] = None):
         """
         Initializes the Unified LLM Context Analyzer.
         
@@ -117,8 +217,18 @@ Response format:
             llm_model_name: Name of the LLM model to use
             use_cache: Whether to use cache for LLM queries (default True)
             cache_ttl: Time-to-live for cache entries in seconds (default 24h)
-            cache_storage_type: Type of cache: "memory" or "disk"
+            cache_storage_type: Type of cache: "memory", "disk", "sqlite" or "tiered"
             debug_mode: Whether to enable debugging mode (more logs)
+            pack_variants: Whether to analyze all variants of a passage in a single LLM
+                request instead of one request per variant
+            prefilter: Optional PassagePrefilter; entities scored below its threshold
+                are not sent to the LLM and variants left without entities are skipped
+            context_sentences: If set, the prompt contains only the sentences mentioning
+                the variant and its entities plus this many neighbouring sentences on
+                each side, instead of the whole passage
+            near_duplicate_cache: Optional NearDuplicateCache; single-variant requests
+                whose passage is a near duplicate of an analyzed one reuse its result,
+                marked with the NEAR_DUPLICATE_FIELDS columns
         """
         super().__init__(pubtator_client)
         self.logger = logging.getLogger(__name__)
@@ -140,21 +250,29 @@ Response format:
             self.logger.info("Cache disabled")
             
         # Debug settings
+        self.pack_variants = pack_variants
+        self.prefilter = prefilter
+        self.context_sentences = context_sentences
+        self.near_duplicate_cache = near_duplicate_cache
         self.debug_mode = debug_mode
         if debug_mode:
             self.logger.setLevel(logging.DEBUG)
             self.logger.info("Debug mode enabled")
     
-    def analyze_publications(self, pmids: List[str], save_debug_info: bool = False) -> List[Dict[str, Any]]:
+    def analyze_publications(self, pmids: List[str], save_debug_info: bool = False,
+                             max_concurrency: int = 1) -> List[Dict[str, Any]]:
         """
         Analyzes a list of publications to extract contextual relationships.
         
         Args:
             pmids: List of PubMed identifiers to analyze
             save_debug_info: Whether to save debugging information
+            max_concurrency: Maximum number of LLM requests sent in parallel. With the
+                default of 1 the requests are sent one at a time
             
         Returns:
-            List of dictionaries containing relationship data
+            List of dictionaries containing relationship data, in the same order
+            regardless of max_concurrency
             
         Raises:
             PubTatorError: If an error occurs while fetching or processing publications
@@ -165,9 +283,17 @@ Response format:
             # Fetch publications from PubTator
             publications = self.pubtator_client.get_publications_by_pmids(pmids)
             
-            for publication in publications:
-                publication_relationships = self._analyze_publication(publication)
-                relationships.extend(publication_relationships)
+            if max_concurrency > 1:
+                relationships = self._analyze_publications_concurrently(publications, max_concurrency)
+            else:
+                for publication in publications:
+                    publication_relationships = self._analyze_publication(publication)
+                    relationships.extend(publication_relationships)
+            
+            if self.prefilter:
+                self.logger.info(f"Passage prefilter: {self.prefilter.report()}")
+            if self.near_duplicate_cache:
+                self.logger.info(f"Near-duplicate cache: {self.near_duplicate_cache.report()}")
             
             # If debug mode is enabled, save error information
             if save_debug_info and self.debug_mode:
@@ -191,6 +317,197 @@ Response format:
             self.logger.error(f"Error analyzing publications: {str(e)}")
             raise PubTatorError(f"Error analyzing publications: {str(e)}") from e
     
+    def iter_publication_relationships(self, pmids: List[str], chunk_size: int = 50,
+                                       max_concurrency: int = 1) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Analyzes publications chunk by chunk, yielding the results of each publication.
+        
+        Only one chunk of publications is held in memory at a time, so the caller can
+        write results as they come and keep track of finished PMIDs. PMIDs that PubTator
+        does not return are yielded with an empty list of relationships. A publication
+        with a failed LLM request is not yielded; LLMError is raised instead.
+        
+        Args:
+            pmids: List of PubMed identifiers to analyze
+            chunk_size: Number of publications fetched from PubTator at once
+            max_concurrency: Maximum number of LLM requests sent in parallel within a chunk
+            
+        Yields:
+            Tuples of (PMID, list of relationship dictionaries of that publication)
+            
+        Raises:
+            LLMError: If an LLM request of a publication failed
+            PubTatorError: If an error occurs while fetching or processing publications
+        """
+        for start in range(0, len(pmids), chunk_size):
+            chunk = pmids[start:start + chunk_size]
+            
+            try:
+                publications = self.pubtator_client.get_publications_by_pmids(chunk)
+                
+                if max_concurrency > 1:
+                    relationships_by_pmid = defaultdict(list)
+                    for relationship in self._analyze_publications_concurrently(
+                            publications, max_concurrency, strict=True):
+                        relationships_by_pmid[relationship["pmid"]].append(relationship)
+                    results = [(publication.id, relationships_by_pmid.get(publication.id, []))
+                               for publication in publications]
+                else:
+                    results = ((publication.id, self._analyze_publication(publication, strict=True))
+                               for publication in publications)
+                
+                found_pmids = set()
+                for pmid, relationships in results:
+                    found_pmids.add(pmid)
+                    yield pmid, relationships
+            except (LLMError, PubTatorError):
+                raise
+            except Exception as e:
+                self.logger.error(f"Error analyzing publications: {str(e)}")
+                raise PubTatorError(f"Error analyzing publications: {str(e)}") from e
+            
+            for pmid in chunk:
+                if pmid not in found_pmids:
+                    self.logger.warning(f"Publication not found for PMID: {pmid}")
+                    yield pmid, []
+    
+    def analyze_publications_batch(self, pmids: List[str], submitter: Optional[BatchSubmitter] = None,
+                                   batch_dir: str = os.path.join("data", "batch"),
+                                   poll_interval: float = 60.0,
+                                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Analyzes a list of publications using the provider's batch API.
+        
+        All prompts without a cached answer are written to a JSONL batch file and
+        submitted at once. The answers are stored in the cache, after which the
+        publications are analyzed as usual. Requests that failed in the batch are
+        sent with regular LLM calls.
+        
+        Args:
+            pmids: List of PubMed identifiers to analyze
+            submitter: Batch submitter, by default the batch API of the LLM provider
+            batch_dir: Directory for the batch input and output files
+            poll_interval: Seconds between batch status checks
+            timeout: Maximum number of seconds to wait for the batch, None to wait indefinitely
+            
+        Returns:
+            List of dictionaries containing relationship data
+            
+        Raises:
+            ValueError: If the cache is disabled
+            LLMError: If the batch does not complete
+            PubTatorError: If an error occurs while fetching or processing publications
+        """
+        if not self.use_cache:
+            raise ValueError("Batch mode requires the cache to be enabled")
+        
+        try:
+            publications = self.pubtator_client.get_publications_by_pmids(pmids)
+        except Exception as e:
+            self.logger.error(f"Error fetching publications: {str(e)}")
+            raise PubTatorError(f"Error fetching publications: {str(e)}") from e
+        
+        requests = self._collect_batch_requests(publications)
+        if requests:
+            submitter = submitter or self.llm_manager.get_batch_submitter()
+            run_id = time.strftime("%Y%m%d_%H%M%S")
+            input_path = os.path.join(batch_dir, f"llm_batch_{run_id}_input.jsonl")
+            output_path = os.path.join(batch_dir, f"llm_batch_{run_id}_output.jsonl")
+            
+            write_batch_file(
+                ((custom_id, messages[0].content, messages[1].content)
+                 for custom_id, (_, _, messages) in requests.items()),
+                input_path,
+                model_name=self.llm_model_name
+            )
+            self.logger.info(f"Submitting {len(requests)} LLM requests in batch {input_path}")
+            
+            results = run_batch(submitter, input_path, output_path,
+                                poll_interval=poll_interval, timeout=timeout)
+            cached_count = self._cache_batch_results(requests, results)
+            self.logger.info(f"Cached {cached_count} of {len(requests)} batch results")
+        
+        relationships = []
+        try:
+            for publication in publications:
+                relationships.extend(self._analyze_publication(publication))
+        except Exception as e:
+            self.logger.error(f"Error analyzing publications: {str(e)}")
+            raise PubTatorError(f"Error analyzing publications: {str(e)}") from e
+        
+        if self.prefilter:
+            self.logger.info(f"Passage prefilter: {self.prefilter.report()}")
+        
+        return relationships
+    
+    def _collect_batch_requests(self, publications: List[bioc.BioCDocument]
+                                ) -> Dict[str, Tuple[str, List[str], List[Union[SystemMessage, HumanMessage]]]]:
+        """
+        Collects the LLM requests of all publications that have no cached answer.
+        
+        Args:
+            publications: BioCDocuments to analyze
+            
+        Returns:
+            Dictionary mapping the batch custom_id to the cache key, the variant texts
+            and the messages of the request
+        """
+        requests = {}
+        for publication in publications:
+            for passage in publication.passages:
+                # Prefilter statistics are recorded when the passages are analyzed
+                jobs = self._prepare_passage_jobs(publication.id, passage, record_stats=False)
+                for group in self._group_jobs(jobs):
+                    cache_key = self._get_group_cache_key(group)
+                    custom_id = stable_digest(cache_key)
+                    if custom_id in requests or self.cache.has(cache_key):
+                        continue
+                    
+                    entities = self._group_entities(group)
+                    prompt_text = self._group_prompt_text(group)
+                    variant_texts = self._unique_variant_texts(group)
+                    if len(variant_texts) == 1:
+                        messages = self._build_messages(variant_texts[0], entities, prompt_text)
+                    else:
+                        messages = self._build_packed_messages(variant_texts, entities, prompt_text)
+                    requests[custom_id] = (cache_key, variant_texts, messages)
+        
+        return requests
+    
+    def _cache_batch_results(self, requests: Dict[str, Tuple[str, List[str], List[Any]]],
+                             results: Dict[str, str]) -> int:
+        """
+        Parses batch answers and stores them in the cache.
+        
+        Args:
+            requests: Requests collected by _collect_batch_requests
+            results: Answers read from the batch output, keyed by custom_id
+            
+        Returns:
+            Number of answers stored in the cache
+        """
+        cached_count = 0
+        for custom_id, (cache_key, variant_texts, _) in requests.items():
+            response_text = results.get(custom_id)
+            if response_text is None:
+                continue
+            
+            try:
+                if len(variant_texts) == 1:
+                    value = self._parse_relationships_response(response_text)
+                else:
+                    value = self._parse_packed_response(response_text, variant_texts)
+                    if len(value) != len(variant_texts):
+                        continue
+            except (ValueError, AttributeError) as e:
+                self.logger.warning(f"Could not parse batch answer {custom_id}: {str(e)}")
+                continue
+            
+            self.cache.set(cache_key, value)
+            cached_count += 1
+        
+        return cached_count
+    
     def analyze_publication(self, pmid: str) -> List[Dict[str, Any]]:
         """
         Analyzes a single publication to extract contextual relationships.
@@ -211,38 +528,125 @@ Response format:
             self.logger.error(f"Error analyzing publication {pmid}: {str(e)}")
             raise PubTatorError(f"Error analyzing publication {pmid}: {str(e)}") from e
     
-    def _analyze_publication(self, publication: bioc.BioCDocument) -> List[Dict[str, Any]]:
+    def _analyze_publication(self, publication: bioc.BioCDocument, strict: bool = False) -> List[Dict[str, Any]]:
         """
         Analyzes a publication to extract contextual relationships.
         
         Args:
             publication: BioCDocument to analyze
+            strict: Whether to raise LLMError when an LLM request fails instead of
+                leaving out the relationships of that request
             
         Returns:
             List of dictionaries containing relationship data
+            
+        Raises:
+            LLMError: If strict is set and an LLM request failed
         """
         publication_relationships = []
         pmid = publication.id
         
         for passage in publication.passages:
-            passage_relationships = self._analyze_passage(pmid, passage)
+            passage_relationships = self._analyze_passage(pmid, passage, strict=strict)
             publication_relationships.extend(passage_relationships)
         
         return publication_relationships
     
-    def _analyze_passage(self, pmid: str, passage: bioc.BioCPassage) -> List[Dict[str, Any]]:
+    def _analyze_publications_concurrently(self, publications: List[bioc.BioCDocument],
+                                           max_concurrency: int, strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Analyzes publications sending up to max_concurrency LLM requests at a time.
+        
+        All job groups are collected first and run in a thread pool. Groups with an
+        identical prompt are sent only once. Results are assembled in job order, so
+        the output is the same as in the sequential mode.
+        
+        Args:
+            publications: BioCDocuments to analyze
+            max_concurrency: Maximum number of LLM requests in flight
+            strict: Whether to raise LLMError when an LLM request fails
+            
+        Returns:
+            List of dictionaries containing relationship data
+            
+        Raises:
+            LLMError: If strict is set and an LLM request failed
+        """
+        groups = []
+        for publication in publications:
+            for passage in publication.passages:
+                groups.extend(self._group_jobs(self._prepare_passage_jobs(publication.id, passage)))
+        
+        group_keys = [self._get_group_cache_key(group) for group in groups]
+        unique_groups = {}
+        for key, group in zip(group_keys, groups):
+            unique_groups.setdefault(key, group)
+        
+        if self.prefilter:
+            # Send the most promising requests first
+            unique_groups = dict(sorted(
+                unique_groups.items(),
+                key=lambda item: -max(job.get("prefilter_score", 0.0) for job in item[1])))
+        
+        self.logger.info(f"Running {len(unique_groups)} LLM jobs with concurrency {max_concurrency}")
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = dict(zip(unique_groups, executor.map(self._run_job_group, unique_groups.values())))
+        
+        relationships = []
+        for key, group in zip(group_keys, groups):
+            for job, job_relationships in zip(group, results[key]):
+                if strict:
+                    self._check_job_result(job, job_relationships)
+                relationships.extend(self._attach_job_metadata(job, job_relationships))
+        
+        return relationships
+    
+    def _analyze_passage(self, pmid: str, passage: bioc.BioCPassage, strict: bool = False) -> List[Dict[str, Any]]:
         """
         Analyzes a passage to extract contextual relationships between variants and other entities.
         
         Args:
             pmid: PubMed identifier
             passage: BioCPassage to analyze
+            strict: Whether to raise LLMError when an LLM request fails
             
         Returns:
             List of dictionaries containing relationship data
+            
+        Raises:
+            LLMError: If strict is set and an LLM request failed
         """
         passage_relationships = []
-        passage_text = passage.text
+        
+        for group in self._group_jobs(self._prepare_passage_jobs(pmid, passage)):
+            for job, relationships in zip(group, self._run_job_group(group)):
+                if strict:
+                    self._check_job_result(job, relationships)
+                passage_relationships.extend(self._attach_job_metadata(job, relationships))
+        
+        return passage_relationships
+    
+    def _prepare_passage_jobs(self, pmid: str, passage: Union[bioc.BioCPassage, CompactPassage],
+                              record_stats: bool = True) -> List[Dict[str, Any]]:
+        """
+        Builds one LLM job for each variant in a passage.
+        
+        Args:
+            pmid: PubMed identifier
+            passage: BioCPassage or CompactPassage to analyze; BioC passages are
+                converted once, and the prefilter gets the converted passage
+            record_stats: Whether to count the jobs in the prefilter statistics; False
+                when the same passage is analyzed again later in the run
+            
+        Returns:
+            List of jobs with the fields pmid, passage_text, variant_text, variant_id
+            and entities. Variants without other entities in the passage are skipped.
+            With a prefilter, entities scored below its threshold are left out, variants
+            left without entities are skipped and jobs get the best pair score in
+            prefilter_score. mention_offsets holds the passage-relative offsets of the
+            variant and entity mentions
+        """
+        passage = as_compact_passage(passage)
         
         # Group annotations by entity type
         grouped_annotations = self._group_annotations_by_type(passage)
@@ -253,291 +657,527 @@ Response format:
             if entity_type in grouped_annotations:
                 variant_annotations.extend(grouped_annotations[entity_type])
         
-        # For each variant, analyze relationships with other entities
-        for variant_annotation in variant_annotations:
-            variant_text = variant_annotation.text
-            variant_id = variant_annotation.id
+        if not variant_annotations:
+            return []
+        
+        # Create a list of entities to check for relationships (all entities except variants)
+        entities = []
+        entity_annotations = []
+        for entity_category, entity_types in self.ENTITY_TYPES.items():
+            if entity_category == "variant":
+                continue
             
-            # Create a list of entities to check for relationships
-            entities = []
+            for entity_type in entity_types:
+                if entity_type in grouped_annotations:
+                    for annotation in grouped_annotations[entity_type]:
+                        entities.append({
+                            "entity_category": entity_category,
+                            "entity_type": entity_type,
+                            "entity_text": annotation.text,
+                            "entity_id": annotation.id
+                        })
+                        entity_annotations.append(annotation)
+        
+        # Skip if no other entities in the passage
+        if not entities:
+            return []
+        
+        pair_scores = self.prefilter.score_passage(pmid, passage) if self.prefilter else None
+        
+        jobs = []
+        for variant_annotation in variant_annotations:
+            job = {
+                "pmid": pmid,
+                "passage_text": passage.text,
+                "variant_text": variant_annotation.text,
+                "variant_id": variant_annotation.id,
+                "entities": entities
+            }
+            variant_offset = self._annotation_offset(variant_annotation)
+            kept_annotations = entity_annotations
             
-            # Add all entities except variants to the list
-            for entity_category, entity_types in self.ENTITY_TYPES.items():
-                if entity_category == "variant":
+            if pair_scores is not None:
+                scores = [
+                    pair_scores.get((variant_offset, self._annotation_offset(annotation), annotation.text), 0.0)
+                    for annotation in entity_annotations
+                ]
+                kept = [self.prefilter.keep(score) for score in scores]
+                job["entities"] = [entity for entity, keep in zip(entities, kept) if keep]
+                kept_annotations = [annotation for annotation, keep in zip(entity_annotations, kept) if keep]
+                if record_stats:
+                    self.prefilter.record_job(len(entities), len(job["entities"]))
+                if not job["entities"]:
                     continue
-                
-                for entity_type in entity_types:
-                    if entity_type in grouped_annotations:
-                        for annotation in grouped_annotations[entity_type]:
-                            entities.append({
-                                "entity_category": entity_category,
-                                "entity_type": entity_type,
-                                "entity_text": annotation.text,
-                                "entity_id": annotation.id
-                            })
-            
-            # Skip if no other entities in the passage
-            if not entities:
-                continue
+                job["prefilter_score"] = max(scores)
             
-            # Use LLM to determine relationships
-            relationships = self._analyze_relationships_with_llm(variant_text, entities, passage_text)
+            # Passage-relative offsets of the mentions, used to trim the prompt text
+            job["mention_offsets"] = [
+                None if offset is None else offset - passage.offset
+                for offset in [variant_offset] + [self._annotation_offset(a) for a in kept_annotations]
+            ]
             
-            # Add metadata to relationships
-            for relationship in relationships:
-                relationship["pmid"] = pmid
-                relationship["passage_text"] = passage_text
-                relationship["variant_text"] = variant_text
-                relationship["variant_id"] = variant_id
-                
-                passage_relationships.append(relationship)
+            jobs.append(job)
         
-        return passage_relationships
+        return jobs
     
-    def _analyze_relationships_with_llm(self, variant_text: str, entities: List[Dict[str, Any]], 
-                                      passage_text: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _annotation_offset(annotation: CompactAnnotation) -> Optional[int]:
         """
-        Analyzes relationships between a variant and other entities using LLM.
+        Returns the document offset of an annotation.
+
+        Args:
+            annotation: CompactAnnotation
+
+        Returns:
+            Offset of the first location, None if the annotation has no location
+        """
+        return annotation.offset
+    
+    def _group_jobs(self, jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Groups the jobs of one passage into LLM requests.
         
         Args:
-            variant_text: Text of the variant
-            entities: List of entities to check for relationships
-            passage_text: Text of the passage
+            jobs: Jobs created by _prepare_passage_jobs for a single passage
             
         Returns:
-            List of dictionaries containing relationship data
+            A single group with all jobs in packed mode, otherwise one group per job
         """
-        # Generate cache key based on inputs and model name
-        if self.use_cache:
-            cache_key = f"relationship_{variant_text}_{hash(str(entities))}_{hash(passage_text)}_{self.llm_model_name}"
-            cached_result = self.cache.get(cache_key)
+        if self.pack_variants and len(jobs) > 1:
+            return [jobs]
+        return [[job] for job in jobs]
+    
+    def _get_group_cache_key(self, group: List[Dict[str, Any]]) -> str:
+        """
+        Returns the cache key of the LLM request made for a job group.
+        
+        Args:
+            group: Jobs created by _group_jobs
             
-            if cached_result:
-                self.logger.debug(f"Using cached LLM result for variant {variant_text}")
-                return cached_result
+        Returns:
+            Cache key of the packed request, or of the single-variant request
+        """
+        entities = self._group_entities(group)
+        prompt_text = self._group_prompt_text(group)
+        variant_texts = self._unique_variant_texts(group)
+        if len(variant_texts) == 1:
+            return analyzer_cache_key(self, variant_texts[0], entities, prompt_text)
+        return self._get_packed_cache_key(variant_texts, entities, prompt_text)
+    
+    def _run_job_group(self, group: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Runs the LLM analysis of a job group.
         
-        # Prepare entities list for prompt
-        entities_list = "\n".join([
-            f"- {entity['entity_category']} '{entity['entity_text']}' (ID: {entity['entity_id']})"
-            for entity in entities
-        ])
+        Args:
+            group: Jobs created by _group_jobs
+            
+        Returns:
+            List of relationships returned by the LLM for each job of the group
+        """
+        entities = self._group_entities(group)
+        prompt_text = self._group_prompt_text(group)
+        variant_texts = self._unique_variant_texts(group)
+        if len(variant_texts) == 1:
+            relationships = self._analyze_relationships_with_llm(variant_texts[0], entities, prompt_text)
+            return [relationships] * len(group)
         
-        # Prepare the user prompt
-        prompt = self.USER_PROMPT_TEMPLATE.format(
-            variant_text=variant_text,
-            entities_list=entities_list,
-            passage_text=passage_text
-        )
+        relationships_by_variant = self._analyze_packed_relationships_with_llm(
+            variant_texts, entities, prompt_text)
+        return [relationships_by_variant[job["variant_text"]] for job in group]
+    
+    @staticmethod
+    def _unique_variant_texts(group: List[Dict[str, Any]]) -> List[str]:
+        """
+        Returns the variant texts of a job group without duplicates, in order.
         
-        # Create messages for LLM
-        messages = [
-            SystemMessage(content=self.SYSTEM_PROMPT),
-            HumanMessage(content=prompt)
-        ]
+        Args:
+            group: Jobs created by _group_jobs
+            
+        Returns:
+            List of variant texts
+        """
+        return list(dict.fromkeys(job["variant_text"] for job in group))
+    
+    @staticmethod
+    def _group_entities(group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the entities of all jobs of a group without duplicates, in order.
         
-        try:
-            # Get response from LLM
-            self.logger.debug(f"Querying LLM for variant {variant_text}")
-            response = self.llm.invoke(messages)
-            response_text = response.content
+        Jobs of one passage share their entities unless the prefilter removed some
+        of them for a particular variant.
+        
+        Args:
+            group: Jobs created by _group_jobs
             
-            # Attempt to fix and parse JSON
-            clean_json = self._attempt_json_fix(response_text)
-            result = json.loads(clean_json)
+        Returns:
+            List of entities included in the group's LLM request
+        """
+        if len(group) == 1:
+            return group[0]["entities"]
+        
+        entities = {}
+        for job in group:
+            for entity in job["entities"]:
+                entities.setdefault((entity["entity_type"], entity["entity_text"], entity["entity_id"]), entity)
+        return list(entities.values())
+    
+    def _group_prompt_text(self, group: List[Dict[str, Any]]) -> str:
+        """
+        Returns the passage text sent to the LLM for a job group.
+        
+        Args:
+            group: Jobs created by _group_jobs
             
-            # Extract relationship data
-            relationships = result.get("relationships", [])
+        Returns:
+            The whole passage, or with context_sentences set, the sentences mentioning the
+            variants and entities of the group with their neighbours. The whole passage is
+            also used if a mention has no location
+        """
+        passage_text = group[0]["passage_text"]
+        if self.context_sentences is None or not passage_text:
+            return passage_text
+        
+        offsets = [offset for job in group for offset in job["mention_offsets"]]
+        if None in offsets:
+            return passage_text
+        return context_window(passage_text, offsets, self.context_sentences)
+    
+    @staticmethod
+    def _check_job_result(job: Dict[str, Any], relationships: List[Dict[str, Any]]) -> None:
+        """
+        Raises LLMError if the LLM request of a job failed.
+        
+        Args:
+            job: Job dictionary
+            relationships: Relationships returned for the job
             
-            # Cache the result if caching is enabled
-            if self.use_cache:
-                self.cache.set(cache_key, relationships)
+        Raises:
+            LLMError: If relationships is a FailedRelationships result
+        """
+        if isinstance(relationships, FailedRelationships):
+            raise LLMError(f"LLM analysis of variant {job['variant_text']} in PMID {job['pmid']} failed")
+    
+    def _attach_job_metadata(self, job: Dict[str, Any],
+                             relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Adds publication and variant metadata to the relationships of a job.
+        
+        The relationships are copied, because the same list may come from the cache
+        or be shared by jobs with an identical prompt.
+        
+        Args:
+            job: Job dictionary
+            relationships: Relationships returned by the LLM
             
-            return relationships
-        except Exception as e:
-            self.logger.error(f"Error querying LLM for variant {variant_text}: {str(e)}")
-            self.logger.debug(f"Error details: {str(e)}, response: {response_text if 'response_text' in locals() else 'N/A'}")
+        Returns:
+            List of relationship dictionaries with metadata
+        """
+        return [
+            dict(relationship,
+                 pmid=job["pmid"],
+                 passage_text=job["passage_text"],
+                 variant_text=job["variant_text"],
+                 variant_id=job["variant_id"])
+            for relationship in relationships
+        ]
+    
+    def _get_packed_cache_key(self, variant_texts: List[str], entities: List[Dict[str, Any]],
+                              passage_text: str) -> str:
+        """
+        Builds a deterministic cache key for a packed multi-variant LLM analysis.
+        
+        Args:
+            variant_texts: Texts of the variants analyzed together
+            entities: List of entities included in the prompt
+            passage_text: Text of the passage
             
-            if self.debug_mode:
-                debug_dir = os.path.join("data", "debug")
-                os.makedirs(debug_dir, exist_ok=True)
-                error_file = os.path.join(debug_dir, f"llm_error_{hash(variant_text)}.txt")
-                
-                with open(error_file, "w", encoding="utf-8") as f:
-                    f.write(f"Variant: {variant_text}\n")
-                    f.write(f"Passage: {passage_text}\n")
-                    f.write(f"Entities: {entities}\n")
-                    f.write(f"Error: {str(e)}\n")
-                    if 'response_text' in locals():
-                        f.write(f"Response: {response_text}\n")
-                
-            return []
+        Returns:
+            Cache key that is stable across processes and runs
+        """
+        return analyzer_cache_key(self, json.dumps(variant_texts, ensure_ascii=False), entities,
+                                  passage_text, prompt_template=self.PACKED_USER_PROMPT_TEMPLATE)
     
-    def _clean_json_response(self, response: str) -> str:
+    def _analyze_packed_relationships_with_llm(self, variant_texts: List[str], entities: List[Dict[str, Any]],
+                                               passage_text: str) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Attempts to extract JSON from the LLM response.
+        Analyzes relationships of several variants of one passage in a single LLM request.
+        
+        The passage text and entity list are sent once instead of once per variant. Variants
+        missing from the response, or all variants if the response cannot be parsed, are
+        analyzed with single-variant requests.
         
         Args:
-            response: Response from LLM
+            variant_texts: Texts of the variants, without duplicates
+            entities: List of entities to check for relationships
+            passage_text: Text of the passage
             
         Returns:
-            Cleaned JSON string
+            Dictionary mapping each variant text to its list of relationships
         """
-        # Try to find JSON block in markdown code blocks
-        if "```" in response:
-            json_blocks = re.findall(r"```(?:json)?(.*?)```", response, re.DOTALL)
-            if json_blocks:
-                return json_blocks[0].strip()
+        cache_key = self._get_packed_cache_key(variant_texts, entities, passage_text)
+        if self.use_cache:
+            cached_result = self.cache.get_or_none(cache_key)
+            if cached_result is not None:
+                self.logger.debug(f"Using cached packed LLM result for {len(variant_texts)} variants")
+                self.llm_manager.record_cache_hit()
+                return cached_result
         
-        # Try to find JSON block with curly braces
-        json_match = re.search(r"\{.*\}", response, re.DOTALL)
-        if json_match:
-            return json_match.group(0)
+        messages = self._build_packed_messages(variant_texts, entities, passage_text)
+        
+        relationships_by_variant = {}
+        try:
+            self.logger.debug(f"Querying LLM for {len(variant_texts)} variants in one request")
+            result = self.llm_manager.invoke_json(messages, self.PACKED_RELATIONSHIPS_SCHEMA,
+                                                  cache_status="miss" if self.use_cache else "none")
+            relationships_by_variant = self._split_packed_response(result, variant_texts)
+        except Exception as e:
+            self.logger.error(f"Error querying LLM for packed variants {variant_texts}: {str(e)}")
         
-        # Return original if no JSON found
-        return response
+        missing = [variant_text for variant_text in variant_texts if variant_text not in relationships_by_variant]
+        if missing:
+            self.logger.warning(f"Packed LLM response is missing {len(missing)} variants, "
+                                f"analyzing them one by one")
+            for variant_text in missing:
+                relationships_by_variant[variant_text] = self._analyze_relationships_with_llm(
+                    variant_text, entities, passage_text)
+        elif self.use_cache:
+            self.cache.set(cache_key, relationships_by_variant)
+        
+        return relationships_by_variant
     
-    def _fix_trailing_commas(self, json_str: str) -> str:
+    @staticmethod
+    def _format_entities_list(entities: List[Dict[str, Any]]) -> str:
         """
-        Fixes trailing commas in JSON strings.
+        Formats the entity list included in the prompts.
         
         Args:
-            json_str: JSON string to fix
+            entities: List of entities to check for relationships
             
         Returns:
-            Fixed JSON string
+            One line per entity
         """
-        # Fix trailing commas in arrays
-        json_str = re.sub(r",\s*]", "]", json_str)
-        # Fix trailing commas in objects
-        json_str = re.sub(r",\s*}", "}", json_str)
-        return json_str
+        return "\n".join([
+            f"- {entity['entity_category']} '{entity['entity_text']}' (ID: {entity['entity_id']})"
+            for entity in entities
+        ])
     
-    def _fix_missing_commas(self, json_str: str) -> str:
+    def _build_messages(self, variant_text: str, entities: List[Dict[str, Any]],
+                        passage_text: str) -> List[Union[SystemMessage, HumanMessage]]:
         """
-        Fixes missing commas in JSON strings.
+        Builds the LLM messages for a single-variant analysis.
         
         Args:
-            json_str: JSON string to fix
+            variant_text: Text of the variant
+            entities: List of entities to check for relationships
+            passage_text: Text of the passage
             
         Returns:
-            Fixed JSON string
+            System and user messages
         """
-        # Fix missing commas between array elements (simplified)
-        json_str = re.sub(r"}\s*{", "},{", json_str)
-        # Fix missing commas between object properties (simplified)
-        json_str = re.sub(r'"\s*"', '","', json_str)
-        return json_str
+        prompt = self.USER_PROMPT_TEMPLATE.format(
+            variant_text=variant_text,
+            entities_list=self._format_entities_list(entities),
+            passage_text=passage_text
+        )
+        return [SystemMessage(content=self.SYSTEM_PROMPT), HumanMessage(content=prompt)]
     
-    def _fix_missing_quotes(self, json_str: str) -> str:
+    def _build_packed_messages(self, variant_texts: List[str], entities: List[Dict[str, Any]],
+                               passage_text: str) -> List[Union[SystemMessage, HumanMessage]]:
         """
-        Fixes missing quotes around property names.
+        Builds the LLM messages for a packed multi-variant analysis.
         
         Args:
-            json_str: JSON string to fix
+            variant_texts: Texts of the variants, without duplicates
+            entities: List of entities to check for relationships
+            passage_text: Text of the passage
             
         Returns:
-            Fixed JSON string
+            System and user messages
         """
-        # Add quotes around unquoted property names (simplified approach)
-        json_str = re.sub(r'(\{|\,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_str)
-        return json_str
+        prompt = self.PACKED_USER_PROMPT_TEMPLATE.format(
+            variants_list="\n".join(f"- {variant_text}" for variant_text in variant_texts),
+            entities_list=self._format_entities_list(entities),
+            passage_text=passage_text
+        )
+        return [SystemMessage(content=self.SYSTEM_PROMPT), HumanMessage(content=prompt)]
     
-    def _fix_inconsistent_quotes(self, json_str: str) -> str:
+    def _parse_relationships_response(self, response_text: str) -> List[Dict[str, Any]]:
         """
-        Fixes inconsistent quotes in JSON strings.
+        Parses the LLM response of a single-variant analysis.
         
         Args:
-            json_str: JSON string to fix
+            response_text: Text of the LLM response
             
         Returns:
-            Fixed JSON string
-        """
-        # Replace single quotes with double quotes
-        # This is a simplified approach and may not handle nested quotes correctly
-        in_string = False
-        in_single_quote_string = False
-        result = []
-        
-        for i, char in enumerate(json_str):
-            if char == '"' and (i == 0 or json_str[i-1] != '\\'):
-                in_string = not in_string
-                result.append(char)
-            elif char == "'" and (i == 0 or json_str[i-1] != '\\'):
-                if not in_string:
-                    # Replace ' with " when not inside a double-quoted string
-                    result.append('"')
-                    in_single_quote_string = not in_single_quote_string
-                else:
-                    # Keep ' when inside a double-quoted string
-                    result.append(char)
-            else:
-                result.append(char)
-                
-        return ''.join(result)
+            List of relationships
+            
+        Raises:
+            ValueError: If the response cannot be parsed as JSON or does not match
+                RELATIONSHIPS_SCHEMA
+        """
+        return parse_structured(response_text, self.RELATIONSHIPS_SCHEMA)["relationships"]
     
-    def _attempt_json_fix(self, json_str: str) -> str:
+    def _parse_packed_response(self, response_text: str, variant_texts: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Attempts to fix common JSON formatting issues.
+        Parses the LLM response of a packed multi-variant analysis.
         
         Args:
-            json_str: JSON string to fix
+            response_text: Text of the LLM response
+            variant_texts: Texts of the variants sent in the request
             
         Returns:
-            Fixed JSON string
+            Dictionary mapping variant texts found in the response to their relationships
+            
+        Raises:
+            ValueError: If the response cannot be parsed as JSON or does not match
+                PACKED_RELATIONSHIPS_SCHEMA
+        """
+        result = parse_structured(response_text, self.PACKED_RELATIONSHIPS_SCHEMA)
+        return self._split_packed_response(result, variant_texts)
+    
+    @staticmethod
+    def _split_packed_response(result: Dict[str, Any], variant_texts: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
-        # First extract the JSON part if it's embedded in other text
-        json_str = self._clean_json_response(json_str)
+        Splits a packed LLM response into per-variant relationship lists.
         
-        # Apply a series of fixes
-        fixes = [
-            self._fix_inconsistent_quotes,
-            self._fix_trailing_commas,
-            self._fix_missing_commas,
-            self._fix_missing_quotes
-        ]
+        Variant keys are matched exactly first, then ignoring case and surrounding
+        whitespace, since models do not always repeat the variant text verbatim.
+        
+        Args:
+            result: Parsed JSON response of a packed request
+            variant_texts: Texts of the variants sent in the request
+            
+        Returns:
+            Dictionary mapping variant texts found in the response to their relationships
+        """
+        variants = result.get("variants", {}) if isinstance(result, dict) else {}
+        if not isinstance(variants, dict):
+            return {}
+        
+        normalized = {str(key).strip().lower(): value for key, value in variants.items()}
+        relationships_by_variant = {}
+        for variant_text in variant_texts:
+            entry = variants.get(variant_text, normalized.get(variant_text.strip().lower()))
+            if isinstance(entry, dict):
+                entry = entry.get("relationships")
+            if isinstance(entry, list):
+                relationships_by_variant[variant_text] = entry
+        
+        return relationships_by_variant
+    
+    def _analyze_relationships_with_llm(self, variant_text: str, entities: List[Dict[str, Any]], 
+                                      passage_text: str) -> List[Dict[str, Any]]:
+        """
+        Analyzes relationships between a variant and other entities using LLM.
+        
+        Args:
+            variant_text: Text of the variant
+            entities: List of entities to check for relationships
+            passage_text: Text of the passage
+            
+        Returns:
+            List of dictionaries containing relationship data; a FailedRelationships
+            (empty) list if the LLM request failed
+        """
+        # Generate cache key based on inputs and model name
+        if self.use_cache:
+            cache_key = analyzer_cache_key(self, variant_text, entities, passage_text)
+            cached_result = self.cache.get_or_none(cache_key)
+            
+            if cached_result is not None:
+                self.logger.debug(f"Using cached LLM result for variant {variant_text}")
+                self.llm_manager.record_cache_hit()
+                if self.near_duplicate_cache:
+                    self.near_duplicate_cache.set(variant_text, entities, passage_text, cached_result)
+                return cached_result
+        
+        if self.near_duplicate_cache:
+            match = self.near_duplicate_cache.get(variant_text, entities, passage_text)
+            if match is not None:
+                self.logger.debug(f"Using LLM result of a near-duplicate passage for variant {variant_text} "
+                                  f"(similarity {match[1]:.3f})")
+                self.llm_manager.record_cache_hit()
+                return self._reuse_near_duplicate(entities, *match)
+        
+        # Create messages for LLM
+        messages = self._build_messages(variant_text, entities, passage_text)
         
-        # Try parsing after each fix
-        for fix_func in fixes:
-            try:
-                fixed = fix_func(json_str)
-                json.loads(fixed)  # Test if valid JSON
-                return fixed
-            except json.JSONDecodeError:
-                # If still invalid, apply the fix and continue to the next
-                json_str = fix_func(json_str)
-        
-        # If we reach here, all automated fixes have been applied
-        # But JSON might still be invalid
         try:
-            # One last validation
-            json.loads(json_str)
-            return json_str
-        except json.JSONDecodeError as e:
-            # Last resort: try to create a minimal valid JSON with relationships array
+            # Get response from LLM
+            self.logger.debug(f"Querying LLM for variant {variant_text}")
+            # Parse and validate the answer, asking the model to correct an invalid one
+            result = self.llm_manager.invoke_json(messages, self.RELATIONSHIPS_SCHEMA,
+                                                  cache_status="miss" if self.use_cache else "none")
+            relationships = result["relationships"]
+            
+            # Cache the result if caching is enabled
+            if self.use_cache:
+                self.cache.set(cache_key, relationships)
+            if self.near_duplicate_cache:
+                self.near_duplicate_cache.set(variant_text, entities, passage_text, relationships)
+            
+            return relationships
+        except Exception as e:
+            self.logger.error(f"Error querying LLM for variant {variant_text}: {str(e)}")
+            
             if self.debug_mode:
-                self.logger.debug(f"JSON repair failed: {str(e)}\nAttempting minimal JSON structure")
+                debug_dir = os.path.join("data", "debug")
+                os.makedirs(debug_dir, exist_ok=True)
+                error_file = os.path.join(debug_dir, f"llm_error_{stable_digest(variant_text)[:16]}.txt")
                 
-            # Create minimal JSON structure
-            return '{"relationships": []}'
+                with open(error_file, "w", encoding="utf-8") as f:
+                    f.write(f"Variant: {variant_text}\n")
+                    f.write(f"Passage: {passage_text}\n")
+                    f.write(f"Entities: {entities}\n")
+                    f.write(f"Error: {str(e)}\n")
+                    if getattr(e, "response_text", None) is not None:
+                        f.write(f"Response: {e.response_text}\n")
+                
+            return FailedRelationships()
     
-    def _group_annotations_by_type(self, passage: bioc.BioCPassage) -> Dict[str, List[bioc.BioCAnnotation]]:
+    @staticmethod
+    def _reuse_near_duplicate(entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]],
+                              similarity: float, source_id: str) -> List[Dict[str, Any]]:
         """
-        Groups annotations in a passage by entity type.
+        Adapts the relationships of a near-duplicate passage to the current request.
+        
+        Entity identifiers are document-specific, so they are replaced with the
+        identifiers of the current entities with the same text.
         
         Args:
-            passage: BioCPassage to analyze
+            entities: Entities of the current request
+            relationships: Relationships of the near-duplicate passage
+            similarity: Similarity of the two passages
+            source_id: Identifier of the near-duplicate passage
             
         Returns:
-            Dictionary mapping entity types to annotations
+            Copied relationships with the near_duplicate_of and near_duplicate_similarity
+            audit fields
         """
-        grouped = defaultdict(list)
-        
-        for annotation in passage.annotations:
-            entity_type = annotation.infons.get("type")
-            if entity_type:
-                grouped[entity_type].append(annotation)
+        entity_ids = {str(entity["entity_text"]).lower(): entity["entity_id"] for entity in entities}
+        reused = []
+        for relationship in relationships:
+            relationship = dict(relationship,
+                                near_duplicate_of=source_id,
+                                near_duplicate_similarity=round(similarity, 4))
+            entity_text = str(relationship.get("entity_text", "")).lower()
+            if entity_text in entity_ids:
+                relationship["entity_id"] = entity_ids[entity_text]
+            reused.append(relationship)
+        return reused
+    
+    def _group_annotations_by_type(
+            self, passage: Union[bioc.BioCPassage, CompactPassage]) -> Dict[str, List[CompactAnnotation]]:
+        """
+        Groups annotations in a passage by entity type.
         
-        return grouped
+        Args:
+            passage: BioCPassage or CompactPassage to analyze
+            
+        Returns:
+            Dictionary mapping entity types to CompactAnnotations
+        """
+        return as_compact_passage(passage).annotations_by_type()
     
     def save_relationships_to_csv(self, relationships: List[Dict[str, Any]], output_file: str):
         """
@@ -560,11 +1200,7 @@ Response format:
                 all_fields.update(rel.keys())
             
             # Define fields order for CSV (ensure key fields come first)
-            key_fields = [
-                "pmid", "variant_id", "variant_text", 
-                "entity_id", "entity_text", "entity_type", "entity_category",
-                "has_relationship", "relationship_score", "explanation"
-            ]
+            key_fields = self.CSV_KEY_FIELDS
             
             # Include remaining fields after key fields
             other_fields = [f for f in sorted(all_fields) if f not in key_fields]
@@ -608,6 +1244,41 @@ Response format:
             self.logger.error(f"Failed to save relationships to JSON: {str(e)}")
             raise
     
+    def append_relationships_to_csv(self, relationships: List[Dict[str, Any]], output_file: str) -> None:
+        """
+        Appends relationships to a CSV file, writing the header if the file is new.
+        
+        Unlike save_relationships_to_csv, the columns are fixed (STREAM_CSV_FIELDS), so
+        rows of later publications can be appended to the same file.
+        
+        Args:
+            relationships: List of relationship dictionaries
+            output_file: Path to the output CSV file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+        
+        with open(output_file, 'a', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.STREAM_CSV_FIELDS, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+            for relationship in relationships:
+                writer.writerow({field: relationship.get(field, "") for field in self.STREAM_CSV_FIELDS})
+    
+    def append_relationships_to_jsonl(self, relationships: List[Dict[str, Any]], output_file: str) -> None:
+        """
+        Appends relationships to a JSON Lines file, one relationship per line.
+        
+        Args:
+            relationships: List of relationship dictionaries
+            output_file: Path to the output JSONL file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        
+        with open(output_file, 'a', encoding='utf-8') as f:
+            for relationship in relationships:
+                f.write(json.dumps(relationship, ensure_ascii=False) + "\n")
+    
     def filter_relationships_by_entity(
             self, 
             relationships: List[Dict[str, Any]], 
@@ -5,7 +5,6 @@ and error handling capabilities.
 
 import json
 import logging
-import re
 from typing import List, Dict, Any, Optional
 
 from langchain.prompts import PromptTemplate
@@ -13,6 +12,8 @@ from langchain.schema import HumanMessage, SystemMessage
 
 from src.api.clients.pubtator_client import PubTatorClient
 from src.analysis.llm.llm_context_analyzer import LlmContextAnalyzer
+from src.utils.llm.cache_keys import analyzer_cache_key
+from src.utils.llm.json_repair import parse_json
 
 
 class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
@@ -20,7 +21,7 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
     Extended version of the LLM context analyzer with improved JSON error handling.
     
     This class inherits from the base class LlmContextAnalyzer, adding:
-    1. Advanced methods for fixing invalid JSON
+    1. Tolerant parsing of invalid JSON (see src.utils.llm.json_repair)
     2. Better error handling and logging
     3. Additional debugging options
     """
@@ -38,7 +39,7 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
             llm_model_name: Name of the LLM model to use
             use_cache: Whether to use cache for LLM queries (default True)
             cache_ttl: Time to live for cache entries in seconds (default 24h)
-            cache_storage_type: Cache type: "memory" or "disk"
+            cache_storage_type: Cache type: "memory", "disk", "sqlite" or "tiered"
             debug_mode: Whether to enable debugging mode (more logs)
         """
         super().__init__(pubtator_client, llm_model_name, use_cache, cache_ttl, cache_storage_type)
@@ -49,166 +50,6 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
             self.logger.setLevel(logging.DEBUG)
             self.logger.info("Debug mode enabled")
     
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Cleans the LLM response to obtain a valid JSON format.
-        
-        Args:
-            response: Response from the LLM
-            
-        Returns:
-            Cleaned JSON string
-        """
-        # First, use the method from the base class
-        json_str = super()._clean_json_response(response)
-        
-        # If debug mode is enabled, log the original response
-        if self.debug_mode:
-            self.logger.debug(f"Original JSON response: {json_str}")
-        
-        # Check if the JSON is already valid
-        try:
-            json.loads(json_str)
-            return json_str
-        except json.JSONDecodeError:
-            # If not, try to fix the errors
-            return self._attempt_json_fix(json_str)
-    
-    def _fix_trailing_commas(self, json_str: str) -> str:
-        """
-        Fixes issues related to trailing commas in JSON.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Remove commas after the last element in objects
-        json_str = re.sub(r',(\s*})', r'\1', json_str)
-        
-        # Remove commas after the last element in arrays
-        json_str = re.sub(r',(\s*])', r'\1', json_str)
-        
-        return json_str
-    
-    def _fix_missing_commas(self, json_str: str) -> str:
-        """
-        Adds missing commas between elements.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Pattern to add a comma after a property before the next property
-        # Recognizes situations where a new key follows immediately after closing a value (quote, brace, number)
-        json_str = re.sub(r'(["}\d])\s+(")', r'\1, \2', json_str)
-        
-        return json_str
-    
-    def _fix_missing_quotes(self, json_str: str) -> str:
-        """
-        Attempts to fix missing quotes in keys and values.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Fix keys without quotes
-        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+)\s*:', r'\1 "\2":', json_str)
-        
-        return json_str
-    
-    def _fix_inconsistent_quotes(self, json_str: str) -> str:
-        """
-        Fixes inconsistent quotes (mixing ' and ").
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Replace all single quotes with double quotes
-        in_string = False
-        result = []
-        
-        i = 0
-        while i < len(json_str):
-            char = json_str[i]
-            
-            if char == '"':
-                # Start or end a string with double quotes
-                in_string = not in_string
-                result.append(char)
-            elif char == "'" and not in_string:
-                # Replace single quotes with double quotes outside of strings
-                result.append('"')
-            else:
-                result.append(char)
-            
-            i += 1
-        
-        return ''.join(result)
-    
-    def _attempt_json_fix(self, json_str: str) -> str:
-        """
-        Attempts to fix invalid JSON by applying various repair methods.
-        
-        Args:
-            json_str: Potentially invalid JSON string
-            
-        Returns:
-            Fixed JSON string (or original if repair fails)
-        """
-        try:
-            # First, check if the JSON is already valid
-            json.loads(json_str)
-            return json_str
-        except json.JSONDecodeError as e:
-            self.logger.info(f"Detected JSON error: {str(e)}")
-            if self.debug_mode:
-                self.logger.debug(f"Problematic JSON (snippet 100 characters before and after error position):")
-                error_pos = e.pos
-                start = max(0, error_pos - 100)
-                end = min(len(json_str), error_pos + 100)
-                self.logger.debug(json_str[start:end])
-                if error_pos < len(json_str):
-                    self.logger.debug(f"Character at error position: '{json_str[error_pos]}' (code: {ord(json_str[error_pos])})")
-            
-            # Apply various repair methods
-            fixed_json = json_str
-            
-            # Step 1: Fix trailing commas
-            fixed_json = self._fix_trailing_commas(fixed_json)
-            
-            # Step 2: Fix missing commas
-            fixed_json = self._fix_missing_commas(fixed_json)
-            
-            # Step 3: Fix missing quotes
-            fixed_json = self._fix_missing_quotes(fixed_json)
-            
-            # Step 4: Fix inconsistent quotes
-            fixed_json = self._fix_inconsistent_quotes(fixed_json)
-            
-            try:
-                # Check if the fixed JSON is valid
-                json.loads(fixed_json)
-                self.logger.info("JSON fixed")
-                if self.debug_mode:
-                    self.logger.debug(f"Fixed JSON: {fixed_json[:100]}...")
-                return fixed_json
-            except json.JSONDecodeError as e:
-                self.logger.warning("Failed to fix JSON")
-                if self.debug_mode:
-                    self.logger.debug(f"Error after fixing: {str(e)}")
-                    self.logger.debug(f"Invalid JSON (snippet): {fixed_json[:100]}...")
-                return json_str
-    
     def analyze_publications(self, pmids: List[str], save_debug_info: bool = False) -> List[Dict[str, Any]]:
         """
         Analyzes a list of publications to extract contextual relationships.
@@ -261,10 +102,13 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
         entities_list = "\n".join([f"- {e['entity_type']}: {e['text']} (ID: {e['id']})" for e in entities])
         
         # Check cache
-        cache_key = f"llm_analysis:{variant_text}:{json.dumps(entities, sort_keys=True)}:{passage_text}"
-        if self.use_cache and self.cache and self.cache.has(cache_key):
-            self.logger.debug(f"Cache hit for LLM analysis: {variant_text}")
-            return self.cache.get(cache_key)
+        cache_key = analyzer_cache_key(self, variant_text, entities, passage_text)
+        if self.use_cache and self.cache:
+            cached_relationships = self.cache.get_or_none(cache_key)
+            if cached_relationships is not None:
+                self.logger.debug(f"Cache hit for LLM analysis: {variant_text}")
+                self.llm_manager.record_cache_hit()
+                return cached_relationships
         
         # Prepare messages for LLM
         system_message = SystemMessage(content=self.SYSTEM_PROMPT)
@@ -279,7 +123,8 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
         
         # Send request to LLM
         try:
-            response = self.llm.invoke([system_message, user_message])
+            response = self.llm_manager.invoke([system_message, user_message],
+                                               cache_status="miss" if self.use_cache else "none")
             response_content = response.content
             
             # Parse JSON response
@@ -287,14 +132,8 @@ class EnhancedLlmContextAnalyzer(LlmContextAnalyzer):
                 # Ensure response_content is of type string
                 response_str = str(response_content) if response_content is not None else "{}"
                 
-                # First, clean the response from surrounding text
-                response_str = self._clean_json_response(response_str)
-                
-                # Then fix errors in the JSON itself
-                fixed_json = self._attempt_json_fix(response_str)
-                
-                # Try to parse the fixed JSON
-                result_data = json.loads(fixed_json)
+                # Extract the JSON from surrounding text and repair it if necessary
+                result_data = parse_json(response_str)
                 
                 if "relationships" in result_data:
                     # Save to cache
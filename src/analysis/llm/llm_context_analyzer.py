@@ -21,8 +21,10 @@ from langchain.schema import HumanMessage, SystemMessage
 from src.api.clients.pubtator_client import PubTatorClient
 from src.api.clients.exceptions import PubTatorError
 from src.analysis.context.context_analyzer import ContextAnalyzer
+from src.utils.llm.cache_keys import analyzer_cache_key
+from src.utils.llm.json_repair import parse_json
 from src.utils.llm.manager import LlmManager
-from src.api.cache.cache import APICache
+from src.api.cache.cache import CacheManager
 
 
 class LlmContextAnalyzer(ContextAnalyzer):
@@ -84,6 +86,9 @@ Response format:
 }}
 """
     
+    # Version of the prompts above, part of the LLM cache key
+    PROMPT_VERSION = 1
+    
     def __init__(self, pubtator_client: Optional[PubTatorClient] = None, 
                  llm_model_name: str = "meta-llama/Meta-Llama-3.1-8B-Instruct",
                  use_cache: bool = True, cache_ttl: int = 86400,
@@ -96,10 +101,11 @@ Response format:
             llm_model_name: Name of the LLM model to use
             use_cache: Whether to use cache for LLM queries (default True)
             cache_ttl: Time-to-live for cache entries in seconds (default 24h)
-            cache_storage_type: Type of cache: "memory" or "disk"
+            cache_storage_type: Type of cache: "memory", "disk", "sqlite" or "tiered"
         """
         super().__init__(pubtator_client)
         self.logger = logging.getLogger(__name__)
+        self.llm_model_name = llm_model_name
         self.llm_manager = LlmManager('together', llm_model_name)
         self.llm = self.llm_manager.get_llm()
         self.logger.info(f'Loaded LLM model: {llm_model_name}')
@@ -107,7 +113,7 @@ Response format:
         # Initialize cache
         self.use_cache = use_cache
         if use_cache:
-            self.cache = APICache.create(storage_type=cache_storage_type, ttl=cache_ttl)
+            self.cache = CacheManager.create(storage_type=cache_storage_type, ttl=cache_ttl)
             self.logger.info(f"Cache enabled ({cache_storage_type}), TTL: {cache_ttl}s")
         else:
             self.cache = None
@@ -300,10 +306,13 @@ Response format:
         entities_list = "\n".join([f"- {e['entity_type']}: {e['text']} (ID: {e['id']})" for e in entities])
         
         # Check cache
-        cache_key = f"llm_analysis:{variant_text}:{json.dumps(entities, sort_keys=True)}:{passage_text}"
-        if self.use_cache and self.cache and self.cache.has(cache_key):
-            self.logger.debug(f"Cache hit for LLM analysis: {variant_text}")
-            return self.cache.get(cache_key)
+        cache_key = analyzer_cache_key(self, variant_text, entities, passage_text)
+        if self.use_cache and self.cache:
+            cached_relationships = self.cache.get_or_none(cache_key)
+            if cached_relationships is not None:
+                self.logger.debug(f"Cache hit for LLM analysis: {variant_text}")
+                self.llm_manager.record_cache_hit()
+                return cached_relationships
         
         # Prepare messages for LLM
         system_message = SystemMessage(content=self.SYSTEM_PROMPT)
@@ -318,7 +327,8 @@ Response format:
         
         # Send request to LLM
         try:
-            response = self.llm.invoke([system_message, user_message])
+            response = self.llm_manager.invoke([system_message, user_message],
+                                               cache_status="miss" if self.use_cache else "none")
             response_content = response.content
             
             # Parse JSON response
@@ -326,9 +336,8 @@ Response format:
                 # Ensure response_content is of type string
                 response_str = str(response_content) if response_content is not None else "{}"
                 
-                # Remove any special characters and markdown code from JSON
-                clean_json = self._clean_json_response(response_str)
-                result_data = json.loads(clean_json)
+                # Extract the JSON from surrounding text and repair it if necessary
+                result_data = parse_json(response_str)
                 
                 if "relationships" in result_data:
                     # Save to cache
@@ -347,28 +356,6 @@ Response format:
             self.logger.error(f"Error calling LLM: {str(e)}")
             return []
     
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Cleans the LLM response to obtain a valid JSON format.
-        
-        Args:
-            response: Response from LLM
-            
-        Returns:
-            Cleaned JSON string
-        """
-        # Find the first '{' and the last '}'
-        start_idx = response.find('{')
-        end_idx = response.rfind('}')
-        
-        if start_idx == -1 or end_idx == -1 or start_idx > end_idx:
-            # If no valid JSON found, return an empty object
-            return "{}"
-        
-        # Extract JSON from the response
-        json_str = response[start_idx:end_idx+1]
-        return json_str
-    
     def _group_annotations_by_type(self, passage: bioc.BioCPassage) -> Dict[str, List[bioc.BioCAnnotation]]:
         """
         Groups annotations in the passage by type.
@@ -7,7 +7,6 @@ import csv
 import json
 import logging
 import os
-import re
 from typing import List, Dict, Any, Optional, Union, Tuple, Set
 from collections import defaultdict
 
@@ -18,8 +17,10 @@ from langchain.schema import HumanMessage, SystemMessage
 from src.api.clients.pubtator_client import PubTatorClient
 from src.api.clients.exceptions import PubTatorError
 from src.analysis.context.context_analyzer import ContextAnalyzer
+from src.utils.llm.cache_keys import analyzer_cache_key
+from src.utils.llm.json_repair import parse_json
 from src.utils.llm.manager import LlmManager
-from src.api.cache.cache import APICache
+from src.api.cache.cache import CacheManager
 
 
 class UnifiedLlmContextAnalyzer(ContextAnalyzer):
@@ -100,6 +101,9 @@ Response format:
 }}
 """
     
+    # Version of the prompts above, part of the LLM cache key
+    PROMPT_VERSION = 1
+    
     def __init__(self, pubtator_client: Optional[PubTatorClient] = None, 
                  llm_model_name: str = "meta-llama/Meta-Llama-3.1-8B-Instruct",
                  use_cache: bool = True, cache_ttl: int = 86400,
@@ -113,7 +117,7 @@ Response format:
             llm_model_name: Name of the LLM model to use
             use_cache: Whether to use cache for LLM queries (default True)
             cache_ttl: Time-to-live for cache entries in seconds (default 24h)
-            cache_storage_type: Type of cache: "memory" or "disk"
+            cache_storage_type: Type of cache: "memory", "disk", "sqlite" or "tiered"
             debug_mode: Whether to enable debugging mode (more logs)
         """
         super().__init__(pubtator_client)
@@ -129,7 +133,7 @@ Response format:
         self.cache_storage_type = cache_storage_type
         
         if use_cache:
-            self.cache = APICache.create(storage_type=cache_storage_type, ttl=cache_ttl)
+            self.cache = CacheManager.create(storage_type=cache_storage_type, ttl=cache_ttl)
             self.logger.info(f"Cache enabled ({cache_storage_type}), TTL: {cache_ttl}s")
         else:
             self.cache = None
@@ -346,10 +350,13 @@ Response format:
         entities_list = "\n".join([f"- {e['entity_type']}: {e['text']} (ID: {e['id']})" for e in entities])
         
         # Check cache (use model name in the cache key)
-        cache_key = f"llm_analysis:{self.llm_model_name}:{variant_text}:{json.dumps(entities, sort_keys=True)}:{passage_text}"
-        if self.use_cache and self.cache and self.cache.has(cache_key):
-            self.logger.debug(f"Cache hit for LLM analysis: {variant_text} (model: {self.llm_model_name})")
-            return self.cache.get(cache_key)
+        cache_key = analyzer_cache_key(self, variant_text, entities, passage_text)
+        if self.use_cache and self.cache:
+            cached_relationships = self.cache.get_or_none(cache_key)
+            if cached_relationships is not None:
+                self.logger.debug(f"Cache hit for LLM analysis: {variant_text} (model: {self.llm_model_name})")
+                self.llm_manager.record_cache_hit()
+                return cached_relationships
         
         # Prepare messages for LLM
         system_message = SystemMessage(content=self.SYSTEM_PROMPT)
@@ -364,7 +371,8 @@ Response format:
         
         # Send request to LLM
         try:
-            response = self.llm.invoke([system_message, user_message])
+            response = self.llm_manager.invoke([system_message, user_message],
+                                               cache_status="miss" if self.use_cache else "none")
             response_content = response.content
             
             # Parse JSON response
@@ -372,13 +380,8 @@ Response format:
                 # Ensure response_content is of type string
                 response_str = str(response_content) if response_content is not None else "{}"
                 
-                # First, clean the response from surrounding text
-                clean_json = self._clean_json_response(response_str)
-                
-                # Then fix any JSON errors
-                fixed_json = self._attempt_json_fix(clean_json)
-                
-                result_data = json.loads(fixed_json)
+                # Extract the JSON from surrounding text and repair it if necessary
+                result_data = parse_json(response_str)
                 
                 if "relationships" in result_data:
                     # Save to cache
@@ -397,168 +400,6 @@ Response format:
             self.logger.error(f"Error calling LLM: {str(e)}")
             return []
             
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Cleans the LLM response to obtain a valid JSON format.
-        
-        Args:
-            response: Response from LLM
-            
-        Returns:
-            Cleaned JSON string
-        """
-        # Find the first '{' and the last '}'
-        start_idx = response.find('{')
-        end_idx = response.rfind('}')
-        
-        if start_idx == -1 or end_idx == -1 or start_idx > end_idx:
-            # If no valid JSON found, return an empty object
-            return "{}"
-        
-        # Extract JSON from the response
-        json_str = response[start_idx:end_idx+1]
-        
-        # If debug mode is enabled, log the original response
-        if self.debug_mode:
-            self.logger.debug(f"Original JSON response: {json_str}")
-            
-        return json_str
-    
-    def _fix_trailing_commas(self, json_str: str) -> str:
-        """
-        Fixes issues related to trailing commas in JSON.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Remove commas after the last element in objects
-        json_str = re.sub(r',(\s*})', r'\1', json_str)
-        
-        # Remove commas after the last element in arrays
-        json_str = re.sub(r',(\s*])', r'\1', json_str)
-        
-        return json_str
-    
-    def _fix_missing_commas(self, json_str: str) -> str:
-        """
-        Adds missing commas between elements.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Pattern to add a comma after a property before the next property
-        # Recognizes situations where a new key follows immediately after closing a value (quote, brace, number)
-        json_str = re.sub(r'(["}\d])\s+(")', r'\1, \2', json_str)
-        
-        return json_str
-    
-    def _fix_missing_quotes(self, json_str: str) -> str:
-        """
-        Attempts to fix missing quotes in keys and values.
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Fix keys without quotes
-        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+)\s*:', r'\1 "\2":', json_str)
-        
-        return json_str
-    
-    def _fix_inconsistent_quotes(self, json_str: str) -> str:
-        """
-        Fixes inconsistent quotes (mixing ' and ").
-        
-        Args:
-            json_str: JSON string to fix
-            
-        Returns:
-            Fixed JSON string
-        """
-        # Replace all single quotes with double quotes
-        in_string = False
-        result = []
-        
-        i = 0
-        while i < len(json_str):
-            char = json_str[i]
-            
-            if char == '"':
-                # Start or end a string with double quotes
-                in_string = not in_string
-                result.append(char)
-            elif char == "'" and not in_string:
-                # Replace single quotes with double quotes outside of strings
-                result.append('"')
-            else:
-                result.append(char)
-            
-            i += 1
-        
-        return ''.join(result)
-    
-    def _attempt_json_fix(self, json_str: str) -> str:
-        """
-        Attempts to fix invalid JSON by applying various repair methods.
-        
-        Args:
-            json_str: Potentially invalid JSON string
-            
-        Returns:
-            Fixed JSON string (or original if repair fails)
-        """
-        try:
-            # First, check if the JSON is already valid
-            json.loads(json_str)
-            return json_str
-        except json.JSONDecodeError as e:
-            self.logger.info(f"Detected JSON error: {str(e)}")
-            if self.debug_mode:
-                self.logger.debug(f"Problematic JSON (snippet 100 characters before and after error position):")
-                error_pos = e.pos
-                start = max(0, error_pos - 100)
-                end = min(len(json_str), error_pos + 100)
-                self.logger.debug(json_str[start:end])
-                if error_pos < len(json_str):
-                    self.logger.debug(f"Character at error position: '{json_str[error_pos]}' (code: {ord(json_str[error_pos])})")
-            
-            # Apply various repair methods
-            fixed_json = json_str
-            
-            # Step 1: Fix trailing commas
-            fixed_json = self._fix_trailing_commas(fixed_json)
-            
-            # Step 2: Fix missing commas
-            fixed_json = self._fix_missing_commas(fixed_json)
-            
-            # Step 3: Fix missing quotes
-            fixed_json = self._fix_missing_quotes(fixed_json)
-            
-            # Step 4: Fix inconsistent quotes
-            fixed_json = self._fix_inconsistent_quotes(fixed_json)
-            
-            try:
-                # Check if the fixed JSON is valid
-                json.loads(fixed_json)
-                self.logger.info("JSON fixed")
-                if self.debug_mode:
-                    self.logger.debug(f"Fixed JSON: {fixed_json[:100]}...")
-                return fixed_json
-            except json.JSONDecodeError as e:
-                self.logger.warning("Failed to fix JSON")
-                if self.debug_mode:
-                    self.logger.debug(f"Error after fixing: {str(e)}")
-                    self.logger.debug(f"Invalid JSON (snippet): {fixed_json[:100]}...")
-                return json_str
-                
     def _group_annotations_by_type(self, passage: bioc.BioCPassage) -> Dict[str, List[bioc.BioCAnnotation]]:
         """
         Groups annotations in the passage by type.
@@ -9,10 +9,15 @@ import os
 import json
 import time
 import logging
-from typing import Any, Optional, Dict, Union
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Tuple, Union
 import hashlib
 from datetime import datetime
 
+from src.api.cache.codecs import CodecUnavailableError, get_codec, is_codec_available, resolve_codec
 from src.models.data.clients.exceptions import CacheError
 
 
@@ -45,6 +50,33 @@ class BaseCache:
         """
         raise NotImplementedError("Subclasses must implement get()")
     
+    def get_or_none(self, key: str) -> Any:
+        """
+        Retrieves a value from the cache with a single lookup.
+        
+        Use this instead of has() followed by get(), which reads the entry twice.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return self.get(key)
+    
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        """
+        Retrieves a value from the cache together with its expiration time.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of the cached value (None if not found or expired) and its expiration
+            time as a Unix timestamp, None if unknown
+        """
+        return self.get_or_none(key), None
+    
     def set(self, key: str, value: Any) -> None:
         """
         Stores a value in the cache.
@@ -89,92 +121,151 @@ APICache = BaseCache
 
 class MemoryCache(BaseCache):
     """
-    In-memory implementation of the cache.
+    Bounded in-memory implementation of the cache.
     
     This cache stores values in memory and is not persistent between program runs.
-    It's fast but will be cleared when the program exits.
+    It's fast but will be cleared when the program exits. The number of entries and
+    (optionally) their estimated size in bytes are limited; when a limit is exceeded
+    the least recently used entries are evicted. Expired entries are swept
+    periodically instead of only when they are read again.
     """
     
-    def __init__(self, ttl: int = 86400):
+    # Default maximum number of entries
+    DEFAULT_MAX_SIZE = 10000
+    
+    def __init__(self, ttl: int = 86400, max_size: Optional[int] = DEFAULT_MAX_SIZE,
+                 max_bytes: Optional[int] = None, cleanup_interval: int = 60):
         """
         Initializes the memory cache.
         
         Args:
             ttl: Time-to-live for cache entries in seconds (default: 24h)
+            max_size: Maximum number of entries (None for no limit)
+            max_bytes: Maximum estimated size of all values in bytes (None for no limit)
+            cleanup_interval: Minimum number of seconds between sweeps of expired entries
         """
         super().__init__(ttl)
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self.logger.info(f"Initialized memory cache with TTL of {ttl}s")
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.cleanup_interval = cleanup_interval
+        
+        # Entries in least-recently-used order (oldest first)
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_timestamps: Dict[str, float] = {}
+        self.cache_expiry: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self.current_bytes = 0
+        
+        self._lock = threading.RLock()
+        self._last_cleanup = time.time()
+        
+        self.logger.info(
+            f"Initialized memory cache with TTL of {ttl}s, max_size={max_size}, max_bytes={max_bytes}")
     
-    def get(self, key: str) -> Any:
+    def get(self, key: str, default: Any = None) -> Any:
         """
-        Retrieves a value from the cache.
+        Retrieves a value from the cache and marks it as recently used.
         
         Args:
             key: Cache key
+            default: Value returned when the key is not found or expired
             
         Returns:
-            Cached value or None if not found or expired
+            Cached value or default if not found or expired
         """
-        hashed_key = self._hash_key(key)
-        
-        if hashed_key not in self._cache:
-            return None
-        
-        entry = self._cache[hashed_key]
-        
-        # Check if entry has expired
-        if time.time() > entry['expires_at']:
-            self.logger.debug(f"Cache entry expired for key: {key}")
-            self.delete(key)
-            return None
+        with self._lock:
+            if key not in self.cache:
+                return default
+            
+            # Check if entry has expired
+            if time.time() > self.cache_expiry[key]:
+                self.logger.debug(f"Cache entry expired for key: {key}")
+                self._remove_from_memory(key)
+                return default
+            
+            self.cache.move_to_end(key)
+            self.cache_timestamps[key] = time.time()
+            self.logger.debug(f"Cache hit for key: {key}")
+            return self.cache[key]
+    
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        """
+        Retrieves a value from the cache together with its expiration time.
         
-        self.logger.debug(f"Cache hit for key: {key}")
-        return entry['value']
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of the cached value and its expiration time, (None, None) if not
+            found or expired
+        """
+        with self._lock:
+            value = self.get(key)
+            return value, (self.cache_expiry.get(key) if value is not None else None)
     
     def has(self, key: str) -> bool:
         """
         Checks if a key exists in the cache and is not expired.
         
+        Unlike get(), this does not change the eviction order.
+        
         Args:
             key: Cache key
             
         Returns:
             True if key exists and is not expired, False otherwise
         """
-        hashed_key = self._hash_key(key)
-        
-        if hashed_key not in self._cache:
-            return False
-        
-        entry = self._cache[hashed_key]
-        
-        # Check if entry has expired
-        if time.time() > entry['expires_at']:
-            self.logger.debug(f"Cache entry expired for key: {key}")
-            self.delete(key)
-            return False
-        
-        return True
+        with self._lock:
+            if key not in self.cache:
+                return False
+            
+            # Check if entry has expired
+            if time.time() > self.cache_expiry[key]:
+                self.logger.debug(f"Cache entry expired for key: {key}")
+                self._remove_from_memory(key)
+                return False
+            
+            return True
     
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
-        Stores a value in the cache.
+        Stores a value in the cache, evicting least recently used entries if needed.
         
         Args:
             key: Cache key
             value: Value to store
+            ttl: Time-to-live for this entry in seconds (default: the cache TTL)
+            
+        Returns:
+            True if the value was stored, False if it is larger than max_bytes; an
+            older value of the key is removed in that case
         """
-        hashed_key = self._hash_key(key)
+        size = self._estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.logger.warning(
+                f"Value for key {key} ({size} bytes) exceeds cache limit of {self.max_bytes} bytes")
+            with self._lock:
+                # Do not serve the value that was just overwritten
+                self._remove_from_memory(key)
+            return False
         
-        # Create cache entry with expiration
-        self._cache[hashed_key] = {
-            'value': value,
-            'created_at': time.time(),
-            'expires_at': time.time() + self.ttl
-        }
+        now = time.time()
+        with self._lock:
+            self._maybe_clean(now)
+            
+            if key in self.cache:
+                self._remove_from_memory(key)
+            
+            self.cache[key] = value
+            self.cache_timestamps[key] = now
+            self.cache_expiry[key] = now + (self.ttl if ttl is None else ttl)
+            self._sizes[key] = size
+            self.current_bytes += size
+            
+            self._evict()
         
         self.logger.debug(f"Cached value for key: {key}")
+        return True
     
     def delete(self, key: str) -> None:
         """
@@ -183,18 +274,121 @@ class MemoryCache(BaseCache):
         Args:
             key: Cache key
         """
-        hashed_key = self._hash_key(key)
+        with self._lock:
+            if key in self.cache:
+                self._remove_from_memory(key)
+                self.logger.debug(f"Deleted cache entry for key: {key}")
+    
+    def invalidate_by_prefix(self, prefix: str) -> int:
+        """
+        Deletes all entries whose keys start with the given prefix.
         
-        if hashed_key in self._cache:
-            del self._cache[hashed_key]
-            self.logger.debug(f"Deleted cache entry for key: {key}")
+        Args:
+            prefix: Key prefix
+            
+        Returns:
+            Number of deleted entries
+        """
+        with self._lock:
+            keys = [key for key in self.cache if key.startswith(prefix)]
+            for key in keys:
+                self._remove_from_memory(key)
+        
+        self.logger.debug(f"Invalidated {len(keys)} cache entries with prefix: {prefix}")
+        return len(keys)
     
     def clear(self) -> None:
         """
         Clears all entries from the cache.
         """
-        self._cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self.cache_timestamps.clear()
+            self.cache_expiry.clear()
+            self._sizes.clear()
+            self.current_bytes = 0
         self.logger.info("Cleared all entries from memory cache")
+    
+    def _remove_from_memory(self, key: str) -> None:
+        """
+        Removes an entry and its metadata without logging.
+        
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self.cache.pop(key, None)
+            self.cache_timestamps.pop(key, None)
+            self.cache_expiry.pop(key, None)
+            self.current_bytes -= self._sizes.pop(key, 0)
+    
+    def _evict(self) -> None:
+        """
+        Evicts least recently used entries until the size limits are met.
+        """
+        while self.cache and (
+                (self.max_size is not None and len(self.cache) > self.max_size) or
+                (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            key = next(iter(self.cache))
+            self._remove_from_memory(key)
+            self.logger.debug(f"Evicted least recently used cache entry: {key}")
+    
+    def _maybe_clean(self, now: float) -> None:
+        """
+        Sweeps expired entries if cleanup_interval has passed since the last sweep.
+        
+        Args:
+            now: Current time
+        """
+        if now - self._last_cleanup >= self.cleanup_interval:
+            self._clean_memory_cache()
+    
+    def _clean_memory_cache(self) -> int:
+        """
+        Removes all expired entries.
+        
+        Returns:
+            Number of removed entries
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, expires_at in self.cache_expiry.items() if now > expires_at]
+            for key in expired:
+                self._remove_from_memory(key)
+            self._last_cleanup = now
+        
+        if expired:
+            self.logger.debug(f"Removed {len(expired)} expired entries from memory cache")
+        return len(expired)
+    
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """
+        Estimates the memory used by a value, including nested containers.
+        
+        Args:
+            value: Value to measure
+            
+        Returns:
+            Estimated size in bytes
+        """
+        size = 0
+        seen = set()
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                stack.extend(item)
+            elif hasattr(item, "__dict__"):
+                stack.append(vars(item))
+        return size
 
 
 class DiskCache(BaseCache):
@@ -203,15 +397,21 @@ class DiskCache(BaseCache):
     
     This cache stores values on disk and is persistent between program runs.
     It's slower than memory cache but can handle larger data and survives restarts.
+    
+    Each entry is a file starting with a one-line JSON header (key, timestamps and
+    the codec used) followed by the encoded value, compressed by default. Entries
+    written in the older plain JSON format are still read.
     """
     
-    def __init__(self, ttl: int = 86400, cache_dir: str = None):
+    def __init__(self, ttl: int = 86400, cache_dir: str = None, codec: Optional[str] = None):
         """
         Initializes the disk cache.
         
         Args:
             ttl: Time-to-live for cache entries in seconds (default: 24h)
             cache_dir: Directory to store cache files (default: data/cache)
+            codec: Name of the codec used for new entries, e.g. "zstd+orjson" or
+                "gzip+json" (default: gzip+json)
         """
         super().__init__(ttl)
         
@@ -220,11 +420,13 @@ class DiskCache(BaseCache):
             cache_dir = os.path.join("data", "cache")
         
         self.cache_dir = cache_dir
+        self.codec = resolve_codec(codec)
         
         # Create cache directory if it doesn't exist
         os.makedirs(self.cache_dir, exist_ok=True)
         
-        self.logger.info(f"Initialized disk cache in {self.cache_dir} with TTL of {ttl}s")
+        self.logger.info(
+            f"Initialized disk cache in {self.cache_dir} with TTL of {ttl}s, codec {self.codec.name}")
     
     def get(self, key: str) -> Any:
         """
@@ -236,62 +438,73 @@ class DiskCache(BaseCache):
         Returns:
             Cached value or None if not found or expired
         """
-        file_path = self._get_file_path(key)
-        
-        if not os.path.exists(file_path):
-            return None
+        return self.get_with_expiry(key)[0]
+    
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        """
+        Retrieves a value from the cache together with its expiration time.
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                entry = json.load(f)
-            
-            # Check if entry has expired
-            if time.time() > entry['expires_at']:
-                self.logger.debug(f"Cache entry expired for key: {key}")
-                self.delete(key)
-                return None
-            
-            self.logger.debug(f"Cache hit for key: {key}")
-            return entry['value']
+        Args:
+            key: Cache key
             
+        Returns:
+            Tuple of the cached value and its expiration time, (None, None) if not
+            found or expired
+        """
+        try:
+            entry = self._read_entry(key, with_value=True)
+        except CodecUnavailableError as e:
+            # Written with a codec that is not installed here; keep it for other hosts
+            self.logger.warning(f"Cannot decode cache file for key {key}: {str(e)}")
+            return None, None
         except Exception as e:
             self.logger.error(f"Error reading cache file for key {key}: {str(e)}")
             # Delete corrupted cache file
             self.delete(key)
-            return None
+            return None, None
+        
+        if entry is None:
+            return None, None
+        
+        # Check if entry has expired
+        if time.time() > entry['expires_at']:
+            self.logger.debug(f"Cache entry expired for key: {key}")
+            self.delete(key)
+            return None, None
+        
+        self.logger.debug(f"Cache hit for key: {key}")
+        return entry['value'], entry['expires_at']
     
     def has(self, key: str) -> bool:
         """
         Checks if a key exists in the cache and is not expired.
         
+        Only the entry header is read, the value is not decoded.
+        
         Args:
             key: Cache key
             
         Returns:
             True if key exists and is not expired, False otherwise
         """
-        file_path = self._get_file_path(key)
-        
-        if not os.path.exists(file_path):
-            return False
-        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                entry = json.load(f)
-            
-            # Check if entry has expired
-            if time.time() > entry['expires_at']:
-                self.logger.debug(f"Cache entry expired for key: {key}")
-                self.delete(key)
-                return False
-            
-            return True
-            
+            entry = self._read_entry(key, with_value=False)
         except Exception as e:
             self.logger.error(f"Error reading cache file for key {key}: {str(e)}")
             # Delete corrupted cache file
             self.delete(key)
             return False
+        
+        if entry is None:
+            return False
+        
+        # Check if entry has expired
+        if time.time() > entry['expires_at']:
+            self.logger.debug(f"Cache entry expired for key: {key}")
+            self.delete(key)
+            return False
+        
+        return is_codec_available(entry.get('codec'))
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -304,20 +517,29 @@ class DiskCache(BaseCache):
         file_path = self._get_file_path(key)
         
         try:
-            # Create cache entry with expiration
-            entry = {
-                'value': value,
+            codec_name, data = self.codec.encode(value)
+            
+            # Create cache entry header with expiration
+            header = {
+                'key': key,  # Store original key for reference
                 'created_at': time.time(),
                 'expires_at': time.time() + self.ttl,
-                'key': key  # Store original key for reference
+                'codec': codec_name
             }
             
             # Ensure directory exists
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(entry, f)
+            with open(file_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8'))
+                f.write(b'\n')
+                f.write(data)
+            
+            # Entry in the older format is superseded
+            legacy_path = self._get_legacy_file_path(key)
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
             
             self.logger.debug(f"Cached value for key: {key}")
             
@@ -332,14 +554,13 @@ class DiskCache(BaseCache):
         Args:
             key: Cache key
         """
-        file_path = self._get_file_path(key)
-        
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                self.logger.debug(f"Deleted cache entry for key: {key}")
-            except Exception as e:
-                self.logger.error(f"Error deleting cache file for key {key}: {str(e)}")
+        for file_path in (self._get_file_path(key), self._get_legacy_file_path(key)):
+            if os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                    self.logger.debug(f"Deleted cache entry for key: {key}")
+                except Exception as e:
+                    self.logger.error(f"Error deleting cache file for key {key}: {str(e)}")
     
     def clear(self) -> None:
         """
@@ -358,6 +579,32 @@ class DiskCache(BaseCache):
             self.logger.error(f"Error clearing disk cache: {str(e)}")
             raise CacheError(f"Failed to clear disk cache: {str(e)}") from e
     
+    def _read_entry(self, key: str, with_value: bool) -> Optional[Dict[str, Any]]:
+        """
+        Reads a cache entry in the current or the older plain JSON format.
+        
+        Args:
+            key: Cache key
+            with_value: Whether to decode the stored value
+            
+        Returns:
+            Entry with 'expires_at' (and 'value' if requested) or None if not found
+        """
+        try:
+            with open(self._get_file_path(key), 'rb') as f:
+                entry = json.loads(f.readline())
+                if with_value:
+                    entry['value'] = get_codec(entry['codec']).decode(f.read())
+                return entry
+        except FileNotFoundError:
+            pass
+        
+        try:
+            with open(self._get_legacy_file_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
     def _get_file_path(self, key: str) -> str:
         """
         Converts a cache key to a file path.
@@ -369,9 +616,396 @@ class DiskCache(BaseCache):
             Path to the cache file
         """
         hashed_key = self._hash_key(key)
+        return os.path.join(self.cache_dir, f"{hashed_key}.cache")
+    
+    def _get_legacy_file_path(self, key: str) -> str:
+        """
+        Converts a cache key to the path used by the older plain JSON format.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Path to the legacy cache file
+        """
+        hashed_key = self._hash_key(key)
         return os.path.join(self.cache_dir, f"{hashed_key}.json")
 
 
+class SqliteCache(BaseCache):
+    """
+    SQLite-based implementation of the cache.
+    
+    All entries are stored in a single database file with an indexed key column,
+    so lookups do not depend on the number of cached entries and clearing the cache
+    does not list a directory. The database runs in WAL mode, which lets several
+    readers work concurrently with a writer.
+    
+    Values are stored encoded with a codec (compressed by default) whose name is
+    kept in the codec column; rows written before the column existed hold plain
+    JSON text and are still read.
+    """
+    
+    def __init__(self, ttl: int = 86400, db_path: str = None, codec: Optional[str] = None):
+        """
+        Initializes the SQLite cache.
+        
+        Args:
+            ttl: Time-to-live for cache entries in seconds (default: 24h)
+            db_path: Path to the database file (default: data/cache/cache.sqlite3)
+            codec: Name of the codec used for new entries, e.g. "zstd+orjson" or
+                "gzip+json" (default: gzip+json)
+            
+        Raises:
+            CacheError: If the database cannot be opened
+        """
+        super().__init__(ttl)
+        
+        # Set default database path if not provided
+        if db_path is None:
+            db_path = os.path.join("data", "cache", "cache.sqlite3")
+        
+        self.db_path = db_path
+        self.codec = resolve_codec(codec)
+        
+        # Create parent directory if it doesn't exist
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        # SQLite connections cannot be shared between threads
+        self._local = threading.local()
+        
+        try:
+            conn = self._get_connection()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "codec TEXT)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")]
+            if "codec" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN codec TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at "
+                "ON cache_entries (expires_at)"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            raise CacheError(f"Failed to open SQLite cache: {str(e)}") from e
+        
+        self.logger.info(
+            f"Initialized SQLite cache in {self.db_path} with TTL of {ttl}s, codec {self.codec.name}")
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Returns the database connection of the current thread.
+        
+        Returns:
+            SQLite connection
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key: str) -> Any:
+        """
+        Retrieves a value from the cache.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return self.get_or_none(key)
+    
+    def get_or_none(self, key: str) -> Any:
+        """
+        Retrieves a value from the cache with a single indexed lookup.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return self.get_with_expiry(key)[0]
+    
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        """
+        Retrieves a value from the cache together with its expiration time.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of the cached value and its expiration time, (None, None) if not
+            found or expired
+        """
+        try:
+            row = self._get_connection().execute(
+                "SELECT value, expires_at, codec FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reading cache entry for key {key}: {str(e)}")
+            return None, None
+        
+        if row is None:
+            return None, None
+        
+        value, expires_at, codec_name = row
+        
+        # Check if entry has expired
+        if time.time() > expires_at:
+            self.logger.debug(f"Cache entry expired for key: {key}")
+            self.delete(key)
+            return None, None
+        
+        try:
+            if codec_name is None:
+                # Row written before codecs were recorded
+                value = json.loads(value)
+            else:
+                value = get_codec(codec_name).decode(value)
+        except CodecUnavailableError as e:
+            # Written with a codec that is not installed here; keep it for other hosts
+            self.logger.warning(f"Cannot decode cache entry for key {key}: {str(e)}")
+            return None, None
+        except Exception as e:
+            self.logger.error(f"Error decoding cache entry for key {key}: {str(e)}")
+            # Delete corrupted entry
+            self.delete(key)
+            return None, None
+        
+        self.logger.debug(f"Cache hit for key: {key}")
+        return value, expires_at
+    
+    def has(self, key: str) -> bool:
+        """
+        Checks if a key exists in the cache and is not expired.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            True if key exists and is not expired, False otherwise
+        """
+        try:
+            row = self._get_connection().execute(
+                "SELECT codec FROM cache_entries WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reading cache entry for key {key}: {str(e)}")
+            return False
+        return row is not None and is_codec_available(row[0])
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value in the cache.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            
+        Raises:
+            CacheError: If the value cannot be serialized or written
+        """
+        now = time.time()
+        try:
+            codec_name, data = self.codec.encode(value)
+            conn = self._get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, created_at, expires_at, codec) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, now, now + self.ttl, codec_name)
+            )
+            conn.commit()
+            self.logger.debug(f"Cached value for key: {key}")
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            self.logger.error(f"Error writing cache entry for key {key}: {str(e)}")
+            raise CacheError(f"Failed to write to SQLite cache: {str(e)}") from e
+    
+    def delete(self, key: str) -> None:
+        """
+        Deletes a value from the cache.
+        
+        Args:
+            key: Cache key
+        """
+        try:
+            conn = self._get_connection()
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.commit()
+            self.logger.debug(f"Deleted cache entry for key: {key}")
+        except sqlite3.Error as e:
+            self.logger.error(f"Error deleting cache entry for key {key}: {str(e)}")
+    
+    def clear(self) -> None:
+        """
+        Clears all entries from the cache.
+        
+        Raises:
+            CacheError: If the entries cannot be deleted
+        """
+        try:
+            conn = self._get_connection()
+            conn.execute("DELETE FROM cache_entries")
+            conn.commit()
+            self.logger.info(f"Cleared all entries from SQLite cache in {self.db_path}")
+        except sqlite3.Error as e:
+            self.logger.error(f"Error clearing SQLite cache: {str(e)}")
+            raise CacheError(f"Failed to clear SQLite cache: {str(e)}") from e
+    
+    def purge_expired(self) -> int:
+        """
+        Deletes all expired entries using the expires_at index.
+        
+        Returns:
+            Number of deleted entries
+        """
+        try:
+            conn = self._get_connection()
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error purging expired cache entries: {str(e)}")
+            return 0
+        
+        if cursor.rowcount:
+            self.logger.info(f"Purged {cursor.rowcount} expired entries from SQLite cache")
+        return cursor.rowcount
+    
+    def close(self) -> None:
+        """
+        Closes the database connection of the current thread.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache with a small in-memory LRU in front of a persistent store.
+    
+    Reads are served from memory when possible; entries found only in the persistent
+    store are promoted to memory (read-through). Writes go to both tiers
+    (write-through), so entries evicted from memory remain available from the
+    persistent store in later runs.
+    """
+    
+    def __init__(self, ttl: int = 86400, backend: Optional[BaseCache] = None,
+                 memory_max_size: int = 1000, memory_max_bytes: Optional[int] = None,
+                 cache_dir: str = None):
+        """
+        Initializes the tiered cache.
+        
+        Args:
+            ttl: Time-to-live for cache entries in seconds (default: 24h)
+            backend: Persistent cache used as the second tier (default: DiskCache)
+            memory_max_size: Maximum number of entries kept in memory
+            memory_max_bytes: Maximum estimated size of the memory tier in bytes
+            cache_dir: Directory for the default disk backend
+        """
+        super().__init__(ttl)
+        self.memory = MemoryCache(ttl=ttl, max_size=memory_max_size, max_bytes=memory_max_bytes)
+        self.backend = backend if backend is not None else DiskCache(ttl=ttl, cache_dir=cache_dir)
+        self.logger.info(
+            f"Initialized tiered cache (memory: {memory_max_size} entries, "
+            f"backend: {self.backend.__class__.__name__}) with TTL of {ttl}s")
+    
+    def get(self, key: str) -> Any:
+        """
+        Retrieves a value from the cache.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return self.get_or_none(key)
+    
+    def get_or_none(self, key: str) -> Any:
+        """
+        Retrieves a value from memory, falling back to the persistent store.
+        
+        Values read from the persistent store are promoted to memory for at most the
+        time they have left in the store, so they do not outlive it.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        
+        value, expires_at = self.backend.get_with_expiry(key)
+        if value is not None:
+            ttl = None if expires_at is None else min(self.memory.ttl, max(0.0, expires_at - time.time()))
+            self.memory.set(key, value, ttl=ttl)
+            self.logger.debug(f"Promoted cache entry to memory for key: {key}")
+        return value
+    
+    def has(self, key: str) -> bool:
+        """
+        Checks if a key exists in either tier and is not expired.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            True if key exists and is not expired, False otherwise
+        """
+        return self.memory.has(key) or self.backend.has(key)
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value in both tiers.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            
+        Raises:
+            CacheError: If the value cannot be written to the persistent store
+        """
+        self.backend.set(key, value)
+        self.memory.set(key, value)
+    
+    def delete(self, key: str) -> None:
+        """
+        Deletes a value from both tiers.
+        
+        Args:
+            key: Cache key
+        """
+        self.memory.delete(key)
+        self.backend.delete(key)
+    
+    def clear(self) -> None:
+        """
+        Clears all entries from both tiers.
+        """
+        self.memory.clear()
+        self.backend.clear()
+
+
 class CacheManager:
     """
     Factory class for creating cache instances.
@@ -381,14 +1015,17 @@ class CacheManager:
     
     @staticmethod
     def create(storage_type: str = "memory", ttl: int = 86400, 
-               cache_dir: str = None) -> Union[MemoryCache, DiskCache]:
+               cache_dir: str = None, codec: Optional[str] = None) -> Union[MemoryCache, DiskCache, SqliteCache, TieredCache]:
         """
         Creates a cache instance based on the specified type.
         
         Args:
-            storage_type: Type of cache to create ("memory" or "disk")
+            storage_type: Type of cache to create ("memory", "disk", "sqlite" or "tiered";
+                the tiered cache keeps an in-memory LRU in front of a disk cache)
             ttl: Time-to-live for cache entries in seconds
-            cache_dir: Directory for disk cache (only used for disk cache)
+            cache_dir: Directory for disk cache or the SQLite database file
+            codec: Value codec for the persistent caches, e.g. "zstd+orjson"
+                (default: gzip+json)
             
         Returns:
             Cache instance
@@ -403,6 +1040,15 @@ class CacheManager:
             return MemoryCache(ttl=ttl)
         elif storage_type.lower() == "disk":
             logger.info(f"Creating disk cache with TTL of {ttl}s")
-            return DiskCache(ttl=ttl, cache_dir=cache_dir)
+            return DiskCache(ttl=ttl, cache_dir=cache_dir, codec=codec)
+        elif storage_type.lower() == "sqlite":
+            logger.info(f"Creating SQLite cache with TTL of {ttl}s")
+            db_path = os.path.join(cache_dir, "cache.sqlite3") if cache_dir else None
+            return SqliteCache(ttl=ttl, db_path=db_path, codec=codec)
+        elif storage_type.lower() == "tiered":
+            logger.info(f"Creating tiered memory+disk cache with TTL of {ttl}s")
+            return TieredCache(ttl=ttl, backend=DiskCache(ttl=ttl, cache_dir=cache_dir, codec=codec))
         else:
-            raise ValueError(f"Invalid cache storage type: {storage_type}. Must be 'memory' or 'disk'.") 
\ No newline at end of file
+            raise ValueError(
+                f"Invalid cache storage type: {storage_type}. "
+                f"Must be 'memory', 'disk', 'sqlite' or 'tiered'.") 
\ No newline at end of file
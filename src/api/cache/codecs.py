@@ -0,0 +1,264 @@
+"""
+Value codecs for the persistent cache backends.
+
+A codec turns a cached value into bytes and back. Serializers (json, orjson, msgpack)
+can be combined with a compression layer (gzip, zstd) using names such as
+"zstd+orjson". The persistent caches record the name of the codec used for every
+entry, so entries written with a different codec, or before codecs were introduced,
+remain readable.
+
+The default codec, gzip+json, only needs the standard library, so cache files can be
+shared between hosts with different optional packages installed. Faster codecs such as
+"zstd+orjson" have to be chosen explicitly; on hosts without their packages, entries
+written with them are treated as cache misses.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+    msgpack = None
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+    zstandard = None
+
+
+# Payloads smaller than this are stored without compression
+DEFAULT_MIN_COMPRESS_SIZE = 1024
+
+# Codec of new entries unless another one is configured; portable across environments
+DEFAULT_CODEC = "gzip+json"
+
+
+class CodecUnavailableError(ValueError):
+    """
+    Raised when a codec is unknown or its package is not installed.
+    """
+    pass
+
+
+class Codec:
+    """
+    Base class for value codecs.
+    """
+
+    name = ""
+
+    def encode(self, value: Any) -> Tuple[str, bytes]:
+        """
+        Serializes a value.
+
+        Args:
+            value: Value to serialize
+
+        Returns:
+            Name of the codec that has to be used to decode the data, and the data
+        """
+        raise NotImplementedError("Subclasses must implement encode()")
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Deserializes a value.
+
+        Args:
+            data: Data produced by encode()
+
+        Returns:
+            Decoded value
+        """
+        raise NotImplementedError("Subclasses must implement decode()")
+
+
+class JsonCodec(Codec):
+    """
+    Codec using the standard library json module.
+    """
+
+    name = "json"
+
+    def encode(self, value: Any) -> Tuple[str, bytes]:
+        return self.name, json.dumps(value).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    Codec using orjson, a faster JSON implementation.
+    """
+
+    name = "orjson"
+
+    def encode(self, value: Any) -> Tuple[str, bytes]:
+        return self.name, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """
+    Codec using the binary msgpack format.
+    """
+
+    name = "msgpack"
+
+    def encode(self, value: Any) -> Tuple[str, bytes]:
+        return self.name, msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class CompressedCodec(Codec):
+    """
+    Compression layer on top of a serializer codec.
+
+    Payloads shorter than min_compress_size are not worth compressing and are
+    stored with the inner codec only.
+    """
+
+    def __init__(self, inner: Codec, compression: str,
+                 min_compress_size: int = DEFAULT_MIN_COMPRESS_SIZE):
+        """
+        Initializes the compressed codec.
+
+        Args:
+            inner: Serializer codec
+            compression: Compression algorithm: "gzip" or "zstd"
+            min_compress_size: Minimum payload size in bytes that gets compressed
+
+        Raises:
+            CodecUnavailableError: If the compression algorithm is unknown or not installed
+        """
+        if compression == "zstd":
+            if not HAS_ZSTD:
+                raise CodecUnavailableError("zstd compression requires the zstandard package")
+            self._compressor = zstandard.ZstdCompressor()
+            self._decompressor = zstandard.ZstdDecompressor()
+        elif compression != "gzip":
+            raise CodecUnavailableError(f"Unknown compression: {compression}")
+
+        self.inner = inner
+        self.compression = compression
+        self.min_compress_size = min_compress_size
+        self.name = f"{compression}+{inner.name}"
+
+    def encode(self, value: Any) -> Tuple[str, bytes]:
+        inner_name, data = self.inner.encode(value)
+        if len(data) < self.min_compress_size:
+            return inner_name, data
+        if self.compression == "zstd":
+            return self.name, self._compressor.compress(data)
+        return self.name, gzip.compress(data, compresslevel=6)
+
+    def decode(self, data: bytes) -> Any:
+        if self.compression == "zstd":
+            data = self._decompressor.decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return self.inner.decode(data)
+
+
+_SERIALIZERS = {
+    "json": (JsonCodec, True),
+    "orjson": (OrjsonCodec, HAS_ORJSON),
+    "msgpack": (MsgpackCodec, HAS_MSGPACK),
+}
+
+_codecs: Dict[str, Codec] = {}
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Returns the codec with the given name, e.g. "json", "orjson" or "zstd+orjson".
+
+    Args:
+        name: Codec name, optionally prefixed with a compression algorithm
+
+    Returns:
+        Codec instance
+
+    Raises:
+        CodecUnavailableError: If the codec is unknown or its package is not installed
+    """
+    codec = _codecs.get(name)
+    if codec is not None:
+        return codec
+
+    compression, _, serializer = name.rpartition("+")
+    if serializer not in _SERIALIZERS:
+        raise CodecUnavailableError(f"Unknown cache codec: {name}")
+    codec_class, available = _SERIALIZERS[serializer]
+    if not available:
+        raise CodecUnavailableError(f"Cache codec {name} requires the {serializer} package")
+
+    codec = codec_class()
+    if compression:
+        codec = CompressedCodec(codec, compression)
+
+    _codecs[name] = codec
+    return codec
+
+
+def is_codec_available(name: Optional[str]) -> bool:
+    """
+    Checks whether entries written with a codec can be decoded in this environment.
+
+    Args:
+        name: Codec name recorded with an entry; None for entries written before
+            codecs were recorded, which are plain JSON
+
+    Returns:
+        True if the codec is known and its packages are installed
+    """
+    if name is None:
+        return True
+    try:
+        get_codec(name)
+    except CodecUnavailableError:
+        return False
+    return True
+
+
+def default_codec_name() -> str:
+    """
+    Returns the name of the codec used when none is configured.
+
+    The default does not depend on the installed packages, so every host can read
+    the entries written by another one.
+
+    Returns:
+        DEFAULT_CODEC ("gzip+json")
+    """
+    return DEFAULT_CODEC
+
+
+def resolve_codec(name: Optional[str] = None) -> Codec:
+    """
+    Returns the named codec, or the default codec if no name is given.
+
+    Args:
+        name: Codec name or None
+
+    Returns:
+        Codec instance
+    """
+    return get_codec(name or default_codec_name())
@@ -0,0 +1,335 @@
+"""
+Asynchronous PubTator client for fetching large numbers of publications.
+
+AsyncPubTatorClient exposes the same public methods as PubTatorClient as coroutines.
+Instead of waiting for each request before sending the next one, it keeps up to
+max_concurrency requests in flight and paces their start times with a token bucket
+shared by all instances, so the 20 requests per second budget of the PubTator3 API
+is respected for the whole process.
+
+HTTP calls go through the shared pooled session and are run in worker threads, so no
+additional HTTP library is required.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Dict, List, Optional
+
+import bioc
+import requests
+
+from .exceptions import PubTatorError
+from .pubtator_client import PubTatorClient
+from .rate_limit import TokenBucket, get_rate_limiter
+
+
+class AsyncPubTatorClient:
+    """
+    Asyncio client for the PubTator3 API.
+
+    Example usage:
+        async def main():
+            client = AsyncPubTatorClient(max_concurrency=8)
+            publications = await client.get_publications_by_pmids(pmids)
+
+        asyncio.run(main())
+    """
+
+    # API rate limit is 20 requests per second according to NCBI
+    REQUESTS_PER_SECOND = 20
+
+    # Maximum number of PMIDs sent in a single export request
+    MAX_PMIDS_PER_REQUEST = 100
+
+    def __init__(
+            self,
+            base_url: Optional[str] = None,
+            timeout: int = 30,
+            use_cache: bool = True,
+            cache_ttl: int = 86400,  # 24 hours
+            cache_storage_type: str = "disk",
+            email: Optional[str] = None,
+            tool: str = "coordinates-lit",
+            session: Optional[requests.Session] = None,
+            max_concurrency: int = 5,
+            batch_size: int = MAX_PMIDS_PER_REQUEST,
+            rate_limiter: Optional[TokenBucket] = None):
+        """
+        Initialize the asynchronous PubTator client.
+
+        Args:
+            base_url: Custom base URL for the API (optional)
+            timeout: API response timeout in seconds
+            use_cache: Whether to use caching for API requests
+            cache_ttl: Cache entry lifetime in seconds (default 24 hours)
+            cache_storage_type: Cache storage type: "memory", "disk", "sqlite" or "tiered"
+            email: User's email address (optional, but recommended by NCBI)
+            tool: Name of the tool using the API
+            session: HTTP session to send requests with (default: shared pooled session)
+            max_concurrency: Maximum number of requests in flight at the same time
+            batch_size: Number of PMIDs requested in a single export call
+            rate_limiter: Token bucket pacing the requests (default: bucket shared by
+                all PubTator clients in the process)
+
+        Raises:
+            ValueError: If max_concurrency or batch_size is not positive
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if not 1 <= batch_size <= self.MAX_PMIDS_PER_REQUEST:
+            raise ValueError(
+                f"batch_size must be between 1 and {self.MAX_PMIDS_PER_REQUEST}")
+
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(
+            "pubtator", self.REQUESTS_PER_SECOND)
+        # The synchronous client provides request parameters, parsing and caching
+        self._client = PubTatorClient(
+            base_url=base_url,
+            timeout=timeout,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            cache_storage_type=cache_storage_type,
+            email=email,
+            tool=tool,
+            session=session,
+            rate_limiter=self.rate_limiter)
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+        # Semaphores are bound to the event loop they are first used in
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def base_url(self) -> str:
+        return self._client.base_url
+
+    @property
+    def session(self) -> requests.Session:
+        return self._client.session
+
+    @property
+    def cache(self):
+        return self._client.cache
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Return the concurrency semaphore for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _make_request(
+            self,
+            endpoint: str,
+            method: str = "GET",
+            params: Optional[Dict] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Makes a request to the PubTator API without blocking the event loop.
+
+        Args:
+            endpoint: API endpoint
+            method: HTTP method (GET or POST)
+            params: Request parameters
+            headers: Additional request headers
+
+        Returns:
+            HTTP response object
+
+        Raises:
+            PubTatorError: When an error occurs during the request
+        """
+        url = f"{self.base_url}/{endpoint}"
+
+        request_params = {}
+        if params:
+            request_params.update(params)
+
+        # Add NCBI parameters if email is provided
+        if self._client.email:
+            request_params["email"] = self._client.email
+            request_params["tool"] = self._client.tool
+
+        if method == "GET":
+            send = functools.partial(
+                self.session.get, url, params=request_params, headers=headers,
+                timeout=self._client.timeout)
+        elif method == "POST":
+            send = functools.partial(
+                self.session.post, url, json=request_params, headers=headers,
+                timeout=self._client.timeout)
+        else:
+            raise PubTatorError(f"Unsupported HTTP method: {method}")
+
+        async with self._get_semaphore():
+            await self.rate_limiter.acquire_async()
+            try:
+                response = await asyncio.to_thread(send)
+            except requests.RequestException as e:
+                raise PubTatorError(f"Error making request: {str(e)}")
+
+        if response.status_code == 404:
+            raise PubTatorError(f"Resource not found: {url}")
+        if response.status_code != 200:
+            raise PubTatorError(f"PubTator API error: {response.status_code} - {response.text}")
+
+        return response
+
+    async def get_publications_by_pmids(self, pmids: List[str],
+                                        concepts: Optional[List[str]] = None,
+                                        format_type: str = "biocjson") -> List[bioc.BioCDocument]:
+        """
+        Retrieve publications by PubMed IDs (PMIDs).
+
+        PMIDs missing from the cache are split into batches of batch_size, which are
+        fetched concurrently.
+
+        Args:
+            pmids: List of PubMed identifiers
+            concepts: List of concept types to include (e.g., "gene", "disease", "mutation")
+                     If not provided, returns all available annotation types
+            format_type: Format of returned data (currently only 'biocjson' is fully supported)
+
+        Returns:
+            List of BioCDocument objects in the order of the requested PMIDs
+
+        Raises:
+            PubTatorError: If the publications cannot be found or an error occurs
+            ValueError: If the PMIDs list is empty or contains non-digit IDs
+        """
+        if format_type.lower() != "biocjson":
+            self.logger.warning(
+                f"Format {format_type} may not be supported by the API. Using 'biocjson'.")
+
+        self._client._validate_pmids(pmids)
+
+        cached_documents = self._client._get_cached_documents(pmids, concepts)
+        missing_pmids = [
+            pmid for pmid in dict.fromkeys(pmids) if pmid not in cached_documents
+        ]
+        batches = [
+            missing_pmids[i:i + self.batch_size]
+            for i in range(0, len(missing_pmids), self.batch_size)
+        ]
+        if batches:
+            self.logger.debug(
+                f"PubTator document cache: {len(cached_documents)} hits, "
+                f"{len(missing_pmids)} misses in {len(batches)} batches")
+
+        batch_results = await asyncio.gather(
+            *(self._fetch_publications_batch(batch, concepts) for batch in batches))
+        fetched_documents = [doc for documents in batch_results for doc in documents]
+
+        return self._client._merge_documents(pmids, cached_documents, fetched_documents)
+
+    async def _fetch_publications_batch(self, pmids: List[str],
+                                        concepts: Optional[List[str]] = None) -> List[bioc.BioCDocument]:
+        """
+        Fetch a single batch of publications and store them in the cache.
+
+        Args:
+            pmids: PubMed identifiers missing from the cache
+            concepts: List of concept types to include
+
+        Returns:
+            List of BioCDocument objects returned by the API
+        """
+        params = self._client._prepare_publications_params(pmids, concepts)
+        response = await self._make_request("publications/export/biocjson", params=params)
+        documents = self._client._process_publications_response(response)
+        self._client._cache_documents(pmids, documents, concepts)
+        return documents
+
+    async def get_publication_by_pmid(self, pmid: str,
+                                      concepts: Optional[List[str]] = None,
+                                      format_type: str = "biocjson") -> Optional[bioc.BioCDocument]:
+        """
+        Retrieve a single publication by PubMed ID.
+
+        Args:
+            pmid: PubMed identifier
+            concepts: List of concept types to include
+            format_type: Format of returned data
+
+        Returns:
+            A BioCDocument object, or None if the publication was not found
+
+        Raises:
+            PubTatorError: If an error occurs during retrieval (except for 404 Not Found)
+        """
+        try:
+            docs = await self.get_publications_by_pmids([pmid], concepts, format_type)
+        except PubTatorError as e:
+            if "Resource not found" in str(e) or "404" in str(e):
+                self.logger.warning(f"Resource not found: {pmid}")
+                return None
+            raise
+        if not docs:
+            self.logger.warning(f"No publication found for PMID: {pmid}")
+            return None
+        return docs[0]
+
+    async def search_publications(self, query: str,
+                                  concepts: Optional[List[str]] = None,
+                                  format_type: str = "biocjson") -> List[Any]:
+        """
+        Search for publications using a text query.
+
+        Args:
+            query: Search query (similar to PubMed queries)
+            concepts: List of concept types to include
+            format_type: Format of returned data
+
+        Returns:
+            List of BioCDocument objects matching the query
+
+        Raises:
+            PubTatorError: If the search fails
+        """
+        params: Dict[str, Any] = {
+            "q": query,
+            "format": format_type
+        }
+        if concepts:
+            params["concepts"] = ",".join(concepts)
+
+        response = await self._make_request("v1/search", params=params)
+        return self._client._process_response(response, format_type)
+
+    async def get_relations(
+        self,
+        entity1: str,
+        relation_type: str,
+        entity2: str
+    ) -> List[Dict[str, Any]]:
+        """Retrieve relations between entities from the PubTator API.
+
+        Args:
+            entity1 (str): First entity (e.g. '@GENE_JAK1')
+            relation_type (str): Relation type (e.g. 'negative_correlate')
+            entity2 (str): Second entity (e.g. 'Chemical')
+
+        Returns:
+            List[Dict[str, Any]]: List of relations in JSON format
+
+        Raises:
+            PubTatorError: If the API request fails
+        """
+        response = await self._make_request(
+            "relations",
+            params={
+                "e1": entity1,
+                "type": relation_type,
+                "e2": entity2
+            },
+            headers={"Accept": "application/json"})
+        try:
+            return response.json()
+        except ValueError as e:
+            raise PubTatorError(f"Failed to retrieve relations: {str(e)}")
@@ -0,0 +1,253 @@
+"""
+Incremental parsing of BioC JSON responses.
+
+PubTator export responses hold all requested documents in one JSON array, either
+{"PubTator3": [...]} (PubTator3 API) or a BioC collection {"documents": [...]}. Parsing
+them with response.json() keeps the raw payload, the decoded text and the complete
+parsed structure in memory at the same time, and for full-text exports of 100 PMIDs
+this is hundreds of megabytes.
+
+iter_json_array_items() reads the response chunk by chunk and yields the elements of
+the document array one at a time, as soon as each one has been received. Only the
+current document and the unparsed rest of the last chunk are buffered, so peak memory
+depends on the size of the largest document rather than on the number of documents.
+Each element is located with a bracket-counting scan (strings are skipped with a
+regular expression) and then decoded with json.JSONDecoder.raw_decode.
+
+Example usage:
+    response = session.get(url, params=params, stream=True)
+    for doc_data in iter_json_array_items(response.iter_content(chunk_size=65536)):
+        document = parse_document(doc_data)
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+# Keys of the document arrays in PubTator3 and BioC collection responses
+DOCUMENT_ARRAY_KEYS = ("PubTator3", "documents")
+
+# Size of the chunks read from a streamed HTTP response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Next bracket or string start inside a JSON value
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+
+# Rest of a JSON string after its opening quote, including the closing quote
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+# Number or literal (true, false, null)
+_SCALAR = re.compile(r"[^\s,:{}\[\]\"]+")
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class _ChunkReader:
+    """
+    Buffer over a sequence of text or byte chunks.
+
+    The buffer holds the unparsed part of the input; consumed text is dropped with
+    compact().
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self) -> bool:
+        """
+        Appends the next non-empty chunk to the buffer.
+
+        Returns:
+            False if the input is exhausted
+        """
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._decoder.decode(b"", final=True)
+            elif isinstance(chunk, bytes):
+                text = self._decoder.decode(chunk)
+            else:
+                text = chunk
+            if text:
+                self.buffer += text
+                return True
+        return False
+
+    def compact(self) -> None:
+        """Drops the consumed part of the buffer."""
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        """Returns a decode error at the current position."""
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character.
+
+        Raises:
+            json.JSONDecodeError: If the input ends
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self.compact()
+            if not self.read_more():
+                raise self.error("Unexpected end of JSON data")
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next character, which must be one of the given characters.
+
+        Raises:
+            json.JSONDecodeError: If another character or the end of input is found
+        """
+        char = self.peek()
+        if char not in characters:
+            raise self.error(f"Expected one of {characters!r}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value_end(self) -> int:
+        """
+        Finds the end of the JSON value at the current position, reading more input
+        until the value is complete.
+
+        Returns:
+            Buffer index just after the value
+
+        Raises:
+            json.JSONDecodeError: If the input ends inside the value
+        """
+        char = self.peek()
+        start = self.pos
+
+        if char == '"':
+            while True:
+                match = _STRING_REST.match(self.buffer, start + 1)
+                if match:
+                    return match.end()
+                if not self.read_more():
+                    raise self.error("Unterminated string")
+
+        if char not in "{[":
+            while True:
+                match = _SCALAR.match(self.buffer, start)
+                if match and (match.end() < len(self.buffer) or self.eof):
+                    return match.end()
+                if not match:
+                    raise self.error(f"Unexpected character {char!r}")
+                if not self.read_more():
+                    return match.end()
+
+        # Object or array: count brackets, resuming the scan after each read
+        depth = 0
+        index = start
+        while True:
+            match = _STRUCTURAL.search(self.buffer, index)
+            if match is None:
+                index = len(self.buffer)
+            else:
+                index = match.start()
+                char = match.group(0)
+                if char == '"':
+                    string_end = _STRING_REST.match(self.buffer, index + 1)
+                    if string_end:
+                        index = string_end.end()
+                        continue
+                else:
+                    depth += 1 if char in "{[" else -1
+                    index += 1
+                    if depth == 0:
+                        return index
+                    continue
+            # Incomplete value or string: index stays at the unfinished part
+            if not self.read_more():
+                raise self.error("Unexpected end of JSON data")
+
+    def read_value(self, decoder: json.JSONDecoder) -> Any:
+        """Reads and decodes the complete JSON value at the current position."""
+        self.value_end()
+        value, self.pos = decoder.raw_decode(self.buffer, self.pos)
+        return value
+
+    def skip_value(self) -> None:
+        """Skips the JSON value at the current position without decoding it."""
+        self.pos = self.value_end()
+        self.compact()
+
+
+def _iter_array(reader: _ChunkReader, decoder: json.JSONDecoder) -> Iterator[Any]:
+    """
+    Yields the elements of the array whose "[" was just consumed.
+    """
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        value = reader.read_value(decoder)
+        reader.compact()
+        yield value
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_json_array_items(chunks: Iterable[Union[bytes, str]],
+                          array_keys: Sequence[str] = DOCUMENT_ARRAY_KEYS,
+                          decoder: Optional[json.JSONDecoder] = None) -> Iterator[Any]:
+    """
+    Yields the elements of a JSON array as they arrive in a chunked input.
+
+    The array is either the top-level value or the value of one of array_keys in a
+    top-level object; other keys of the object are skipped without being decoded.
+
+    Args:
+        chunks: Parts of the JSON text, as bytes (UTF-8) or str, e.g. the output of
+            requests.Response.iter_content()
+        array_keys: Keys of the top-level object that hold the array
+        decoder: JSON decoder used for the elements (default: json.JSONDecoder())
+
+    Yields:
+        Decoded array elements, in order
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON or ends prematurely
+        KeyError: If the top-level value is an object without any of array_keys
+    """
+    decoder = decoder or json.JSONDecoder()
+    reader = _ChunkReader(chunks)
+
+    first = reader.expect("{[")
+    if first == "[":
+        yield from _iter_array(reader, decoder)
+        return
+
+    found = False
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key_end = reader.value_end()
+            key = json.loads(reader.buffer[reader.pos:key_end])
+            reader.pos = key_end
+            reader.expect(":")
+            if key in array_keys and reader.peek() == "[":
+                reader.pos += 1
+                found = True
+                yield from _iter_array(reader, decoder)
+            else:
+                reader.skip_value()
+            if reader.expect(",}") == "}":
+                break
+
+    if not found:
+        raise KeyError(f"None of the keys {list(array_keys)} found in the JSON object")
@@ -27,7 +27,8 @@ from .exceptions import (
     ParseError,
     RateLimitError
 )
-from src.api.cache.cache import MemoryCache, DiskCache
+from src.api.cache.cache import MemoryCache, DiskCache, SqliteCache, TieredCache
+from src.api.clients.transport import get_session
 
 # Default base URL for NCBI E-utilities API
 DEFAULT_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
@@ -72,6 +73,9 @@ class ClinVarClient:
     
     # Minimum interval between requests in seconds (3 requests per second)
     API_REQUEST_INTERVAL = 0.34
+
+    # Maximum number of variant IDs sent in a single esummary/efetch request
+    DETAILS_BATCH_SIZE = 200
     
     def __init__(
             self,
@@ -84,7 +88,8 @@ class ClinVarClient:
             use_cache: bool = True,
             cache_storage_type: str = "memory",
             cache_ttl: int = 3600,
-            tool: str = "clinvar_client"):
+            tool: str = "clinvar_client",
+            session: Optional[requests.Session] = None):
         """
         Initialize the ClinVar client.
 
@@ -96,9 +101,10 @@ class ClinVarClient:
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
             use_cache: Whether to use caching
-            cache_storage_type: Type of cache storage ("memory" or "disk")
+            cache_storage_type: Type of cache storage ("memory", "disk", "sqlite" or "tiered")
             cache_ttl: Cache time-to-live in seconds
             tool: Tool name for API requests
+            session: HTTP session to send requests with (default: shared pooled session)
         """
         self.email = email
         self.api_key = api_key
@@ -110,6 +116,7 @@ class ClinVarClient:
         self.cache_storage_type = cache_storage_type
         self.cache_ttl = cache_ttl
         self.tool = tool
+        self.session = session if session is not None else get_session()
         self.logger = logging.getLogger(__name__)
         self._request_lock = threading.Lock()
         self._last_request_time = 0
@@ -123,6 +130,10 @@ class ClinVarClient:
         if use_cache:
             if cache_storage_type == "disk":
                 self.cache = DiskCache(ttl=cache_ttl)
+            elif cache_storage_type == "sqlite":
+                self.cache = SqliteCache(ttl=cache_ttl)
+            elif cache_storage_type == "tiered":
+                self.cache = TieredCache(ttl=cache_ttl)
             else:
                 self.cache = MemoryCache(ttl=cache_ttl, max_size=1000)
             self.logger.info(f"Cache enabled ({cache_storage_type}), TTL: {cache_ttl}s")
@@ -230,8 +241,8 @@ class ClinVarClient:
             # Generate cache key
             cache_key = f"{endpoint}:{json.dumps(request_params, sort_keys=True)}"
 
-            if self.cache.has(cache_key):
-                cached_response = self.cache.get(cache_key)
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
                 # Create response object from cached data
                 response = requests.Response()
                 response.status_code = cached_response["status_code"]
@@ -242,15 +253,17 @@ class ClinVarClient:
                 self.logger.debug(f"Retrieved from cache: {response.url}")
                 return response
 
-        # Wait if necessary to comply with request limits
+        # Wait if necessary to comply with request limits. Cache hits returned above,
+        # so only requests that actually go out take a rate limit slot.
         self._wait_for_rate_limit()
 
         # Build request URL
         url = self._build_request_url(endpoint, request_params)
 
+        response = None
         try:
             # Make request
-            response = requests.request(
+            response = self.session.request(
                 method=http_method,
                 url=url,
                 headers=self.headers,
@@ -272,8 +285,11 @@ class ClinVarClient:
             return response
 
         except requests.exceptions.RequestException as e:
-            # Handle rate limit errors
-            if response.status_code == 429:
+            # Handle rate limit errors (connection errors carry no response)
+            error_response = getattr(e, "response", None)
+            if error_response is None:
+                error_response = response
+            if error_response is not None and error_response.status_code == 429:
                 if retry_count < self.max_retries:
                     wait_time = (retry_count + 1) * self.retry_delay
                     self.logger.warning(f"Rate limit exceeded. Waiting {wait_time}s before retry {retry_count + 1}/{self.max_retries}")
@@ -765,24 +781,8 @@ class ClinVarClient:
                 self.logger.debug("Nie znaleziono wariantów dla zapytania")
                 return []
 
-            # Przygotuj wyniki dla znalezionych ID
-            results = []
-            for variant_id in variant_ids[:retmax]:
-                try:
-                    # Pobierz szczegóły dla każdego wariantu
-                    variant = self.get_variant_by_id(variant_id, format_type)
-                    results.append(variant)
-                except Exception as e:
-                    self.logger.warning(f"Nie udało się pobrać szczegółów wariantu {variant_id}: {e}")
-                    # Dodaj podstawowe informacje o wariancie
-                    results.append({
-                        "id": variant_id,
-                        "name": f"Variant {variant_id}",
-                        "variation_type": "Unknown",
-                        "clinical_significance": "Not provided"
-                    })
-            
-            return results
+            # Pobierz szczegóły wariantów partiami zamiast jednego zapytania na ID
+            return self._fetch_variants_by_ids(variant_ids[:retmax], format_type)
 
         except Exception as e:
             self.logger.error(f"Błąd podczas wyszukiwania: {str(e)}")
@@ -790,6 +790,158 @@ class ClinVarClient:
 
         return []
 
+    def _fetch_variants_by_ids(self, variant_ids: List[str], format_type: str = "json") -> List[Dict[str, Any]]:
+        """
+        Pobiera szczegóły wielu wariantów w partiach po DETAILS_BATCH_SIZE identyfikatorów.
+
+        Dla formatu JSON używany jest esummary (jedno zapytanie na partię), dla XML
+        efetch z rettype=clinvarset. Identyfikatory są przekazywane jawnie zamiast
+        WebEnv/query_key, dzięki czemu odpowiedzi dla partii trafiają do cache'a.
+
+        Args:
+            variant_ids: Identyfikatory wariantów ClinVar
+            format_type: Format odpowiedzi ("json" lub "xml")
+
+        Returns:
+            Lista wariantów w kolejności identyfikatorów. Warianty, których nie udało
+            się pobrać, są zastępowane podstawowymi informacjami.
+        """
+        results = []
+        for start in range(0, len(variant_ids), self.DETAILS_BATCH_SIZE):
+            batch = variant_ids[start:start + self.DETAILS_BATCH_SIZE]
+            try:
+                if format_type == "json":
+                    params = {
+                        "db": "clinvar",
+                        "id": ",".join(batch),
+                        "retmode": "json"
+                    }
+                    response = self._make_request("esummary.fcgi", params=params)
+                    variants = self._process_variation_summary(response.json())
+                else:
+                    params = {
+                        "db": "clinvar",
+                        "id": ",".join(batch),
+                        "rettype": "clinvarset",
+                        "retmode": "xml"
+                    }
+                    response = self._make_request("efetch.fcgi", params=params)
+                    variants = self._process_variation_xml_batch(response.text)
+                self.logger.debug(f"Pobrano {len(variants)} wariantów dla partii {len(batch)} ID")
+            except Exception as e:
+                self.logger.warning(f"Nie udało się pobrać szczegółów partii {len(batch)} wariantów: {e}")
+                variants = []
+
+            results.extend(self._match_variants_to_ids(batch, variants))
+
+        return results
+
+    def _match_variants_to_ids(self, variant_ids: List[str], variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Układa przetworzone warianty w kolejności zapytania.
+
+        Args:
+            variant_ids: Identyfikatory wysłane w zapytaniu
+            variants: Warianty zwrócone przez API
+
+        Returns:
+            Lista wariantów; identyfikatory bez odpowiedzi otrzymują podstawowe informacje
+        """
+        by_id = {str(variant.get("id", "")): variant for variant in variants}
+        if variants and not any(variant_id in by_id for variant_id in variant_ids):
+            # Odpowiedź nie zawiera identyfikatorów zapytania (np. inny typ ID), zwracamy ją bez zmian
+            return variants
+
+        results = []
+        for variant_id in variant_ids:
+            variant = by_id.get(variant_id)
+            if variant is None:
+                self.logger.warning(f"Brak szczegółów wariantu {variant_id} w odpowiedzi")
+                variant = {
+                    "id": variant_id,
+                    "name": f"Variant {variant_id}",
+                    "variation_type": "Unknown",
+                    "clinical_significance": "Not provided"
+                }
+            results.append(variant)
+        return results
+
+    def _process_variation_summary(self, data: Dict) -> List[Dict[str, Any]]:
+        """
+        Przetwarza odpowiedź esummary dla wielu wariantów w jednym przebiegu.
+
+        Args:
+            data: Dane JSON z esummary ({"result": {"uids": [...], "<uid>": {...}}})
+
+        Returns:
+            Lista przetworzonych wariantów
+        """
+        result = data.get("result", {}) if isinstance(data, dict) else {}
+        if not isinstance(result, dict) or "uids" not in result:
+            # Inna struktura odpowiedzi (np. efetch w JSON)
+            return self._process_variation_json(data)
+
+        results = []
+        for uid in result.get("uids", []):
+            summary = result.get(str(uid))
+            if not isinstance(summary, dict):
+                continue
+
+            significance = summary.get("germline_classification") or summary.get("clinical_significance") or {}
+            trait_set = significance.get("trait_set") or summary.get("trait_set") or []
+            variation_set = summary.get("variation_set") or [{}]
+
+            coordinates = []
+            for variation in variation_set:
+                for location in variation.get("variation_loc", []):
+                    coordinates.append({
+                        "assembly": location.get("assembly_name", ""),
+                        "chromosome": location.get("chr", ""),
+                        "start": location.get("start", 0),
+                        "stop": location.get("stop", 0)
+                    })
+
+            results.append({
+                "id": str(uid),
+                "name": summary.get("title", ""),
+                "variation_type": summary.get("obj_type", variation_set[0].get("variant_type", "")),
+                "clinical_significance": significance.get("description") or "Not provided",
+                "genes": [
+                    {"symbol": gene.get("symbol", ""), "id": str(gene.get("geneid", ""))}
+                    for gene in summary.get("genes", [])
+                ],
+                "phenotypes": [
+                    {"name": trait.get("trait_name", ""), "id": ""}
+                    for trait in trait_set
+                ],
+                "coordinates": coordinates
+            })
+
+        return results
+
+    def _process_variation_xml_batch(self, response_text: str) -> List[Dict[str, Any]]:
+        """
+        Przetwarza odpowiedź efetch XML zawierającą wiele zestawów ClinVarSet.
+
+        _xml_to_dict nadpisuje powtarzające się elementy, dlatego każdy ClinVarSet
+        jest konwertowany osobno.
+
+        Args:
+            response_text: Tekst odpowiedzi XML
+
+        Returns:
+            Lista przetworzonych wariantów
+        """
+        try:
+            root = ET.fromstring(response_text)
+        except ET.ParseError as e:
+            raise ParseError(f"Błąd parsowania XML: {str(e)}")
+
+        clinvar_sets = [self._xml_to_dict(element) for element in root.iter("ClinVarSet")]
+        if not clinvar_sets:
+            return self._process_variation_xml(self._xml_to_dict(root))
+        return self._process_variation_xml({"ReleaseSet": {"ClinVarSet": clinvar_sets}})
+
     def _process_variation_json(self, data: Dict) -> List[Dict[str, Any]]:
         """
         Przetwarza dane o wariantach w formacie JSON.
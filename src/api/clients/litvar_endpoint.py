@@ -9,6 +9,8 @@ import json
 import pandas as pd
 from typing import List, Dict, Any, Optional
 
+from src.api.clients.transport import get_session
+
 
 class LitVarEndpoint:
     """
@@ -23,10 +25,14 @@ class LitVarEndpoint:
     
     BASE_URL = "https://www.ncbi.nlm.nih.gov/research/litvar2-api"
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         """
         Initialize the LitVar API client.
+
+        Args:
+            session: HTTP session to send requests with (default: shared pooled session)
         """
+        self.session = session if session is not None else get_session()
         self.variants_data = []
         self.variant_details = {}
         self.pmids_data = {}
@@ -45,7 +51,7 @@ class LitVarEndpoint:
         
         for gene in genes:
             url = f"{self.BASE_URL}/variant/search/gene/{gene}"
-            response = requests.get(url)
+            response = self.session.get(url)
             
             if response.status_code == 200:
                 # Convert text response to list of dictionaries
@@ -87,7 +93,7 @@ class LitVarEndpoint:
         
         for variant_id in variant_ids:
             url = f"{self.BASE_URL}/variant/get/{variant_id}"
-            response = requests.get(url)
+            response = self.session.get(url)
             
             if response.status_code == 200:
                 variant_details[variant_id] = response.json()
@@ -109,7 +115,7 @@ class LitVarEndpoint:
         
         for rsid in rsids:
             url = f"{self.BASE_URL}/publications/get/{rsid}"
-            response = requests.get(url)
+            response = self.session.get(url)
             
             if response.status_code == 200:
                 publications = response.json()
@@ -11,16 +11,18 @@ the returned data using the bioc library.
 
 import json
 import logging
-import time
-import threading
 from io import StringIO
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterator, Optional, Union
 
 import requests
 import bioc
 from bioc import pubtator, biocjson
 from .exceptions import FormatNotSupportedException, PubTatorError
-from src.api.cache.cache import MemoryCache, DiskCache
+from src.api.clients.bioc_stream import STREAM_CHUNK_SIZE, iter_json_array_items
+from src.models.entities.annotations import CompactDocument, document_from_json
+from src.api.cache.cache import MemoryCache, DiskCache, SqliteCache, TieredCache
+from src.api.clients.rate_limit import TokenBucket, get_rate_limiter
+from src.api.clients.transport import get_session
 
 DEFAULT_BASE_URL = "https://www.ncbi.nlm.nih.gov/research/pubtator3-api"
 
@@ -44,7 +46,8 @@ class PubTatorClient:
     """
 
     # API rate limit is 20 requests per second according to NCBI
-    API_REQUEST_INTERVAL = 0.05  # 50 ms = 20 req/s
+    REQUESTS_PER_SECOND = 20
+    API_REQUEST_INTERVAL = 1.0 / REQUESTS_PER_SECOND  # 50 ms
 
     # Mapping between API parameters (lowercase) and data types (uppercase)
     # based on documentation:
@@ -74,7 +77,9 @@ class PubTatorClient:
             cache_ttl: int = 86400,  # 24 hours
             cache_storage_type: str = "disk",
             email: Optional[str] = None,
-            tool: str = "coordinates-lit"):
+            tool: str = "coordinates-lit",
+            session: Optional[requests.Session] = None,
+            rate_limiter: Optional[TokenBucket] = None):
         """
         Initialize the PubTator client.
         
@@ -83,25 +88,32 @@ class PubTatorClient:
             timeout: API response timeout in seconds
             use_cache: Whether to use caching for API requests
             cache_ttl: Cache entry lifetime in seconds (default 24 hours)
-            cache_storage_type: Cache storage type: "memory" or "disk"
+            cache_storage_type: Cache storage type: "memory", "disk", "sqlite" or "tiered"
             email: User's email address (optional, but recommended by NCBI)
             tool: Name of the tool using the API
+            session: HTTP session to send requests with (default: shared pooled session)
+            rate_limiter: Token bucket pacing the requests (default: bucket shared by
+                all PubTator clients in the process, synchronous and asynchronous)
         """
         self.base_url = base_url if base_url else DEFAULT_BASE_URL
         self.timeout = timeout
         self.email = email
         self.tool = tool
+        self.session = session if session is not None else get_session()
         self.logger = logging.getLogger(__name__)
 
-        # Variables for tracking last request time
-        self._last_request_time = 0
-        self._request_lock = threading.Lock()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(
+            "pubtator", self.REQUESTS_PER_SECOND)
 
         # Initialize cache
         self.use_cache = use_cache
         if use_cache:
             if cache_storage_type == "disk":
                 self.cache = DiskCache(ttl=cache_ttl)
+            elif cache_storage_type == "sqlite":
+                self.cache = SqliteCache(ttl=cache_ttl)
+            elif cache_storage_type == "tiered":
+                self.cache = TieredCache(ttl=cache_ttl)
             else:
                 self.cache = MemoryCache(ttl=cache_ttl, max_size=1000)
             self.logger.info(f"Cache enabled ({cache_storage_type}), TTL: {cache_ttl}s")
@@ -112,27 +124,18 @@ class PubTatorClient:
     def _wait_for_rate_limit(self):
         """
         Waits if necessary to meet API rate limit requirements.
-        Ensures at least self.API_REQUEST_INTERVAL seconds between requests.
+        Takes a slot from the token bucket shared with the other PubTator clients, so
+        the 20 req/s budget holds for the whole process.
         """
-        with self._request_lock:
-            current_time = time.time()
-            time_since_last_request = current_time - self._last_request_time
-            
-            # If less time has passed since last request than required interval
-            if time_since_last_request < self.API_REQUEST_INTERVAL:
-                sleep_time = self.API_REQUEST_INTERVAL - time_since_last_request
-                self.logger.debug(f"Waiting {sleep_time:.2f}s to meet API limit (max 20 req/s)")
-                time.sleep(sleep_time)
-            
-            # Update last request time
-            self._last_request_time = time.time()
+        self.rate_limiter.acquire()
 
     def _make_request(
             self,
             endpoint: str,
             method: str = "GET",
             params: Optional[Dict] = None,
-            use_cache: Optional[bool] = None) -> requests.Response:
+            use_cache: Optional[bool] = None,
+            stream: bool = False) -> requests.Response:
         """
         Makes a request to the PubTator API.
         
@@ -141,6 +144,8 @@ class PubTatorClient:
             method: HTTP method (GET or POST)
             params: Request parameters
             use_cache: Whether to use cache (if None, uses constructor setting)
+            stream: Whether to return before the body is downloaded, so that it can be
+                read with response.iter_content(). Streamed responses are not cached
             
         Returns:
             HTTP response object
@@ -148,9 +153,6 @@ class PubTatorClient:
         Raises:
             PubTatorError: When an error occurs during the request
         """
-        # Wait for rate limit
-        self._wait_for_rate_limit()
-        
         # Determine whether to use cache
         should_use_cache = self.use_cache if use_cache is None else use_cache
         
@@ -167,28 +169,33 @@ class PubTatorClient:
             request_params["email"] = self.email
             request_params["tool"] = self.tool
         
-        try:
-            # Check cache
-            if should_use_cache and method == "GET" and self.cache:
-                cache_key = f"{method}:{url}:{json.dumps(request_params, sort_keys=True)}"
+        # Check cache before taking a rate limit slot, so cache hits never wait
+        cache_key = None
+        if should_use_cache and method == "GET" and self.cache and not stream:
+            cache_key = f"{method}:{url}:{json.dumps(request_params, sort_keys=True)}"
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                # Create response object from cached data
+                response = requests.Response()
+                response.status_code = cached_response["status_code"]
+                response._content = cached_response["content"].encode("utf-8") if isinstance(cached_response["content"], str) else cached_response["content"]
+                response.headers = cached_response["headers"]
+                response.url = url
                 
-                if self.cache.has(cache_key):
-                    cached_response = self.cache.get(cache_key)
-                    # Create response object from cached data
-                    response = requests.Response()
-                    response.status_code = cached_response["status_code"]
-                    response._content = cached_response["content"].encode("utf-8") if isinstance(cached_response["content"], str) else cached_response["content"]
-                    response.headers = cached_response["headers"]
-                    response.url = url
-                    
-                    self.logger.debug(f"Retrieved from cache: {url}")
-                    return response
-            
+                self.logger.debug(f"Retrieved from cache: {url}")
+                return response
+        
+        # Wait for rate limit only when the request actually goes out
+        self._wait_for_rate_limit()
+        
+        try:
             # Make API request
-            if method == "GET":
-                response = requests.get(url, params=request_params, timeout=self.timeout)
+            if method == "GET" and stream:
+                response = self.session.get(url, params=request_params, timeout=self.timeout, stream=True)
+            elif method == "GET":
+                response = self.session.get(url, params=request_params, timeout=self.timeout)
             elif method == "POST":
-                response = requests.post(url, json=request_params, timeout=self.timeout)
+                response = self.session.post(url, json=request_params, timeout=self.timeout)
             else:
                 raise PubTatorError(f"Unsupported HTTP method: {method}")
                 
@@ -200,9 +207,7 @@ class PubTatorClient:
                 raise PubTatorError(f"PubTator API error: {response.status_code} - {response.text}")
                 
             # Save response to cache
-            if should_use_cache and method == "GET" and self.cache and not is_mock:
-                cache_key = f"{method}:{url}:{json.dumps(request_params, sort_keys=True)}"
-                
+            if cache_key and not is_mock:
                 # Prepare cache data
                 cache_data = {
                     "status_code": response.status_code,
@@ -244,8 +249,7 @@ class PubTatorClient:
         if format_type == "biocjson":
             try:
                 data = response.json()
-                collection = biocjson.load(StringIO(json.dumps(data)))
-                return collection.documents
+                return [biocjson.fromJSON(doc_data, "BioCDocument") for doc_data in data["documents"]]
             except (json.JSONDecodeError, KeyError) as e:
                 self.logger.error(f"Error processing response: {str(e)}")
                 raise PubTatorError(f"Error processing response: {str(e)}")
@@ -256,21 +260,19 @@ class PubTatorClient:
                 return docs
             except Exception as e:
                 self.logger.error(
-                    f"Error processing PubTator response: {
-                        str(e)}")
+                    f"Error processing PubTator response: {str(e)}")
                 raise PubTatorError(
-                    f"Error processing PubTator response: {
-                        str(e)}")
+                    f"Error processing PubTator response: {str(e)}")
         else:
             self.logger.warning(
                 f"Format {format_type} is not fully supported at this time")
             raise FormatNotSupportedException(
                 f"Format {format_type} is not fully supported at this time")
 
-    # todo this method is totally too long. please refactor it and split it into smaller methods that will be easier to test. then write tests for them in appropriate test file.
     def get_publications_by_pmids(self, pmids: List[str],
                                   concepts: Optional[List[str]] = None,
-                                  format_type: str = "biocjson") -> List[Any]:
+                                  format_type: str = "biocjson",
+                                  compact: bool = False) -> List[Any]:
         """
         Retrieve publications by PubMed IDs (PMIDs).
 
@@ -279,9 +281,12 @@ class PubTatorClient:
             concepts: List of concept types to include (e.g., "gene", "disease", "mutation")
                      If not provided, returns all available annotation types
             format_type: Format of returned data (currently only 'biocjson' is fully supported)
+            compact: Return CompactDocument objects (see src.models.entities.annotations)
+                     built directly from the response instead of BioCDocument objects
 
         Returns:
-            List of BioCDocument objects containing publication texts with annotations
+            List of BioCDocument (or CompactDocument) objects containing publication
+            texts with annotations
 
         Raises:
             PubTatorError: If the publications cannot be found or an error occurs
@@ -295,33 +300,99 @@ class PubTatorClient:
 
         # Validate PMIDs
         self._validate_pmids(pmids)
-        
-        # Prepare request parameters
-        params = self._prepare_publications_params(pmids, concepts)
-        
-        # Check cache
-        cache_key = self._get_publications_cache_key(pmids, concepts)
-        if self.use_cache and self.cache and self.cache.has(cache_key):
-            self.logger.debug(f"Cache hit dla get_publications_by_pmids: {cache_key}")
-            return self.cache.get(cache_key)
-            
-        try:
-            # Make the API request
-            response = self._make_request("publications/export/biocjson", params=params)
-            
-            # Process the response
-            documents = self._process_publications_response(response)
-            
-            # Cache the results
-            if self.use_cache and self.cache:
-                self.cache.set(cache_key, documents)
-                
-            return documents
-            
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error retrieving publications: {str(e)}")
-            raise PubTatorError(f"Error retrieving publications: {str(e)}")
-    
+
+        # Split the request into cached documents and PMIDs that must be fetched
+        cached_documents = self._get_cached_documents(pmids, concepts, compact)
+        missing_pmids = [
+            pmid for pmid in dict.fromkeys(pmids) if pmid not in cached_documents
+        ]
+
+        fetched_documents: List[bioc.BioCDocument] = []
+        if missing_pmids:
+            self.logger.debug(
+                f"PubTator document cache: {len(cached_documents)} hits, "
+                f"{len(missing_pmids)} misses")
+            try:
+                # Make the API request for the missing PMIDs only. The raw response is
+                # not cached, documents are cached individually below.
+                params = self._prepare_publications_params(missing_pmids, concepts)
+                response = self._make_request(
+                    "publications/export/biocjson", params=params, use_cache=False)
+
+                # Process the response
+                fetched_documents = self._process_publications_response(response, compact)
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Error retrieving publications: {str(e)}")
+                raise PubTatorError(f"Error retrieving publications: {str(e)}")
+
+            # Cache the results per document
+            self._cache_documents(missing_pmids, fetched_documents, concepts, compact)
+
+        return self._merge_documents(pmids, cached_documents, fetched_documents)
+
+    def iter_publications_by_pmids(self, pmids: List[str],
+                                   concepts: Optional[List[str]] = None,
+                                   batch_size: int = 100,
+                                   compact: bool = False) -> Iterator[Union[bioc.BioCDocument, CompactDocument]]:
+        """
+        Retrieve publications by PubMed IDs one document at a time.
+
+        Unlike get_publications_by_pmids, the response is parsed while it is being
+        downloaded and every document is yielded (and cached) as soon as it has been
+        received, so memory use does not grow with the number of PMIDs.
+
+        Documents of each batch are yielded in this order: cached documents in the
+        order of the PMIDs, then fetched documents in the order of the API response.
+
+        Args:
+            pmids: List of PubMed identifiers
+            concepts: List of concept types to include (e.g., "gene", "disease", "mutation")
+            batch_size: Maximum number of PMIDs sent in one API request
+            compact: Yield CompactDocument objects instead of BioCDocument objects
+
+        Yields:
+            BioCDocument (or CompactDocument) objects; PMIDs without a document in
+            PubTator are skipped
+
+        Raises:
+            PubTatorError: If a request fails or a response cannot be parsed
+            ValueError: If the PMIDs list is empty or contains non-digit IDs
+        """
+        self._validate_pmids(pmids)
+        unique_pmids = list(dict.fromkeys(pmids))
+
+        for start in range(0, len(unique_pmids), batch_size):
+            batch = unique_pmids[start:start + batch_size]
+            cached_documents = self._get_cached_documents(batch, concepts, compact)
+            for pmid in batch:
+                if cached_documents.get(pmid) is not None:
+                    yield cached_documents[pmid]
+
+            missing_pmids = [pmid for pmid in batch if pmid not in cached_documents]
+            if not missing_pmids:
+                continue
+
+            try:
+                params = self._prepare_publications_params(missing_pmids, concepts)
+                response = self._make_request(
+                    "publications/export/biocjson", params=params, use_cache=False, stream=True)
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Error retrieving publications: {str(e)}")
+                raise PubTatorError(f"Error retrieving publications: {str(e)}")
+
+            found_pmids = set()
+            with response:
+                for document in self._iter_publications_response(response, compact):
+                    found_pmids.add(document.id)
+                    self._cache_documents([document.id], [document], concepts, compact)
+                    yield document
+
+            # Remember PMIDs without a document, as get_publications_by_pmids does,
+            # unless a document with an unexpected ID may have answered them
+            if found_pmids <= set(missing_pmids):
+                self._cache_documents(
+                    [pmid for pmid in missing_pmids if pmid not in found_pmids], [], concepts, compact)
+
     def _validate_pmids(self, pmids: List[str]) -> None:
         """
         Validate list of PMIDs.
@@ -358,28 +429,135 @@ class PubTatorClient:
             
         return params
     
-    def _get_publications_cache_key(self, pmids: List[str], concepts: Optional[List[str]] = None) -> str:
+    def _get_document_cache_key(self, pmid: str, concepts: Optional[List[str]] = None,
+                                compact: bool = False) -> str:
         """
-        Generate cache key for publications request.
-        
+        Generate cache key for a single document.
+
+        The concept list is normalized (lowercased, deduplicated and sorted) so that
+        the same concept set always maps to the same key regardless of its order.
+        Compact documents lack most annotation infons, so they are cached under
+        separate keys and never returned for BioC requests.
+
         Args:
-            pmids: List of PubMed identifiers
+            pmid: PubMed identifier
             concepts: List of concept types to include
-            
+            compact: Whether the key is for a CompactDocument
+
         Returns:
             Cache key string
         """
-        return f"pubtator:publications:{','.join(pmids)}:{','.join(concepts) if concepts else 'all'}"
-    
-    def _process_publications_response(self, response: requests.Response) -> List[bioc.BioCDocument]:
+        concept_key = ",".join(sorted({c.lower() for c in concepts})) if concepts else "all"
+        key = f"pubtator:document:{pmid}:{concept_key}"
+        return f"{key}:compact" if compact else key
+
+    def _get_cached_documents(self, pmids: List[str],
+                              concepts: Optional[List[str]] = None,
+                              compact: bool = False) -> Dict[str, Optional[bioc.BioCDocument]]:
+        """
+        Look up documents for the given PMIDs in the cache.
+
+        Args:
+            pmids: List of PubMed identifiers
+            concepts: List of concept types to include
+            compact: Return CompactDocument objects instead of BioCDocument objects
+
+        Returns:
+            Dictionary mapping each cached PMID to its BioCDocument, or to None when
+            the API is known not to return a document for that PMID
+        """
+        if not self.use_cache or not self.cache:
+            return {}
+
+        cached_documents = {}
+        for pmid in pmids:
+            entry = self.cache.get(self._get_document_cache_key(pmid, concepts, compact))
+            if entry is None:
+                continue
+            document = entry.get("document")
+            if document is None:
+                cached_documents[pmid] = None
+            elif compact:
+                cached_documents[pmid] = document_from_json(document)
+            else:
+                cached_documents[pmid] = biocjson.fromJSON(document, "BioCDocument")
+        return cached_documents
+
+    def _cache_documents(self, pmids: List[str], documents: List[bioc.BioCDocument],
+                         concepts: Optional[List[str]] = None, compact: bool = False) -> None:
+        """
+        Store fetched documents in the cache, one entry per PMID.
+
+        Documents are stored as BioC JSON dictionaries so that they can be kept by
+        both memory and disk caches. PMIDs for which the API returned no document are
+        cached as well, so they are not requested again until the entry expires,
+        unless the API returned a document with an ID that was not requested: such a
+        document may answer any of the requested PMIDs, so no PMID is marked missing.
+
+        Args:
+            pmids: PubMed identifiers that were requested from the API
+            documents: Documents returned by the API
+            concepts: List of concept types that were requested
+            compact: Whether the documents are CompactDocument objects
+        """
+        if not self.use_cache or not self.cache:
+            return
+
+        documents_by_pmid = {doc.id: doc for doc in documents}
+        remember_missing = set(documents_by_pmid) <= set(pmids)
+        for pmid in pmids:
+            document = documents_by_pmid.get(pmid)
+            if document is None:
+                if not remember_missing:
+                    continue
+                document_json = None
+            elif isinstance(document, CompactDocument):
+                document_json = document.to_json()
+            else:
+                document_json = biocjson.toJSON(document)
+            self.cache.set(self._get_document_cache_key(pmid, concepts, compact), {"document": document_json})
+
+    def _merge_documents(self, pmids: List[str],
+                         cached_documents: Dict[str, Optional[bioc.BioCDocument]],
+                         fetched_documents: List[bioc.BioCDocument]) -> List[bioc.BioCDocument]:
+        """
+        Combine cached and freshly fetched documents in the order of requested PMIDs.
+
+        Args:
+            pmids: Requested PubMed identifiers
+            cached_documents: Documents retrieved from the cache
+            fetched_documents: Documents retrieved from the API
+
+        Returns:
+            List of BioCDocument objects
+        """
+        documents_by_pmid = dict(cached_documents)
+        unmatched = []
+        for doc in fetched_documents:
+            if doc.id in documents_by_pmid and documents_by_pmid[doc.id] is not None:
+                continue
+            if doc.id in pmids:
+                documents_by_pmid[doc.id] = doc
+            else:
+                unmatched.append(doc)
+
+        documents = [
+            documents_by_pmid[pmid] for pmid in dict.fromkeys(pmids)
+            if documents_by_pmid.get(pmid) is not None
+        ]
+        return documents + unmatched
+
+    def _process_publications_response(self, response: requests.Response,
+                                       compact: bool = False) -> List[bioc.BioCDocument]:
         """
         Process response from publications request.
         
         Args:
             response: Response from PubTator API
+            compact: Return CompactDocument objects instead of BioCDocument objects
             
         Returns:
-            List of BioCDocument objects
+            List of BioCDocument (or CompactDocument) objects
             
         Raises:
             PubTatorError: If there is an error processing the response
@@ -396,7 +574,7 @@ class PubTatorClient:
             if "PubTator3" in data:
                 documents = []
                 for doc_data in data["PubTator3"]:
-                    document = self._parse_pubtator3_document(doc_data)
+                    document = self._parse_document(doc_data, compact)
                     documents.append(document)
                 return documents
             else:
@@ -406,6 +584,53 @@ class PubTatorClient:
             self.logger.error(f"Error processing PubTator response: {str(e)}")
             raise PubTatorError(f"Error processing PubTator response: {str(e)}")
     
+    def _iter_publications_response(self, response: requests.Response,
+                                    compact: bool = False) -> Iterator[bioc.BioCDocument]:
+        """
+        Parse a streamed response from publications request one document at a time.
+
+        Args:
+            response: Response from PubTator API, requested with stream=True
+            compact: Yield CompactDocument objects instead of BioCDocument objects
+
+        Yields:
+            BioCDocument (or CompactDocument) objects, in the order of the response
+
+        Raises:
+            PubTatorError: If the request failed or the response cannot be parsed
+        """
+        if response.status_code == 404:
+            raise PubTatorError(f"Resource not found: {response.url}")
+
+        if not response.ok:
+            raise PubTatorError(f"API request failed: {response.text}")
+
+        try:
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            for doc_data in iter_json_array_items(chunks, array_keys=("PubTator3",)):
+                yield self._parse_document(doc_data, compact)
+        except KeyError:
+            self.logger.warning("Unexpected response format from PubTator API")
+            raise PubTatorError("Unexpected response format from PubTator API")
+        except (json.JSONDecodeError, requests.exceptions.RequestException) as e:
+            self.logger.error(f"Error processing PubTator response: {str(e)}")
+            raise PubTatorError(f"Error processing PubTator response: {str(e)}")
+
+    def _parse_document(self, doc_data: Dict, compact: bool = False) -> Union[bioc.BioCDocument, CompactDocument]:
+        """
+        Parse PubTator3 document data into a BioCDocument or a CompactDocument.
+
+        Args:
+            doc_data: Document data from PubTator3 response
+            compact: Build a CompactDocument without creating BioC objects
+
+        Returns:
+            BioCDocument or CompactDocument object
+        """
+        if compact:
+            return document_from_json(doc_data)
+        return self._parse_pubtator3_document(doc_data)
+
     def _parse_pubtator3_document(self, doc_data: Dict) -> bioc.BioCDocument:
         """
         Parse PubTator3 document data into BioCDocument.
@@ -738,7 +963,7 @@ class PubTatorClient:
             PubTatorError: If the API request fails
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/relations",
                 params={
                     "e1": entity1,
@@ -787,7 +1012,7 @@ class PubTatorClient:
 
         headers = {"Accept": "application/json"}
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/publications/export/biocjson",
                 params={"pmids": pmids},
                 headers=headers,
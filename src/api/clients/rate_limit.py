@@ -0,0 +1,106 @@
+"""
+Token-bucket rate limiting for the API clients.
+
+A TokenBucket hands out request slots at a fixed rate. Callers reserve a slot while
+holding the internal lock and then wait for it outside the lock, so concurrent callers
+are paced without serialising their requests: several requests can be in flight while
+the start times stay within the configured budget.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from both synchronous and asyncio code.
+
+    Example usage:
+        limiter = TokenBucket(rate=20)   # 20 requests per second
+        limiter.acquire()                # blocks the thread until a slot is free
+        await limiter.acquire_async()    # suspends the coroutine instead
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Number of tokens added per second (requests per second)
+            capacity: Maximum number of tokens that can accumulate. The default of 1
+                spaces requests evenly at 1/rate seconds; larger values allow bursts
+
+        Raises:
+            ValueError: If rate or capacity is not positive
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take one token, going into debt if the bucket is empty.
+
+        Returns:
+            Number of seconds the caller has to wait before using the token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Block the current thread until a token is available.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self) -> None:
+        """
+        Suspend the current coroutine until a token is available.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """
+    Return the token bucket registered under the given name, creating it if needed.
+
+    Clients talking to the same service should share one bucket so that the service's
+    request budget is respected across all client instances in the process.
+
+    Args:
+        name: Name of the limited service (e.g. "pubtator")
+        rate: Requests per second, used when the bucket is created
+        capacity: Bucket capacity, used when the bucket is created
+
+    Returns:
+        Shared token bucket
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = TokenBucket(rate=rate, capacity=capacity)
+            _limiters[name] = limiter
+        return limiter
@@ -0,0 +1,125 @@
+"""
+Shared HTTP transport for the NCBI API clients.
+
+Every client (PubTator, ClinVar, LitVar, PubMed, FOX gene finder) sends its requests
+through a pooled requests.Session instead of module-level requests.get calls, so that
+TCP/TLS connections are kept alive and reused between calls. A single process-wide
+session is created lazily; clients accept an explicit session to override it.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of per-host connection pools kept by an adapter
+DEFAULT_POOL_CONNECTIONS = 10
+
+# Maximum number of connections kept alive in a single host pool
+DEFAULT_POOL_MAXSIZE = 10
+
+# Pool sizes for hosts that receive most of the traffic
+DEFAULT_HOST_POOL_SIZES = {
+    "https://eutils.ncbi.nlm.nih.gov/": 10,
+    "https://www.ncbi.nlm.nih.gov/": 20,
+}
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+logger = logging.getLogger(__name__)
+
+_shared_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        host_pool_sizes: Optional[Dict[str, int]] = None,
+        max_retries: int = 0,
+        headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a requests.Session with keep-alive connection pooling.
+
+    Args:
+        pool_connections: Number of host pools cached by the default adapter
+        pool_maxsize: Maximum number of connections kept per host
+        host_pool_sizes: Pool sizes for specific URL prefixes, e.g.
+            {"https://eutils.ncbi.nlm.nih.gov/": 10}. Defaults to DEFAULT_HOST_POOL_SIZES
+        max_retries: Number of connection-level retries performed by urllib3
+        headers: Default headers sent with every request (gzip negotiation and
+            keep-alive by default)
+
+    Returns:
+        Configured session object
+    """
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+
+    default_adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    if host_pool_sizes is None:
+        host_pool_sizes = DEFAULT_HOST_POOL_SIZES
+    for prefix, maxsize in host_pool_sizes.items():
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=maxsize,
+            max_retries=max_retries))
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide shared session, creating it on first use.
+
+    Returns:
+        Shared session object
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+            logger.debug("Created shared HTTP session")
+        return _shared_session
+
+
+def configure_session(**kwargs) -> requests.Session:
+    """
+    Replace the shared session with a newly configured one.
+
+    Clients created afterwards use the new session; clients that already hold a
+    reference keep using the previous one.
+
+    Args:
+        **kwargs: Arguments passed to create_session()
+
+    Returns:
+        The new shared session
+    """
+    global _shared_session
+    session = create_session(**kwargs)
+    with _session_lock:
+        _shared_session = session
+    return session
+
+
+def close_session() -> None:
+    """
+    Close the shared session and release its pooled connections.
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
@@ -8,15 +8,21 @@ such as genes, diseases, and tissues.
 """
 
 import argparse
+import csv
+import json
 import logging
 import os
 import sys
 import time
-from typing import List, Optional
+from typing import List, Optional, Set
 
+from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+from src.analysis.context.passage_prefilter import PassagePrefilter
+from src.utils.llm.near_duplicate_cache import NearDuplicateCache
 from src.analysis.llm.context_analyzer import UnifiedLlmContextAnalyzer
 from src.models.data.clients.pubtator import PubTatorClient
 from src.utils.config.config import Config
+from src.utils.llm.metrics import get_llm_metrics
 
 
 def configure_logging(log_level: str = "INFO") -> None:
@@ -69,6 +75,183 @@ def load_pmids_from_file(file_path: str) -> List[str]:
         raise
 
 
+class CheckpointManifest:
+    """
+    Append-only record of PMIDs whose results have been written to the output files.
+    
+    Each finished PMID is appended as one line and flushed to disk, so after a crash
+    the manifest lists exactly the publications that do not need to be analyzed again.
+    
+    Example usage:
+        manifest = CheckpointManifest("results.csv.checkpoint")
+        if not manifest.is_done(pmid):
+            ...
+            manifest.mark_done(pmid)
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initializes the manifest, loading PMIDs completed in earlier runs.
+        
+        Args:
+            path: Path to the manifest file
+        """
+        self.path = path
+        self.completed: Set[str] = set()
+        
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+    
+    def is_done(self, pmid: str) -> bool:
+        """
+        Checks whether a PMID has been completed.
+        
+        Args:
+            pmid: PubMed ID
+            
+        Returns:
+            True if the results of the PMID have been written
+        """
+        return pmid in self.completed
+    
+    def mark_done(self, pmid: str) -> None:
+        """
+        Records a PMID as completed.
+        
+        Args:
+            pmid: PubMed ID
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(pmid + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.completed.add(pmid)
+    
+    def reset(self) -> None:
+        """Removes all completed PMIDs, starting a new run."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.completed = set()
+
+
+def drop_unfinished_rows(output_file: str, completed: Set[str]) -> None:
+    """
+    Removes rows of PMIDs missing from the manifest from a CSV or JSONL output file.
+    
+    A crash between writing the rows of a publication and recording it in the manifest
+    leaves rows of a publication that will be analyzed again; they are removed before
+    resuming so the output has no duplicates.
+    
+    Args:
+        output_file: Path to a CSV file, or a JSONL file if it ends with .jsonl
+        completed: PMIDs recorded in the manifest
+    """
+    if not os.path.exists(output_file):
+        return
+    
+    temp_file = output_file + ".tmp"
+    if output_file.endswith(".jsonl"):
+        with open(output_file, "r", encoding="utf-8") as f_in, \
+                open(temp_file, "w", encoding="utf-8") as f_out:
+            for line in f_in:
+                try:
+                    if str(json.loads(line).get("pmid")) in completed:
+                        f_out.write(line)
+                except ValueError:
+                    # Partially written last line
+                    continue
+    else:
+        with open(output_file, "r", newline="", encoding="utf-8") as f_in, \
+                open(temp_file, "w", newline="", encoding="utf-8") as f_out:
+            reader = csv.DictReader(f_in)
+            if reader.fieldnames:
+                writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames)
+                writer.writeheader()
+                writer.writerows(row for row in reader if row.get("pmid") in completed)
+    
+    os.replace(temp_file, output_file)
+
+
+def stream_pmids(
+    analyzer: UnifiedLlmContextAnalyzer,
+    pmids: List[str],
+    output_csv: str,
+    output_jsonl: Optional[str] = None,
+    chunk_size: int = 50,
+    resume: bool = False,
+    max_concurrency: int = 1,
+    retry_on_failure: bool = True,
+    max_retries: int = 3,
+    retry_delay: int = 5
+) -> int:
+    """
+    Analyzes publications in chunks, appending results as each publication finishes.
+    
+    Finished PMIDs are recorded in a checkpoint manifest next to the CSV file
+    (<output_csv>.checkpoint). Retries and resumed runs only process PMIDs that are
+    not in the manifest. A publication with a failed LLM request is not recorded, so
+    the failure is retried like any other error.
+    
+    Args:
+        analyzer: LLM context analyzer
+        pmids: List of PubMed IDs to analyze
+        output_csv: Path to the output CSV file
+        output_jsonl: Optional path to an output JSON Lines file
+        chunk_size: Number of publications fetched and analyzed at once
+        resume: Whether to continue a previous run instead of starting over
+        max_concurrency: Maximum number of LLM requests sent in parallel
+        retry_on_failure: Whether to retry in case of failure
+        max_retries: Maximum number of retry attempts
+        retry_delay: Delay between retry attempts in seconds
+        
+    Returns:
+        Number of relationships written in this run
+    """
+    logger = logging.getLogger(__name__)
+    manifest = CheckpointManifest(output_csv + ".checkpoint")
+    output_files = [path for path in (output_csv, output_jsonl) if path]
+    
+    if resume:
+        for path in output_files:
+            drop_unfinished_rows(path, manifest.completed)
+        logger.info(f"Resuming: {len(manifest.completed)} PMIDs already completed")
+    else:
+        manifest.reset()
+        for path in output_files:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    written = 0
+    retries = 0
+    while True:
+        pending = [pmid for pmid in pmids if not manifest.is_done(pmid)]
+        logger.info(f"Analyzing {len(pending)} remaining publications")
+        
+        try:
+            for pmid, relationships in analyzer.iter_publication_relationships(
+                    pending, chunk_size=chunk_size, max_concurrency=max_concurrency):
+                analyzer.append_relationships_to_csv(relationships, output_csv)
+                if output_jsonl:
+                    analyzer.append_relationships_to_jsonl(relationships, output_jsonl)
+                manifest.mark_done(pmid)
+                written += len(relationships)
+            
+            return written
+            
+        except Exception as e:
+            logger.error(f"Error during analysis: {str(e)}")
+            
+            if not retry_on_failure or retries >= max_retries:
+                logger.error(f"Failed after {retries} retries, rerun with --resume to continue")
+                raise
+            
+            retries += 1
+            logger.info(f"Retrying ({retries}/{max_retries}) in {retry_delay} seconds...")
+            time.sleep(retry_delay)
+
+
 def analyze_pmids(
     pmids: List[str],
     output_csv: str,
@@ -79,7 +262,17 @@ def analyze_pmids(
     retry_on_failure: bool = True,
     max_retries: int = 3,
     retry_delay: int = 5,
-    cache_storage_type: str = "memory"
+    cache_storage_type: str = "memory",
+    max_concurrency: int = 1,
+    pack_variants: bool = False,
+    use_batch: bool = False,
+    batch_dir: str = os.path.join("data", "batch"),
+    stream: bool = False,
+    chunk_size: int = 50,
+    resume: bool = False,
+    prefilter_threshold: Optional[float] = None,
+    context_sentences: Optional[int] = None,
+    near_duplicate_threshold: Optional[float] = None
 ) -> None:
     """
     Analyzes PubMed publications to extract variant relationships.
@@ -94,12 +287,43 @@ def analyze_pmids(
         retry_on_failure: Whether to retry in case of failure
         max_retries: Maximum number of retry attempts
         retry_delay: Delay between retry attempts in seconds
-        cache_storage_type: Type of cache storage (memory or disk)
+        cache_storage_type: Type of cache storage (memory, disk, sqlite or tiered)
+        max_concurrency: Maximum number of LLM requests sent in parallel
+        pack_variants: Whether to analyze all variants of a passage in one LLM request
+        use_batch: Whether to send the LLM requests through the provider's batch API
+        batch_dir: Directory for the batch input and output files
+        stream: Whether to write results as each publication finishes, with a checkpoint.
+            In this mode output_json is written in the JSON Lines format
+        chunk_size: Number of publications processed at once in streaming mode
+        resume: Whether to skip publications completed by a previous streaming run
+        prefilter_threshold: Minimum pre-score of a variant-entity pair sent to the LLM,
+            None to send all pairs
+        context_sentences: Number of neighbouring sentences kept around the mentions in
+            the prompt, None to send whole passages
+        near_duplicate_threshold: Minimum similarity of a passage to an already analyzed
+            one for its LLM result to be reused, None to disable near-duplicate reuse
+    
+    Raises:
+        ValueError: If batch mode is combined with streaming or resuming
     """
     logger = logging.getLogger(__name__)
     
+    if use_batch and (stream or resume):
+        raise ValueError("Batch mode cannot be combined with streaming or resuming")
+    
     # Create PubTator client
-    pubtator_client = PubTatorClient(email=email)
+    pubtator_client = PubTatorClient(email=email, compact=True)
+    
+    prefilter = None
+    if prefilter_threshold is not None:
+        prefilter = PassagePrefilter(
+            threshold=prefilter_threshold,
+            cooccurrence_analyzer=CooccurrenceContextAnalyzer(pubtator_client)
+        )
+    
+    near_duplicate_cache = None
+    if near_duplicate_threshold is not None:
+        near_duplicate_cache = NearDuplicateCache(threshold=near_duplicate_threshold)
     
     # Create LLM context analyzer
     analyzer = UnifiedLlmContextAnalyzer(
@@ -107,20 +331,46 @@ def analyze_pmids(
         llm_model_name=llm_model,
         use_cache=True,
         cache_storage_type=cache_storage_type,
-        debug_mode=debug_mode
+        debug_mode=debug_mode,
+        pack_variants=pack_variants,
+        prefilter=prefilter,
+        context_sentences=context_sentences,
+        near_duplicate_cache=near_duplicate_cache
     )
     
     logger.info(f"Analyzing {len(pmids)} publications")
     
+    if stream:
+        written = stream_pmids(
+            analyzer, pmids, output_csv,
+            output_jsonl=output_json,
+            chunk_size=chunk_size,
+            resume=resume,
+            max_concurrency=max_concurrency,
+            retry_on_failure=retry_on_failure,
+            max_retries=max_retries,
+            retry_delay=retry_delay
+        )
+        logger.info(f"Saved {written} relationships to CSV: {output_csv}")
+        if prefilter:
+            logger.info(f"Passage prefilter: {prefilter.report()}")
+        if near_duplicate_cache:
+            logger.info(f"Near-duplicate cache: {near_duplicate_cache.report()}")
+        return
+    
     # Analyze publications with retry logic
     retries = 0
     while True:
         try:
             # Analyze publications
-            relationships = analyzer.analyze_publications(
-                pmids=pmids,
-                save_debug_info=debug_mode
-            )
+            if use_batch:
+                relationships = analyzer.analyze_publications_batch(pmids=pmids, batch_dir=batch_dir)
+            else:
+                relationships = analyzer.analyze_publications(
+                    pmids=pmids,
+                    save_debug_info=debug_mode,
+                    max_concurrency=max_concurrency
+                )
             
             # Save results to CSV
             analyzer.save_relationships_to_csv(relationships, output_csv)
@@ -146,6 +396,26 @@ def analyze_pmids(
             time.sleep(retry_delay)
 
 
+def report_llm_metrics(metrics_output: Optional[str] = None) -> None:
+    """
+    Logs a summary of the LLM calls made in this run and optionally saves the metrics.
+    
+    Args:
+        metrics_output: Optional path for the metrics, in the Prometheus text format
+            if it ends with .prom and as JSON otherwise
+    """
+    logger = logging.getLogger(__name__)
+    metrics = get_llm_metrics()
+    total = metrics.summary()["total"]
+    logger.info(f"LLM calls: {total['calls']}, cache hits: {total['cache_hits']}, "
+                f"tokens in/out: {total['input_tokens']}/{total['output_tokens']}, "
+                f"estimated cost: ${total['cost']:.4f}")
+    
+    if metrics_output:
+        metrics.save(metrics_output)
+        logger.info(f"Saved LLM metrics to {metrics_output}")
+
+
 def main() -> None:
     """Main function of the CLI tool."""
     # Load configuration
@@ -172,13 +442,43 @@ def main() -> None:
                         help="Maximum number of retry attempts (default: 3)")
     parser.add_argument("--retry-delay", type=int, default=5,
                         help="Delay between retry attempts in seconds (default: 5)")
-    parser.add_argument("--cache-type", choices=["memory", "disk"], default="memory",
+    parser.add_argument("--cache-type", choices=["memory", "disk", "sqlite", "tiered"], default="memory",
                         help="Type of cache storage (default: memory)")
+    parser.add_argument("--max-concurrency", type=int, default=1,
+                        help="Maximum number of LLM requests sent in parallel (default: 1)")
+    parser.add_argument("--pack-variants", action="store_true",
+                        help="Analyze all variants of a passage in a single LLM request")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send LLM requests through the provider's batch API (offline, cheaper)")
+    parser.add_argument("--batch-dir", default=os.path.join("data", "batch"),
+                        help="Directory for batch input and output files (default: data/batch)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write results as each publication finishes and keep a checkpoint "
+                             "(the JSON output is written as JSON Lines)")
+    parser.add_argument("--chunk-size", type=int, default=50,
+                        help="Number of publications processed at once in streaming mode (default: 50)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip publications completed by a previous streaming run (implies --stream)")
+    parser.add_argument("--prefilter-threshold", type=float,
+                        help="Skip variant-entity pairs whose cheap pre-score (distance, sentence, "
+                             "section, keywords) is below this value, e.g. 0.2 (default: off)")
+    parser.add_argument("--context-sentences", type=int,
+                        help="Send only the sentences mentioning the variant and entities plus this many "
+                             "neighbouring sentences on each side, instead of whole passages (default: off)")
+    parser.add_argument("--near-duplicate-threshold", type=float,
+                        help="Reuse the LLM result of an already analyzed passage with the same variant "
+                             "and entities when the passages are at least this similar (Jaccard, 0-1), "
+                             "e.g. 0.9; reused rows are marked in the near_duplicate_* columns (default: off)")
+    parser.add_argument("--metrics-output",
+                        help="Path for LLM token/cost metrics (.prom for Prometheus text format, otherwise JSON)")
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
                         default="INFO", help="Logging level (default: INFO)")
     
     args = parser.parse_args()
     
+    if args.batch and (args.stream or args.resume):
+        parser.error("--batch cannot be combined with --stream or --resume")
+    
     # Configure logging
     configure_logging(args.log_level)
     logger = logging.getLogger(__name__)
@@ -200,8 +500,8 @@ def main() -> None:
         logger.error("No PubMed IDs provided. Use --pmids or --file option.")
         sys.exit(1)
     
-    # Remove duplicates and ensure unique PMIDs
-    pmids = list(set(pmids))
+    # Remove duplicates and ensure unique PMIDs, keeping the input order
+    pmids = list(dict.fromkeys(pmids))
     logger.info(f"Processing {len(pmids)} unique PubMed IDs")
     
     try:
@@ -216,7 +516,17 @@ def main() -> None:
             retry_on_failure=not args.no_retry,
             max_retries=args.max_retries,
             retry_delay=args.retry_delay,
-            cache_storage_type=args.cache_type
+            cache_storage_type=args.cache_type,
+            max_concurrency=args.max_concurrency,
+            pack_variants=args.pack_variants,
+            use_batch=args.batch,
+            batch_dir=args.batch_dir,
+            stream=args.stream or args.resume,
+            chunk_size=args.chunk_size,
+            resume=args.resume,
+            prefilter_threshold=args.prefilter_threshold,
+            context_sentences=args.context_sentences,
+            near_duplicate_threshold=args.near_duplicate_threshold
         )
         
         logger.info("Analysis completed successfully")
@@ -224,6 +534,8 @@ def main() -> None:
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")
         sys.exit(1)
+    finally:
+        report_llm_metrics(args.metrics_output)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ import json
 import requests
 import bioc
 
+from src.api.clients.transport import get_session
+from src.models.entities.annotations import CompactDocument, document_from_json
 from src.models.data.clients.exceptions import PubTatorError
 from src.utils.config.config import Config
 
@@ -44,7 +46,9 @@ class PubTatorClient:
     def __init__(self, email: Optional[str] = None, 
                  max_retries: int = 3, 
                  retry_delay: int = 1,
-                 timeout: int = 30):
+                 timeout: int = 30,
+                 session: Optional[requests.Session] = None,
+                 compact: bool = False):
         """
         Initializes the PubTator client.
         
@@ -53,6 +57,10 @@ class PubTatorClient:
             max_retries: Maximum number of retry attempts (default: 3)
             retry_delay: Delay between retry attempts in seconds (default: 1)
             timeout: Timeout for API requests in seconds (default: 30)
+            session: HTTP session to send requests with (default: shared pooled session)
+            compact: Return CompactDocuments (see src.models.entities.annotations)
+                     instead of BioCDocuments; they use much less memory but keep
+                     only the type and identifier infons of annotations
         """
         self.logger = logging.getLogger(__name__)
         
@@ -67,6 +75,8 @@ class PubTatorClient:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.timeout = timeout
+        self.session = session if session is not None else get_session()
+        self.compact = compact
         
         self.logger.info(f"Initialized PubTator client (email: {email}, max_retries: {max_retries})")
     
@@ -166,7 +176,7 @@ class PubTatorClient:
         retries = 0
         while retries <= self.max_retries:
             try:
-                response = requests.get(
+                response = self.session.get(
                     url, 
                     params=params,
                     headers=headers,
@@ -190,7 +200,7 @@ class PubTatorClient:
                 # Wait before retrying
                 time.sleep(self.retry_delay)
     
-    def _parse_bioc_json(self, bioc_json: Dict[str, Any]) -> List[bioc.BioCDocument]:
+    def _parse_bioc_json(self, bioc_json: Dict[str, Any]) -> List[Union[bioc.BioCDocument, CompactDocument]]:
         """
         Parses BioC JSON format to BioCDocument objects.
         
@@ -198,9 +208,13 @@ class PubTatorClient:
             bioc_json: BioC JSON response from PubTator
             
         Returns:
-            List of BioCDocuments
+            List of BioCDocuments, or CompactDocuments if the client was created
+            with compact=True
         """
         try:
+            if self.compact:
+                return [document_from_json(doc_json) for doc_json in bioc_json.get("documents", [])]
+
             # Create BioC collection from JSON
             collection = bioc.BioCCollection()
             collection.encoding = bioc_json.get("encoding", "utf-8")
@@ -0,0 +1,315 @@
+"""
+Compact in-memory model of annotated publications.
+
+bioc.BioCAnnotation objects keep a full infons dictionary and a list of BioCLocation
+objects per annotation, and the analyzers used to copy them again into fresh dicts for
+every passage they looked at. On full-text corpora with thousands of annotations per
+document this dominates memory use and per-passage processing time.
+
+The classes below use __slots__ and keep only what the analyzers use:
+- CompactAnnotation: id, text, type, identifier and the locations as (offset, length)
+  tuples. The type and identifier strings are interned, so the many annotations of one
+  concept share a single string,
+- CompactPassage: offset, text, infons and the annotations, with an index of the
+  annotations by type built once per passage,
+- CompactDocument: id, infons and the passages.
+
+Annotation infons other than "type" and "identifier" are dropped; code that needs them
+should keep using BioC documents.
+
+Documents are built directly from PubTator/BioC JSON with document_from_json(), or
+converted from BioC objects with document_from_bioc(). as_compact_passage() lets the
+analyzers accept both representations.
+
+Example usage:
+    document = document_from_json(doc_data)
+    for passage in document.passages:
+        for annotation in passage.annotations_of_type("Gene", "Disease"):
+            print(annotation.text, annotation.identifier, annotation.offset)
+"""
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import bioc
+
+
+def _intern(value: Any) -> Optional[str]:
+    """Returns an interned string, or None for missing values."""
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+class CompactAnnotation:
+    """
+    Annotation of a single entity mention.
+
+    The attribute names match bioc.BioCAnnotation where they overlap (id, text), so
+    code reading only those works with both classes.
+    """
+
+    __slots__ = ("id", "text", "type", "identifier", "locations")
+
+    def __init__(self, id: str, text: str, type: Optional[str], identifier: Optional[str] = None,
+                 locations: Tuple[Tuple[int, int], ...] = ()):
+        """
+        Initializes the annotation.
+
+        Args:
+            id: Annotation identifier within the document
+            text: Annotated text
+            type: Entity type, e.g. "Gene" or "Mutation"
+            identifier: Normalized concept identifier, e.g. an NCBI Gene ID
+            locations: (offset, length) pairs of the mention in the document
+        """
+        self.id = id
+        self.text = text
+        self.type = _intern(type)
+        self.identifier = _intern(identifier)
+        self.locations = locations
+
+    @property
+    def offset(self) -> Optional[int]:
+        """Document offset of the first location, None if the annotation has no location."""
+        return self.locations[0][0] if self.locations else None
+
+    @property
+    def length(self) -> Optional[int]:
+        """Length of the first location, None if the annotation has no location."""
+        return self.locations[0][1] if self.locations else None
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactAnnotation):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"CompactAnnotation(id={self.id!r}, text={self.text!r}, type={self.type!r}, offset={self.offset})"
+
+
+class CompactPassage:
+    """
+    Passage of a document with its annotations.
+    """
+
+    __slots__ = ("offset", "text", "infons", "annotations", "_by_type")
+
+    def __init__(self, offset: int, text: str, infons: Optional[Dict[str, Any]] = None,
+                 annotations: Optional[List[CompactAnnotation]] = None):
+        """
+        Initializes the passage.
+
+        Args:
+            offset: Document offset of the passage
+            text: Passage text
+            infons: Passage infons, e.g. section_type and type
+            annotations: Annotations of the passage
+        """
+        self.offset = offset
+        self.text = text
+        self.infons = infons if infons is not None else {}
+        self.annotations = annotations if annotations is not None else []
+        self._by_type = None
+
+    def annotations_by_type(self) -> Dict[str, List[CompactAnnotation]]:
+        """
+        Groups the annotations by entity type.
+
+        The index is built on the first call and reused afterwards; annotations added
+        to the passage later are not included.
+
+        Returns:
+            Dictionary mapping entity types to annotations, in passage order.
+            Annotations without a type are left out
+        """
+        if self._by_type is None:
+            by_type = {}
+            for annotation in self.annotations:
+                if annotation.type:
+                    by_type.setdefault(annotation.type, []).append(annotation)
+            self._by_type = by_type
+        return self._by_type
+
+    def annotations_of_type(self, *types: str) -> List[CompactAnnotation]:
+        """
+        Returns the annotations of the given entity types.
+
+        Args:
+            types: Entity types
+
+        Returns:
+            Annotations grouped by type, in the order of the types
+        """
+        by_type = self.annotations_by_type()
+        return [annotation for entity_type in types for annotation in by_type.get(entity_type, [])]
+
+
+class CompactDocument:
+    """
+    Annotated publication.
+    """
+
+    __slots__ = ("id", "infons", "passages")
+
+    def __init__(self, id: str, infons: Optional[Dict[str, Any]] = None,
+                 passages: Optional[List[CompactPassage]] = None):
+        """
+        Initializes the document.
+
+        Args:
+            id: Document identifier (PMID)
+            infons: Document infons
+            passages: Passages of the document
+        """
+        self.id = id
+        self.infons = infons if infons is not None else {}
+        self.passages = passages if passages is not None else []
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Serializes the document to a BioC JSON dictionary.
+
+        Returns:
+            Dictionary readable by document_from_json() and bioc.biocjson.fromJSON()
+        """
+        return {
+            "id": self.id,
+            "infons": self.infons,
+            "relations": [],
+            "passages": [{
+                "offset": passage.offset,
+                "text": passage.text,
+                "infons": passage.infons,
+                "sentences": [],
+                "relations": [],
+                "annotations": [{
+                    "id": annotation.id,
+                    "text": annotation.text,
+                    "infons": _annotation_infons(annotation),
+                    "locations": [{"offset": offset, "length": length} for offset, length in annotation.locations]
+                } for annotation in passage.annotations]
+            } for passage in self.passages]
+        }
+
+
+def _annotation_infons(annotation: CompactAnnotation) -> Dict[str, str]:
+    """Returns the infons kept in a compact annotation."""
+    infons = {}
+    if annotation.type is not None:
+        infons["type"] = annotation.type
+    if annotation.identifier is not None:
+        infons["identifier"] = annotation.identifier
+    return infons
+
+
+def _annotation_from_json(annotation_data: Dict[str, Any]) -> CompactAnnotation:
+    """Builds an annotation from its BioC JSON dictionary."""
+    infons = annotation_data.get("infons") or {}
+    return CompactAnnotation(
+        id=annotation_data.get("id", ""),
+        text=annotation_data.get("text", ""),
+        type=infons.get("type"),
+        identifier=infons.get("identifier"),
+        locations=tuple(
+            (location.get("offset", 0), location.get("length", 0))
+            for location in annotation_data.get("locations", [])
+        )
+    )
+
+
+def document_from_json(doc_data: Dict[str, Any]) -> CompactDocument:
+    """
+    Builds a compact document from a PubTator3 or BioC JSON document dictionary.
+
+    Args:
+        doc_data: Document dictionary, e.g. an element of the "PubTator3" array of a
+            PubTator export or the output of bioc.biocjson.toJSON()
+
+    Returns:
+        CompactDocument
+    """
+    return CompactDocument(
+        id=doc_data.get("id", ""),
+        infons=doc_data.get("infons") or {},
+        passages=[
+            CompactPassage(
+                offset=passage_data.get("offset", 0),
+                text=passage_data.get("text", ""),
+                infons=passage_data.get("infons") or {},
+                annotations=[_annotation_from_json(a) for a in passage_data.get("annotations", [])]
+            )
+            for passage_data in doc_data.get("passages", [])
+        ]
+    )
+
+
+def annotation_from_bioc(annotation: bioc.BioCAnnotation) -> CompactAnnotation:
+    """
+    Converts a BioC annotation.
+
+    Args:
+        annotation: BioCAnnotation
+
+    Returns:
+        CompactAnnotation
+    """
+    return CompactAnnotation(
+        id=annotation.id,
+        text=annotation.text,
+        type=annotation.infons.get("type"),
+        identifier=annotation.infons.get("identifier"),
+        locations=tuple((location.offset, location.length) for location in annotation.locations)
+    )
+
+
+def as_compact_passage(passage: Union[bioc.BioCPassage, CompactPassage]) -> CompactPassage:
+    """
+    Returns a passage in the compact representation, converting BioC passages.
+
+    Args:
+        passage: BioCPassage or CompactPassage
+
+    Returns:
+        The passage itself if it is already compact, otherwise a converted copy
+    """
+    if isinstance(passage, CompactPassage):
+        return passage
+    return CompactPassage(
+        offset=passage.offset,
+        text=passage.text,
+        infons=passage.infons,
+        annotations=[annotation_from_bioc(annotation) for annotation in passage.annotations]
+    )
+
+
+def document_from_bioc(document: Union[bioc.BioCDocument, CompactDocument]) -> CompactDocument:
+    """
+    Converts a BioC document.
+
+    Args:
+        document: BioCDocument, or a CompactDocument that is returned unchanged
+
+    Returns:
+        CompactDocument
+    """
+    if isinstance(document, CompactDocument):
+        return document
+    return CompactDocument(
+        id=document.id,
+        infons=document.infons,
+        passages=[as_compact_passage(passage) for passage in document.passages]
+    )
+
+
+def documents_from_json(docs_data: Iterable[Dict[str, Any]]) -> List[CompactDocument]:
+    """
+    Builds compact documents from a sequence of JSON document dictionaries.
+
+    Args:
+        docs_data: Document dictionaries
+
+    Returns:
+        List of CompactDocuments
+    """
+    return [document_from_json(doc_data) for doc_data in docs_data]
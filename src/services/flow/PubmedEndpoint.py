@@ -1,16 +1,25 @@
 import logging
+from typing import Optional
 
 import requests
 from xml.etree import ElementTree
 import pandas as pd
 
+from src.api.clients.transport import get_session
+
 
 class PubmedEndpoint:
     PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
 
-    @staticmethod
-    def pubmed_search(query, retmax=10):
-        base_url = f"{PubmedEndpoint.PUBMED_BASE_URL}/esearch.fcgi"
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Args:
+            session: HTTP session to send requests with (default: shared pooled session)
+        """
+        self.session = session if session is not None else get_session()
+
+    def pubmed_search(self, query, retmax=10):
+        base_url = f"{self.PUBMED_BASE_URL}/esearch.fcgi"
         params = {
             "db": "pubmed",
             "term": query,
@@ -18,7 +27,7 @@ class PubmedEndpoint:
             "retmax": retmax
         }
 
-        response = requests.get(base_url, params=params)
+        response = self.session.get(base_url, params=params)
         response.raise_for_status()
 
         tree = ElementTree.fromstring(response.content)
@@ -26,9 +35,8 @@ class PubmedEndpoint:
 
         return ids
 
-    @staticmethod
-    def fetch_details(id_list):
-        base_url = f"{PubmedEndpoint.PUBMED_BASE_URL}/esearch.fcgi"
+    def fetch_details(self, id_list):
+        base_url = f"{self.PUBMED_BASE_URL}/esearch.fcgi"
         ids = ",".join(id_list)
         params = {
             "db": "pubmed",
@@ -37,7 +45,7 @@ class PubmedEndpoint:
             "rettype": "abstract"
         }
 
-        response = requests.get(base_url, params=params)
+        response = self.session.get(base_url, params=params)
         response.raise_for_status()
 
         return response.content
@@ -87,8 +95,7 @@ class PubmedEndpoint:
         df = pd.DataFrame(articles)
         return df
 
-    @staticmethod
-    def fetch_full_text(pmc_id):
+    def fetch_full_text(self, pmc_id):
         base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
         params = {
             "db": "pmc",
@@ -96,7 +103,7 @@ class PubmedEndpoint:
             "retmode": "xml"
         }
 
-        response = requests.get(base_url, params=params)
+        response = self.session.get(base_url, params=params)
         response.raise_for_status()
 
         return response.content
@@ -125,8 +132,7 @@ class PubmedEndpoint:
             return ''
         
 
-    @staticmethod
-    def fetch_full_text_from_pubmed_id(id):
+    def fetch_full_text_from_pubmed_id(self, id):
         logger = logging.getLogger(__name__)
         logger.info(f"Fetching full text for article with PubMed ID: {id}")
         # Convert PubMed ID to PMC ID using eLink
@@ -138,14 +144,14 @@ class PubmedEndpoint:
             "retmode": "xml"
         }
 
-        elink_response = requests.get(elink_base_url, params=elink_params)
+        elink_response = self.session.get(elink_base_url, params=elink_params)
         elink_response.raise_for_status()
 
         elink_tree = ElementTree.fromstring(elink_response.content)
         pmc_id_elem = elink_tree.find(".//LinkSetDb/Link/Id")
         if pmc_id_elem is not None:
             pmc_id = pmc_id_elem.text
-            full_text_xml = PubmedEndpoint.fetch_full_text(pmc_id)
+            full_text_xml = self.fetch_full_text(pmc_id)
             return full_text_xml.decode('utf-8')
         else:
             print("Full text not available in PMC for this article.")
@@ -153,13 +159,12 @@ class PubmedEndpoint:
 
             return None
 
-    @staticmethod
-    def fetch_articles_from_query(query):
-        ids = PubmedEndpoint.pubmed_search(query, retmax=10)
+    def fetch_articles_from_query(self, query):
+        ids = self.pubmed_search(query, retmax=10)
 
         if ids:
-            details = PubmedEndpoint.fetch_details(ids)
-            df = PubmedEndpoint.preprocess_details_to_dataframe(details)
+            details = self.fetch_details(ids)
+            df = self.preprocess_details_to_dataframe(details)
 
             return df, ids
         else:
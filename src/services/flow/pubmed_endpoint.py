@@ -3,10 +3,13 @@ Klasa PubmedEndpoint służy do komunikacji z API PubMed i pobierania
 pełnych tekstów publikacji na podstawie identyfikatorów.
 """
 
-import requests
 import logging
 from typing import Optional, Dict, List, Any
 
+import requests
+
+from src.api.clients.transport import get_session
+
 
 class PubmedEndpoint:
     """
@@ -15,8 +18,16 @@ class PubmedEndpoint:
     
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
     
-    @staticmethod
-    def fetch_full_text_from_pubmed_id(pubmed_id: str) -> str:
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Inicjalizuje klienta PubMed.
+        
+        Args:
+            session: Sesja HTTP używana do wysyłania zapytań (domyślnie: współdzielona sesja z pulą połączeń)
+        """
+        self.session = session if session is not None else get_session()
+    
+    def fetch_full_text_from_pubmed_id(self, pubmed_id: str) -> str:
         """
         Pobiera pełny tekst publikacji z PubMed na podstawie identyfikatora.
         
@@ -30,12 +41,12 @@ class PubmedEndpoint:
         
         try:
             # Próba pobrania artykułu z PubMed Central
-            text = PubmedEndpoint._fetch_from_pmc(pubmed_id)
+            text = self._fetch_from_pmc(pubmed_id)
             if text:
                 return text
             
             # Jeśli nie udało się pobrać z PMC, próba pobrania abstraktu z PubMed
-            text = PubmedEndpoint._fetch_abstract_from_pubmed(pubmed_id)
+            text = self._fetch_abstract_from_pubmed(pubmed_id)
             if text:
                 return text
             
@@ -46,8 +57,7 @@ class PubmedEndpoint:
             logging.error(f"Błąd podczas pobierania publikacji {pubmed_id}: {str(e)}")
             return ""
     
-    @staticmethod
-    def _fetch_from_pmc(pubmed_id: str) -> Optional[str]:
+    def _fetch_from_pmc(self, pubmed_id: str) -> Optional[str]:
         """
         Próbuje pobrać pełny tekst z PubMed Central.
         
@@ -58,12 +68,12 @@ class PubmedEndpoint:
             Pełny tekst publikacji lub None w przypadku niepowodzenia
         """
         # Najpierw znajdź identyfikator PMC
-        pmc_id = PubmedEndpoint._get_pmc_id(pubmed_id)
+        pmc_id = self._get_pmc_id(pubmed_id)
         if not pmc_id:
             return None
         
         # Pobierz pełny tekst z PMC
-        url = f"{PubmedEndpoint.BASE_URL}/efetch.fcgi"
+        url = f"{self.BASE_URL}/efetch.fcgi"
         params = {
             "db": "pmc",
             "id": pmc_id,
@@ -71,19 +81,18 @@ class PubmedEndpoint:
             "rettype": "full"
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
         if response.status_code == 200:
             # Przetwarzanie XML z tekstem
-            text = PubmedEndpoint._extract_text_from_pmc_xml(response.text)
+            text = self._extract_text_from_pmc_xml(response.text)
             if text:
                 logging.info(f"Pobrano pełny tekst z PMC dla publikacji {pubmed_id}")
                 return text
         
         return None
     
-    @staticmethod
-    def _get_pmc_id(pubmed_id: str) -> Optional[str]:
+    def _get_pmc_id(self, pubmed_id: str) -> Optional[str]:
         """
         Pobiera identyfikator PMC na podstawie identyfikatora PubMed.
         
@@ -93,7 +102,7 @@ class PubmedEndpoint:
         Returns:
             Identyfikator PMC lub None, jeśli nie znaleziono
         """
-        url = f"{PubmedEndpoint.BASE_URL}/elink.fcgi"
+        url = f"{self.BASE_URL}/elink.fcgi"
         params = {
             "dbfrom": "pubmed",
             "db": "pmc",
@@ -101,7 +110,7 @@ class PubmedEndpoint:
             "retmode": "json"
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
         if response.status_code == 200 and response.text:
             # Obsługa odpowiedzi XML lub JSON w zależności od formatu
@@ -126,8 +135,7 @@ class PubmedEndpoint:
         
         return None
     
-    @staticmethod
-    def _fetch_abstract_from_pubmed(pubmed_id: str) -> Optional[str]:
+    def _fetch_abstract_from_pubmed(self, pubmed_id: str) -> Optional[str]:
         """
         Pobiera abstrakt publikacji z PubMed.
         
@@ -137,7 +145,7 @@ class PubmedEndpoint:
         Returns:
             Abstrakt publikacji lub None w przypadku niepowodzenia
         """
-        url = f"{PubmedEndpoint.BASE_URL}/efetch.fcgi"
+        url = f"{self.BASE_URL}/efetch.fcgi"
         params = {
             "db": "pubmed",
             "id": pubmed_id,
@@ -145,11 +153,11 @@ class PubmedEndpoint:
             "rettype": "abstract"
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
         if response.status_code == 200:
             # Przetwarzanie XML z abstraktem
-            text = PubmedEndpoint._extract_abstract_from_pubmed_xml(response.text)
+            text = self._extract_abstract_from_pubmed_xml(response.text)
             if text:
                 logging.info(f"Pobrano abstrakt dla publikacji {pubmed_id}")
                 return text
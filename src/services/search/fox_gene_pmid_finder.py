@@ -6,11 +6,14 @@ It uses NCBI's E-utilities API to directly search PubMed for publications relate
 
 import os
 import json
-from typing import List, Dict, Set, Any
+from typing import List, Dict, Set, Any, Optional
 import logging
 import time
+
 import requests
 
+from src.api.clients.transport import get_session
+
 class FoxGenePMIDFinder:
     """
     Class for finding and extracting PMIDs associated with FOX family genes.
@@ -18,10 +21,14 @@ class FoxGenePMIDFinder:
     Uses the NCBI E-utilities API to search for publications directly in PubMed.
     """
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         """
         Initialize the FoxGenePMIDFinder instance.
+
+        Args:
+            session: HTTP session to send requests with (default: shared pooled session)
         """
+        self.session = session if session is not None else get_session()
         self.genes = []
         self.pmids = set()
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
@@ -94,7 +101,7 @@ class FoxGenePMIDFinder:
                     "retmode": "json"
                 }
                 
-                response = requests.get(esearch_url, params=params)
+                response = self.session.get(esearch_url, params=params)
                 
                 if response.status_code == 200:
                     try:
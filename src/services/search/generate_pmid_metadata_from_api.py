@@ -8,9 +8,10 @@ import json
 import os
 import logging
 import time
-import requests
 from typing import Dict, List, Set, Any
 
+from src.api.clients.transport import get_session
+
 # Konfiguracja loggera
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +28,7 @@ class FoxPmidMetadataGenerator:
     def __init__(self):
         """Inicjalizacja generatora metadanych."""
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+        self.session = get_session()
         self.pmid_metadata = {}  # słownik PMID -> {gen}
         self.genes = []
         
@@ -76,7 +78,7 @@ class FoxPmidMetadataGenerator:
         }
         
         try:
-            response = requests.get(esearch_url, params=params, timeout=30)
+            response = self.session.get(esearch_url, params=params, timeout=30)
             
             if response.status_code == 200:
                 results = response.json()
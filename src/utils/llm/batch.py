@@ -0,0 +1,302 @@
+"""
+Offline batch processing of LLM requests.
+
+Batch endpoints of OpenAI and TogetherAI accept a JSONL file with one chat completion
+request per line and return a JSONL file with the responses after a while. They are
+much cheaper than per-call invocation and are well suited for non-interactive runs,
+such as re-scoring the whole corpus.
+
+This module writes and reads batch files in that format and runs a batch through a
+pluggable submitter:
+- OpenAICompatibleBatchSubmitter uses the provider's batch API
+- LocalBatchSubmitter answers the requests locally, for tests and offline runs
+
+Example usage:
+    write_batch_file(requests, "batch_input.jsonl", model_name="gpt-4")
+    results = run_batch(submitter, "batch_input.jsonl", "batch_output.jsonl")
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.models.data.clients.exceptions import LLMError
+
+try:
+    import openai
+    HAS_OPENAI = True
+except ImportError:
+    HAS_OPENAI = False
+    openai = None
+
+
+# Endpoint used for every request in a batch file
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Base URL of the OpenAI-compatible TogetherAI API
+TOGETHER_BASE_URL = "https://api.together.xyz/v1"
+
+# Batch states after which polling stops
+FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def write_batch_file(requests: Iterable[Tuple[str, str, str]], path: str, model_name: str,
+                     temperature: float = 0.0) -> int:
+    """
+    Writes chat completion requests to a JSONL batch file.
+
+    Args:
+        requests: Tuples of (custom_id, system prompt, user prompt)
+        path: Path of the batch file
+        model_name: Name of the model answering the requests
+        temperature: Sampling temperature
+
+    Returns:
+        Number of requests written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, system_prompt, user_prompt in requests:
+            line = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": model_name,
+                    "temperature": temperature,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ]
+                }
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            count += 1
+
+    return count
+
+
+def read_batch_results(path: str) -> Dict[str, str]:
+    """
+    Reads the responses from a batch output file.
+
+    Failed requests are skipped, so the caller can retry them another way.
+
+    Args:
+        path: Path of the batch output file
+
+    Returns:
+        Dictionary mapping custom_id to the content of the model's answer
+    """
+    logger = logging.getLogger(__name__)
+    results = {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code", 200) != 200:
+                    logger.warning(f"Batch request {entry.get('custom_id')} failed: "
+                                   f"{entry.get('error') or response.get('status_code')}")
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[entry["custom_id"]] = content
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Skipping malformed batch output line: {str(e)}")
+
+    return results
+
+
+class BatchSubmitter:
+    """
+    Base class for submitting batch files to an LLM provider.
+    """
+
+    def submit(self, input_path: str) -> str:
+        """
+        Submits a batch file.
+
+        Args:
+            input_path: Path of the JSONL batch file
+
+        Returns:
+            Identifier of the batch
+        """
+        raise NotImplementedError("Subclasses must implement submit()")
+
+    def get_status(self, batch_id: str) -> str:
+        """
+        Returns the state of a batch, e.g. "in_progress" or "completed".
+
+        Args:
+            batch_id: Identifier returned by submit()
+
+        Returns:
+            State of the batch
+        """
+        raise NotImplementedError("Subclasses must implement get_status()")
+
+    def download_results(self, batch_id: str, output_path: str) -> None:
+        """
+        Downloads the output file of a completed batch.
+
+        Args:
+            batch_id: Identifier returned by submit()
+            output_path: Path where the JSONL output is saved
+        """
+        raise NotImplementedError("Subclasses must implement download_results()")
+
+
+class OpenAICompatibleBatchSubmitter(BatchSubmitter):
+    """
+    Submitter using the batch API of OpenAI or an OpenAI-compatible provider (TogetherAI).
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, completion_window: str = "24h"):
+        """
+        Initializes the submitter.
+
+        Args:
+            api_key: API key of the provider
+            base_url: Base URL of the API, None for OpenAI
+            completion_window: Time within which the provider has to finish the batch
+
+        Raises:
+            LLMError: If the openai package is not installed
+        """
+        if not HAS_OPENAI:
+            raise LLMError("Batch mode requires the openai package")
+
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        self.completion_window = completion_window
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            batch_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        self.logger.info(f"Submitted batch {batch.id} from {input_path}")
+        return batch.id
+
+    def get_status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download_results(self, batch_id: str, output_path: str) -> None:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            raise LLMError(f"Batch {batch_id} has no output file (status: {batch.status})")
+        content = self.client.files.content(batch.output_file_id)
+        with open(output_path, "wb") as f:
+            f.write(content.read())
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    """
+    File-based stand-in for a provider batch API.
+
+    Requests are answered when the batch is submitted, by a responder that gets the
+    chat messages of a request and returns the answer text. Input and output files are
+    kept in work_dir, mirroring what a provider would store.
+
+    Example usage:
+        submitter = LocalBatchSubmitter(lambda messages: '{"relationships": []}', "data/batch")
+    """
+
+    def __init__(self, responder: Callable[[List[Dict[str, str]]], str], work_dir: str):
+        """
+        Initializes the local submitter.
+
+        Args:
+            responder: Function returning the answer for a list of chat messages
+            work_dir: Directory where batch files are stored
+        """
+        self.responder = responder
+        self.work_dir = work_dir
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(work_dir, exist_ok=True)
+
+    def _output_path(self, batch_id: str) -> str:
+        return os.path.join(self.work_dir, f"{batch_id}_output.jsonl")
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        shutil.copyfile(input_path, os.path.join(self.work_dir, f"{batch_id}_input.jsonl"))
+
+        with open(input_path, "r", encoding="utf-8") as f_in, \
+                open(self._output_path(batch_id), "w", encoding="utf-8") as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                entry: Dict[str, Any] = {"id": uuid.uuid4().hex, "custom_id": request["custom_id"]}
+                try:
+                    content = self.responder(request["body"]["messages"])
+                    entry["response"] = {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}
+                    }
+                    entry["error"] = None
+                except Exception as e:
+                    entry["response"] = None
+                    entry["error"] = {"message": str(e)}
+                f_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        self.logger.info(f"Processed local batch {batch_id}")
+        return batch_id
+
+    def get_status(self, batch_id: str) -> str:
+        return "completed" if os.path.exists(self._output_path(batch_id)) else "failed"
+
+    def download_results(self, batch_id: str, output_path: str) -> None:
+        shutil.copyfile(self._output_path(batch_id), output_path)
+
+
+def run_batch(submitter: BatchSubmitter, input_path: str, output_path: str,
+              poll_interval: float = 60.0, timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    Submits a batch file, waits for the batch to finish and reads its results.
+
+    Args:
+        submitter: Submitter used to run the batch
+        input_path: Path of the JSONL batch file
+        output_path: Path where the JSONL output is saved
+        poll_interval: Seconds between status checks
+        timeout: Maximum number of seconds to wait, None to wait indefinitely
+
+    Returns:
+        Dictionary mapping custom_id to the content of the model's answer
+
+    Raises:
+        LLMError: If the batch does not complete or the timeout is exceeded
+    """
+    logger = logging.getLogger(__name__)
+    batch_id = submitter.submit(input_path)
+    started = time.monotonic()
+
+    while True:
+        status = submitter.get_status(batch_id)
+        if status in FINAL_STATES:
+            break
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise LLMError(f"Batch {batch_id} did not finish within {timeout} seconds")
+        logger.debug(f"Batch {batch_id} status: {status}")
+        time.sleep(poll_interval)
+
+    if status != "completed":
+        raise LLMError(f"Batch {batch_id} finished with status: {status}")
+
+    submitter.download_results(batch_id, output_path)
+    return read_batch_results(output_path)
@@ -0,0 +1,104 @@
+"""
+Deterministic cache keys for LLM responses.
+
+Python's built-in hash() is salted per process, so keys built with it never match
+between runs and a persistent LLM cache is never hit. The keys built here are
+SHA-256 digests of everything that determines the LLM answer: the model, the prompt
+version and texts, the variant, the canonicalised entity list and the passage text.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+# Prefix of all LLM analysis cache keys
+LLM_CACHE_KEY_PREFIX = "llm_analysis"
+
+
+def canonicalize_entities(entities: List[Dict[str, Any]]) -> List[str]:
+    """
+    Returns an order-independent representation of an entity list.
+
+    Args:
+        entities: Entity dictionaries passed to the LLM prompt
+
+    Returns:
+        Sorted list of entities serialized as JSON with sorted keys
+    """
+    return sorted(
+        json.dumps(entity, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        for entity in entities
+    )
+
+
+def stable_digest(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a text.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest that is the same in every process
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_llm_cache_key(model_name: str, variant_text: str, entities: List[Dict[str, Any]],
+                        passage_text: str, system_prompt: str = "", prompt_template: str = "",
+                        prompt_version: int = 1) -> str:
+    """
+    Builds a content-addressed cache key for an LLM relationship analysis.
+
+    Args:
+        model_name: Name of the LLM model
+        variant_text: Text of the variant
+        entities: Entities listed in the prompt
+        passage_text: Text of the passage
+        system_prompt: System prompt sent to the model
+        prompt_template: User prompt template
+        prompt_version: Version of the prompt, bumped when the prompt semantics change
+
+    Returns:
+        Cache key of the form "llm_analysis:<model>:<sha256>"
+    """
+    payload = json.dumps({
+        "model": model_name,
+        "prompt_version": prompt_version,
+        "system_prompt": system_prompt,
+        "prompt_template": prompt_template,
+        "variant": variant_text,
+        "entities": canonicalize_entities(entities),
+        "passage": passage_text
+    }, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    return f"{LLM_CACHE_KEY_PREFIX}:{model_name}:{stable_digest(payload)}"
+
+
+def analyzer_cache_key(analyzer: Any, variant_text: str, entities: List[Dict[str, Any]],
+                       passage_text: str, prompt_template: Optional[str] = None) -> str:
+    """
+    Builds the cache key of an LLM context analyzer request.
+
+    The model, prompts and prompt version are read from the analyzer, which must define
+    llm_model_name, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE and PROMPT_VERSION.
+
+    Args:
+        analyzer: LLM context analyzer sending the request
+        variant_text: Text of the variant
+        entities: Entities listed in the prompt
+        passage_text: Text of the passage
+        prompt_template: User prompt template (default: the analyzer's USER_PROMPT_TEMPLATE)
+
+    Returns:
+        Cache key that is stable across processes and runs
+    """
+    return build_llm_cache_key(
+        model_name=analyzer.llm_model_name,
+        variant_text=variant_text,
+        entities=entities,
+        passage_text=passage_text,
+        system_prompt=analyzer.SYSTEM_PROMPT,
+        prompt_template=prompt_template if prompt_template is not None else analyzer.USER_PROMPT_TEMPLATE,
+        prompt_version=analyzer.PROMPT_VERSION
+    )
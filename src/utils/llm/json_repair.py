@@ -0,0 +1,276 @@
+"""
+Tolerant parsing of JSON produced by language models.
+
+LLM answers are usually valid JSON, sometimes wrapped in a markdown code block or
+surrounded by prose, and occasionally slightly malformed: single-quoted strings,
+unquoted keys, Python literals, trailing or missing commas, or an answer cut off
+before the closing brackets.
+
+parse_json() tries a plain parse first (with orjson when it is installed) and only
+falls back to repair_json(), which fixes all of the above in a single pass over the
+text instead of running a series of regular expressions and re-parsing after each.
+
+Example usage:
+    result = parse_json(response.content)
+    relationships = result.get("relationships", [])
+"""
+
+import json
+import re
+from typing import Any, List, Tuple
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+# JSON inside a markdown code block
+_CODE_BLOCK = re.compile(r"```(?:json)?(.*?)```", re.DOTALL)
+
+# Outermost JSON object in a text
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+# Unquoted token: a key, a number or a literal such as true, True or None
+_BAREWORD = re.compile(r"[A-Za-z0-9_+\-.]+")
+
+# Valid JSON number
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+# Runs of whitespace and of string characters that need no rewriting
+_WHITESPACE = re.compile(r"\s+")
+_PLAIN_STRING_CHARS = {
+    '"': re.compile(r'[^"\\\n\r\t]+'),
+    "'": re.compile(r"[^'\"\\\n\r\t]+"),
+}
+
+# Next non-whitespace character
+_NEXT_TOKEN = re.compile(r"\s*(.?)", re.DOTALL)
+
+# Literals written in Python or JavaScript style
+_LITERALS = {
+    "true": "true", "True": "true", "TRUE": "true",
+    "false": "false", "False": "false", "FALSE": "false",
+    "null": "null", "None": "null", "NULL": "null", "undefined": "null",
+}
+
+# Escapes that are valid in a JSON string
+_JSON_ESCAPES = set('"\\/bfnrtu')
+
+_CLOSING = {"{": "}", "[": "]"}
+_OPENING = {"}": "{", "]": "["}
+
+
+def _loads(text: str) -> Any:
+    """Parses JSON with orjson if available, otherwise with the standard library."""
+    if HAS_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_json(text: str) -> str:
+    """
+    Extracts the JSON part of an LLM response.
+
+    Args:
+        text: Response of the model
+
+    Returns:
+        Content of the first markdown code block, or the text from the first "{" to the
+        last "}", or the stripped text if neither is found
+    """
+    if "```" in text:
+        match = _CODE_BLOCK.search(text)
+        if match:
+            return match.group(1).strip()
+
+    match = _JSON_OBJECT.search(text)
+    if match:
+        return match.group(0)
+
+    return text.strip()
+
+
+def _read_string(text: str, start: int) -> Tuple[str, int]:
+    """
+    Reads a string literal opened by a single or double quote.
+
+    Args:
+        text: Text being repaired
+        start: Position of the opening quote
+
+    Returns:
+        Tuple of the string as a valid JSON literal and the position after the closing
+        quote (the end of the text for unterminated strings)
+    """
+    quote = text[start]
+    plain = _PLAIN_STRING_CHARS[quote]
+    chars = ['"']
+    i = start + 1
+    length = len(text)
+
+    while i < length:
+        match = plain.match(text, i)
+        if match:
+            chars.append(match.group(0))
+            i = match.end()
+            if i >= length:
+                break
+        char = text[i]
+        if char == "\\" and i + 1 < length:
+            escaped = text[i + 1]
+            if escaped == "'":
+                chars.append("'")
+            elif escaped in _JSON_ESCAPES:
+                chars.append(char + escaped)
+            else:
+                chars.append("\\\\" + escaped)
+            i += 2
+            continue
+        if char == quote:
+            i += 1
+            break
+        if char == '"':
+            chars.append('\\"')
+        elif char == "\n":
+            chars.append("\\n")
+        elif char == "\r":
+            chars.append("\\r")
+        elif char == "\t":
+            chars.append("\\t")
+        else:
+            chars.append(char)
+        i += 1
+
+    chars.append('"')
+    return "".join(chars), i
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrites malformed JSON into valid JSON in a single pass.
+
+    Fixes single-quoted strings, unquoted keys and string values, Python/JavaScript
+    literals, raw newlines inside strings, trailing, duplicated and missing commas,
+    mismatched closing brackets and unclosed strings, arrays and objects.
+
+    Args:
+        text: JSON text, already extracted from the surrounding response
+
+    Returns:
+        Repaired JSON text. Input that is not JSON-like at all may still fail to parse
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Kind of the last emitted token: None, "open", "comma", "colon" or "value"
+    last = None
+    i = 0
+    length = len(text)
+
+    def drop_trailing_comma():
+        if last == "comma":
+            for index in range(len(out) - 1, -1, -1):
+                if out[index] == ",":
+                    del out[index]
+                    break
+
+    while i < length:
+        char = text[i]
+
+        if char in " \t\r\n":
+            match = _WHITESPACE.match(text, i)
+            out.append(match.group(0))
+            i = match.end()
+        elif char == '"' or char == "'":
+            if last == "value":
+                out.append(",")
+            literal, i = _read_string(text, i)
+            out.append(literal)
+            last = "value"
+        elif char in "{[":
+            if last == "value":
+                out.append(",")
+            stack.append(char)
+            out.append(char)
+            last = "open"
+            i += 1
+        elif char in "}]":
+            opening = _OPENING[char]
+            if opening in stack:
+                drop_trailing_comma()
+                if last == "colon":
+                    out.append("null")
+                # Close anything left open inside the container being closed
+                while stack[-1] != opening:
+                    out.append(_CLOSING[stack.pop()])
+                stack.pop()
+                out.append(char)
+                last = "value"
+            i += 1
+        elif char == ",":
+            if last == "value":
+                out.append(",")
+                last = "comma"
+            i += 1
+        elif char == ":":
+            out.append(":")
+            last = "colon"
+            i += 1
+        else:
+            match = _BAREWORD.match(text, i)
+            if not match:
+                # Stray character, e.g. a comment marker or an ellipsis
+                i += 1
+                continue
+            word = match.group(0)
+            i = match.end()
+            if word.strip("."):
+                next_char = _NEXT_TOKEN.match(text, i).group(1)
+                if last == "value":
+                    out.append(",")
+                if next_char == ":" and stack and stack[-1] == "{":
+                    out.append(json.dumps(word))
+                elif word in _LITERALS:
+                    out.append(_LITERALS[word])
+                elif _NUMBER.fullmatch(word):
+                    out.append(word)
+                else:
+                    out.append(json.dumps(word))
+                last = "value"
+
+    drop_trailing_comma()
+    if last == "colon":
+        out.append("null")
+    while stack:
+        out.append(_CLOSING[stack.pop()])
+
+    return "".join(out)
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parses the JSON in an LLM response, repairing it if necessary.
+
+    Args:
+        text: Response of the model
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the response cannot be parsed even after repair
+    """
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+
+    extracted = extract_json(text)
+    try:
+        return _loads(extracted)
+    except ValueError:
+        pass
+
+    return json.loads(repair_json(extracted))
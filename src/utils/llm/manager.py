@@ -6,6 +6,7 @@ Language Model providers like OpenAI and TogetherAI.
 """
 
 import logging
+import threading
 from typing import Optional, Dict, Any, List, Union
 
 from langchain_openai import ChatOpenAI
@@ -13,6 +14,9 @@ from langchain_together import Together
 from langchain_core.language_models.base import BaseLanguageModel
 
 from src.utils.config.config import Config
+from src.utils.llm.batch import BatchSubmitter, OpenAICompatibleBatchSubmitter, TOGETHER_BASE_URL
+from src.utils.llm.metrics import LlmMetrics, LlmMetricsCallbackHandler, get_llm_metrics
+from src.utils.llm.structured_output import invoke_structured
 from src.models.data.clients.exceptions import LLMError
 
 
@@ -42,8 +46,24 @@ class LlmManager:
     # Model temperature settings
     DEFAULT_TEMPERATURE = 0.0
     
+    # Maximum number of requests in flight to each provider, shared by all managers
+    DEFAULT_CONCURRENCY_LIMITS = {
+        'openai': 8,
+        'together': 4
+    }
+    
+    # Providers whose API can be asked to answer with a JSON object (JSON mode)
+    JSON_MODE_PROVIDERS = {'openai'}
+    
+    # Follow-up requests made by invoke_json() for answers that do not match the schema
+    DEFAULT_MAX_REPAIR_ATTEMPTS = 1
+    
+    _concurrency_limiters: Dict[str, threading.BoundedSemaphore] = {}
+    _concurrency_lock = threading.Lock()
+    
     def __init__(self, provider: str, model_name: Optional[str] = None, 
-                 temperature: float = DEFAULT_TEMPERATURE):
+                 temperature: float = DEFAULT_TEMPERATURE,
+                 metrics: Optional[LlmMetrics] = None):
         """
         Initializes the LLM Manager.
         
@@ -51,6 +71,7 @@ class LlmManager:
             provider: LLM provider name ("openai" or "together")
             model_name: Name of the LLM model to use (provider-specific)
             temperature: Sampling temperature for generation (0.0-1.0)
+            metrics: Collector of call metrics, by default the process-wide collector
             
         Raises:
             ValueError: If an unsupported provider is specified
@@ -79,6 +100,10 @@ class LlmManager:
         self.model_name = model_name
         self.llm: Optional[BaseLanguageModel] = None
         
+        # Every call of the model is recorded through this callback
+        self.metrics = metrics if metrics is not None else get_llm_metrics()
+        self.metrics_handler = LlmMetricsCallbackHandler(self.metrics, model_name)
+        
         # Initialize the LLM based on provider
         self._initialize_llm()
         
@@ -98,7 +123,8 @@ class LlmManager:
                     self.llm = ChatOpenAI(
                         model=self.model_name,
                         api_key=api_key,
-                        temperature=self.temperature
+                        temperature=self.temperature,
+                        callbacks=[self.metrics_handler]
                     )
                     self.logger.debug(f"Initialized OpenAI LLM with model: {self.model_name}")
                 else:
@@ -110,7 +136,8 @@ class LlmManager:
                     self.llm = Together(
                         model=self.model_name,
                         together_api_key=api_key,
-                        temperature=self.temperature
+                        temperature=self.temperature,
+                        callbacks=[self.metrics_handler]
                     )
                     self.logger.debug(f"Initialized TogetherAI LLM with model: {self.model_name}")
                 else:
@@ -136,6 +163,102 @@ class LlmManager:
         
         return self.llm
     
+    def invoke(self, messages: Any, cache_status: str = "none") -> Any:
+        """
+        Sends a request to the LLM.
+        
+        This is the single entry point for LLM calls: it applies the provider's
+        concurrency limit, and the call is recorded in the metrics collector together
+        with its cache status.
+        
+        Args:
+            messages: Messages or prompt passed to the model
+            cache_status: "miss" if the cache was checked before the call, otherwise "none"
+            
+        Returns:
+            Response of the model
+            
+        Raises:
+            LLMError: If the LLM is not properly initialized
+        """
+        return self._invoke_model(self.get_llm(), messages, cache_status)
+    
+    def invoke_json(self, messages: List[Any], schema: Dict[str, Any], cache_status: str = "none",
+                    max_repair_attempts: int = DEFAULT_MAX_REPAIR_ATTEMPTS) -> Any:
+        """
+        Sends a request to the LLM and returns its answer as JSON matching a schema.
+        
+        Providers in JSON_MODE_PROVIDERS are asked to answer with a JSON object. The
+        answer is parsed and validated against the schema; an invalid answer is sent
+        back to the model with the error, at most max_repair_attempts times.
+        
+        Example usage:
+            result = llm_manager.invoke_json(messages, {"type": "object", "required": ["relationships"]})
+        
+        Args:
+            messages: Chat messages of the request
+            schema: JSON schema of the expected answer (see src.utils.llm.structured_output)
+            cache_status: "miss" if the cache was checked before the call, otherwise "none"
+            max_repair_attempts: Maximum number of follow-up requests for invalid answers
+            
+        Returns:
+            Parsed answer, with values converted to the types required by the schema
+            
+        Raises:
+            LLMError: If the LLM is not initialized or no valid answer was received
+        """
+        llm = self.get_llm()
+        if self.provider in self.JSON_MODE_PROVIDERS:
+            llm = llm.bind(response_format={"type": "json_object"})
+        
+        return invoke_structured(
+            lambda request_messages: self._invoke_model(llm, request_messages, cache_status),
+            messages, schema, max_repair_attempts=max_repair_attempts, logger=self.logger
+        )
+    
+    def _invoke_model(self, llm: Any, messages: Any, cache_status: str) -> Any:
+        """
+        Calls a model within the provider's concurrency limit.
+        
+        Args:
+            llm: Model or runnable bound to the model
+            messages: Messages or prompt passed to the model
+            cache_status: Cache status recorded in the call metadata
+            
+        Returns:
+            Response of the model
+        """
+        with self.get_concurrency_limiter():
+            return llm.invoke(messages, config={"metadata": {"cache_status": cache_status}})
+    
+    def record_cache_hit(self) -> None:
+        """
+        Records a request of this manager's model that was answered from a cache.
+        """
+        self.metrics.record_cache_hit(self.model_name)
+    
+    def get_batch_submitter(self) -> BatchSubmitter:
+        """
+        Returns a submitter for the batch API of the configured provider.
+        
+        Returns:
+            Batch submitter authenticated with the provider's API key
+            
+        Raises:
+            LLMError: If the API key is missing or the openai package is not installed
+        """
+        if self.provider == 'openai':
+            api_key = self.config.get_openai_api_key()
+            base_url = None
+        else:
+            api_key = self.config.get_together_api_key()
+            base_url = TOGETHER_BASE_URL
+        
+        if not api_key:
+            raise LLMError(f"{self.provider} API key not found")
+        
+        return OpenAICompatibleBatchSubmitter(api_key, base_url=base_url)
+    
     def get_model_name(self) -> str:
         """
         Returns the name of the currently configured model.
@@ -152,4 +275,49 @@ class LlmManager:
         Returns:
             Provider name
         """
-        return self.provider 
\ No newline at end of file
+        return self.provider
+    
+    @classmethod
+    def set_concurrency_limit(cls, provider: str, limit: int) -> None:
+        """
+        Sets the maximum number of concurrent requests sent to a provider.
+        
+        Requests that are already in flight are not affected; the new limit applies
+        to requests started after the call.
+        
+        Args:
+            provider: LLM provider name ("openai" or "together")
+            limit: Maximum number of concurrent requests
+            
+        Raises:
+            ValueError: If the provider is unsupported or the limit is not positive
+        """
+        provider = provider.lower()
+        if provider not in cls.SUPPORTED_PROVIDERS:
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+        if limit < 1:
+            raise ValueError("Concurrency limit must be positive")
+        
+        with cls._concurrency_lock:
+            cls._concurrency_limiters[provider] = threading.BoundedSemaphore(limit)
+    
+    def get_concurrency_limiter(self) -> threading.BoundedSemaphore:
+        """
+        Returns the semaphore limiting concurrent requests to this manager's provider.
+        
+        The semaphore is shared by all managers of the same provider, so separate
+        analyzers running in one process respect a common limit.
+        
+        Example usage:
+            with llm_manager.get_concurrency_limiter():
+                response = llm.invoke(messages)
+        
+        Returns:
+            Semaphore to hold while a request is in flight
+        """
+        with self._concurrency_lock:
+            limiter = self._concurrency_limiters.get(self.provider)
+            if limiter is None:
+                limiter = threading.BoundedSemaphore(self.DEFAULT_CONCURRENCY_LIMITS[self.provider])
+                self._concurrency_limiters[self.provider] = limiter
+            return limiter
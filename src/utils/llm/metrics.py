@@ -0,0 +1,416 @@
+"""
+Token, latency and cost accounting for LLM calls.
+
+Every LLM created by LlmManager reports its calls to an LlmMetrics collector through
+LlmMetricsCallbackHandler, a LangChain callback. Because the callback is attached to
+the model itself, calls are recorded whether they are made directly, through
+LlmManager.invoke or inside a LangChain chain. Cache hits, which never reach the model,
+are recorded by the analyzers with LlmMetrics.record_cache_hit.
+
+The collected records are aggregated per model and can be exported as JSON or in the
+Prometheus text exposition format.
+
+Example usage:
+    metrics = get_llm_metrics()
+    ...
+    print(metrics.summary())
+    metrics.save("data/metrics/llm_metrics.prom")
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+# Estimated prices in USD per million (input, output) tokens. Providers change their
+# prices; use LlmMetrics.set_price to override or add models.
+DEFAULT_PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+    "meta-llama/Meta-Llama-3.1-8B-Instruct": (0.18, 0.18),
+    "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo": (0.18, 0.18),
+    "meta-llama/Meta-Llama-3.1-70B-Instruct": (0.88, 0.88),
+    "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo": (0.88, 0.88),
+}
+
+# Rough number of characters per token, used when a provider does not report usage
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a text.
+
+    Args:
+        text: Text sent to or returned by a model
+
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class LlmMetrics:
+    """
+    Thread-safe collector of per-call LLM metrics.
+
+    Each record is a dictionary with the fields model, status ("ok", "error" or
+    "cache_hit"), cache_status ("hit", "miss" or "none"), input_tokens, output_tokens,
+    tokens_estimated, latency (seconds), retries and cost (USD).
+    """
+
+    def __init__(self, prices: Optional[Dict[str, tuple]] = None):
+        """
+        Initializes the collector.
+
+        Args:
+            prices: Prices in USD per million (input, output) tokens, keyed by model name
+        """
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.records: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def set_price(self, model: str, input_price: float, output_price: float) -> None:
+        """
+        Sets the price of a model.
+
+        Args:
+            model: Model name
+            input_price: Price in USD per million input tokens
+            output_price: Price in USD per million output tokens
+        """
+        self.prices[model] = (input_price, output_price)
+
+    def estimate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """
+        Estimates the cost of a call.
+
+        Args:
+            model: Model name
+            input_tokens: Number of prompt tokens
+            output_tokens: Number of completion tokens
+
+        Returns:
+            Cost in USD, 0.0 for models without a known price
+        """
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def record_call(self, model: str, input_tokens: int, output_tokens: int, latency: float,
+                    retries: int = 0, cache_status: str = "none", tokens_estimated: bool = False,
+                    error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Records a call that reached the model.
+
+        Args:
+            model: Model name
+            input_tokens: Number of prompt tokens
+            output_tokens: Number of completion tokens
+            latency: Duration of the call in seconds
+            retries: Number of retries made by the client
+            cache_status: "miss" if the cache was checked before the call, otherwise "none"
+            tokens_estimated: Whether the token counts are estimates
+            error: Error message if the call failed
+
+        Returns:
+            The stored record
+        """
+        record = {
+            "timestamp": time.time(),
+            "model": model,
+            "status": "error" if error else "ok",
+            "cache_status": cache_status,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_estimated": tokens_estimated,
+            "latency": latency,
+            "retries": retries,
+            "cost": self.estimate_cost(model, input_tokens, output_tokens),
+            "error": error
+        }
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def record_cache_hit(self, model: str) -> Dict[str, Any]:
+        """
+        Records an LLM call answered from the cache.
+
+        Args:
+            model: Model name
+
+        Returns:
+            The stored record
+        """
+        record = {
+            "timestamp": time.time(),
+            "model": model,
+            "status": "cache_hit",
+            "cache_status": "hit",
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "tokens_estimated": False,
+            "latency": 0.0,
+            "retries": 0,
+            "cost": 0.0,
+            "error": None
+        }
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def reset(self) -> None:
+        """Removes all records, starting a new run."""
+        with self._lock:
+            self.records = []
+            self.started_at = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregates the records of the run per model.
+
+        Returns:
+            Dictionary with the run totals under "total" and per-model totals under "models"
+        """
+        with self._lock:
+            records = list(self.records)
+
+        models: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            stats = models.setdefault(record["model"], self._empty_stats())
+            self._add_record(stats, record)
+
+        total = self._empty_stats()
+        for record in records:
+            self._add_record(total, record)
+
+        return {
+            "started_at": self.started_at,
+            "total": self._finalize(total),
+            "models": {model: self._finalize(stats) for model, stats in models.items()}
+        }
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {"calls": 0, "errors": 0, "cache_hits": 0, "cache_misses": 0, "input_tokens": 0,
+                "output_tokens": 0, "retries": 0, "cost": 0.0, "latency_total": 0.0,
+                "latency_max": 0.0}
+
+    @staticmethod
+    def _add_record(stats: Dict[str, Any], record: Dict[str, Any]) -> None:
+        if record["status"] == "cache_hit":
+            stats["cache_hits"] += 1
+            return
+
+        stats["calls"] += 1
+        stats["errors"] += record["status"] == "error"
+        stats["cache_misses"] += record["cache_status"] == "miss"
+        stats["input_tokens"] += record["input_tokens"]
+        stats["output_tokens"] += record["output_tokens"]
+        stats["retries"] += record["retries"]
+        stats["cost"] += record["cost"]
+        stats["latency_total"] += record["latency"]
+        stats["latency_max"] = max(stats["latency_max"], record["latency"])
+
+    @staticmethod
+    def _finalize(stats: Dict[str, Any]) -> Dict[str, Any]:
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        stats["latency_avg"] = stats["latency_total"] / stats["calls"] if stats["calls"] else 0.0
+        stats["cache_hit_rate"] = stats["cache_hits"] / lookups if lookups else 0.0
+        return stats
+
+    def to_json(self, include_records: bool = False) -> str:
+        """
+        Exports the aggregated metrics as JSON.
+
+        Args:
+            include_records: Whether to include the individual call records
+
+        Returns:
+            JSON document
+        """
+        data = self.summary()
+        if include_records:
+            with self._lock:
+                data["records"] = list(self.records)
+        return json.dumps(data, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Exports the aggregated metrics in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text, one sample per model and metric
+        """
+        metrics = [
+            ("llm_calls_total", "counter", "LLM calls that reached the model", "calls"),
+            ("llm_call_errors_total", "counter", "LLM calls that failed", "errors"),
+            ("llm_cache_hits_total", "counter", "LLM calls answered from the cache", "cache_hits"),
+            ("llm_cache_misses_total", "counter", "LLM calls made after a cache miss", "cache_misses"),
+            ("llm_input_tokens_total", "counter", "Prompt tokens sent to the model", "input_tokens"),
+            ("llm_output_tokens_total", "counter", "Completion tokens returned by the model", "output_tokens"),
+            ("llm_retries_total", "counter", "Retries made by the LLM clients", "retries"),
+            ("llm_cost_usd_total", "counter", "Estimated cost of the LLM calls in USD", "cost"),
+            ("llm_latency_seconds_total", "counter", "Total duration of the LLM calls", "latency_total"),
+            ("llm_latency_seconds_max", "gauge", "Longest LLM call", "latency_max"),
+        ]
+
+        models = self.summary()["models"]
+        lines = []
+        for name, metric_type, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for model, stats in sorted(models.items()):
+                label = model.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{model="{label}"}} {stats[field]}')
+
+        return "\n".join(lines) + "\n"
+
+    def save(self, path: str) -> None:
+        """
+        Saves the metrics to a file, in the Prometheus format if the path ends with
+        .prom and as JSON otherwise.
+
+        Args:
+            path: Path to the output file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+class LlmMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback recording every call of a model in an LlmMetrics collector.
+
+    The cache status of a call can be passed in the run metadata under the key
+    "cache_status", e.g. llm.invoke(messages, config={"metadata": {"cache_status": "miss"}}).
+    """
+
+    def __init__(self, metrics: "LlmMetrics", model: str):
+        """
+        Initializes the callback.
+
+        Args:
+            metrics: Collector receiving the records
+            model: Name of the model the callback is attached to
+        """
+        self.metrics = metrics
+        self.model = model
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, prompt_text: str, metadata: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._runs[run_id] = {
+                "started": time.monotonic(),
+                "prompt_text": prompt_text,
+                "cache_status": (metadata or {}).get("cache_status", "none"),
+                "retries": 0
+            }
+
+    def _finish(self, run_id: UUID) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._runs.pop(run_id, None)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID,
+                     metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, "".join(prompts), metadata)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        prompt_text = "".join(str(message.content) for batch in messages for message in batch)
+        self._start(run_id, prompt_text, metadata)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            if run_id in self._runs:
+                self._runs[run_id]["retries"] += 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._finish(run_id)
+        if run is None:
+            return
+
+        input_tokens, output_tokens = self._get_usage(response)
+        tokens_estimated = input_tokens is None
+        if tokens_estimated:
+            completion_text = "".join(
+                generation.text for generations in response.generations for generation in generations)
+            input_tokens = estimate_tokens(run["prompt_text"])
+            output_tokens = estimate_tokens(completion_text)
+
+        self.metrics.record_call(
+            model=self.model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency=time.monotonic() - run["started"],
+            retries=run["retries"],
+            cache_status=run["cache_status"],
+            tokens_estimated=tokens_estimated
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._finish(run_id)
+        if run is None:
+            return
+
+        self.metrics.record_call(
+            model=self.model,
+            input_tokens=estimate_tokens(run["prompt_text"]),
+            output_tokens=0,
+            latency=time.monotonic() - run["started"],
+            retries=run["retries"],
+            cache_status=run["cache_status"],
+            tokens_estimated=True,
+            error=str(error)
+        )
+
+    @staticmethod
+    def _get_usage(response: LLMResult) -> tuple:
+        """
+        Reads the token usage reported by the provider.
+
+        Args:
+            response: Result passed to on_llm_end
+
+        Returns:
+            Tuple of (input tokens, output tokens), or (None, None) if not reported
+        """
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if "prompt_tokens" in token_usage:
+            return token_usage["prompt_tokens"], token_usage.get("completion_tokens", 0)
+
+        input_tokens = output_tokens = 0
+        found = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+                    found = True
+        return (input_tokens, output_tokens) if found else (None, None)
+
+
+_default_metrics = LlmMetrics()
+
+
+def get_llm_metrics() -> LlmMetrics:
+    """
+    Returns the process-wide collector used by LlmManager.
+
+    Returns:
+        LlmMetrics instance
+    """
+    return _default_metrics
@@ -0,0 +1,271 @@
+"""
+Approximate (near-duplicate) cache of LLM relationship analyses.
+
+The exact LLM cache (see cache_keys) only matches prompts with an identical passage
+text. Many passages are almost identical, for example an abstract sentence quoted in
+the full text or a boilerplate variant description repeated across papers.
+NearDuplicateCache reuses the result of such a passage when:
+- the variant text is the same,
+- the set of entities (category, type and text; identifiers are document-specific)
+  is the same,
+- the Jaccard similarity of the word shingles of the normalised passages is at least
+  the threshold.
+
+Candidates are found with MinHash signatures and locality-sensitive hashing (LSH)
+bands, and the similarity of each candidate is then computed exactly. Entries are kept
+in memory for the lifetime of the cache, so duplicates are found within one run; a
+passage is stored once per variant and entity set, and the least recently used
+entries are evicted beyond max_size.
+
+Example usage:
+    near_duplicates = NearDuplicateCache(threshold=0.9)
+    analyzer = UnifiedLlmContextAnalyzer(near_duplicate_cache=near_duplicates)
+    analyzer.analyze_publications(pmids)
+    print(near_duplicates.report())
+"""
+
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Mersenne prime 2**61 - 1, modulus of the MinHash permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Words of a normalised passage
+_WORD = re.compile(r"\w+")
+
+
+def normalize_passage(text: str) -> List[str]:
+    """
+    Normalises a passage for near-duplicate detection.
+
+    Args:
+        text: Passage text
+
+    Returns:
+        Lowercased words, without punctuation and with Unicode compatibility forms folded
+    """
+    return _WORD.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+def _hash_shingle(shingle: str) -> int:
+    """Returns a 64-bit hash of a shingle that is the same in every process."""
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class NearDuplicateCache:
+    """
+    In-memory cache of LLM results looked up by passage similarity.
+
+    Example usage:
+        cache = NearDuplicateCache(threshold=0.9)
+        cache.set("V600E", entities, passage_text, relationships)
+        match = cache.get("V600E", entities, similar_passage_text)
+        if match:
+            relationships, similarity, source_id = match
+    """
+
+    # Default maximum number of stored passages
+    DEFAULT_MAX_SIZE = 10000
+
+    def __init__(self, threshold: float = 0.9, shingle_size: int = 3,
+                 num_permutations: int = 64, bands: int = 16, seed: int = 1,
+                 max_size: Optional[int] = DEFAULT_MAX_SIZE):
+        """
+        Initializes the cache.
+
+        Args:
+            threshold: Minimum Jaccard similarity of the passage shingles for a result
+                to be reused, between 0 and 1
+            shingle_size: Number of consecutive words in a shingle
+            num_permutations: Length of the MinHash signatures
+            bands: Number of LSH bands; num_permutations must be divisible by it. More
+                bands find candidates with lower similarity
+            seed: Seed of the MinHash permutations
+            max_size: Maximum number of stored passages (None for no limit); the least
+                recently used ones are evicted first
+
+        Raises:
+            ValueError: If the threshold is outside [0, 1] or num_permutations is not
+                divisible by bands
+        """
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+        if num_permutations % bands:
+            raise ValueError(f"num_permutations ({num_permutations}) must be divisible by bands ({bands})")
+
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self.max_size = max_size
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+        # Entries in least recently used order, keyed by (variant, entity set, source_id),
+        # and LSH buckets of source identifiers per (variant, entity set)
+        self._entries: "OrderedDict[Tuple[str, FrozenSet, str], Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, FrozenSet], Dict[Tuple[int, Tuple[int, ...]], Set[str]]] = \
+            defaultdict(lambda: defaultdict(set))
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @staticmethod
+    def _entity_set(entities: List[Dict[str, Any]]) -> FrozenSet[Tuple[str, str, str]]:
+        """Returns the entities as a set of (category, type, lowercased text)."""
+        return frozenset(
+            (entity.get("entity_category", ""), entity.get("entity_type", ""),
+             str(entity.get("entity_text", "")).lower())
+            for entity in entities
+        )
+
+    def _shingles(self, passage_text: str) -> FrozenSet[int]:
+        """Returns the hashed word shingles of a normalised passage."""
+        words = normalize_passage(passage_text)
+        if len(words) <= self.shingle_size:
+            return frozenset([_hash_shingle(" ".join(words))])
+        return frozenset(
+            _hash_shingle(" ".join(words[index:index + self.shingle_size]))
+            for index in range(len(words) - self.shingle_size + 1)
+        )
+
+    def _signature(self, shingles: FrozenSet[int]) -> List[int]:
+        """Returns the MinHash signature of a shingle set."""
+        return [
+            min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+            for a, b in self._permutations
+        ]
+
+    def _bands(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """Splits a signature into LSH band keys."""
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def get(self, variant_text: str, entities: List[Dict[str, Any]],
+            passage_text: str) -> Optional[Tuple[List[Dict[str, Any]], float, str]]:
+        """
+        Looks up the result of a near-duplicate passage.
+
+        Args:
+            variant_text: Text of the variant
+            entities: Entities of the request
+            passage_text: Passage text sent to the LLM
+
+        Returns:
+            Tuple of the cached relationships, the similarity of the passages and the
+            identifier of the source passage (a digest of its text), or None if no
+            stored passage is similar enough
+        """
+        key = (variant_text, self._entity_set(entities))
+        shingles = self._shingles(passage_text)
+        band_keys = self._bands(self._signature(shingles))
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            buckets = self._buckets.get(key)
+            if not buckets:
+                return None
+
+            candidates = {source_id for band_key in band_keys for source_id in buckets.get(band_key, ())}
+
+            best, best_similarity = None, 0.0
+            for source_id in candidates:
+                entry = self._entries[key + (source_id,)]
+                similarity = len(shingles & entry["shingles"]) / len(shingles | entry["shingles"])
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None or best_similarity < self.threshold:
+                return None
+
+            self._entries.move_to_end(key + (best["source_id"],))
+            self.stats["hits"] += 1
+            return best["relationships"], best_similarity, best["source_id"]
+
+    def set(self, variant_text: str, entities: List[Dict[str, Any]], passage_text: str,
+            relationships: List[Dict[str, Any]]) -> None:
+        """
+        Stores the LLM result of a passage.
+
+        A passage already stored for the same variant and entity set is only marked as
+        recently used.
+
+        Args:
+            variant_text: Text of the variant
+            entities: Entities of the request
+            passage_text: Passage text sent to the LLM
+            relationships: Relationships returned by the LLM
+        """
+        key = (variant_text, self._entity_set(entities))
+        source_id = hashlib.sha256(passage_text.encode("utf-8")).hexdigest()[:16]
+        entry_key = key + (source_id,)
+
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return
+
+        shingles = self._shingles(passage_text)
+        entry = {
+            "shingles": shingles,
+            "relationships": relationships,
+            "source_id": source_id,
+            "band_keys": self._bands(self._signature(shingles))
+        }
+
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return
+            self._entries[entry_key] = entry
+            buckets = self._buckets[key]
+            for band_key in entry["band_keys"]:
+                buckets[band_key].add(source_id)
+
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Removes the least recently used entry; the lock must be held."""
+        (variant_text, entity_set, source_id), entry = self._entries.popitem(last=False)
+        key = (variant_text, entity_set)
+        buckets = self._buckets[key]
+        for band_key in entry["band_keys"]:
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(source_id)
+                if not bucket:
+                    del buckets[band_key]
+        if not buckets:
+            del self._buckets[key]
+        self.stats["evictions"] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns statistics of the cache.
+
+        Returns:
+            Dictionary with the numbers of lookups, hits (LLM calls saved), evictions
+            and stored entries, the hit rate and the threshold
+        """
+        with self._lock:
+            report = dict(self.stats, entries=len(self._entries))
+        report["hit_rate"] = report["hits"] / report["lookups"] if report["lookups"] else 0.0
+        report["threshold"] = self.threshold
+        return report
+
+    def reset_stats(self) -> None:
+        """
+        Resets the statistics returned by report().
+        """
+        self.stats = {"lookups": 0, "hits": 0, "evictions": 0}
@@ -0,0 +1,239 @@
+"""
+Structured (JSON) output of language models.
+
+Answers are parsed with src.utils.llm.json_repair and checked against a JSON schema.
+An answer that cannot be parsed or does not match the schema is sent back to the model
+with the error, up to a fixed number of times, instead of being silently dropped.
+
+Only the subset of JSON Schema needed for LLM answers is supported: the keywords
+"type", "properties", "required", "additionalProperties", "items", "enum",
+"minimum" and "maximum". "type" may also be a list of types, such as
+["string", "null"] for optional values. Values that are unambiguous but of the wrong
+type, such as "true" for a boolean or "7" for an integer, are converted, and
+non-integral numbers are rounded where an integer is expected.
+
+Example usage:
+    schema = {"type": "object", "required": ["answer"], "properties": {"answer": {"type": "string"}}}
+    result = invoke_structured(llm.invoke, messages, schema)
+"""
+
+import json
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.schema import AIMessage, HumanMessage
+
+from src.models.data.clients.exceptions import LLMError
+from src.utils.llm.json_repair import parse_json
+
+
+# Message sent to the model after an invalid answer
+REPAIR_PROMPT = """Your previous answer could not be used: {error}
+Respond again with only a JSON value matching this JSON schema, without any other text:
+{schema}"""
+
+_TRUE_STRINGS = {"true", "yes", "1"}
+_FALSE_STRINGS = {"false", "no", "0"}
+
+
+class SchemaValidationError(ValueError):
+    """
+    Raised when a parsed answer does not match the expected JSON schema.
+    """
+    pass
+
+
+def _coerce_boolean(value: Any, path: str) -> bool:
+    """Returns the value as a JSON boolean, converting unambiguous representations."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in _TRUE_STRINGS | _FALSE_STRINGS:
+        return value.strip().lower() in _TRUE_STRINGS
+    raise SchemaValidationError(f"{path}: expected boolean, got {value!r}")
+
+
+def _coerce_integer(value: Any, path: str) -> int:
+    """Returns the value as a JSON integer, converting unambiguous representations."""
+    if isinstance(value, bool):
+        raise SchemaValidationError(f"{path}: expected integer, got {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and math.isfinite(value):
+        return int(round(value))
+    if isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            number = None
+        if number is not None and math.isfinite(number):
+            return int(round(number))
+    raise SchemaValidationError(f"{path}: expected integer, got {value!r}")
+
+
+def _coerce_number(value: Any, path: str) -> float:
+    """Returns the value as a JSON number, converting unambiguous representations."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise SchemaValidationError(f"{path}: expected number, got {value!r}")
+
+
+def _coerce_string(value: Any, path: str) -> str:
+    """Returns the value as a JSON string, converting unambiguous representations."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise SchemaValidationError(f"{path}: expected string, got {value!r}")
+
+
+_COERCIONS = {
+    "boolean": _coerce_boolean,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "string": _coerce_string,
+}
+
+
+def validate_json(value: Any, schema: Dict[str, Any], path: str = "$") -> Any:
+    """
+    Checks a parsed JSON value against a schema.
+
+    Args:
+        value: Parsed JSON value
+        schema: JSON schema (see the module docstring for the supported keywords)
+        path: Location of the value, used in error messages
+
+    Returns:
+        The value, with scalars converted to the types required by the schema
+
+    Raises:
+        SchemaValidationError: If the value does not match the schema
+    """
+    expected_type = schema.get("type")
+
+    if isinstance(expected_type, list):
+        if value is None:
+            if "null" in expected_type:
+                return None
+            raise SchemaValidationError(f"{path}: expected {' or '.join(expected_type)}, got None")
+        types = [item for item in expected_type if item != "null"]
+        for index, item in enumerate(types):
+            try:
+                return validate_json(value, dict(schema, type=item), path)
+            except SchemaValidationError:
+                if index == len(types) - 1:
+                    raise
+        raise SchemaValidationError(f"{path}: expected null, got {value!r}")
+
+    if expected_type == "null":
+        if value is not None:
+            raise SchemaValidationError(f"{path}: expected null, got {value!r}")
+        return None
+
+    if expected_type == "object":
+        if not isinstance(value, dict):
+            raise SchemaValidationError(f"{path}: expected object, got {type(value).__name__}")
+        for key in schema.get("required", []):
+            if key not in value:
+                raise SchemaValidationError(f"{path}: missing required property '{key}'")
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties", True)
+        result = {}
+        for key, item in value.items():
+            if key in properties:
+                result[key] = validate_json(item, properties[key], f"{path}.{key}")
+            elif isinstance(additional, dict):
+                result[key] = validate_json(item, additional, f"{path}.{key}")
+            elif additional:
+                result[key] = item
+            else:
+                raise SchemaValidationError(f"{path}: unexpected property '{key}'")
+        value = result
+
+    elif expected_type == "array":
+        if not isinstance(value, list):
+            raise SchemaValidationError(f"{path}: expected array, got {type(value).__name__}")
+        items = schema.get("items")
+        if items:
+            value = [validate_json(item, items, f"{path}[{index}]") for index, item in enumerate(value)]
+
+    elif expected_type in _COERCIONS:
+        value = _COERCIONS[expected_type](value, path)
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaValidationError(f"{path}: {value!r} is not one of {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        raise SchemaValidationError(f"{path}: {value!r} is less than {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        raise SchemaValidationError(f"{path}: {value!r} is greater than {schema['maximum']}")
+
+    return value
+
+
+def parse_structured(text: str, schema: Dict[str, Any]) -> Any:
+    """
+    Parses an answer of a model and checks it against a schema.
+
+    Args:
+        text: Text of the answer
+        schema: JSON schema of the expected answer
+
+    Returns:
+        Parsed and validated value
+
+    Raises:
+        ValueError: If the answer is not valid JSON (json.JSONDecodeError) or does not
+            match the schema (SchemaValidationError)
+    """
+    return validate_json(parse_json(text), schema)
+
+
+def invoke_structured(invoke: Callable[[List[Any]], Any], messages: List[Any], schema: Dict[str, Any],
+                      max_repair_attempts: int = 1, logger: Optional[logging.Logger] = None) -> Any:
+    """
+    Calls a model and returns its answer parsed and validated against a schema.
+
+    If the answer is invalid, it is sent back to the model together with the error
+    and the schema, at most max_repair_attempts times.
+
+    Args:
+        invoke: Function sending a list of messages to the model
+        messages: Messages of the request
+        schema: JSON schema of the expected answer
+        max_repair_attempts: Maximum number of follow-up requests for invalid answers
+        logger: Logger for repair attempts
+
+    Returns:
+        Parsed and validated answer
+
+    Raises:
+        LLMError: If no valid answer was received; the last answer is available in its
+            response_text attribute
+    """
+    logger = logger or logging.getLogger(__name__)
+    messages = list(messages)
+
+    for attempt in range(max_repair_attempts + 1):
+        response = invoke(messages)
+        # Chat models return a message, completion models a plain string
+        text = response.content if hasattr(response, "content") else str(response)
+
+        try:
+            return parse_structured(text, schema)
+        except ValueError as e:
+            if attempt == max_repair_attempts:
+                error = LLMError(f"Invalid structured answer after {attempt + 1} attempts: {str(e)}")
+                # Last answer, kept for debugging
+                error.response_text = text
+                raise error from e
+            logger.warning(f"Invalid structured answer, asking the model to correct it: {str(e)}")
+            messages = messages + [
+                AIMessage(content=text),
+                HumanMessage(content=REPAIR_PROMPT.format(error=str(e), schema=json.dumps(schema)))
+            ]
@@ -0,0 +1,130 @@
+"""
+Tests for corpus-level co-occurrence aggregation.
+"""
+
+import math
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.analysis.context.cooccurrence_aggregator import CooccurrenceAggregator, association_scores
+from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+from src.models.entities.annotations import document_from_json
+
+
+def record(variant, passage, genes=(), diseases=(), variant_id=""):
+    """Builds a relationship record as returned by CooccurrenceContextAnalyzer."""
+    return {
+        "pmid": "1",
+        "variant_text": variant,
+        "variant_id": variant_id,
+        "passage_text": passage,
+        "genes": [{"text": gene, "id": ""} for gene in genes],
+        "diseases": [{"text": disease, "id": ""} for disease in diseases],
+    }
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = CooccurrenceAggregator()
+    # Four passages: V600E with BRAF twice, KRAS G12D with KRAS twice
+    aggregator.add_publication([
+        record("V600E", "p1", genes=["BRAF"], diseases=["melanoma"]),
+        record("G12D", "p2", genes=["KRAS", "TP53"]),
+    ])
+    aggregator.add_publication([
+        record("V600E", "p3", genes=["BRAF", "TP53"]),
+        record("G12D", "p4", genes=["KRAS"]),
+    ])
+    return aggregator
+
+
+def test_counts(aggregator):
+    """Test unit, marginal and pair counts."""
+    assert aggregator.report() == {
+        "unit": "passage", "units": 4, "variants": 2,
+        "entities": {"genes": 3, "diseases": 1}, "pairs": {"genes": 4, "diseases": 1}
+    }
+
+    top = aggregator.top_k("V600E", "genes", measure="count")
+    assert [(row["entity_text"], row["count"]) for row in top] == [("BRAF", 2), ("TP53", 1)]
+
+
+def test_association_measures(aggregator):
+    """Test PMI, NPMI and chi-square against a hand computation."""
+    braf, tp53 = aggregator.top_k("V600E", "genes", measure="npmi")
+
+    # BRAF: n(v, e) = 2, n(v) = 2, n(e) = 2, N = 4
+    assert braf["pmi"] == pytest.approx(math.log(2 * 4 / (2 * 2)))
+    assert braf["npmi"] == pytest.approx(1.0)
+    assert braf["chi2"] == pytest.approx(4.0)
+    # TP53: n(v, e) = 1, n(v) = 2, n(e) = 2, N = 4 - independent
+    assert tp53["pmi"] == pytest.approx(0.0)
+    assert tp53["chi2"] == pytest.approx(0.0)
+
+
+def test_top_k_options(aggregator):
+    """Test k, min_count, unknown variants and invalid arguments."""
+    assert len(aggregator.top_k("G12D", "genes", k=1)) == 1
+    assert [row["entity_text"] for row in aggregator.top_k("G12D", "genes", min_count=2)] == ["KRAS"]
+    assert aggregator.top_k("T790M", "genes") == []
+    assert aggregator.top_k("G12D", "diseases") == []
+    with pytest.raises(ValueError):
+        aggregator.top_k("V600E", "tissues")
+    with pytest.raises(ValueError):
+        aggregator.top_k("V600E", "genes", measure="lift")
+
+
+def test_top_k_by_variant_text():
+    """Test looking up variants with an identifier by their text."""
+    aggregator = CooccurrenceAggregator()
+    aggregator.add_publication([
+        record("p.V600E", "p1", genes=["BRAF"], variant_id="tmVar:p|SUB|V|600|E;HGVS:p.V600E;VariantGroup:0"),
+        record("V600E", "p2", genes=["BRAF"], variant_id="tmVar:p|SUB|V|600|E;HGVS:p.V600E;VariantGroup:0"),
+        record("V600K", "p3", genes=["BRAF"], variant_id="tmVar:p|SUB|V|600|K;HGVS:p.V600K;VariantGroup:1"),
+        record("V600K", "p4", genes=["BRAF"], variant_id="tmVar:p|SUB|V|600|K;HGVS:p.V600K;VariantGroup:2"),
+    ])
+
+    by_id = aggregator.top_k("tmVar:p|SUB|V|600|E;HGVS:p.V600E;VariantGroup:0", "genes")
+    assert by_id[0]["count"] == 2
+    assert aggregator.top_k("p.V600E", "genes") == by_id
+    assert aggregator.top_k("V600E", "genes") == by_id
+    with pytest.raises(ValueError, match="several variants"):
+        aggregator.top_k("V600K", "genes")
+
+
+def test_document_unit():
+    """Test counting publications instead of passages."""
+    aggregator = CooccurrenceAggregator(unit="document")
+    aggregator.add_publication([record("V600E", "p1", genes=["BRAF"]), record("V600E", "p2", genes=["BRAF"])])
+
+    assert aggregator.report()["units"] == 1
+    assert aggregator.top_k("V600E", "genes")[0]["count"] == 1
+
+
+def test_association_scores_pair_in_every_unit():
+    """Test that a pair present in every unit does not divide by zero."""
+    scores = association_scores(np.array([3]), 3, np.array([3]), 3)
+    assert scores["npmi"][0] == 1.0
+    assert scores["chi2"][0] == 0.0
+
+
+def test_update_streams_analyzer_output():
+    """Test aggregation of publications streamed through the analyzer."""
+    text = "BRAF V600E in melanoma"
+    documents = [document_from_json({"id": pmid, "passages": [{"offset": 0, "text": text, "annotations": [
+        {"id": "1", "text": "BRAF", "infons": {"type": "Gene", "identifier": "673"},
+         "locations": [{"offset": 0, "length": 4}]},
+        {"id": "2", "text": "V600E", "infons": {"type": "Mutation", "identifier": "p.V600E"},
+         "locations": [{"offset": 5, "length": 5}]},
+    ]}]}) for pmid in ("1", "2")]
+    client = MagicMock()
+    client.iter_publications_by_pmids.return_value = iter(documents)
+    aggregator = CooccurrenceAggregator()
+
+    assert aggregator.update(CooccurrenceContextAnalyzer(client), ["1", "2"], batch_size=50) == 2
+
+    client.iter_publications_by_pmids.assert_called_once_with(["1", "2"], batch_size=50, compact=True)
+    assert aggregator.top_k("p.V600E", "genes")[0]["entity_id"] == "673"
+    assert aggregator.top_k("p.V600E", "genes")[0]["count"] == 2
@@ -260,6 +260,27 @@ def test_analyze_passage_with_variants(analyzer):
     assert result[0]["diseases"][0]["id"] == "D009369"
     assert result[0]["diseases"][0]["offset"] == 25
 
+def test_analyze_passage_distance_scores(analyzer):
+    """Test that entities get distances and scores relative to each variant."""
+    passage_text = "BRAF V600E was found in melanoma. Vemurafenib was given. KRAS G12D was absent."
+    passage = create_mock_passage(passage_text, [
+        create_mock_annotation("BRAF", "Gene", "673", passage_text.index("BRAF")),
+        create_mock_annotation("V600E", "Mutation", "p.V600E", passage_text.index("V600E")),
+        create_mock_annotation("melanoma", "Disease", "D008545", passage_text.index("melanoma")),
+        create_mock_annotation("G12D", "Mutation", "p.G12D", passage_text.index("G12D")),
+    ])
+
+    v600e, g12d = analyzer._analyze_passage("12345678", passage)
+
+    gene = v600e["genes"][0]
+    assert (gene["char_distance"], gene["token_distance"], gene["same_sentence"]) == (5, 0, True)
+    assert gene["score"] == pytest.approx(1.0)
+    assert v600e["cooccurrence_score"] == pytest.approx(1.0)
+    assert g12d["genes"][0]["same_sentence"] is False
+    assert g12d["cooccurrence_score"] < v600e["cooccurrence_score"]
+    # Results must stay serializable to JSON
+    json.dumps([v600e, g12d])
+
 def test_analyze_publication(analyzer):
     """Test analyzing a complete publication."""
     # Create a mock document with multiple passages
@@ -387,7 +408,7 @@ def test_analyze_publications(analyzer):
     assert result[1]["genes"][0]["text"] == "KRAS"
     
     # Verify client method was called
-    analyzer.pubtator_client.get_publications_by_pmids.assert_called_once_with(pmids)
+    analyzer.pubtator_client.get_publications_by_pmids.assert_called_once_with(pmids, compact=True)
 
 def test_analyze_publications_api_error(analyzer):
     """Test analyzing publications when the API returns an error."""
@@ -401,7 +422,7 @@ def test_analyze_publications_api_error(analyzer):
         analyzer.analyze_publications(pmids)
     
     # Verify client method was called
-    analyzer.pubtator_client.get_publications_by_pmids.assert_called_once_with(pmids)
+    analyzer.pubtator_client.get_publications_by_pmids.assert_called_once_with(pmids, compact=True)
 
 def test_save_relationships_to_csv(analyzer):
     """Test saving relationships to a CSV file."""
@@ -0,0 +1,59 @@
+"""
+Tests for the vectorised co-occurrence distances.
+"""
+
+import math
+import random
+
+import pytest
+
+from src.analysis.context.cooccurrence_matrix import cooccurrence_matrix
+from src.analysis.context.sentences import sentence_index, split_sentences
+
+TEXT = ("The BRAF V600E mutation was found in melanoma. "
+        "Patients were treated with vemurafenib for six months in the clinic.")
+
+
+def test_distances_and_scores():
+    """Test distances, sentence flags and scores of a small passage."""
+    variant = TEXT.index("V600E")
+    braf, melanoma, drug = TEXT.index("BRAF"), TEXT.index("melanoma"), TEXT.index("vemurafenib")
+
+    matrix = cooccurrence_matrix(TEXT, [variant + 100], [braf + 100, melanoma + 100, drug + 100],
+                                 passage_offset=100)
+
+    assert matrix["char_distance"].tolist() == [[variant - braf, melanoma - variant, drug - variant]]
+    assert matrix["token_distance"].tolist() == [[0, 4, 9]]
+    assert matrix["same_sentence"].tolist() == [[True, True, False]]
+    scores = matrix["score"][0]
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[0] > scores[1] > scores[2]
+    assert scores[2] == pytest.approx(0.5 * math.exp(-9 / 25.0))
+
+
+def test_token_distance_matches_text_split():
+    """Test that token distances equal the count of PassagePrefilter for any offsets."""
+    rng = random.Random(0)
+    spans = split_sentences(TEXT)
+    variants = [rng.randrange(len(TEXT)) for _ in range(20)]
+    entities = [rng.randrange(len(TEXT)) for _ in range(30)]
+
+    matrix = cooccurrence_matrix(TEXT, variants, entities)
+
+    for i, variant in enumerate(variants):
+        for j, entity in enumerate(entities):
+            first, last = sorted((variant, entity))
+            assert matrix["token_distance"][i, j] == max(0, len(TEXT[first:last].split()) - 1)
+            same = sentence_index(spans, variant) == sentence_index(spans, entity)
+            assert matrix["same_sentence"][i, j] == same
+
+
+def test_unknown_offsets_and_empty_inputs():
+    """Test pairs without offsets and passages without entities."""
+    matrix = cooccurrence_matrix(TEXT, [4, None], [9])
+
+    assert matrix["char_distance"].tolist() == [[5], [-1]]
+    assert matrix["token_distance"].tolist() == [[0], [-1]]
+    assert matrix["same_sentence"].tolist() == [[True], [False]]
+    assert matrix["score"][1, 0] == 0.0
+    assert cooccurrence_matrix(TEXT, [4], [])["score"].shape == (1, 0)
@@ -0,0 +1,98 @@
+"""
+Unit tests for PassagePrefilter and the sentence helpers.
+"""
+
+from unittest.mock import MagicMock
+
+import bioc
+
+from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+from src.analysis.context.passage_prefilter import PassagePrefilter
+from src.analysis.context.sentences import context_window, sentence_index, split_sentences
+
+
+def _make_passage(text, annotations, offset=0, infons=None):
+    """Builds a passage with (text, type) annotations located at their first occurrence."""
+    passage = bioc.BioCPassage()
+    passage.offset = offset
+    passage.text = text
+    passage.infons.update(infons or {})
+    for index, (annotation_text, annotation_type) in enumerate(annotations):
+        annotation = bioc.BioCAnnotation()
+        annotation.id = str(index)
+        annotation.text = annotation_text
+        annotation.infons["type"] = annotation_type
+        annotation.locations.append(bioc.BioCLocation(offset + text.index(annotation_text), len(annotation_text)))
+        passage.annotations.append(annotation)
+    return passage
+
+
+def _prefilter(**kwargs):
+    return PassagePrefilter(cooccurrence_analyzer=CooccurrenceContextAnalyzer(MagicMock()), **kwargs)
+
+
+def test_split_sentences():
+    """Test sentence spans, skipping dots in variant notation and abbreviations."""
+    text = "The p.V600E variant was found by Smith et al. in 2010. Fig. 2 shows c.1799T>A. Done"
+    spans = split_sentences(text)
+    assert [text[start:end] for start, end in spans] == [
+        "The p.V600E variant was found by Smith et al. in 2010.",
+        "Fig. 2 shows c.1799T>A.",
+        "Done",
+    ]
+    assert sentence_index(spans, 0) == 0
+    assert sentence_index(spans, text.index("Fig.")) == 1
+    assert sentence_index(spans, len(text) - 1) == 2
+    assert split_sentences("") == [(0, 0)]
+
+
+def test_close_pair_scores_higher_than_distant_pair():
+    """Test that distance and sentence boundaries lower the score."""
+    filler = " ".join(["Unrelated words follow here."] * 20)
+    text = f"The V600E mutation in BRAF. {filler} Patients had melanoma."
+    passage = _make_passage(text, [("V600E", "Mutation"), ("BRAF", "Gene"), ("melanoma", "Disease")],
+                            offset=500, infons={"section_type": "RESULTS"})
+
+    scores = _prefilter().score_passage("1", passage)
+
+    gene_score = scores[(504, 500 + text.index("BRAF"), "BRAF")]
+    disease_score = scores[(504, 500 + text.index("melanoma"), "melanoma")]
+    assert gene_score > 0.7
+    assert disease_score < 0.05
+
+
+def test_section_and_keyword_priors():
+    """Test that references score zero and relation keywords raise the score."""
+    annotations = [("V600E", "Mutation"), ("melanoma", "Disease")]
+    prefilter = _prefilter()
+
+    plain = prefilter.score_passage("1", _make_passage("V600E. Then melanoma.", annotations))
+    keyword = prefilter.score_passage("1", _make_passage("V600E. Then melanoma risk.", annotations))
+    reference = prefilter.score_passage(
+        "1", _make_passage("V600E in melanoma.", annotations, infons={"type": "ref"}))
+
+    assert list(keyword.values())[0] > list(plain.values())[0]
+    assert list(reference.values()) == [0.0]
+
+
+def test_report_counts_saved_calls():
+    """Test the statistics of recorded jobs."""
+    prefilter = _prefilter(threshold=0.5)
+    prefilter.record_job(3, 1)
+    prefilter.record_job(2, 0)
+
+    report = prefilter.report()
+    assert report["pairs_total"] == 5
+    assert report["pairs_dropped"] == 4
+    assert report["jobs_total"] == 2
+    assert report["llm_calls_saved"] == 1
+    assert prefilter.keep(0.5) and not prefilter.keep(0.49)
+
+
+def test_context_window():
+    """Test extracting mentioned sentences with their neighbours."""
+    text = "A one. B two. C three. D four. E five."
+    assert context_window(text, [text.index("C")]) == "... C three. ..."
+    assert context_window(text, [text.index("C")], window=1) == "... B two. C three. D four. ..."
+    assert context_window(text, [0, text.index("E")]) == "A one. ... E five."
+    assert context_window(text, []) == text
@@ -0,0 +1,122 @@
+"""
+Tests for the streaming relationship writers.
+"""
+
+import csv
+import os
+
+import pytest
+
+from src.analysis.context import relationship_writers
+from src.analysis.context.relationship_writers import (
+    default_passages_file,
+    iter_product_rows,
+    passage_id,
+    write_relationship_pairs,
+)
+
+PASSAGE = "BRAF and NRAS mutations such as V600E and Q61R occur in melanoma and colorectal cancer."
+
+
+def relationship(variant, pmid="1"):
+    """Builds a relationship record with two genes and two diseases."""
+    return {
+        "pmid": pmid,
+        "variant_text": variant,
+        "variant_offset": PASSAGE.index(variant),
+        "variant_id": f"p.{variant}",
+        "genes": [
+            {"text": "BRAF", "id": "673", "offset": 0, "char_distance": 32, "token_distance": 5,
+             "same_sentence": True, "score": 0.8},
+            {"text": "NRAS", "id": "4893", "offset": 9, "char_distance": 23, "token_distance": 4,
+             "same_sentence": True, "score": 0.85},
+        ],
+        "diseases": [
+            {"text": "melanoma", "id": "D008545", "offset": 55},
+            {"text": "colorectal cancer", "id": "D015179", "offset": 68},
+        ],
+        "tissues": [],
+        "species": [],
+        "chemicals": [],
+        "passage_text": PASSAGE,
+        "cooccurrence_score": 0.85,
+    }
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def test_pairs_csv_stores_passages_once(tmp_path):
+    """Test the pair layout and the passage side table."""
+    output_file = str(tmp_path / "pairs.csv")
+    relationships = (relationship(variant) for variant in ("V600E", "Q61R"))
+
+    counts = write_relationship_pairs(relationships, output_file)
+
+    assert counts == {"pairs": 8, "passages": 1}
+    pairs = read_csv(output_file)
+    passages = read_csv(str(tmp_path / "pairs_passages.csv"))
+    assert len(pairs) == 8
+    assert passages == [{"passage_id": passage_id("1", PASSAGE), "pmid": "1", "passage_text": PASSAGE}]
+    assert {row["passage_id"] for row in pairs} == {passages[0]["passage_id"]}
+    assert "passage_text" not in pairs[0]
+    assert pairs[0]["entity_type"] == "gene"
+    assert pairs[0]["token_distance"] == "5"
+    assert [row["entity_type"] for row in pairs[:4]] == ["gene", "gene", "disease", "disease"]
+
+
+def test_variant_without_entities_keeps_a_row(tmp_path):
+    """Test that variants without co-occurring entities are not lost."""
+    record = dict(relationship("V600E"), genes=[], diseases=[])
+    output_file = str(tmp_path / "pairs.csv")
+
+    write_relationship_pairs([record], output_file, passages_file=str(tmp_path / "texts.csv"))
+
+    rows = read_csv(output_file)
+    assert len(rows) == 1
+    assert rows[0]["variant_text"] == "V600E"
+    assert rows[0]["entity_text"] == ""
+    assert os.path.exists(tmp_path / "texts.csv")
+
+
+def test_product_rows_are_generated_lazily():
+    """Test that the legacy layout is produced row by row."""
+    rows = iter_product_rows(iter([relationship("V600E")]))
+
+    first = next(rows)
+
+    assert (first["gene_text"], first["disease_text"], first["tissue_text"]) == ("BRAF", "melanoma", "")
+    assert len(list(rows)) == 3
+
+
+def test_parquet_output(tmp_path):
+    """Test that the Parquet tables keep column types."""
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    output_file = str(tmp_path / "pairs.parquet")
+
+    counts = write_relationship_pairs([relationship("V600E"), relationship("Q61R", pmid="2")], output_file,
+                                      batch_size=3)
+
+    assert counts == {"pairs": 8, "passages": 2}
+    pairs = pd.read_parquet(output_file)
+    passages = pd.read_parquet(default_passages_file(output_file))
+    assert len(pairs) == 8
+    assert pairs["token_distance"].tolist()[:2] == [5, 4]
+    assert pairs["same_sentence"].iloc[0]
+    assert pairs["score"].dtype == "float64"
+    assert sorted(passages["pmid"]) == ["1", "2"]
+    merged = pairs.merge(passages, on=["passage_id", "pmid"])
+    assert (merged["passage_text"] == PASSAGE).all()
+
+
+def test_parquet_requires_pyarrow(tmp_path, monkeypatch):
+    """Test the error raised when pyarrow is not installed."""
+    monkeypatch.setattr(relationship_writers, "HAS_PYARROW", False)
+
+    with pytest.raises(ValueError, match="pyarrow"):
+        write_relationship_pairs([relationship("V600E")], str(tmp_path / "pairs.parquet"))
+    with pytest.raises(ValueError, match="Unsupported file format"):
+        write_relationship_pairs([], str(tmp_path / "pairs.txt"), file_format="xlsx")
@@ -15,8 +15,10 @@ from typing import List, Dict, Any
 
 from src.analysis.llm.context_analyzer import UnifiedLlmContextAnalyzer
 from src.models.data.clients.pubtator import PubTatorClient
-from src.models.data.clients.exceptions import PubTatorError
+from src.models.data.clients.exceptions import LLMError, PubTatorError
 from src.utils.llm.manager import LlmManager
+from src.utils.llm.near_duplicate_cache import NearDuplicateCache
+from src.utils.llm.structured_output import invoke_structured
 
 
 @pytest.fixture
@@ -26,6 +28,9 @@ def mock_llm_manager():
         mock_instance = MagicMock()
         mock_llm = MagicMock()
         mock_instance.get_llm.return_value = mock_llm
+        mock_instance.invoke.side_effect = lambda messages, **kwargs: mock_llm.invoke(messages)
+        mock_instance.invoke_json.side_effect = lambda messages, schema, **kwargs: invoke_structured(
+            mock_llm.invoke, messages, schema)
         mock.return_value = mock_instance
         yield mock_instance
         
@@ -41,7 +46,7 @@ def mock_pubtator_client():
 def mock_cache():
     """Fixture providing a mocked cache instance."""
     mock_cache = MagicMock()
-    mock_cache.get.return_value = None
+    mock_cache.get_or_none.return_value = None
     return mock_cache
 
 
@@ -247,7 +252,7 @@ def test_analyze_relationships_with_llm(analyzer, sample_relationship_response):
 def test_analyze_relationships_with_llm_cache_hit(analyzer, sample_relationship_response):
     """Test the _analyze_relationships_with_llm method with cache hit."""
     # Configure cache to return a cached result
-    analyzer.cache.get.return_value = sample_relationship_response["relationships"]
+    analyzer.cache.get_or_none.return_value = sample_relationship_response["relationships"]
     
     # Prepare test data
     variant_text = "BRAF V600E"
@@ -272,39 +277,48 @@ def test_analyze_relationships_with_llm_cache_hit(analyzer, sample_relationship_
     analyzer.llm.invoke.assert_not_called()
 
 
-def test_clean_json_response():
-    """Test the _clean_json_response method."""
-    analyzer = UnifiedLlmContextAnalyzer(llm_model_name="test-model")
+def test_analyze_relationships_with_llm_repairs_invalid_answer(analyzer, tmp_path, monkeypatch):
+    """Test that an answer not matching the schema is corrected by the model and not cached."""
+    # Debug mode writes the failed answer to data/debug relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    invalid = MagicMock()
+    invalid.content = json.dumps({"relationships": [{"entity_text": "melanoma"}]})
+    valid = MagicMock()
+    valid.content = json.dumps({"relationships": [
+        {"entity_text": "melanoma", "has_relationship": "true", "relationship_score": "8"}]})
+    analyzer.llm.invoke.side_effect = [invalid, valid]
+    entities = [{"entity_category": "disease", "entity_type": "Disease", "entity_text": "melanoma", "entity_id": "2"}]
     
-    # Test with JSON in markdown code block
-    markdown_response = '```json\n{"key": "value"}\n```'
-    result = analyzer._clean_json_response(markdown_response)
-    assert result == '{"key": "value"}'
+    result = analyzer._analyze_relationships_with_llm("V600E", entities, "V600E in melanoma.")
     
-    # Test with plain JSON
-    plain_json = '{"key": "value"}'
-    result = analyzer._clean_json_response(plain_json)
-    assert result == '{"key": "value"}'
+    assert result == [{"entity_text": "melanoma", "has_relationship": True, "relationship_score": 8}]
+    assert analyzer.llm.invoke.call_count == 2
     
-    # Test with JSON embedded in text
-    text_with_json = 'Here is the result: {"key": "value"} and more text'
-    result = analyzer._clean_json_response(text_with_json)
-    assert result == '{"key": "value"}'
+    analyzer.llm.invoke.side_effect = [invalid, invalid]
+    analyzer.cache.set.reset_mock()
+    
+    assert analyzer._analyze_relationships_with_llm("V600K", entities, "V600K in melanoma.") == []
+    analyzer.cache.set.assert_not_called()
+    assert len(os.listdir(tmp_path / "data" / "debug")) == 1
 
 
-def test_fix_trailing_commas():
-    """Test the _fix_trailing_commas method."""
-    analyzer = UnifiedLlmContextAnalyzer(llm_model_name="test-model")
+def test_analyze_relationships_with_llm_accepts_null_optional_fields(analyzer):
+    """Test that null optional fields and fractional scores do not trigger a repair request."""
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [
+        {"entity_type": None, "entity_text": "melanoma", "entity_id": None,
+         "has_relationship": True, "relationship_score": 7.5, "explanation": None},
+        {"entity_text": "BRAF", "has_relationship": False, "relationship_score": None}]})
+    analyzer.llm.invoke.return_value = response
+    entities = [{"entity_category": "disease", "entity_type": "Disease", "entity_text": "melanoma", "entity_id": "2"}]
     
-    # Test with trailing comma in object
-    json_with_trailing_comma_obj = '{"key1": "value1", "key2": "value2",}'
-    result = analyzer._fix_trailing_commas(json_with_trailing_comma_obj)
-    assert result == '{"key1": "value1", "key2": "value2"}'
+    result = analyzer._analyze_relationships_with_llm("V600E", entities, "V600E in melanoma.")
     
-    # Test with trailing comma in array
-    json_with_trailing_comma_arr = '["value1", "value2",]'
-    result = analyzer._fix_trailing_commas(json_with_trailing_comma_arr)
-    assert result == '["value1", "value2"]'
+    assert result == [
+        {"entity_type": None, "entity_text": "melanoma", "entity_id": None,
+         "has_relationship": True, "relationship_score": 8, "explanation": None},
+        {"entity_text": "BRAF", "has_relationship": False, "relationship_score": None}]
+    assert analyzer.llm.invoke.call_count == 1
 
 
 def test_save_relationships_to_csv(analyzer, tmp_path):
@@ -418,4 +432,325 @@ def test_filter_relationships_by_entity(analyzer):
     
     # Filter with no matches
     no_results = analyzer.filter_relationships_by_entity(relationships, "tissue", "skin")
-    assert len(no_results) == 0 
\ No newline at end of file
+    assert len(no_results) == 0 
+
+def _make_multi_variant_document(pmid: str) -> bioc.BioCDocument:
+    """Builds a document with two passages, each mentioning two variants and a disease."""
+    document = bioc.BioCDocument()
+    document.id = pmid
+    
+    for passage_index in range(2):
+        passage = bioc.BioCPassage()
+        passage.offset = passage_index * 100
+        passage.text = f"Passage {passage_index} of {pmid}: V600E and V600K found in melanoma."
+        
+        for annotation_id, (text, entity_type) in enumerate(
+                [("V600E", "Mutation"), ("V600K", "Mutation"), ("melanoma", "Disease")]):
+            annotation = bioc.BioCAnnotation()
+            annotation.id = f"{passage_index}-{annotation_id}"
+            annotation.text = text
+            annotation.infons["type"] = entity_type
+            annotation.locations.append(bioc.BioCLocation(passage.text.index(text), len(text)))
+            passage.annotations.append(annotation)
+        
+        document.passages.append(passage)
+    
+    return document
+
+
+def test_analyze_publications_concurrently_preserves_order(analyzer):
+    """Test that concurrent analysis returns the same results in the same order."""
+    import threading
+    import time
+    
+    analyzer.use_cache = False
+    documents = [_make_multi_variant_document(pmid) for pmid in ["111", "222", "333"]]
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = documents
+    
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    
+    def fake_invoke(messages):
+        prompt = messages[1].content
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        # Later jobs finish first, so a naive implementation would reorder results
+        time.sleep(0.05 if "Passage 0" in prompt else 0.01)
+        with lock:
+            in_flight.pop()
+        response = MagicMock()
+        response.content = json.dumps({"relationships": [{
+            "entity_type": "Disease", "entity_text": "melanoma", "entity_id": "2",
+            "has_relationship": True, "relationship_score": 7, "explanation": prompt[:40]
+        }]})
+        return response
+    
+    analyzer.llm.invoke.side_effect = fake_invoke
+    
+    sequential = analyzer.analyze_publications(["111", "222", "333"])
+    concurrent = analyzer.analyze_publications(["111", "222", "333"], max_concurrency=4)
+    
+    assert len(concurrent) == 12
+    assert concurrent == sequential
+    assert [rel["pmid"] for rel in concurrent[:4]] == ["111"] * 4
+    assert [rel["variant_text"] for rel in concurrent[:2]] == ["V600E", "V600K"]
+    assert max(peak) > 1
+
+
+def test_analyze_publications_concurrently_deduplicates_prompts(analyzer):
+    """Test that identical prompts are sent to the LLM only once."""
+    analyzer.use_cache = False
+    document = _make_multi_variant_document("111")
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [document, document]
+    
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": True}]})
+    analyzer.llm.invoke.return_value = response
+    
+    relationships = analyzer.analyze_publications(["111", "111"], max_concurrency=3)
+    
+    assert analyzer.llm.invoke.call_count == 4
+    assert len(relationships) == 8
+    assert relationships[0] is not relationships[4]
+
+
+def _packed_response(variants: List[str]) -> MagicMock:
+    """Builds a packed LLM response with one relationship per variant."""
+    response = MagicMock()
+    response.content = json.dumps({"variants": {
+        variant: {"relationships": [{
+            "entity_type": "Disease", "entity_text": "melanoma", "entity_id": "2",
+            "has_relationship": True, "relationship_score": 8, "explanation": f"{variant} in melanoma"
+        }]}
+        for variant in variants
+    }})
+    return response
+
+
+def test_packed_mode_sends_one_request_per_passage(analyzer):
+    """Test that packed mode analyzes all variants of a passage in one request."""
+    analyzer.pack_variants = True
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [_make_multi_variant_document("111")]
+    analyzer.llm.invoke.return_value = _packed_response(["V600E", "V600K"])
+    
+    relationships = analyzer.analyze_publications(["111"])
+    
+    assert analyzer.llm.invoke.call_count == 2
+    prompt = analyzer.llm.invoke.call_args[0][0][1].content
+    assert "- V600E" in prompt and "- V600K" in prompt
+    assert [rel["variant_text"] for rel in relationships] == ["V600E", "V600K", "V600E", "V600K"]
+    assert relationships[1]["explanation"] == "V600K in melanoma"
+    assert all(rel["pmid"] == "111" for rel in relationships)
+    
+    # The packed result is cached under a single key per passage
+    assert analyzer.cache.set.call_count == 2
+    assert set(analyzer.cache.set.call_args[0][1]) == {"V600E", "V600K"}
+
+
+def test_packed_mode_falls_back_for_missing_variants(analyzer):
+    """Test that variants missing from a packed response are analyzed one by one."""
+    analyzer.pack_variants = True
+    analyzer.use_cache = False
+    document = _make_multi_variant_document("111")
+    document.passages = document.passages[:1]
+    
+    single_response = MagicMock()
+    single_response.content = json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": False}]})
+    analyzer.llm.invoke.side_effect = [_packed_response([" v600e "]), single_response]
+    
+    relationships = analyzer._analyze_publication(document)
+    
+    assert analyzer.llm.invoke.call_count == 2
+    assert relationships[0]["explanation"] == " v600e  in melanoma"
+    assert relationships[1]["variant_text"] == "V600K"
+    assert relationships[1]["has_relationship"] is False
+
+
+def test_analyze_publications_batch(analyzer, tmp_path):
+    """Test that batch mode answers all prompts through the batch submitter."""
+    from src.api.cache.cache import MemoryCache
+    from src.utils.llm.batch import LocalBatchSubmitter
+    
+    analyzer.cache = MemoryCache(ttl=100)
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [_make_multi_variant_document("111")]
+    
+    submitted = []
+    
+    def responder(messages):
+        submitted.append(messages[1]["content"])
+        variant = "V600E" if "variant V600E" in messages[1]["content"] else "V600K"
+        return json.dumps({"relationships": [{
+            "entity_text": "melanoma", "has_relationship": True, "explanation": f"batch {variant}"}]})
+    
+    submitter = LocalBatchSubmitter(responder, str(tmp_path / "work"))
+    relationships = analyzer.analyze_publications_batch(["111"], submitter=submitter,
+                                                        batch_dir=str(tmp_path), poll_interval=0)
+    
+    assert len(submitted) == 4
+    analyzer.llm.invoke.assert_not_called()
+    assert [rel["explanation"] for rel in relationships] == ["batch V600E", "batch V600K"] * 2
+    assert [rel["pmid"] for rel in relationships] == ["111"] * 4
+    
+    # A second run finds everything in the cache and submits nothing
+    submitted.clear()
+    analyzer.analyze_publications_batch(["111"], submitter=submitter, batch_dir=str(tmp_path), poll_interval=0)
+    assert submitted == []
+
+
+def test_iter_publication_relationships(analyzer):
+    """Test chunked analysis yielding results per publication."""
+    analyzer.use_cache = False
+    documents = {pmid: _make_multi_variant_document(pmid) for pmid in ["111", "222"]}
+    analyzer.pubtator_client.get_publications_by_pmids.side_effect = (
+        lambda pmids: [documents[pmid] for pmid in pmids if pmid in documents])
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": True}]})
+    analyzer.llm.invoke.return_value = response
+    
+    results = list(analyzer.iter_publication_relationships(["111", "999", "222"], chunk_size=2))
+    
+    assert [pmid for pmid, _ in results] == ["111", "999", "222"]
+    assert [len(relationships) for _, relationships in results] == [4, 0, 4]
+    assert analyzer.pubtator_client.get_publications_by_pmids.call_count == 2
+    
+    concurrent = list(analyzer.iter_publication_relationships(["111", "999", "222"], chunk_size=2,
+                                                              max_concurrency=3))
+    assert concurrent == results
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 2])
+def test_failed_llm_request_is_not_checkpointed(analyzer, tmp_path, monkeypatch, max_concurrency):
+    """Test that a publication whose LLM request failed stays out of the streaming manifest."""
+    from src.cli.analyze import CheckpointManifest, stream_pmids
+    
+    # Debug mode writes the failed request to data/debug relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    analyzer.use_cache = False
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [_make_multi_variant_document("123")]
+    analyzer.llm.invoke.side_effect = RuntimeError("API down")
+    output_csv = str(tmp_path / "out.csv")
+    
+    with pytest.raises(LLMError):
+        stream_pmids(analyzer, ["123"], output_csv, max_concurrency=max_concurrency, retry_on_failure=False)
+    
+    assert CheckpointManifest(output_csv + ".checkpoint").completed == set()
+    # Analyses outside streaming mode still skip the failed request
+    assert analyzer.analyze_publications(["123"]) == []
+
+
+def test_prefilter_skips_low_scoring_pairs(analyzer):
+    """Test that pairs below the prefilter threshold are not sent to the LLM."""
+    from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+    from src.analysis.context.passage_prefilter import PassagePrefilter
+    
+    filler = " ".join(["Unrelated words follow here."] * 20)
+    text = f"V600E was associated with melanoma. {filler} V600K was also seen."
+    document = bioc.BioCDocument()
+    document.id = "111"
+    passage = bioc.BioCPassage()
+    passage.offset = 0
+    passage.text = text
+    for annotation_id, (annotation_text, entity_type) in enumerate(
+            [("V600E", "Mutation"), ("V600K", "Mutation"), ("melanoma", "Disease")]):
+        annotation = bioc.BioCAnnotation()
+        annotation.id = str(annotation_id)
+        annotation.text = annotation_text
+        annotation.infons["type"] = entity_type
+        annotation.locations.append(bioc.BioCLocation(text.index(annotation_text), len(annotation_text)))
+        passage.annotations.append(annotation)
+    document.passages.append(passage)
+    
+    analyzer.use_cache = False
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [document]
+    analyzer.prefilter = PassagePrefilter(threshold=0.2,
+                                          cooccurrence_analyzer=CooccurrenceContextAnalyzer(MagicMock()))
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": True}]})
+    analyzer.llm.invoke.return_value = response
+    
+    relationships = analyzer.analyze_publications(["111"])
+    
+    assert analyzer.llm.invoke.call_count == 1
+    assert "V600E" in analyzer.llm.invoke.call_args[0][0][1].content
+    assert [rel["variant_text"] for rel in relationships] == ["V600E"]
+    assert analyzer.prefilter.report()["llm_calls_saved"] == 1
+
+
+
+def test_prefilter_counts_batch_jobs_once(analyzer, tmp_path):
+    """Test that batch mode records prefilter statistics once per passage."""
+    from src.analysis.context.cooccurrence_context_analyzer import CooccurrenceContextAnalyzer
+    from src.analysis.context.passage_prefilter import PassagePrefilter
+    from src.api.cache.cache import MemoryCache
+    from src.utils.llm.batch import LocalBatchSubmitter
+    
+    analyzer.cache = MemoryCache(ttl=100)
+    analyzer.pubtator_client.get_publications_by_pmids.return_value = [_make_multi_variant_document("111")]
+    analyzer.prefilter = PassagePrefilter(threshold=0.0,
+                                          cooccurrence_analyzer=CooccurrenceContextAnalyzer(MagicMock()))
+    submitter = LocalBatchSubmitter(
+        lambda messages: json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": True}]}),
+        str(tmp_path / "work"))
+    
+    analyzer.analyze_publications_batch(["111"], submitter=submitter, batch_dir=str(tmp_path), poll_interval=0)
+    
+    report = analyzer.prefilter.report()
+    assert report["jobs_total"] == 4
+    assert report["llm_calls_saved"] == 0
+
+
+def test_context_sentences_trim_prompt(analyzer):
+    """Test that only the sentences around the mentions are sent to the LLM."""
+    text = ("Background sentence one. Another background sentence. V600E was found in melanoma. "
+            "Some trailing text. More trailing text.")
+    passage = bioc.BioCPassage()
+    passage.offset = 1000
+    passage.text = text
+    for annotation_id, (annotation_text, entity_type) in enumerate([("V600E", "Mutation"), ("melanoma", "Disease")]):
+        annotation = bioc.BioCAnnotation()
+        annotation.id = str(annotation_id)
+        annotation.text = annotation_text
+        annotation.infons["type"] = entity_type
+        annotation.locations.append(bioc.BioCLocation(1000 + text.index(annotation_text), len(annotation_text)))
+        passage.annotations.append(annotation)
+    
+    analyzer.use_cache = False
+    analyzer.context_sentences = 0
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [{"entity_text": "melanoma", "has_relationship": True}]})
+    analyzer.llm.invoke.return_value = response
+    
+    relationships = analyzer._analyze_passage("111", passage)
+    
+    prompt = analyzer.llm.invoke.call_args[0][0][1].content
+    assert 'Text fragment: "... V600E was found in melanoma. ..."' in prompt
+    assert "background" not in prompt
+    assert relationships[0]["passage_text"] == text
+
+
+def test_near_duplicate_cache_reuses_and_audits_results(analyzer):
+    """Test that a near-duplicate passage reuses the LLM result and is marked in the output."""
+    analyzer.use_cache = False
+    analyzer.near_duplicate_cache = NearDuplicateCache(threshold=0.8)
+    response = MagicMock()
+    response.content = json.dumps({"relationships": [
+        {"entity_text": "melanoma", "entity_id": "2", "has_relationship": True}]})
+    analyzer.llm.invoke.return_value = response
+    passage_text = ("The BRAF V600E mutation was found in most melanoma samples and was associated "
+                    "with a favourable response to targeted therapy in this cohort.")
+    
+    first = analyzer._analyze_relationships_with_llm(
+        "V600E", [{"entity_category": "disease", "entity_type": "Disease", "entity_text": "melanoma",
+                   "entity_id": "2"}], passage_text)
+    second = analyzer._analyze_relationships_with_llm(
+        "V600E", [{"entity_category": "disease", "entity_type": "Disease", "entity_text": "melanoma",
+                   "entity_id": "7"}], passage_text.replace("this cohort", "this large cohort"))
+    
+    assert analyzer.llm.invoke.call_count == 1
+    assert "near_duplicate_of" not in first[0]
+    assert second[0]["entity_id"] == "7"
+    assert second[0]["has_relationship"] is True
+    assert 0.8 <= second[0]["near_duplicate_similarity"] < 1.0
+    assert second[0]["near_duplicate_of"]
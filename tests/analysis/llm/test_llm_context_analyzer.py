@@ -79,6 +79,7 @@ def llm_analyzer():
         
         mock_llm_manager = mock_llm_manager_class.return_value
         mock_llm_manager.get_llm.return_value = mock_llm
+        mock_llm_manager.invoke.side_effect = lambda messages, **kwargs: mock_llm.invoke(messages)
         
         analyzer = LlmContextAnalyzer(pubtator_client=mock_pubtator_client)
         return analyzer
@@ -94,6 +95,7 @@ def test_initialization():
         mock_llm = Mock()
         mock_llm_manager = mock_llm_manager_class.return_value
         mock_llm_manager.get_llm.return_value = mock_llm
+        mock_llm_manager.invoke.side_effect = lambda messages, **kwargs: mock_llm.invoke(messages)
         
         analyzer = LlmContextAnalyzer(mock_pubtator_client)
         assert analyzer.pubtator_client == mock_pubtator_client
@@ -310,11 +312,11 @@ def test_cache_functionality():
         
         mock_llm_manager = mock_llm_manager_class.return_value
         mock_llm_manager.get_llm.return_value = mock_llm
+        mock_llm_manager.invoke.side_effect = lambda messages, **kwargs: mock_llm.invoke(messages)
         
         # Przygotowanie atrapy cache'a
         mock_cache = Mock()
-        mock_cache.has.return_value = False  # Na początku nie ma danych w cache
-        mock_cache.get.return_value = MOCK_LLM_RESPONSE["relationships"]
+        mock_cache.get_or_none.return_value = None  # Na początku nie ma danych w cache
         mock_cache.set.return_value = True
         
         mock_api_cache_class.create.return_value = mock_cache
@@ -340,7 +342,7 @@ def test_cache_functionality():
         assert mock_cache.set.call_count == 1
         
         # Symulacja istnienia danych w cache przy następnym wywołaniu
-        mock_cache.has.return_value = True
+        mock_cache.get_or_none.return_value = MOCK_LLM_RESPONSE["relationships"]
         
         # Drugie wywołanie z tymi samymi parametrami - dane powinny być pobrane z cache
         result2 = analyzer._analyze_relationships_with_llm(variant_text, entities, passage_text)
@@ -348,11 +350,9 @@ def test_cache_functionality():
         # LLM nie powinien być wywoływany ponownie
         assert mock_llm.invoke.call_count == 1
         
-        # Cache powinien być sprawdzony
-        assert mock_cache.has.call_count > 0
-        
-        # Dane powinny być pobrane z cache
-        assert mock_cache.get.call_count > 0
+        # Dane powinny być pobrane z cache tym samym kluczem, pod którym zostały zapisane
+        assert mock_cache.get_or_none.call_count == 2
+        assert mock_cache.get_or_none.call_args[0][0] == mock_cache.set.call_args[0][0]
         
         # Wyniki powinny być identyczne
         assert result1 == result2
@@ -370,6 +370,7 @@ def test_cache_disabled():
         
         mock_llm_manager = mock_llm_manager_class.return_value
         mock_llm_manager.get_llm.return_value = mock_llm
+        mock_llm_manager.invoke.side_effect = lambda messages, **kwargs: mock_llm.invoke(messages)
         
         # Utworzenie analizatora z wyłączonym cache
         analyzer = LlmContextAnalyzer(pubtator_client=pubtator_client_mock, use_cache=False)
@@ -98,6 +98,7 @@ class TestUnifiedLlmContextAnalyzer(unittest.TestCase):
             
             self.mock_llm_manager_instance = MagicMock()
             self.mock_llm_manager_instance.get_llm.return_value = self.mock_llm
+            self.mock_llm_manager_instance.invoke.side_effect = lambda messages, **kwargs: self.mock_llm.invoke(messages)
             self.mock_llm_manager.return_value = self.mock_llm_manager_instance
             
             # Create the analyzer with the mock
@@ -119,7 +120,7 @@ class TestUnifiedLlmContextAnalyzer(unittest.TestCase):
         """Test that the cache key includes the model name."""
         # Create a mock cache
         self.analyzer.cache = MagicMock()
-        self.analyzer.cache.has.return_value = False
+        self.analyzer.cache.get_or_none.return_value = None
         
         # Mock LLM response
         mock_response = MagicMock()
@@ -135,24 +136,23 @@ class TestUnifiedLlmContextAnalyzer(unittest.TestCase):
         self.analyzer._analyze_relationships_with_llm(variant_text, entities, passage_text)
         
         # Check if the cache key includes the model name
-        cache_key_pattern = f"llm_analysis:{self.analyzer.llm_model_name}:{variant_text}:"
+        cache_key_pattern = f"llm_analysis:{self.analyzer.llm_model_name}:"
         
-        # Verify cache.has was called with a key containing the model name
-        self.analyzer.cache.has.assert_called_once()
-        actual_key = self.analyzer.cache.has.call_args[0][0]
+        # Verify the cache was looked up with a key containing the model name
+        self.analyzer.cache.get_or_none.assert_called_once()
+        actual_key = self.analyzer.cache.get_or_none.call_args[0][0]
         self.assertTrue(actual_key.startswith(cache_key_pattern))
         
         # Verify cache.set was called with the same key pattern
         self.analyzer.cache.set.assert_called_once()
         actual_set_key = self.analyzer.cache.set.call_args[0][0]
-        self.assertTrue(actual_set_key.startswith(cache_key_pattern))
+        self.assertEqual(actual_set_key, actual_key)
     
     def test_cache_hit(self):
         """Test handling of a cache hit."""
         # Create a mock cache with a hit
         self.analyzer.cache = MagicMock()
-        self.analyzer.cache.has.return_value = True
-        self.analyzer.cache.get.return_value = MOCK_LLM_RESPONSE["relationships"]
+        self.analyzer.cache.get_or_none.return_value = MOCK_LLM_RESPONSE["relationships"]
         
         # Test data
         variant_text = "V600E"
@@ -163,8 +163,7 @@ class TestUnifiedLlmContextAnalyzer(unittest.TestCase):
         result = self.analyzer._analyze_relationships_with_llm(variant_text, entities, passage_text)
         
         # Verify cache was used and LLM was not called
-        self.analyzer.cache.has.assert_called_once()
-        self.analyzer.cache.get.assert_called_once()
+        self.analyzer.cache.get_or_none.assert_called_once()
         self.mock_llm.invoke.assert_not_called()
         
         # Check the result
@@ -231,28 +230,6 @@ class TestUnifiedLlmContextAnalyzer(unittest.TestCase):
         self.assertEqual(result[0]["genes"][0]["text"], "BRAF")
         self.assertEqual(result[0]["genes"][0]["relationship_score"], 9)
     
-    def test_json_repair_functions(self):
-        """Test JSON repair functions."""
-        # Test fixing trailing commas
-        invalid_json = '{"key1": "value1", "key2": "value2", }'
-        fixed = self.analyzer._fix_trailing_commas(invalid_json)
-        self.assertEqual(fixed, '{"key1": "value1", "key2": "value2" }')
-        
-        # Test fixing missing quotes
-        invalid_json = '{key1: "value1", key2: "value2"}'
-        fixed = self.analyzer._fix_missing_quotes(invalid_json)
-        self.assertEqual(fixed, '{ "key1": "value1", "key2": "value2"}')
-        
-        # Test fixing inconsistent quotes
-        invalid_json = "{'key1': \"value1\", 'key2': 'value2'}"
-        fixed = self.analyzer._fix_inconsistent_quotes(invalid_json)
-        self.assertEqual(fixed, "{\"key1\": \"value1\", \"key2\": \"value2\"}")
-        
-        # Test fixing missing commas
-        invalid_json = '{"key1": "value1" "key2": "value2"}'
-        fixed = self.analyzer._fix_missing_commas(invalid_json)
-        self.assertEqual(fixed, '{"key1": "value1", "key2": "value2"}')
-    
     def test_save_relationships_to_csv_with_scores(self):
         """Test saving relationships to CSV with relationship scores."""
         import tempfile
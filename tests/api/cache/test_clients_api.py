@@ -193,7 +193,7 @@ class TestClinVarClientCache:
 class TestPubTatorClientCache:
     """Testy dla cache'a PubTatorClient."""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_uses_cache(self, mock_get):
         """Test sprawdzający, czy PubTatorClient używa cache'a dla zapytań GET."""
         # Tworzymy klienta z włączonym cache'em
@@ -228,7 +228,7 @@ class TestPubTatorClientCache:
         # Sprawdzamy, czy wykonano tylko jedno faktyczne zapytanie HTTP
         assert mock_get.call_count == 1
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_post_not_cached(self, mock_post):
         """Test sprawdzający, czy zapytania POST nie są cache'owane."""
         # Tworzymy klienta z włączonym cache'em
@@ -248,7 +248,7 @@ class TestPubTatorClientCache:
         # Sprawdzamy, czy wykonano dwa zapytania HTTP (POST nie powinno być cache'owane)
         assert mock_post.call_count == 2
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_different_cache_ttl(self, mock_get):
         """Test sprawdzający, czy TTL cache'a działa prawidłowo."""
         # Tworzymy klienta z krótkim TTL
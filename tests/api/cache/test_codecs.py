@@ -0,0 +1,171 @@
+"""
+Testy dla kodeków wartości cache'a.
+
+Ten moduł zawiera testy kodeków z src.api.cache.codecs oraz sprawdza,
+czy trwałe implementacje cache'a odczytują wpisy zapisane w starszym formacie.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import pytest
+
+from src.api.cache import codecs
+from src.api.cache.cache import DiskCache, SqliteCache
+
+SAMPLE_VALUE = {
+    "status_code": 200,
+    "text": "<ReleaseSet>" + "<ClinVarSet>BRCA1 c.5266dupC</ClinVarSet>" * 200 + "</ReleaseSet>",
+    "headers": {"Content-Type": "text/xml"},
+}
+
+
+@pytest.fixture
+def temp_dir():
+    """Fixture tworząca tymczasowy katalog dla testów."""
+    dir_path = tempfile.mkdtemp(prefix="test_cache_codecs_")
+    yield dir_path
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
+
+
+def _available_codecs():
+    names = ["json", "gzip+json"]
+    if codecs.HAS_ORJSON:
+        names += ["orjson", "gzip+orjson"]
+    if codecs.HAS_MSGPACK:
+        names += ["msgpack", "gzip+msgpack"]
+    if codecs.HAS_ZSTD:
+        names += ["zstd+json"]
+    return names
+
+
+@pytest.mark.parametrize("name", _available_codecs())
+def test_round_trip(name):
+    """Test kodowania i dekodowania wartości każdym dostępnym kodekiem."""
+    codec = codecs.get_codec(name)
+    used_name, data = codec.encode(SAMPLE_VALUE)
+
+    assert isinstance(data, bytes)
+    assert codecs.get_codec(used_name).decode(data) == SAMPLE_VALUE
+
+
+def test_compression_reduces_size():
+    """Test, czy skompresowane wpisy są mniejsze niż zwykły JSON."""
+    _, plain = codecs.get_codec("json").encode(SAMPLE_VALUE)
+    name, compressed = codecs.get_codec("gzip+json").encode(SAMPLE_VALUE)
+
+    assert name == "gzip+json"
+    assert len(compressed) * 3 < len(plain)
+
+
+def test_small_values_are_not_compressed():
+    """Test, czy małe wartości są zapisywane bez kompresji."""
+    name, data = codecs.get_codec("gzip+json").encode({"id": 1})
+
+    assert name == "json"
+    assert json.loads(data) == {"id": 1}
+
+
+def test_unknown_codec():
+    """Test zgłaszania błędu dla nieznanego kodeka."""
+    with pytest.raises(ValueError):
+        codecs.get_codec("lz4+json")
+    with pytest.raises(ValueError):
+        codecs.get_codec("pickle")
+
+
+def test_disk_cache_records_codec(temp_dir):
+    """Test zapisu nazwy kodeka w nagłówku pliku DiskCache."""
+    cache = DiskCache(ttl=100, cache_dir=temp_dir, codec="gzip+json")
+    cache.set("key", SAMPLE_VALUE)
+
+    with open(cache._get_file_path("key"), "rb") as f:
+        header = json.loads(f.readline())
+
+    assert header["codec"] == "gzip+json"
+    assert header["key"] == "key"
+    assert DiskCache(ttl=100, cache_dir=temp_dir, codec="json").get("key") == SAMPLE_VALUE
+
+
+def test_disk_cache_reads_legacy_entries(temp_dir):
+    """Test odczytu wpisów zapisanych w starszym formacie JSON."""
+    legacy_path = os.path.join(temp_dir, hashlib.md5(b"old_key").hexdigest() + ".json")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump({"value": "old_value", "created_at": time.time(),
+                   "expires_at": time.time() + 100, "key": "old_key"}, f)
+
+    cache = DiskCache(ttl=100, cache_dir=temp_dir)
+    assert cache.has("old_key") is True
+    assert cache.get("old_key") == "old_value"
+
+    # Nadpisanie wpisu usuwa plik w starszym formacie
+    cache.set("old_key", "new_value")
+    assert not os.path.exists(legacy_path)
+    assert cache.get("old_key") == "new_value"
+
+
+def test_sqlite_cache_reads_legacy_rows(temp_dir):
+    """Test odczytu wierszy zapisanych przed dodaniem kolumny codec."""
+    db_path = os.path.join(temp_dir, "cache.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+        "created_at REAL NOT NULL, expires_at REAL NOT NULL)")
+    conn.execute("INSERT INTO cache_entries VALUES (?, ?, ?, ?)",
+                 ("old_key", json.dumps({"id": 1}), time.time(), time.time() + 100))
+    conn.commit()
+    conn.close()
+
+    cache = SqliteCache(ttl=100, db_path=db_path, codec="gzip+json")
+    assert cache.get("old_key") == {"id": 1}
+
+    cache.set("new_key", SAMPLE_VALUE)
+    assert cache.get("new_key") == SAMPLE_VALUE
+    row = cache._get_connection().execute(
+        "SELECT codec FROM cache_entries WHERE key = 'new_key'").fetchone()
+    assert row[0] == "gzip+json"
+
+
+def test_default_codec_is_portable():
+    """Test, czy domyślny kodek nie zależy od zainstalowanych pakietów."""
+    assert codecs.default_codec_name() == "gzip+json"
+    assert codecs.resolve_codec().name == "gzip+json"
+
+
+def _hide_json_codec(monkeypatch):
+    """Udaje środowisko, w którym pakiet kodeka json nie jest zainstalowany."""
+    monkeypatch.setattr(codecs, "_codecs", {})
+    monkeypatch.setitem(codecs._SERIALIZERS, "json", (codecs.JsonCodec, False))
+
+
+def test_disk_cache_keeps_entries_with_unavailable_codec(temp_dir, monkeypatch):
+    """Test, czy wpis z niedostępnym kodekiem jest traktowany jak brak, a nie usuwany."""
+    cache = DiskCache(ttl=100, cache_dir=temp_dir, codec="gzip+json")
+    cache.set("key", SAMPLE_VALUE)
+
+    _hide_json_codec(monkeypatch)
+    assert cache.get("key") is None
+    assert cache.has("key") is False
+    assert os.path.exists(cache._get_file_path("key"))
+
+    monkeypatch.undo()
+    assert cache.get("key") == SAMPLE_VALUE
+
+
+def test_sqlite_cache_keeps_rows_with_unavailable_codec(temp_dir, monkeypatch):
+    """Test, czy wiersz z niedostępnym kodekiem jest traktowany jak brak, a nie usuwany."""
+    cache = SqliteCache(ttl=100, db_path=os.path.join(temp_dir, "cache.sqlite3"), codec="gzip+json")
+    cache.set("key", SAMPLE_VALUE)
+
+    _hide_json_codec(monkeypatch)
+    assert cache.get("key") is None
+    assert cache.has("key") is False
+
+    monkeypatch.undo()
+    assert cache.get("key") == SAMPLE_VALUE
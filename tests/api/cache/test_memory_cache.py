@@ -243,6 +243,39 @@ class TestMemoryCache(unittest.TestCase):
         # Sprawdź, czy klucz istnieje
         self.assertTrue(self.cache.has("none_key"))
 
+    def test_max_bytes_limit(self):
+        """Test limitu rozmiaru wartości w bajtach."""
+        value_size = MemoryCache._estimate_size("x" * 1000)
+        cache = MemoryCache(ttl=10, max_size=None, max_bytes=3 * value_size)
+
+        for i in range(5):
+            cache.set(f"key{i}", "x" * 1000)
+
+        self.assertEqual(len(cache.cache), 3)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+        self.assertFalse(cache.has("key0"))
+        self.assertTrue(cache.has("key4"))
+
+        # Wartość większa niż cały limit nie jest zapisywana
+        self.assertFalse(cache.set("huge", "x" * 10000))
+        self.assertFalse(cache.has("huge"))
+
+        # Zbyt duża wartość usuwa poprzednią wartość klucza
+        self.assertFalse(cache.set("key4", "x" * 10000))
+        self.assertIsNone(cache.get("key4"))
+        self.assertLessEqual(cache.current_bytes, 2 * value_size)
+
+    def test_periodic_cleanup(self):
+        """Test okresowego usuwania wygasłych wpisów przy zapisie."""
+        cache = MemoryCache(ttl=10, cleanup_interval=0)
+        cache.set("expired_key", "value", ttl=0)
+        time.sleep(0.05)
+
+        # Zapis innego klucza usuwa wygasły wpis bez jego odczytu
+        cache.set("key", "value")
+        self.assertNotIn("expired_key", cache.cache)
+        self.assertNotIn("expired_key", cache.cache_expiry)
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
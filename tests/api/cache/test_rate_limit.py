@@ -13,6 +13,7 @@ import requests
 
 from src.api.clients.clinvar_client import ClinVarClient
 from src.api.clients.pubtator_client import PubTatorClient
+from src.api.cache.cache import MemoryCache
 
 
 def create_mock_response(status_code=200, json_data=None, text=None):
@@ -32,14 +33,14 @@ def create_mock_response(status_code=200, json_data=None, text=None):
     return mock_resp
 
 
-@patch('requests.get')
-def test_clinvar_client_rate_limit_without_api_key(mock_get):
+@patch('requests.Session.request')
+def test_clinvar_client_rate_limit_without_api_key(mock_request):
     """Test sprawdzający, czy ClinVarClient prawidłowo ogranicza zapytania do 3 na sekundę (bez klucza API)."""
     # Tworzymy klienta bez klucza API
     client = ClinVarClient(email="test@example.com", use_cache=False)
     
     # Konfiguracja mocka
-    mock_get.return_value = create_mock_response(
+    mock_request.return_value = create_mock_response(
         json_data={"id": "test_id", "name": "test_variant"}
     )
     
@@ -60,11 +61,11 @@ def test_clinvar_client_rate_limit_without_api_key(mock_get):
     assert elapsed_time >= 3.0, f"Zapytania wykonane zbyt szybko: {elapsed_time}s. Oczekiwano >= 3.0s"
     
     # Sprawdzamy, czy wykonano 10 zapytań
-    assert mock_get.call_count == 10
+    assert mock_request.call_count == 10
 
 
-@patch('requests.get')
-def test_clinvar_client_rate_limit_with_api_key(mock_get):
+@patch('requests.Session.request')
+def test_clinvar_client_rate_limit_with_api_key(mock_request):
     """Test sprawdzający, czy ClinVarClient prawidłowo ogranicza zapytania do 10 na sekundę (z kluczem API)."""
     # Tworzymy klienta z kluczem API
     client = ClinVarClient(
@@ -74,7 +75,7 @@ def test_clinvar_client_rate_limit_with_api_key(mock_get):
     )
     
     # Konfiguracja mocka
-    mock_get.return_value = create_mock_response(
+    mock_request.return_value = create_mock_response(
         json_data={"id": "test_id", "name": "test_variant"}
     )
     
@@ -94,10 +95,10 @@ def test_clinvar_client_rate_limit_with_api_key(mock_get):
     assert elapsed_time >= 2.0, f"Zapytania wykonane zbyt szybko: {elapsed_time}s. Oczekiwano >= 2.0s"
     
     # Sprawdzamy, czy wykonano 20 zapytań
-    assert mock_get.call_count == 20
+    assert mock_request.call_count == 20
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_pubtator_client_rate_limit(mock_get):
     """Test sprawdzający, czy PubTatorClient prawidłowo ogranicza zapytania do 20 na sekundę."""
     # Tworzymy klienta
@@ -127,14 +128,14 @@ def test_pubtator_client_rate_limit(mock_get):
     assert mock_get.call_count == 40
 
 
-@patch('requests.get')
-def test_clinvar_cache_bypasses_rate_limit(mock_get):
+@patch('requests.Session.request')
+def test_clinvar_cache_bypasses_rate_limit(mock_request):
     """Test sprawdzający, czy cache w ClinVarClient pozwala ominąć ograniczenia częstotliwości zapytań."""
     # Tworzymy klienta z włączonym cache'em
     client = ClinVarClient(email="test@example.com", use_cache=True)
     
     # Konfiguracja mocka
-    mock_get.return_value = create_mock_response(
+    mock_request.return_value = create_mock_response(
         json_data={"id": "test_id", "name": "test_variant"}
     )
     
@@ -154,10 +155,10 @@ def test_clinvar_cache_bypasses_rate_limit(mock_get):
     assert elapsed_time < 0.5, f"Cache nie przyspiesza zapytań: {elapsed_time}s. Oczekiwano < 0.5s"
     
     # Powinno być wykonane tylko jedno faktyczne zapytanie HTTP
-    assert mock_get.call_count == 1
+    assert mock_request.call_count == 1
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_pubtator_cache_bypasses_rate_limit(mock_get):
     """Test sprawdzający, czy cache w PubTatorClient pozwala ominąć ograniczenia częstotliwości zapytań."""
     # Tworzymy klienta z włączonym cache'em
@@ -184,4 +185,43 @@ def test_pubtator_cache_bypasses_rate_limit(mock_get):
     assert elapsed_time < 1.5, f"Cache nie przyspiesza zapytań: {elapsed_time}s. Oczekiwano < 1.5s"
     
     # Sprawdzamy, czy mock został wywołany tylko raz (pierwsze zapytanie)
-    assert mock_get.call_count == 1, f"Mock został wywołany {mock_get.call_count} razy, oczekiwano 1" 
\ No newline at end of file
+    assert mock_get.call_count == 1, f"Mock został wywołany {mock_get.call_count} razy, oczekiwano 1" 
+
+def create_http_response(status_code=200, text="{}"):
+    """Tworzy prawdziwy obiekt requests.Response, który klienty zapisują w cache'u."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode("utf-8")
+    return response
+
+
+@patch('requests.Session.get')
+def test_pubtator_cache_hit_does_not_wait_for_rate_limit(mock_get):
+    """Test sprawdzający, czy trafienie w cache PubTatorClient nie pobiera slotu limitu zapytań."""
+    client = PubTatorClient(use_cache=False)
+    client.use_cache = True
+    client.cache = MemoryCache(ttl=100)
+    mock_get.return_value = create_http_response()
+
+    with patch.object(client, '_wait_for_rate_limit') as mock_wait:
+        for i in range(5):
+            client._make_request("publications", method="GET", params={"pmids": "12345"})
+
+    assert mock_get.call_count == 1
+    assert mock_wait.call_count == 1
+
+
+@patch('requests.Session.request')
+def test_clinvar_cache_hit_does_not_wait_for_rate_limit(mock_request):
+    """Test sprawdzający, czy trafienie w cache ClinVarClient nie pobiera slotu limitu zapytań."""
+    client = ClinVarClient(email="test@example.com", use_cache=False)
+    client.use_cache = True
+    client.cache = MemoryCache(ttl=100)
+    mock_request.return_value = create_http_response()
+
+    with patch.object(client, '_wait_for_rate_limit') as mock_wait:
+        for i in range(5):
+            client._make_request("einfo", method="GET", params={"db": "clinvar"})
+
+    assert mock_request.call_count == 1
+    assert mock_wait.call_count == 1
@@ -0,0 +1,152 @@
+"""
+Testy dla implementacji SqliteCache.
+
+Ten moduł zawiera testy jednostkowe dla klasy SqliteCache,
+która przechowuje wpisy cache'a w jednym pliku bazy SQLite.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pytest
+
+from src.api.cache.cache import CacheManager, SqliteCache
+from src.models.data.clients.exceptions import CacheError
+
+
+@pytest.fixture
+def temp_dir():
+    """Fixture tworząca tymczasowy katalog dla testów."""
+    dir_path = tempfile.mkdtemp(prefix="test_sqlite_cache_")
+    yield dir_path
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
+
+
+@pytest.fixture
+def sqlite_cache(temp_dir):
+    """Fixture tworząca obiekt SqliteCache w tymczasowym katalogu."""
+    cache = SqliteCache(ttl=10, db_path=os.path.join(temp_dir, "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_basic_operations(sqlite_cache):
+    """Test podstawowych operacji: set, get, has, delete."""
+    sqlite_cache.set("key1", {"value": [1, 2, 3]})
+
+    assert sqlite_cache.get("key1") == {"value": [1, 2, 3]}
+    assert sqlite_cache.get_or_none("key1") == {"value": [1, 2, 3]}
+    assert sqlite_cache.has("key1") is True
+    assert sqlite_cache.get_or_none("nonexistent") is None
+
+    sqlite_cache.delete("key1")
+    assert sqlite_cache.has("key1") is False
+    assert sqlite_cache.get("key1") is None
+
+
+def test_single_file_with_wal(sqlite_cache, temp_dir):
+    """Test, czy wszystkie wpisy trafiają do jednego pliku w trybie WAL."""
+    for i in range(20):
+        sqlite_cache.set(f"key{i}", f"value{i}")
+
+    assert os.listdir(temp_dir) and all(
+        name.startswith("cache.sqlite3") for name in os.listdir(temp_dir))
+    mode = sqlite_cache._get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_ttl_expiration(temp_dir):
+    """Test wygasania wpisów po TTL."""
+    cache = SqliteCache(ttl=1, db_path=os.path.join(temp_dir, "cache.sqlite3"))
+    cache.set("expire_soon", "value")
+    assert cache.get("expire_soon") == "value"
+
+    time.sleep(1.1)
+
+    assert cache.has("expire_soon") is False
+    assert cache.get_or_none("expire_soon") is None
+
+
+def test_purge_expired(temp_dir):
+    """Test usuwania wygasłych wpisów za pomocą kolumny expires_at."""
+    db_path = os.path.join(temp_dir, "cache.sqlite3")
+    short_cache = SqliteCache(ttl=0, db_path=db_path)
+    long_cache = SqliteCache(ttl=100, db_path=db_path)
+    short_cache.set("short", "value")
+    long_cache.set("long", "value")
+    time.sleep(0.05)
+
+    assert long_cache.purge_expired() == 1
+    assert long_cache.get("long") == "value"
+    assert long_cache.get("short") is None
+
+
+def test_persistence(temp_dir):
+    """Test, czy dane są dostępne dla nowej instancji wskazującej na ten sam plik."""
+    db_path = os.path.join(temp_dir, "cache.sqlite3")
+    SqliteCache(ttl=100, db_path=db_path).set("persistent_key", "persistent_value")
+
+    assert SqliteCache(ttl=100, db_path=db_path).get("persistent_key") == "persistent_value"
+
+
+def test_clear(sqlite_cache):
+    """Test metody clear usuwającej wszystkie wpisy."""
+    sqlite_cache.set("key1", "value1")
+    sqlite_cache.set("key2", "value2")
+
+    sqlite_cache.clear()
+
+    assert sqlite_cache.has("key1") is False
+    assert sqlite_cache.has("key2") is False
+
+
+def test_non_serializable_value(sqlite_cache):
+    """Test zgłaszania CacheError dla wartości, których nie da się zapisać."""
+    with pytest.raises(CacheError):
+        sqlite_cache.set("key", object())
+
+
+def test_corrupted_entry(sqlite_cache):
+    """Test obsługi uszkodzonego wpisu w bazie."""
+    sqlite_cache.set("key", "value")
+    conn = sqlite3.connect(sqlite_cache.db_path)
+    conn.execute("UPDATE cache_entries SET value = 'not json' WHERE key = 'key'")
+    conn.commit()
+    conn.close()
+
+    assert sqlite_cache.get("key") is None
+    assert sqlite_cache.has("key") is False
+
+
+def test_concurrent_threads(sqlite_cache):
+    """Test zapisu i odczytu z wielu wątków."""
+    errors = []
+
+    def worker(thread_id):
+        try:
+            for i in range(20):
+                sqlite_cache.set(f"thread{thread_id}:{i}", i)
+                assert sqlite_cache.get(f"thread{thread_id}:{i}") == i
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+
+
+def test_cache_manager_creates_sqlite_cache(temp_dir):
+    """Test tworzenia SqliteCache przez CacheManager."""
+    cache = CacheManager.create(storage_type="sqlite", ttl=100, cache_dir=temp_dir)
+
+    assert isinstance(cache, SqliteCache)
+    assert cache.db_path == os.path.join(temp_dir, "cache.sqlite3")
@@ -0,0 +1,106 @@
+"""
+Testy dla implementacji TieredCache.
+
+Ten moduł zawiera testy jednostkowe dla klasy TieredCache, która łączy
+cache w pamięci z trwałym cache'em na dysku.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.api.cache.cache import CacheManager, DiskCache, MemoryCache, TieredCache
+
+
+@pytest.fixture
+def temp_dir():
+    """Fixture tworząca tymczasowy katalog dla testów."""
+    dir_path = tempfile.mkdtemp(prefix="test_tiered_cache_")
+    yield dir_path
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
+
+
+def test_write_through(temp_dir):
+    """Test zapisu wartości do obu warstw."""
+    cache = TieredCache(ttl=100, cache_dir=temp_dir)
+    cache.set("key", {"value": 1})
+
+    assert cache.memory.get("key") == {"value": 1}
+    assert cache.backend.get("key") == {"value": 1}
+
+
+def test_memory_hit_skips_backend(temp_dir):
+    """Test, czy powtórny odczyt jest obsługiwany z pamięci."""
+    cache = TieredCache(ttl=100, cache_dir=temp_dir)
+    cache.set("key", "value")
+
+    with patch.object(cache.backend, "get_or_none") as backend_get:
+        assert cache.get("key") == "value"
+        backend_get.assert_not_called()
+
+
+def test_read_through_promotion(temp_dir):
+    """Test promocji wpisu z dysku do pamięci w nowej instancji."""
+    TieredCache(ttl=100, cache_dir=temp_dir).set("key", "value")
+
+    cache = TieredCache(ttl=100, cache_dir=temp_dir)
+    assert cache.memory.has("key") is False
+    assert cache.get("key") == "value"
+    assert cache.memory.has("key") is True
+
+
+def test_promotion_keeps_backend_expiry(temp_dir):
+    """Test, czy wpis promowany do pamięci nie przeżywa wpisu na dysku."""
+    DiskCache(ttl=5, cache_dir=temp_dir).set("key", "value")
+
+    cache = TieredCache(ttl=100, cache_dir=temp_dir)
+    _, expires_at = cache.backend.get_with_expiry("key")
+    assert cache.get("key") == "value"
+    assert cache.memory.cache_expiry["key"] == pytest.approx(expires_at)
+
+
+def test_evicted_entries_remain_on_disk(temp_dir):
+    """Test, czy wpisy usunięte z pamięci są nadal dostępne z dysku."""
+    cache = TieredCache(ttl=100, cache_dir=temp_dir, memory_max_size=2)
+    for i in range(4):
+        cache.set(f"key{i}", i)
+
+    assert len(cache.memory.cache) == 2
+    assert cache.get("key0") == 0
+    assert cache.has("key1") is True
+
+
+def test_delete_and_clear(temp_dir):
+    """Test usuwania wpisów z obu warstw."""
+    cache = TieredCache(ttl=100, cache_dir=temp_dir)
+    cache.set("key1", "value1")
+    cache.set("key2", "value2")
+
+    cache.delete("key1")
+    assert cache.get("key1") is None
+    assert cache.backend.get("key1") is None
+
+    cache.clear()
+    assert cache.has("key2") is False
+
+
+def test_custom_backend():
+    """Test użycia dowolnego cache'a jako drugiej warstwy."""
+    backend = MemoryCache(ttl=100)
+    cache = TieredCache(ttl=100, backend=backend)
+    cache.set("key", "value")
+
+    assert backend.get("key") == "value"
+
+
+def test_cache_manager_creates_tiered_cache(temp_dir):
+    """Test tworzenia TieredCache przez CacheManager."""
+    cache = CacheManager.create(storage_type="tiered", ttl=100, cache_dir=temp_dir)
+
+    assert isinstance(cache, TieredCache)
+    assert isinstance(cache.backend, DiskCache)
+    assert cache.backend.cache_dir == temp_dir
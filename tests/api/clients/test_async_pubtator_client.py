@@ -0,0 +1,147 @@
+"""
+Unit tests for AsyncPubTatorClient and the token-bucket rate limiter.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.api.cache.cache import MemoryCache
+from src.api.clients.async_pubtator_client import AsyncPubTatorClient
+from src.api.clients.exceptions import PubTatorError
+from src.api.clients.rate_limit import TokenBucket, get_rate_limiter
+
+
+def _pubtator3_response(pmids):
+    response = MagicMock()
+    response.status_code = 200
+    response.ok = True
+    response.json.return_value = {
+        "PubTator3": [
+            {
+                "id": pmid,
+                "passages": [{
+                    "offset": 0,
+                    "text": f"Publication {pmid}",
+                    "infons": {"type": "title"},
+                    "annotations": []
+                }]
+            } for pmid in pmids
+        ]
+    }
+    return response
+
+
+class FakeSession:
+    """Session stand-in recording how many requests are in flight."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.calls.append((url, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return _pubtator3_response(params["pmids"].split(","))
+
+
+@pytest.fixture
+def fast_limiter():
+    return TokenBucket(rate=1000)
+
+
+def _client(session, limiter, **kwargs):
+    client = AsyncPubTatorClient(use_cache=False, session=session,
+                                 rate_limiter=limiter, **kwargs)
+    client._client.use_cache = True
+    client._client.cache = MemoryCache(ttl=100)
+    return client
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_spaces_requests_at_configured_rate(self):
+        """Test that tokens beyond the capacity are handed out at the given rate."""
+        limiter = TokenBucket(rate=50)
+
+        async def take(count):
+            for _ in range(count):
+                await limiter.acquire_async()
+
+        start = time.monotonic()
+        asyncio.run(take(6))
+        elapsed = time.monotonic() - start
+
+        # The first token is available immediately, the remaining five take 20 ms each
+        assert elapsed >= 0.09
+
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_named_limiters_are_shared(self):
+        """Test that limiters registered under one name are shared."""
+        assert get_rate_limiter("test-service", 5) is get_rate_limiter("test-service", 5)
+
+
+class TestAsyncPubTatorClient:
+    """Tests for AsyncPubTatorClient."""
+
+    def test_batches_are_fetched_concurrently(self, fast_limiter):
+        """Test that PMID batches are requested in parallel and returned in order."""
+        session = FakeSession()
+        client = _client(session, fast_limiter, max_concurrency=4, batch_size=2)
+        pmids = [str(i) for i in range(1, 9)]
+
+        docs = asyncio.run(client.get_publications_by_pmids(pmids))
+
+        assert [doc.id for doc in docs] == pmids
+        assert len(session.calls) == 4
+        assert session.max_in_flight > 1
+
+    def test_concurrency_is_bounded(self, fast_limiter):
+        """Test that no more than max_concurrency requests are in flight."""
+        session = FakeSession()
+        client = _client(session, fast_limiter, max_concurrency=2, batch_size=1)
+
+        asyncio.run(client.get_publications_by_pmids([str(i) for i in range(1, 7)]))
+
+        assert session.max_in_flight <= 2
+
+    def test_cached_documents_are_not_requested(self, fast_limiter):
+        """Test that the per-PMID document cache is shared with the sync client."""
+        session = FakeSession(delay=0)
+        client = _client(session, fast_limiter, batch_size=10)
+
+        asyncio.run(client.get_publications_by_pmids(["1", "2"]))
+        docs = asyncio.run(client.get_publications_by_pmids(["2", "3"]))
+
+        assert [doc.id for doc in docs] == ["2", "3"]
+        assert session.calls[-1][1]["pmids"] == "3"
+
+    def test_request_error_is_wrapped(self, fast_limiter):
+        """Test that HTTP errors are reported as PubTatorError."""
+        session = MagicMock()
+        session.get.return_value = MagicMock(status_code=500, text="error")
+        client = _client(session, fast_limiter)
+
+        with pytest.raises(PubTatorError):
+            asyncio.run(client.get_relations("@GENE_JAK1", "negative_correlate", "Chemical"))
+
+    def test_invalid_batch_size(self):
+        """Test that batch sizes above the API limit are rejected."""
+        with pytest.raises(ValueError):
+            AsyncPubTatorClient(use_cache=False, batch_size=101)
@@ -0,0 +1,66 @@
+"""
+Unit tests for incremental parsing of BioC JSON responses.
+"""
+
+import json
+
+import pytest
+
+from src.api.clients.bioc_stream import iter_json_array_items
+
+DOCUMENTS = [
+    {
+        "id": str(index),
+        "passages": [{
+            "offset": 0,
+            "text": 'Brackets [ { in "quotes" \\ and ünïcode ' * index,
+            "annotations": [{"id": "1", "locations": [{"offset": 0, "length": 5}], "score": 0.5, "x": None}]
+        }]
+    }
+    for index in range(5)
+]
+
+
+def _chunks(payload: bytes, size: int):
+    return [payload[start:start + size] for start in range(0, len(payload), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+@pytest.mark.parametrize("payload", [
+    {"PubTator3": DOCUMENTS},
+    {"source": "PubTator", "infons": {"a": ["]", {"b": "}"}]}, "count": 5, "ok": True, "documents": DOCUMENTS},
+    DOCUMENTS,
+])
+def test_items_are_parsed_from_any_chunking(payload, chunk_size):
+    """Test that splitting the input anywhere, even inside UTF-8 characters, gives the same documents."""
+    encoded = json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8")
+    assert list(iter_json_array_items(_chunks(encoded, chunk_size))) == DOCUMENTS
+
+
+def test_items_are_yielded_before_the_input_ends():
+    """Test that a document is available as soon as it has been received."""
+    encoded = json.dumps({"PubTator3": DOCUMENTS}).encode("utf-8")
+    received = []
+
+    def chunks():
+        for chunk in _chunks(encoded, 64):
+            received.append(chunk)
+            yield chunk
+
+    items = iter_json_array_items(chunks())
+    assert next(items) == DOCUMENTS[0]
+    assert sum(len(chunk) for chunk in received) < len(encoded)
+
+
+def test_empty_array_and_missing_key():
+    """Test an empty document list and an object without a document list."""
+    assert list(iter_json_array_items([b'{"PubTator3": []}'])) == []
+    with pytest.raises(KeyError):
+        list(iter_json_array_items([b'{"error": "Not found"}']))
+
+
+@pytest.mark.parametrize("payload", [b'{"PubTator3": [{"id": "1"}', b'{"PubTator3": [{"id": "1"} {"id": "2"}]}', b''])
+def test_malformed_input_raises_decode_error(payload):
+    """Test truncated and malformed responses."""
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array_items([payload]))
@@ -207,7 +207,7 @@ def client(request):
                     pytest.skip(f"Nie można stworzyć rzeczywistego klienta: {str(e)}")
         
     # Używamy zamockowanego klienta dla testów jednostkowych
-    with patch('requests.post') as mock_post, patch('requests.get') as mock_get:
+    with patch('requests.Session.request') as mock_request:
         mock_response_json = Mock()
         mock_response_json.text = json.dumps(SAMPLE_VARIANT_JSON)
         mock_response_json.json.return_value = SAMPLE_VARIANT_JSON
@@ -220,12 +220,11 @@ def client(request):
         mock_response_xml.ok = True
         
         # Mapowanie różnych endpointów na odpowiednie odpowiedzi
-        def get_side_effect(*args, **kwargs):
-            url = args[0] if args else kwargs.get('url', '')
-            params = kwargs.get('params', {})
+        def request_side_effect(*args, **kwargs):
+            url = kwargs.get('url', '')
             
             if "efetch.fcgi" in url:
-                if params.get('retmode') == 'xml':
+                if "retmode=xml" in url:
                     return mock_response_xml
                 return mock_response_json
             elif "esearch.fcgi" in url:
@@ -237,8 +236,7 @@ def client(request):
                 return mock_esearch
             return mock_response_json
             
-        mock_get.side_effect = get_side_effect
-        mock_post.side_effect = get_side_effect
+        mock_request.side_effect = request_side_effect
         
         yield ClinVarClient(email="test@example.com")
 
@@ -299,18 +297,20 @@ class TestPrivateMethods:
 
     def test_make_request_get(self, client, mock_response):
         """Test wykonania zapytania GET."""
-        with patch('requests.get', return_value=mock_response) as mock_get:
+        with patch.object(client.session, 'request', return_value=mock_response) as mock_request:
             response = client._make_request("test_endpoint", method="GET")
             
-            mock_get.assert_called_once()
+            mock_request.assert_called_once()
+            assert mock_request.call_args.kwargs["method"] == "GET"
             assert response == mock_response
 
     def test_make_request_post(self, client, mock_response):
         """Test wykonania zapytania POST."""
-        with patch('requests.post', return_value=mock_response) as mock_post:
+        with patch.object(client.session, 'request', return_value=mock_response) as mock_request:
             response = client._make_request("test_endpoint", method="POST")
             
-            mock_post.assert_called_once()
+            mock_request.assert_called_once()
+            assert mock_request.call_args.kwargs["method"] == "POST"
             assert response == mock_response
 
     def test_make_request_invalid_method(self, client):
@@ -322,16 +322,14 @@ class TestPrivateMethods:
         """Test wykonania zapytania z parametrami."""
         test_params = {"param1": "value1", "param2": "value2"}
     
-        with patch('requests.get', return_value=mock_response) as mock_get:
+        with patch.object(client.session, 'request', return_value=mock_response) as mock_request:
             client._make_request("test_endpoint", params=test_params)
     
-            # Sprawdź, czy została wywołana metoda requests.get
-            mock_get.assert_called_once()
+            # Sprawdź, czy zapytanie zostało wysłane przez sesję klienta
+            mock_request.assert_called_once()
             
             # Sprawdź, czy parametry są przesyłane w URL
-            args = mock_get.call_args[0]
-            # Sprawdź URL - pierwszy argument w call_args[0]
-            url = args[0]
+            url = mock_request.call_args.kwargs["url"]
             assert "param1=value1" in url or "param1" in url  # Parametry mogą być w różnej formie zależnie od implementacji
             assert "param2=value2" in url or "param2" in url
 
@@ -340,7 +338,7 @@ class TestPrivateMethods:
         rate_limit_response = Mock()
         rate_limit_response.status_code = 429
     
-        with patch('requests.get', return_value=rate_limit_response):
+        with patch.object(client.session, 'request', return_value=rate_limit_response):
             with pytest.raises(RateLimitError):
                 client._make_request("test_endpoint")
 
@@ -353,10 +351,10 @@ class TestPrivateMethods:
         client._last_request_time = 0
         
         with patch('time.sleep') as mock_sleep:
-            with patch('requests.get', side_effect=[server_error_response, mock_response]) as mock_get:
+            with patch.object(client.session, 'request', side_effect=[server_error_response, mock_response]) as mock_request:
                 response = client._make_request("test_endpoint")
                 
-                assert mock_get.call_count == 2
+                assert mock_request.call_count == 2
                 # Sprawdzamy tylko wywołania sleep dla retry, pomijamy rate limiting
                 retry_sleep_calls = [call for call in mock_sleep.call_args_list if call[0][0] >= 1.0]
                 assert len(retry_sleep_calls) == 1
@@ -367,13 +365,13 @@ class TestPrivateMethods:
         bad_response.status_code = 400
         bad_response.json.return_value = {"message": "Bad request parameters"}
         
-        with patch('requests.get', return_value=bad_response):
+        with patch.object(client.session, 'request', return_value=bad_response):
             with pytest.raises(InvalidParameterError):
                 client._make_request("test_endpoint")
 
     def test_make_request_general_error(self, client):
         """Test obsługi ogólnego błędu zapytania."""
-        with patch('requests.get', side_effect=requests.exceptions.RequestException("Connection error")):
+        with patch.object(client.session, 'request', side_effect=requests.exceptions.RequestException("Connection error")):
             with pytest.raises(APIRequestError):
                 client._make_request("test_endpoint")
 
@@ -1080,8 +1078,8 @@ class TestPublicMethods:
         # Tworzymy klienta z krótkim timeout
         test_client = ClinVarClient(email="test@example.com", timeout=1)
         
-        # Mockujemy requests.get, aby wywołał timeout
-        with patch('requests.get', side_effect=requests.exceptions.Timeout("Connection timed out")) as mock_get:
+        # Mockujemy zapytanie sesji, aby wywołało timeout
+        with patch.object(test_client.session, 'request', side_effect=requests.exceptions.Timeout("Connection timed out")):
             # Powinniśmy otrzymać APIRequestError
             with pytest.raises(APIRequestError) as exc_info:
                 test_client._make_request("test_endpoint")
@@ -1142,12 +1140,12 @@ class TestPublicMethods:
         
         # Mockujemy time.sleep, aby przyspieszyć testy
         with patch('time.sleep') as mock_sleep:
-            # Mockujemy requests.get aby zwracać błędy serwera, a potem sukces
-            with patch('requests.get', side_effect=[server_error_response, server_error_response, mock_response]) as mock_get:
+            # Mockujemy zapytanie sesji, aby zwracało błędy serwera, a potem sukces
+            with patch.object(test_client.session, 'request', side_effect=[server_error_response, server_error_response, mock_response]) as mock_request:
                 response = test_client._make_request("test_endpoint")
                 
-                # Sprawdzamy, czy funkcja get została wywołana 3 razy
-                assert mock_get.call_count == 3
+                # Sprawdzamy, czy zapytanie zostało wysłane 3 razy
+                assert mock_request.call_count == 3
                 # Sprawdzamy, czy sleep został wywołany 2 razy (po każdej nieudanej próbie)
                 assert mock_sleep.call_count >= 2
                 # Sprawdzamy, czy ostatecznie otrzymaliśmy prawidłową odpowiedź
@@ -774,4 +774,101 @@ class TestClinvarClient:
         client.save_variant_data(variants[0], output_file)
         
         # Verify file was written
-        mock_file.assert_called_with(output_file, "w", encoding="utf-8") 
\ No newline at end of file
+        mock_file.assert_called_with(output_file, "w", encoding="utf-8") 
+
+def _esearch_response(ids):
+    response = MagicMock()
+    response.json.return_value = {"esearchresult": {"count": str(len(ids)), "idlist": ids}}
+    return response
+
+
+def _esummary_response(ids):
+    result = {"uids": ids}
+    for uid in ids:
+        result[uid] = {
+            "uid": uid,
+            "title": f"NM_007294.4(BRCA1):c.{uid}A>G",
+            "obj_type": "single nucleotide variant",
+            "germline_classification": {
+                "description": "Pathogenic",
+                "trait_set": [{"trait_name": "Breast-ovarian cancer, familial 1"}]
+            },
+            "genes": [{"symbol": "BRCA1", "geneid": 672}],
+            "variation_set": [{
+                "variation_loc": [{"assembly_name": "GRCh38", "chr": "17",
+                                   "start": "43071077", "stop": "43071077"}]
+            }]
+        }
+    response = MagicMock()
+    response.json.return_value = {"result": result}
+    return response
+
+
+class TestBatchedSearch:
+    """
+    Tests for fetching search results in batched esummary/efetch calls.
+    """
+
+    def test_search_fetches_details_in_one_request(self):
+        """Test that all IDs found by esearch are summarised in a single call."""
+        client = ClinVarClient(use_cache=False)
+        ids = [str(i) for i in range(1, 51)]
+
+        with patch.object(client, "_make_request",
+                          side_effect=[_esearch_response(ids), _esummary_response(ids)]) as mock_request:
+            results = client.search_by_gene("BRCA1")
+
+        assert mock_request.call_count == 2
+        endpoint = mock_request.call_args_list[1][0][0]
+        params = mock_request.call_args_list[1][1]["params"]
+        assert endpoint == "esummary.fcgi"
+        assert params["id"] == ",".join(ids)
+        assert [variant["id"] for variant in results] == ids
+        assert results[0]["clinical_significance"] == "Pathogenic"
+        assert results[0]["genes"] == [{"symbol": "BRCA1", "id": "672"}]
+        assert results[0]["coordinates"][0]["chromosome"] == "17"
+
+    def test_details_are_fetched_in_chunks(self):
+        """Test that large result sets are split into DETAILS_BATCH_SIZE chunks."""
+        client = ClinVarClient(use_cache=False)
+        client.DETAILS_BATCH_SIZE = 2
+        ids = ["1", "2", "3", "4", "5"]
+
+        with patch.object(client, "_make_request", side_effect=[
+                _esearch_response(ids),
+                _esummary_response(["1", "2"]),
+                _esummary_response(["3", "4"]),
+                _esummary_response(["5"])]) as mock_request:
+            results = client.search_by_phenotype("Breast cancer")
+
+        assert mock_request.call_count == 4
+        assert [variant["id"] for variant in results] == ids
+
+    def test_missing_variants_get_basic_information(self):
+        """Test that IDs missing from a batch response keep their position."""
+        client = ClinVarClient(use_cache=False)
+
+        with patch.object(client, "_make_request", side_effect=[
+                _esearch_response(["1", "2", "3"]),
+                _esummary_response(["1", "3"])]):
+            results = client.search_by_gene("BRCA1")
+
+        assert [variant["id"] for variant in results] == ["1", "2", "3"]
+        assert results[1]["name"] == "Variant 2"
+        assert results[1]["clinical_significance"] == "Not provided"
+
+    def test_xml_batch_parses_every_clinvar_set(self):
+        """Test that efetch XML with several ClinVarSet elements yields every variant."""
+        client = ClinVarClient(use_cache=False)
+        xml_response = MagicMock()
+        xml_response.text = """<ReleaseSet>
+            <ClinVarSet><ReferenceClinVarAssertion><MeasureSet ID="1"><Name>first</Name></MeasureSet></ReferenceClinVarAssertion></ClinVarSet>
+            <ClinVarSet><ReferenceClinVarAssertion><MeasureSet ID="2"><Name>second</Name></MeasureSet></ReferenceClinVarAssertion></ClinVarSet>
+        </ReleaseSet>"""
+
+        with patch.object(client, "_make_request",
+                          side_effect=[_esearch_response(["1", "2"]), xml_response]) as mock_request:
+            results = client.search_by_gene("BRCA1", format_type="xml")
+
+        assert mock_request.call_args_list[1][0][0] == "efetch.fcgi"
+        assert len(results) == 2
@@ -15,7 +15,10 @@ import bioc
 from bioc import pubtator, BioCDocument, BioCPassage, BioCAnnotation, BioCLocation, biocjson
 
 from src.api.clients.pubtator_client import PubTatorClient
+from src.api.clients.rate_limit import TokenBucket
 from src.api.clients.exceptions import FormatNotSupportedException, PubTatorError
+from src.api.cache.cache import MemoryCache
+from src.models.entities.annotations import CompactDocument
 
 # Sample test data
 SAMPLE_BIOC_JSON = {
@@ -81,7 +84,7 @@ def client(request):
         yield PubTatorClient()
     else:
         # Use mocked client for unit tests
-        with patch('requests.post') as mock_post, patch('requests.get') as mock_get:
+        with patch('requests.Session.post') as mock_post, patch('requests.Session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.ok = True
@@ -204,9 +207,7 @@ class TestPrivateMethods:
 
     def test_wait_for_rate_limit(self):
         """Test rate limiting mechanism."""
-        client = PubTatorClient()
-        # Ustaw _last_request_time w przeszłości
-        client._last_request_time = time.time() - 1  # 1 sekunda temu
+        client = PubTatorClient(rate_limiter=TokenBucket(PubTatorClient.REQUESTS_PER_SECOND))
         
         # Pierwsze wywołanie powinno przejść bez czekania
         start_time = time.time()
@@ -218,17 +219,17 @@ class TestPrivateMethods:
         start_time = time.time()
         client._wait_for_rate_limit()
         elapsed = time.time() - start_time
-        assert elapsed >= client.API_REQUEST_INTERVAL
+        assert elapsed >= client.API_REQUEST_INTERVAL * 0.9
 
     def test_make_request_get(self, client, mock_response):
         """Test making GET request."""
-        with patch('requests.get', return_value=mock_response) as mock_get:
+        with patch('requests.Session.get', return_value=mock_response) as mock_get:
             client._make_request("test/endpoint", method="GET")
             mock_get.assert_called_once()
 
     def test_make_request_post(self, client, mock_response):
         """Test making POST request."""
-        with patch('requests.post', return_value=mock_response) as mock_post:
+        with patch('requests.Session.post', return_value=mock_response) as mock_post:
             client._make_request("test/endpoint", method="POST")
             mock_post.assert_called_once()
 
@@ -240,7 +241,7 @@ class TestPrivateMethods:
     def test_make_request_with_params(self, client, mock_response):
         """Test making request with parameters."""
         params = {"param1": "value1", "param2": "value2"}
-        with patch('requests.get', return_value=mock_response) as mock_get:
+        with patch('requests.Session.get', return_value=mock_response) as mock_get:
             client._make_request("test/endpoint", method="GET", params=params)
             mock_get.assert_called_once()
             # Sprawdź, czy przekazane parametry są poprawne
@@ -256,7 +257,7 @@ class TestPrivateMethods:
         tool = "custom-tool"
         client = PubTatorClient(email=email, tool=tool)
         
-        with patch('requests.get', return_value=mock_response) as mock_get:
+        with patch('requests.Session.get', return_value=mock_response) as mock_get:
             client._make_request("test/endpoint", method="GET")
             call_kwargs = mock_get.call_args[1]
             assert "params" in call_kwargs
@@ -265,7 +266,7 @@ class TestPrivateMethods:
 
     def test_make_request_failure(self, client):
         """Test behavior when request fails."""
-        with patch('requests.get', side_effect=requests.RequestException("Test error")):
+        with patch('requests.Session.get', side_effect=requests.RequestException("Test error")):
             with pytest.raises(PubTatorError):
                 client._make_request("test/endpoint", method="GET")
 
@@ -276,7 +277,7 @@ class TestPrivateMethods:
         error_response.text = "Not Found"
         error_response.__class__.__name__ = "Response"  # Wymuszamy, żeby nie został wykryty jako Mock
         
-        with patch('requests.get', return_value=error_response):
+        with patch('requests.Session.get', return_value=error_response):
             with pytest.raises(PubTatorError):
                 client._make_request("test/endpoint", method="GET")
 
@@ -403,13 +404,13 @@ class TestPublicMethods:
         
     def test_search_publications_error(self, client):
         """Test behavior when search fails."""
-        with patch('requests.get', side_effect=requests.RequestException("Test error")):
+        with patch('requests.Session.get', side_effect=requests.RequestException("Test error")):
             with pytest.raises(PubTatorError):
                 client.search_publications("test query")
                 
     def test_search_publications_empty_query(self, client):
         """Test searching with empty query."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.ok = True
@@ -511,7 +512,7 @@ class TestPublicMethods:
     @pytest.mark.parametrize("use_mock", [True, False])
     def test_get_relations(self, client, use_mock):
         """Test retrieving relations between entities."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.ok = True
@@ -528,14 +529,14 @@ class TestPublicMethods:
             
     def test_get_relations_error(self, client):
         """Test behavior when retrieving relations fails."""
-        with patch('requests.get', side_effect=requests.RequestException("Test error")):
+        with patch('requests.Session.get', side_effect=requests.RequestException("Test error")):
             with pytest.raises(PubTatorError):
                 client.get_relations("@GENE_JAK1", "negative_correlate", "Chemical")
                 
     @pytest.mark.parametrize("use_mock", [True, False])
     def test_get_publications(self, client, use_mock):
         """Test retrieving publications in raw JSON format."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.ok = True
@@ -548,13 +549,13 @@ class TestPublicMethods:
             
     def test_get_publications_error(self, client):
         """Test behavior when retrieving publications fails."""
-        with patch('requests.get', side_effect=requests.RequestException("Test error")):
+        with patch('requests.Session.get', side_effect=requests.RequestException("Test error")):
             with pytest.raises(PubTatorError):
                 client.get_publications("12345")
                 
     def test_get_publications_not_found(self, client):
         """Test behavior when publication is not found."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 404
             mock_response.ok = False
@@ -654,7 +655,7 @@ def test_get_annotation_types():
 # Error handling tests
 def test_request_error_handling():
     """Test handling request errors."""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         mock_get.side_effect = requests.RequestException("API Error")
         client = PubTatorClient()
         with pytest.raises(PubTatorError) as exc_info:
@@ -999,7 +1000,7 @@ def test_timeout_handling():
     """Test handling of response timeouts."""
     client = PubTatorClient(timeout=1)  # use integer value
     
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         mock_get.side_effect = requests.Timeout("Connection timed out")
         
         with pytest.raises(PubTatorError) as exc_info:
@@ -1010,7 +1011,7 @@ def test_timeout_handling():
     client = PubTatorClient(timeout=60)
     assert client.timeout == 60
     
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.ok = True
@@ -1027,7 +1028,7 @@ class TestErrorHandling:
     
     def test_request_error_handling(self):
         """Test handling request errors."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_get.side_effect = requests.RequestException("API Error")
             client = PubTatorClient()
             with pytest.raises(PubTatorError) as exc_info:
@@ -1075,7 +1076,7 @@ class TestErrorHandling:
         """Test handling of response timeouts."""
         client = PubTatorClient(timeout=1)  # use integer value
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_get.side_effect = requests.Timeout("Connection timed out")
             
             with pytest.raises(PubTatorError) as exc_info:
@@ -1087,7 +1088,7 @@ class TestErrorHandling:
         # Wyłączamy cache, aby uniknąć problemów z zapisywaniem mocka
         client.use_cache = False
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.ok = True
@@ -1103,7 +1104,7 @@ class TestErrorHandling:
                     
     def test_connection_error_handling(self, client):
         """Test handling of connection errors."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_get.side_effect = requests.ConnectionError("Connection failed")
             
             with pytest.raises(PubTatorError) as exc_info:
@@ -1291,7 +1292,7 @@ class TestPerformance:
         """Test that caching works correctly."""
         client = PubTatorClient(use_cache=True, cache_storage_type="memory")
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             # Przygotowanie mocka z odpowiednimi właściwościami
             mock_response = MagicMock()
             mock_response.status_code = 200
@@ -1315,7 +1316,7 @@ class TestPerformance:
         """Test that cache entries expire after TTL."""
         client = PubTatorClient(use_cache=True, cache_storage_type="memory", cache_ttl=1)  # 1 sekunda TTL
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             # Przygotowanie mocka z odpowiednimi właściwościami
             mock_response = MagicMock()
             mock_response.status_code = 200
@@ -1342,6 +1343,148 @@ class TestPerformance:
                 client.get_publications_by_pmids(["12345"])
                 assert mock_get.call_count == 2
 
+class TestDocumentCache:
+    """Tests for the per-PMID document cache of get_publications_by_pmids."""
+
+    @staticmethod
+    def _pubtator3_response(pmids):
+        response = MagicMock()
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = {
+            "PubTator3": [
+                {
+                    "id": pmid,
+                    "passages": [{
+                        "offset": 0,
+                        "text": f"Publication {pmid} about BRCA1",
+                        "infons": {"type": "title"},
+                        "annotations": [{
+                            "id": "1",
+                            "text": "BRCA1",
+                            "infons": {"type": "Gene", "identifier": "672"},
+                            "locations": [{"offset": 21, "length": 5}]
+                        }]
+                    }]
+                } for pmid in pmids
+            ]
+        }
+        payload = json.dumps(response.json.return_value).encode("utf-8")
+        response.iter_content.side_effect = lambda chunk_size: (
+            payload[start:start + 16] for start in range(0, len(payload), 16))
+        return response
+
+    @pytest.fixture
+    def cached_client(self):
+        client = PubTatorClient(use_cache=False)
+        client.use_cache = True
+        client.cache = MemoryCache(ttl=100)
+        return client
+
+    def _fake_make_request(self, available_pmids=None):
+        def make_request(endpoint, params=None, **kwargs):
+            requested = params["pmids"].split(",")
+            if available_pmids is not None:
+                requested = [pmid for pmid in requested if pmid in available_pmids]
+            return self._pubtator3_response(requested)
+        return make_request
+
+    def test_overlapping_batch_fetches_only_missing_pmids(self, cached_client):
+        """Test that only PMIDs missing from the cache are requested."""
+        with patch.object(cached_client, '_make_request',
+                          side_effect=self._fake_make_request()) as mock_request:
+            cached_client.get_publications_by_pmids(["1", "2", "3"])
+            docs = cached_client.get_publications_by_pmids(["2", "3", "4"])
+
+        assert mock_request.call_count == 2
+        assert mock_request.call_args_list[1].kwargs["params"]["pmids"] == "4"
+        assert [doc.id for doc in docs] == ["2", "3", "4"]
+        assert docs[0].passages[0].annotations[0].infons["identifier"] == "672"
+
+    def test_fully_cached_batch_makes_no_request(self, cached_client):
+        """Test that a batch of cached PMIDs is served without an API call."""
+        with patch.object(cached_client, '_make_request',
+                          side_effect=self._fake_make_request()) as mock_request:
+            cached_client.get_publications_by_pmids(["1", "2"])
+            docs = cached_client.get_publications_by_pmids(["2", "1"])
+
+        assert mock_request.call_count == 1
+        assert [doc.id for doc in docs] == ["2", "1"]
+
+    def test_concept_order_does_not_change_cache_key(self, cached_client):
+        """Test that documents are keyed by the concept set, not its order."""
+        assert (cached_client._get_document_cache_key("1", ["gene", "Disease"]) ==
+                cached_client._get_document_cache_key("1", ["disease", "gene"]))
+        assert (cached_client._get_document_cache_key("1", ["gene"]) !=
+                cached_client._get_document_cache_key("1", None))
+
+    def test_missing_documents_are_cached(self, cached_client):
+        """Test that PMIDs without a document are not requested again."""
+        with patch.object(cached_client, '_make_request',
+                          side_effect=self._fake_make_request({"1"})) as mock_request:
+            first = cached_client.get_publications_by_pmids(["1", "2"])
+            second = cached_client.get_publications_by_pmids(["1", "2"])
+
+        assert mock_request.call_count == 1
+        assert [doc.id for doc in first] == ["1"]
+        assert [doc.id for doc in second] == ["1"]
+
+    def test_renamed_document_is_not_cached_as_missing(self, cached_client):
+        """Test that a requested PMID answered with another document ID is requested again."""
+        with patch.object(cached_client, '_make_request',
+                          return_value=self._pubtator3_response(["99"])) as mock_request:
+            first = cached_client.get_publications_by_pmids(["1"])
+            second = cached_client.get_publications_by_pmids(["1"])
+            streamed = list(cached_client.iter_publications_by_pmids(["1"]))
+
+        assert mock_request.call_count == 3
+        assert [doc.id for doc in first] == ["99"]
+        assert [doc.id for doc in second] == ["99"]
+        assert [doc.id for doc in streamed] == ["99"]
+
+    def test_iter_publications_streams_and_caches_documents(self, cached_client):
+        """Test that documents are parsed from a streamed response batch by batch."""
+        with patch.object(cached_client, '_make_request',
+                          side_effect=self._fake_make_request({"1", "2", "3"})) as mock_request:
+            documents = cached_client.iter_publications_by_pmids(["1", "2", "3", "4"], batch_size=2)
+            first = next(documents)
+
+            assert first.id == "1"
+            assert first.passages[0].annotations[0].locations[0].offset == 21
+            assert mock_request.call_count == 1
+            assert mock_request.call_args.kwargs["stream"] is True
+            assert [doc.id for doc in documents] == ["2", "3"]
+
+            cached = list(cached_client.iter_publications_by_pmids(["4", "3", "2", "1"], batch_size=2))
+
+        assert mock_request.call_count == 2
+        assert [doc.id for doc in cached] == ["3", "2", "1"]
+
+    def test_compact_documents_are_cached_separately(self, cached_client):
+        """Test that compact documents are returned and cached apart from BioC documents."""
+        with patch.object(cached_client, '_make_request',
+                          side_effect=self._fake_make_request()) as mock_request:
+            compact = cached_client.get_publications_by_pmids(["1"], compact=True)
+            cached = cached_client.get_publications_by_pmids(["1"], compact=True)
+            full = cached_client.get_publications_by_pmids(["1"])
+
+        assert mock_request.call_count == 2
+        for docs in (compact, cached):
+            assert isinstance(docs[0], CompactDocument)
+            annotation = docs[0].passages[0].annotations[0]
+            assert (annotation.type, annotation.identifier, annotation.offset) == ("Gene", "672", 21)
+        assert isinstance(full[0], bioc.BioCDocument)
+
+    def test_iter_publications_unexpected_format(self, cached_client):
+        """Test that a streamed response without documents raises PubTatorError."""
+        response = self._pubtator3_response([])
+        response.iter_content.side_effect = lambda chunk_size: iter([b'{"error": "Too many PMIDs"}'])
+
+        with patch.object(cached_client, '_make_request', return_value=response):
+            with pytest.raises(PubTatorError, match="Unexpected response format"):
+                list(cached_client.iter_publications_by_pmids(["1"]))
+
+
 class TestEdgeCases:
     """Tests for edge cases in PubTatorClient."""
     
@@ -27,7 +27,7 @@ class TestPubTatorClient:
         assert client.email == "test@example.com"
         assert client.tool == "custom_tool"
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_build_request_url(self, mock_get):
         """Test building a request URL."""
         mock_get.return_value = MagicMock(status_code=200)
@@ -40,7 +40,7 @@ class TestPubTatorClient:
         assert "email=test%40example.com" in url
         assert "tool=pythonPubTatorClient" in url
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_annotations_by_pmid(self, mock_get):
         """Test getting annotations for a specific PMID."""
         mock_response = MagicMock()
@@ -77,7 +77,7 @@ class TestPubTatorClient:
         assert len(result["passages"][0]["annotations"]) == 1
         assert result["passages"][0]["annotations"][0]["text"] == "BRCA1"
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_annotations_by_pmid_error(self, mock_get):
         """Test handling error when getting annotations for a PMID."""
         mock_response = MagicMock()
@@ -93,7 +93,7 @@ class TestPubTatorClient:
         assert "Error retrieving annotations" in str(excinfo.value)
         assert "404" in str(excinfo.value)
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_annotations_by_pmid_connection_error(self, mock_get):
         """Test handling connection error when getting annotations."""
         mock_get.side_effect = requests.exceptions.RequestException("Connection error")
@@ -104,7 +104,7 @@ class TestPubTatorClient:
         
         assert "Connection error" in str(excinfo.value)
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_annotations_for_multiple_pmids(self, mock_get):
         """Test getting annotations for multiple PMIDs."""
         mock_response = MagicMock()
@@ -165,7 +165,7 @@ class TestPubTatorClient:
         assert len(results[1]["passages"][0]["annotations"]) == 2
         assert results[1]["passages"][0]["annotations"][1]["text"] == "p.V600E"
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_annotations_for_multiple_pmids_empty_list(self, mock_get):
         """Test getting annotations for an empty list of PMIDs."""
         client = PubTatorClient()
@@ -174,7 +174,7 @@ class TestPubTatorClient:
         mock_get.assert_not_called()
         assert results == []
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_extract_mutations_from_annotations(self, mock_get):
         """Test extracting mutations from annotations."""
         annotations = {
@@ -211,7 +211,7 @@ class TestPubTatorClient:
         assert "c.123A>G" in mutations
         assert "p.V600E" in mutations
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_extract_mutations_no_mutations(self, mock_get):
         """Test extracting mutations when no mutations are present."""
         annotations = {
@@ -236,7 +236,7 @@ class TestPubTatorClient:
         assert mutations is not None
         assert len(mutations) == 0
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_extract_genes_from_annotations(self, mock_get):
         """Test extracting genes from annotations."""
         annotations = {
@@ -273,7 +273,7 @@ class TestPubTatorClient:
         assert "BRCA1" in genes
         assert "BRAF" in genes
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_extract_genes_no_genes(self, mock_get):
         """Test extracting genes when no genes are present."""
         annotations = {
@@ -298,7 +298,7 @@ class TestPubTatorClient:
         assert genes is not None
         assert len(genes) == 0
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_extract_diseases_from_annotations(self, mock_get):
         """Test extracting diseases from annotations."""
         annotations = {
@@ -335,7 +335,7 @@ class TestPubTatorClient:
         assert "breast cancer" in diseases
         assert "melanoma" in diseases
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_mutations_for_pmid(self, mock_get):
         """Test getting mutations for a specific PMID."""
         mock_response = MagicMock()
@@ -370,7 +370,7 @@ class TestPubTatorClient:
         assert "c.123A>G" in mutations
         assert "p.V600E" in mutations
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_genes_for_pmid(self, mock_get):
         """Test getting genes for a specific PMID."""
         mock_response = MagicMock()
@@ -405,7 +405,7 @@ class TestPubTatorClient:
         assert "BRCA1" in genes
         assert "BRAF" in genes
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_diseases_for_pmid(self, mock_get):
         """Test getting diseases for a specific PMID."""
         mock_response = MagicMock()
@@ -440,7 +440,7 @@ class TestPubTatorClient:
         assert "breast cancer" in diseases
         assert "melanoma" in diseases
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_get_mutations_for_multiple_pmids(self, mock_get):
         """Test getting mutations for multiple PMIDs."""
         mock_response = MagicMock()
@@ -489,7 +489,7 @@ class TestPubTatorClient:
         assert "p.V600E" in mutations_by_pmid["23456789"]
     
     @patch('builtins.open', new_callable=mock_open)
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_save_annotations(self, mock_get, mock_file):
         """Test saving annotations to a file."""
         annotations = {
@@ -530,7 +530,7 @@ class TestPubTatorClient:
         with pytest.raises(IOError):
             client.save_annotations(annotations, "invalid/path.json")
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_merge_annotations(self, mock_get):
         """Test merging annotations from multiple sources."""
         annotation1 = {
@@ -580,7 +580,7 @@ class TestPubTatorClient:
     
     # Integration tests
     
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_integration_get_and_extract(self, mock_get):
         """Integration test for getting and extracting annotations."""
         mock_response = MagicMock()
@@ -634,7 +634,7 @@ class TestPubTatorClient:
         assert "breast cancer" in diseases
     
     @patch('builtins.open', new_callable=mock_open)
-    @patch('src.api.clients.pubtator_client.requests.get')
+    @patch('src.api.clients.pubtator_client.requests.Session.get')
     def test_integration_full_pipeline(self, mock_get, mock_file, temp_dir):
         """Integration test for running the full annotation pipeline."""
         # Mock response for multiple PMIDs
@@ -0,0 +1,55 @@
+"""
+Tests for the shared HTTP transport used by the API clients.
+"""
+
+import requests
+import pytest
+
+from src.api.clients import transport
+from src.api.clients.clinvar_client import ClinVarClient
+from src.api.clients.pubtator_client import PubTatorClient
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_session():
+    """Make sure every test starts without a shared session."""
+    transport.close_session()
+    yield
+    transport.close_session()
+
+
+def test_create_session_mounts_pooled_adapters():
+    """Test that sessions use keep-alive pools and negotiate gzip."""
+    session = transport.create_session(
+        pool_maxsize=4,
+        host_pool_sizes={"https://eutils.ncbi.nlm.nih.gov/": 7})
+
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.headers["Connection"] == "keep-alive"
+    assert session.get_adapter("https://example.org/")._pool_maxsize == 4
+    assert session.get_adapter("https://eutils.ncbi.nlm.nih.gov/entrez")._pool_maxsize == 7
+
+
+def test_get_session_returns_shared_instance():
+    """Test that the shared session is created once and reused."""
+    assert transport.get_session() is transport.get_session()
+
+
+def test_configure_session_replaces_shared_session():
+    """Test that the shared session can be reconfigured."""
+    previous = transport.get_session()
+    session = transport.configure_session(pool_maxsize=2)
+
+    assert session is not previous
+    assert transport.get_session() is session
+
+
+def test_clients_share_session_by_default():
+    """Test that clients use the shared session unless one is injected."""
+    pubtator = PubTatorClient(use_cache=False)
+    clinvar = ClinVarClient(use_cache=False)
+    assert pubtator.session is clinvar.session is transport.get_session()
+
+    custom = requests.Session()
+    assert PubTatorClient(use_cache=False, session=custom).session is custom
+    assert ClinVarClient(use_cache=False, session=custom).session is custom
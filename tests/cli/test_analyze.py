@@ -0,0 +1,126 @@
+"""
+Tests for the streaming, checkpointed mode of the analyze CLI.
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.analysis.llm.context_analyzer import UnifiedLlmContextAnalyzer
+from src.cli.analyze import CheckpointManifest, analyze_pmids, drop_unfinished_rows, stream_pmids
+
+
+def _relationships(pmid):
+    return [{"pmid": pmid, "variant_text": f"V{pmid}", "entity_text": "melanoma",
+             "has_relationship": True, "relationship_score": 7}]
+
+
+def _make_analyzer(fail_after=None):
+    """Creates an analyzer whose analysis is replaced by a deterministic fake."""
+    analyzer = UnifiedLlmContextAnalyzer.__new__(UnifiedLlmContextAnalyzer)
+    analyzer.processed = []
+    
+    def iter_publication_relationships(pmids, chunk_size=50, max_concurrency=1):
+        for pmid in pmids:
+            if fail_after is not None and len(analyzer.processed) == fail_after:
+                raise RuntimeError("LLM provider unavailable")
+            analyzer.processed.append(pmid)
+            yield pmid, _relationships(pmid)
+    
+    analyzer.iter_publication_relationships = iter_publication_relationships
+    return analyzer
+
+
+def _read_csv_pmids(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["pmid"] for row in csv.DictReader(f)]
+
+
+def test_stream_writes_rows_and_checkpoint(tmp_path):
+    """Test that results and the manifest are written per publication."""
+    output_csv = str(tmp_path / "out.csv")
+    output_jsonl = str(tmp_path / "out.jsonl")
+    
+    written = stream_pmids(_make_analyzer(), ["1", "2", "3"], output_csv, output_jsonl=output_jsonl)
+    
+    assert written == 3
+    assert _read_csv_pmids(output_csv) == ["1", "2", "3"]
+    with open(output_jsonl, encoding="utf-8") as f:
+        assert [json.loads(line)["pmid"] for line in f] == ["1", "2", "3"]
+    assert CheckpointManifest(output_csv + ".checkpoint").completed == {"1", "2", "3"}
+
+
+def test_resume_after_crash(tmp_path):
+    """Test that --resume skips publications finished before a crash."""
+    output_csv = str(tmp_path / "out.csv")
+    
+    with pytest.raises(RuntimeError):
+        stream_pmids(_make_analyzer(fail_after=2), ["1", "2", "3", "4"], output_csv, retry_on_failure=False)
+    assert _read_csv_pmids(output_csv) == ["1", "2"]
+    
+    analyzer = _make_analyzer()
+    stream_pmids(analyzer, ["1", "2", "3", "4"], output_csv, resume=True)
+    
+    assert analyzer.processed == ["3", "4"]
+    assert _read_csv_pmids(output_csv) == ["1", "2", "3", "4"]
+
+
+def test_retry_continues_with_remaining_pmids(tmp_path):
+    """Test that a retry does not analyze finished publications again."""
+    analyzer = _make_analyzer()
+    output_csv = str(tmp_path / "out.csv")
+    
+    def fail_once(pmids, chunk_size=50, max_concurrency=1):
+        if not analyzer.failed:
+            analyzer.failed = True
+            yield pmids[0], _relationships(pmids[0])
+            raise RuntimeError("timeout")
+        for pmid in pmids:
+            analyzer.processed.append(pmid)
+            yield pmid, _relationships(pmid)
+    
+    analyzer.failed = False
+    analyzer.iter_publication_relationships = fail_once
+    stream_pmids(analyzer, ["1", "2", "3"], output_csv, retry_delay=0)
+    
+    assert analyzer.processed == ["2", "3"]
+    assert _read_csv_pmids(output_csv) == ["1", "2", "3"]
+
+
+def test_new_run_starts_over(tmp_path):
+    """Test that a run without resume discards earlier output and checkpoint."""
+    output_csv = str(tmp_path / "out.csv")
+    stream_pmids(_make_analyzer(), ["1", "2"], output_csv)
+    
+    analyzer = _make_analyzer()
+    stream_pmids(analyzer, ["1", "2"], output_csv)
+    
+    assert analyzer.processed == ["1", "2"]
+    assert _read_csv_pmids(output_csv) == ["1", "2"]
+
+
+def test_drop_unfinished_rows(tmp_path):
+    """Test removing rows of publications that are not in the manifest."""
+    output_csv = str(tmp_path / "out.csv")
+    output_jsonl = str(tmp_path / "out.jsonl")
+    analyzer = _make_analyzer()
+    for pmid in ["1", "2"]:
+        analyzer.append_relationships_to_csv(_relationships(pmid), output_csv)
+        analyzer.append_relationships_to_jsonl(_relationships(pmid), output_jsonl)
+    with open(output_jsonl, "a", encoding="utf-8") as f:
+        f.write('{"pmid": "3", "varia')
+    
+    drop_unfinished_rows(output_csv, {"1"})
+    drop_unfinished_rows(output_jsonl, {"1"})
+    
+    assert _read_csv_pmids(output_csv) == ["1"]
+    with open(output_jsonl, encoding="utf-8") as f:
+        assert [json.loads(line)["pmid"] for line in f] == ["1"]
+
+
+@pytest.mark.parametrize("stream, resume", [(True, False), (False, True)])
+def test_batch_mode_rejects_streaming(tmp_path, stream, resume):
+    """Test that batch mode is not silently dropped in streaming mode."""
+    with pytest.raises(ValueError, match="Batch mode"):
+        analyze_pmids(["1"], str(tmp_path / "out.csv"), use_batch=True, stream=stream, resume=resume)
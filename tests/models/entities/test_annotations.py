@@ -0,0 +1,96 @@
+"""
+Tests for the compact annotation model.
+"""
+
+import sys
+
+import bioc
+from bioc import biocjson
+
+from src.models.entities.annotations import (
+    CompactAnnotation,
+    CompactDocument,
+    CompactPassage,
+    as_compact_passage,
+    document_from_bioc,
+    document_from_json,
+)
+
+DOCUMENT_JSON = {
+    "id": "32735606",
+    "infons": {"journal": "Test J"},
+    "passages": [{
+        "offset": 0,
+        "text": "BRAF V600E in melanoma",
+        "infons": {"type": "title"},
+        "annotations": [
+            {"id": "1", "text": "BRAF", "infons": {"type": "Gene", "identifier": "673", "ncbi_homologene": "3197"},
+             "locations": [{"offset": 0, "length": 4}]},
+            {"id": "2", "text": "V600E", "infons": {"type": "Mutation", "identifier": "tmVar:p|SUB|V|600|E"},
+             "locations": [{"offset": 5, "length": 5}]},
+            {"id": "3", "text": "melanoma", "infons": {"type": "Disease", "identifier": "MESH:D008545"},
+             "locations": [{"offset": 14, "length": 8}]},
+        ]
+    }]
+}
+
+
+def test_document_from_json():
+    """Test building a compact document from PubTator3 JSON."""
+    document = document_from_json(DOCUMENT_JSON)
+
+    assert document.id == "32735606"
+    passage = document.passages[0]
+    assert passage.infons == {"type": "title"}
+    assert [a.text for a in passage.annotations] == ["BRAF", "V600E", "melanoma"]
+    gene = passage.annotations[0]
+    assert (gene.type, gene.identifier, gene.offset, gene.length) == ("Gene", "673", 0, 4)
+    assert gene.type is sys.intern("Gene")
+    assert not hasattr(gene, "__dict__")
+
+
+def test_annotations_by_type():
+    """Test grouping annotations by type."""
+    passage = document_from_json(DOCUMENT_JSON).passages[0]
+    passage.annotations.append(CompactAnnotation("4", "untyped", None))
+
+    by_type = passage.annotations_by_type()
+
+    assert sorted(by_type) == ["Disease", "Gene", "Mutation"]
+    assert passage.annotations_by_type() is by_type
+    assert [a.text for a in passage.annotations_of_type("Mutation", "Gene")] == ["V600E", "BRAF"]
+
+
+def test_conversion_from_bioc_matches_json():
+    """Test that BioC objects and JSON give the same compact document."""
+    passages = [dict(passage, sentences=[], relations=[]) for passage in DOCUMENT_JSON["passages"]]
+    bioc_document = biocjson.fromJSON(dict(DOCUMENT_JSON, passages=passages, relations=[]), "BioCDocument")
+
+    converted = document_from_bioc(bioc_document)
+
+    expected = document_from_json(DOCUMENT_JSON)
+    assert converted.passages[0].annotations == expected.passages[0].annotations
+    assert document_from_bioc(converted) is converted
+    assert as_compact_passage(converted.passages[0]) is converted.passages[0]
+
+
+def test_to_json_round_trip():
+    """Test that serialized documents can be read back by both parsers."""
+    document = document_from_json(DOCUMENT_JSON)
+
+    data = document.to_json()
+
+    assert document_from_json(data).passages[0].annotations == document.passages[0].annotations
+    bioc_document = biocjson.fromJSON(data, "BioCDocument")
+    assert isinstance(bioc_document, bioc.BioCDocument)
+    # Only type and identifier infons are kept
+    assert bioc_document.passages[0].annotations[0].infons == {"type": "Gene", "identifier": "673"}
+
+
+def test_empty_document():
+    """Test a document without passages and a passage without annotations."""
+    assert document_from_json({"id": "1"}).passages == []
+    passage = CompactPassage(0, "No entities")
+    assert passage.annotations_by_type() == {}
+    assert CompactDocument("1", passages=[passage]).to_json()["passages"][0]["annotations"] == []
+    assert CompactAnnotation("1", "x", "Gene").offset is None
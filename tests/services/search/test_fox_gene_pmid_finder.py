@@ -57,7 +57,7 @@ def test_load_genes_file_not_found():
         finder.load_genes_from_file("nonexistent_file.txt")
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_find_pmids_for_genes(mock_get, mock_gene_file):
     """Test finding PMIDs for genes."""
     # Setup mock response
@@ -84,7 +84,7 @@ def test_find_pmids_for_genes(mock_get, mock_gene_file):
     assert '345678' in pmids
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_save_pmids_to_file(mock_get, mock_gene_file, mock_output_file):
     """Test saving PMIDs to a file."""
     # Setup mock response
@@ -119,7 +119,7 @@ def test_save_pmids_no_pmids(mock_output_file):
         finder.save_pmids_to_file(mock_output_file)
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_process_and_save(mock_get, mock_gene_file, mock_output_file):
     """Test the process_and_save convenience method."""
     # Setup mock response
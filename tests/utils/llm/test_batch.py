@@ -0,0 +1,81 @@
+"""
+Tests for offline LLM batch processing.
+"""
+import json
+
+import pytest
+
+from src.models.data.clients.exceptions import LLMError
+from src.utils.llm.batch import (BatchSubmitter, LocalBatchSubmitter, read_batch_results,
+                                 run_batch, write_batch_file)
+
+
+def test_write_batch_file_format(tmp_path):
+    """Test that batch files use the provider batch JSONL format."""
+    path = tmp_path / "input.jsonl"
+    count = write_batch_file([("a", "system", "user a"), ("b", "system", "user b")], str(path), "test-model")
+    
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert count == 2
+    assert [line["custom_id"] for line in lines] == ["a", "b"]
+    assert lines[0]["method"] == "POST"
+    assert lines[0]["url"] == "/v1/chat/completions"
+    assert lines[0]["body"]["model"] == "test-model"
+    assert lines[0]["body"]["messages"] == [{"role": "system", "content": "system"},
+                                            {"role": "user", "content": "user a"}]
+
+
+def test_local_submitter_round_trip(tmp_path):
+    """Test running a batch through the local submitter."""
+    input_path = tmp_path / "input.jsonl"
+    write_batch_file([("a", "system", "first"), ("b", "system", "fail"), ("c", "system", "third")],
+                     str(input_path), "test-model")
+    
+    def responder(messages):
+        if messages[1]["content"] == "fail":
+            raise RuntimeError("rate limited")
+        return messages[1]["content"].upper()
+    
+    submitter = LocalBatchSubmitter(responder, str(tmp_path / "work"))
+    results = run_batch(submitter, str(input_path), str(tmp_path / "output.jsonl"), poll_interval=0)
+    
+    assert results == {"a": "FIRST", "c": "THIRD"}
+
+
+def test_read_batch_results_skips_errors(tmp_path):
+    """Test that failed and malformed entries are skipped."""
+    path = tmp_path / "output.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"custom_id": "ok", "error": None, "response": {
+            "status_code": 200, "body": {"choices": [{"message": {"content": "answer"}}]}}}),
+        json.dumps({"custom_id": "http_error", "error": None, "response": {"status_code": 500, "body": {}}}),
+        "not json",
+        ""
+    ]), encoding="utf-8")
+    
+    assert read_batch_results(str(path)) == {"ok": "answer"}
+
+
+class _StatusSubmitter(BatchSubmitter):
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+    
+    def submit(self, input_path):
+        return "batch_1"
+    
+    def get_status(self, batch_id):
+        return self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+
+
+def test_run_batch_failed_status(tmp_path):
+    """Test that a failed batch raises LLMError."""
+    with pytest.raises(LLMError):
+        run_batch(_StatusSubmitter(["in_progress", "failed"]), "in.jsonl", str(tmp_path / "out.jsonl"),
+                  poll_interval=0)
+
+
+def test_run_batch_timeout(tmp_path):
+    """Test that waiting for a batch stops after the timeout."""
+    with pytest.raises(LLMError):
+        run_batch(_StatusSubmitter(["in_progress"]), "in.jsonl", str(tmp_path / "out.jsonl"),
+                  poll_interval=0.01, timeout=0.05)
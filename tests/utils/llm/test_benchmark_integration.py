@@ -83,7 +83,7 @@ class TestBenchmarkIntegration:
              patch('src.analysis.BenchmarkTestService.PubmedEndpoint') as mock_pubmed:
             
             # Mock PubmedEndpoint to return test text
-            mock_pubmed.fetch_full_text_from_pubmed_id.return_value = "Test publication text"
+            mock_pubmed.return_value.fetch_full_text_from_pubmed_id.return_value = "Test publication text"
             
             # Create BenchmarkTestService
             service = BenchmarkTestService(
@@ -107,7 +107,7 @@ class TestBenchmarkIntegration:
                 result = service.manual_test_coordinate_search(pmids)
                 
                 # Verify PubmedEndpoint was called
-                mock_pubmed.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
+                mock_pubmed.return_value.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
                 
                 # Verify CoordinatesInference.extract_coordinates_from_text was called
                 mock_coords_instance.extract_coordinates_from_text.assert_called_once_with("Test publication text")
@@ -135,7 +135,7 @@ class TestBenchmarkIntegration:
              patch('src.analysis.BenchmarkTestService.PubmedEndpoint') as mock_pubmed:
             
             # Mock PubmedEndpoint to return test text
-            mock_pubmed.fetch_full_text_from_pubmed_id.return_value = "Test publication text"
+            mock_pubmed.return_value.fetch_full_text_from_pubmed_id.return_value = "Test publication text"
             
             # Create BenchmarkTestService
             service = BenchmarkTestService(
@@ -158,7 +158,7 @@ class TestBenchmarkIntegration:
                 found, links_valid = service.perform_simple_benchmark_test(sample_benchmark_test)
                 
                 # Verify method calls
-                mock_pubmed.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
+                mock_pubmed.return_value.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
                 mock_coords_instance.extract_coordinates_from_text.assert_called_once_with("Test publication text")
                 mock_coords_instance.process_coordinate.assert_called_once_with(
                     "NM_000546.5:c.215C>G", 
@@ -177,7 +177,7 @@ class TestBenchmarkIntegration:
              patch('src.analysis.BenchmarkTestService.PubmedEndpoint') as mock_pubmed:
             
             # Mock PubmedEndpoint to return test text
-            mock_pubmed.fetch_full_text_from_pubmed_id.return_value = "Test publication text with multiple paragraphs.\n\nSecond paragraph."
+            mock_pubmed.return_value.fetch_full_text_from_pubmed_id.return_value = "Test publication text with multiple paragraphs.\n\nSecond paragraph."
             
             # Create BenchmarkTestService
             service = BenchmarkTestService(
@@ -203,7 +203,7 @@ class TestBenchmarkIntegration:
                 texts = service.prepare_texts_from_pmids(pmids)
                 
                 # Verify PubmedEndpoint and splitter were called correctly
-                mock_pubmed.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
+                mock_pubmed.return_value.fetch_full_text_from_pubmed_id.assert_called_once_with("12345")
                 mock_splitter_class.assert_called_once()
                 mock_splitter.create_documents.assert_called_once_with(["Test publication text with multiple paragraphs.\n\nSecond paragraph."])
                 
@@ -234,7 +234,7 @@ class TestRealBenchmarkIntegration:
         
         # Patch PubmedEndpoint to return a simple test text to avoid actual API calls
         with patch('src.analysis.BenchmarkTestService.PubmedEndpoint') as mock_pubmed:
-            mock_pubmed.fetch_full_text_from_pubmed_id.return_value = (
+            mock_pubmed.return_value.fetch_full_text_from_pubmed_id.return_value = (
                 "The TP53 gene with mutation c.215C>G (p.Pro72Arg) is associated with Li-Fraumeni syndrome."
             )
             
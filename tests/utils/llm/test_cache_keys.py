@@ -0,0 +1,85 @@
+"""
+Tests for deterministic LLM cache keys.
+"""
+import os
+import subprocess
+import sys
+
+from src.utils.llm.cache_keys import analyzer_cache_key, build_llm_cache_key, stable_digest
+
+ENTITIES = [
+    {"entity_type": "gene", "text": "BRAF", "id": "673", "offset": 0},
+    {"entity_type": "disease", "text": "melanoma", "id": "D008545", "offset": 24},
+]
+PASSAGE = "BRAF with V600E mutation in melanoma."
+
+
+def _key(**overrides):
+    params = dict(model_name="test-model", variant_text="V600E", entities=ENTITIES,
+                  passage_text=PASSAGE, system_prompt="system", prompt_template="user",
+                  prompt_version=1)
+    params.update(overrides)
+    return build_llm_cache_key(**params)
+
+
+def test_key_format():
+    """Test that keys contain the model name and a SHA-256 digest."""
+    key = _key()
+    prefix, model, digest = key.split(":", 2)
+    assert prefix == "llm_analysis"
+    assert model == "test-model"
+    assert len(digest) == 64
+
+
+def test_key_is_stable_across_processes():
+    """Test that the same inputs give the same key in a fresh interpreter."""
+    code = (
+        "from src.utils.llm.cache_keys import build_llm_cache_key\n"
+        f"print(build_llm_cache_key('test-model', 'V600E', {ENTITIES!r}, {PASSAGE!r}, "
+        "'system', 'user', 1))"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+    env = dict(os.environ, PYTHONHASHSEED="random")
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert output == _key()
+
+
+def test_entity_order_does_not_change_key():
+    """Test that the entity list is canonicalised."""
+    reordered = [dict(reversed(list(e.items()))) for e in reversed(ENTITIES)]
+    assert _key(entities=reordered) == _key()
+
+
+def test_inputs_change_key():
+    """Test that every input determining the LLM answer is part of the key."""
+    base = _key()
+    assert _key(model_name="other-model") != base
+    assert _key(variant_text="V600K") != base
+    assert _key(passage_text=PASSAGE + " ") != base
+    assert _key(entities=ENTITIES[:1]) != base
+    assert _key(system_prompt="changed") != base
+    assert _key(prompt_template="changed") != base
+    assert _key(prompt_version=2) != base
+
+
+def test_analyzer_cache_key_uses_analyzer_prompts():
+    """Test that analyzer keys are built from the analyzer's model, prompts and version."""
+    class Analyzer:
+        llm_model_name = "test-model"
+        SYSTEM_PROMPT = "system"
+        USER_PROMPT_TEMPLATE = "user"
+        PROMPT_VERSION = 1
+
+    analyzer = Analyzer()
+    assert analyzer_cache_key(analyzer, "V600E", ENTITIES, PASSAGE) == _key()
+    assert analyzer_cache_key(analyzer, "V600E", ENTITIES, PASSAGE,
+                              prompt_template="packed") == _key(prompt_template="packed")
+
+    analyzer.PROMPT_VERSION = 2
+    assert analyzer_cache_key(analyzer, "V600E", ENTITIES, PASSAGE) == _key(prompt_version=2)
+
+
+def test_stable_digest():
+    """Test the SHA-256 digest helper."""
+    assert stable_digest("abc") == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
@@ -0,0 +1,83 @@
+"""
+Tests for tolerant parsing of LLM JSON responses.
+"""
+import json
+
+import pytest
+
+from src.utils.llm import json_repair
+from src.utils.llm.json_repair import extract_json, parse_json, repair_json
+
+RELATIONSHIPS = {
+    "relationships": [
+        {"entity_type": "gene", "entity_text": "BRAF", "has_relationship": True,
+         "explanation": "V600E is a mutation in BRAF."},
+        {"entity_type": "disease", "entity_text": "melanoma", "has_relationship": True,
+         "explanation": "V600E is associated with melanoma."},
+    ]
+}
+
+
+def test_extract_json():
+    """Test extracting JSON from code blocks and surrounding text."""
+    assert extract_json('```json\n{"key": "value"}\n```') == '{"key": "value"}'
+    assert extract_json('{"key": "value"}') == '{"key": "value"}'
+    assert extract_json('Here is the result: {"key": "value"} and more text') == '{"key": "value"}'
+
+
+@pytest.mark.parametrize("malformed, expected", [
+    ('{"key1": "value1", "key2": "value2",}', {"key1": "value1", "key2": "value2"}),
+    ('["value1", "value2",]', ["value1", "value2"]),
+    ('{key1: "value1", key2: "value2"}', {"key1": "value1", "key2": "value2"}),
+    ("{'key1': \"value1\", 'key2': 'value2'}", {"key1": "value1", "key2": "value2"}),
+    ('{"key1": "value1" "key2": 123 "key3": {"nested": "value"}}',
+     {"key1": "value1", "key2": 123, "key3": {"nested": "value"}}),
+    ('{"a": [1, 2,, 3], "b": None, "c": True}', {"a": [1, 2, 3], "b": None, "c": True}),
+    ('{"text": "line\nbreak", "quote": \'it\\\'s "quoted"\'}', {"text": "line\nbreak", "quote": 'it\'s "quoted"'}),
+    ('{"relationships": [{"a": 1}, ...]}', {"relationships": [{"a": 1}]}),
+    ('{"relationships": [{"a": 1}, {"b": 2', {"relationships": [{"a": 1}, {"b": 2}]}),
+    ('{"a": [1, 2}', {"a": [1, 2]}),
+    ('{"a":}', {"a": None}),
+])
+def test_repair_json(malformed, expected):
+    """Test repairing common defects of model output."""
+    assert json.loads(repair_json(malformed)) == expected
+
+
+def test_parse_json_complex_response():
+    """Test a response with several defects at once, wrapped in prose."""
+    response = """Here is my analysis:
+{
+  relationships: [
+    {
+      "entity_type": "gene",
+      'entity_text': 'BRAF',
+      'has_relationship': true,
+      'explanation': "V600E is a mutation in BRAF.",
+    },
+    {
+      entity_type: "disease",
+      entity_text: "melanoma",
+      has_relationship: true,
+      explanation: "V600E is associated with melanoma.",
+    },
+  ]
+}
+I hope this helps."""
+    assert parse_json(response) == RELATIONSHIPS
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_parse_json_valid_response(monkeypatch, use_orjson):
+    """Test the fast path with and without orjson."""
+    if use_orjson and not json_repair.HAS_ORJSON:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(json_repair, "HAS_ORJSON", use_orjson)
+    assert parse_json(json.dumps(RELATIONSHIPS)) == RELATIONSHIPS
+    assert parse_json(f"```json\n{json.dumps(RELATIONSHIPS, indent=2)}\n```") == RELATIONSHIPS
+
+
+def test_parse_json_raises_for_non_json():
+    """Test that text without JSON raises JSONDecodeError."""
+    with pytest.raises(json.JSONDecodeError):
+        parse_json("This is not JSON")
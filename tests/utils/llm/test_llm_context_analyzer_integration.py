@@ -144,36 +144,6 @@ class TestLlmContextAnalyzerIntegration:
             assert len(rel["diseases"]) > 0
             assert rel["diseases"][0]["text"] == "Li-Fraumeni syndrome"
 
-    def test_clean_json_response(self, mock_llm_manager):
-        """Test _clean_json_response method"""
-        # Patch the LlmManager to return our mock
-        with patch('src.llm_context_analyzer.llm_context_analyzer.LlmManager', return_value=mock_llm_manager):
-            # Create LlmContextAnalyzer
-            analyzer = LlmContextAnalyzer(llm_model_name="mock-model")
-            
-            # Test cleaning a messy JSON string
-            messy_json = '''```json
-            {
-                "key": "value",
-                "number": 42
-            }
-            ```'''
-            
-            clean_json = analyzer._clean_json_response(messy_json)
-            
-            # Verify cleaning worked
-            assert clean_json == '{\n                "key": "value",\n                "number": 42\n            }'
-            
-            # Test with already clean JSON
-            clean_input = '{"key": "value"}'
-            result = analyzer._clean_json_response(clean_input)
-            assert result == '{"key": "value"}'
-            
-            # Test with invalid input (no JSON)
-            invalid_input = "This is not JSON"
-            result = analyzer._clean_json_response(invalid_input)
-            assert result == "{}"
-
     def test_group_annotations_by_type(self, mock_llm_manager, mock_bioc_document):
         """Test _group_annotations_by_type method"""
         # Patch the LlmManager to return our mock
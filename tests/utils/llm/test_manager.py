@@ -59,4 +59,77 @@ def test_init_with_custom_model_name(mock_config):
 def test_init_with_custom_temperature(mock_config):
     """Test initialization with custom temperature."""
     manager = LlmManager(endpoint='gpt', temperature=0.5)
-    assert manager.llm.temperature == 0.5 
\ No newline at end of file
+    assert manager.llm.temperature == 0.5 
+def test_concurrency_limiter_shared_per_provider():
+    """Test that managers of the same provider share one concurrency limiter."""
+    with patch('src.utils.llm.manager.Config') as mock_config_class, \
+         patch('src.utils.llm.manager.Together'), \
+         patch('src.utils.llm.manager.ChatOpenAI'):
+        mock_config_class.return_value.get_together_api_key.return_value = 'test-together-key'
+        mock_config_class.return_value.get_openai_api_key.return_value = 'test-openai-key'
+        
+        LlmManager.set_concurrency_limit('together', 2)
+        first = LlmManager('together', 'model-a')
+        second = LlmManager('together', 'model-b')
+        other = LlmManager('openai', 'gpt-4')
+        
+        limiter = first.get_concurrency_limiter()
+        assert second.get_concurrency_limiter() is limiter
+        assert other.get_concurrency_limiter() is not limiter
+        
+        assert limiter.acquire(blocking=False)
+        assert limiter.acquire(blocking=False)
+        assert not limiter.acquire(blocking=False)
+        limiter.release()
+        limiter.release()
+
+def test_set_concurrency_limit_validation():
+    """Test validation of concurrency limits."""
+    with pytest.raises(ValueError):
+        LlmManager.set_concurrency_limit('together', 0)
+    with pytest.raises(ValueError):
+        LlmManager.set_concurrency_limit('unknown', 2)
+
+def test_invoke_records_metrics():
+    """Test that calls through LlmManager.invoke and cache hits are recorded."""
+    from langchain_core.language_models.fake import FakeListLLM
+    from src.utils.llm.metrics import LlmMetrics
+    
+    def fake_together(model, together_api_key, temperature, callbacks):
+        return FakeListLLM(responses=['{"relationships": []}'], callbacks=callbacks)
+    
+    with patch('src.utils.llm.manager.Config') as mock_config_class, \
+         patch('src.utils.llm.manager.Together', side_effect=fake_together):
+        mock_config_class.return_value.get_together_api_key.return_value = 'test-together-key'
+        metrics = LlmMetrics()
+        manager = LlmManager('together', 'test-model', metrics=metrics)
+        
+        assert manager.invoke("prompt", cache_status="miss") == '{"relationships": []}'
+        manager.record_cache_hit()
+        
+        summary = metrics.summary()["models"]["test-model"]
+        assert summary["calls"] == 1
+        assert summary["cache_misses"] == 1
+        assert summary["cache_hits"] == 1
+
+
+def test_invoke_json_uses_json_mode_and_repairs_answer():
+    """Test that invoke_json binds JSON mode for OpenAI and retries an invalid answer."""
+    with patch('src.utils.llm.manager.Config') as mock_config_class, \
+         patch('src.utils.llm.manager.ChatOpenAI') as mock_chat:
+        mock_config_class.return_value.get_openai_api_key.return_value = 'test-openai-key'
+        bound = mock_chat.return_value.bind.return_value
+        bound.invoke.side_effect = [
+            MagicMock(content='{"relationships": "none"}'),
+            MagicMock(content='{"relationships": []}'),
+        ]
+        manager = LlmManager('openai', 'gpt-4o-mini')
+        schema = {"type": "object", "required": ["relationships"],
+                  "properties": {"relationships": {"type": "array"}}}
+        
+        assert manager.invoke_json(["prompt"], schema) == {"relationships": []}
+        
+        mock_chat.return_value.bind.assert_called_once_with(response_format={"type": "json_object"})
+        repair_messages = bound.invoke.call_args_list[1][0][0]
+        assert len(repair_messages) == 3
+        assert "expected array" in repair_messages[2].content
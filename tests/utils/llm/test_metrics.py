@@ -0,0 +1,105 @@
+"""
+Tests for LLM token, latency and cost accounting.
+"""
+import json
+
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.utils.llm.metrics import LlmMetrics, LlmMetricsCallbackHandler
+
+
+def test_chat_model_calls_are_recorded():
+    """Test recording of direct calls, including the cache status from run metadata."""
+    metrics = LlmMetrics(prices={"fake-chat": (1.0, 2.0)})
+    llm = FakeListChatModel(responses=["x" * 40], callbacks=[LlmMetricsCallbackHandler(metrics, "fake-chat")])
+    
+    llm.invoke([HumanMessage(content="y" * 400)], config={"metadata": {"cache_status": "miss"}})
+    
+    record = metrics.records[0]
+    assert record["model"] == "fake-chat"
+    assert record["status"] == "ok"
+    assert record["cache_status"] == "miss"
+    assert record["tokens_estimated"] is True
+    assert record["input_tokens"] == 100
+    assert record["output_tokens"] == 10
+    assert record["cost"] == (100 * 1.0 + 10 * 2.0) / 1_000_000
+    assert record["latency"] >= 0
+
+
+def test_chain_calls_are_recorded():
+    """Test that calls made inside a LangChain chain are recorded."""
+    metrics = LlmMetrics()
+    llm = FakeListLLM(responses=["NONE"], callbacks=[LlmMetricsCallbackHandler(metrics, "fake-llm")])
+    chain = ChatPromptTemplate.from_template("{system} PUBLICATION: {publication}") | llm | StrOutputParser()
+    
+    assert chain.invoke({"system": "Extract coordinates.", "publication": "text"}) == "NONE"
+    assert len(metrics.records) == 1
+    assert metrics.records[0]["cache_status"] == "none"
+
+
+def test_reported_usage_is_used():
+    """Test that token counts reported by the provider take precedence over estimates."""
+    metrics = LlmMetrics()
+    handler = LlmMetricsCallbackHandler(metrics, "gpt-4")
+    
+    handler.on_llm_start({}, ["prompt"], run_id="openai-run")
+    handler.on_llm_end(LLMResult(generations=[[]], llm_output={
+        "token_usage": {"prompt_tokens": 120, "completion_tokens": 30}}), run_id="openai-run")
+    
+    message = AIMessage(content="answer", usage_metadata={"input_tokens": 50, "output_tokens": 5, "total_tokens": 55})
+    handler.on_llm_start({}, ["prompt"], run_id="chat-run")
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id="chat-run")
+    
+    assert [(r["input_tokens"], r["output_tokens"], r["tokens_estimated"]) for r in metrics.records] == [
+        (120, 30, False), (50, 5, False)]
+
+
+def test_errors_and_retries_are_recorded():
+    """Test recording of failed calls and client retries."""
+    metrics = LlmMetrics()
+    handler = LlmMetricsCallbackHandler(metrics, "model")
+    
+    handler.on_llm_start({}, ["prompt"], run_id="run")
+    handler.on_retry(None, run_id="run")
+    handler.on_retry(None, run_id="run")
+    handler.on_llm_error(TimeoutError("timed out"), run_id="run")
+    
+    summary = metrics.summary()["models"]["model"]
+    assert summary["calls"] == 1
+    assert summary["errors"] == 1
+    assert summary["retries"] == 2
+
+
+def test_summary_and_exports(tmp_path):
+    """Test aggregation per model and the JSON and Prometheus exports."""
+    metrics = LlmMetrics(prices={"a": (1.0, 1.0)})
+    metrics.record_call("a", 1000, 100, latency=2.0, cache_status="miss")
+    metrics.record_call("a", 500, 50, latency=1.0, cache_status="miss")
+    metrics.record_cache_hit("a")
+    metrics.record_call("b", 10, 1, latency=0.5)
+    
+    summary = metrics.summary()
+    assert summary["models"]["a"]["calls"] == 2
+    assert summary["models"]["a"]["input_tokens"] == 1500
+    assert summary["models"]["a"]["cache_hit_rate"] == 1 / 3
+    assert summary["models"]["a"]["latency_avg"] == 1.5
+    assert summary["total"]["calls"] == 3
+    assert summary["total"]["cost"] == (1650) / 1_000_000
+    
+    prometheus = metrics.to_prometheus()
+    assert "# TYPE llm_input_tokens_total counter" in prometheus
+    assert 'llm_input_tokens_total{model="a"} 1500' in prometheus
+    assert 'llm_cache_hits_total{model="a"} 1' in prometheus
+    
+    metrics.save(str(tmp_path / "metrics.json"))
+    metrics.save(str(tmp_path / "metrics.prom"))
+    assert json.loads((tmp_path / "metrics.json").read_text())["models"]["b"]["calls"] == 1
+    assert (tmp_path / "metrics.prom").read_text() == prometheus
+    
+    metrics.reset()
+    assert metrics.summary()["total"]["calls"] == 0
@@ -0,0 +1,89 @@
+"""
+Tests for the near-duplicate LLM result cache.
+"""
+import pytest
+
+from src.utils.llm.near_duplicate_cache import NearDuplicateCache, normalize_passage
+
+ENTITIES = [
+    {"entity_category": "gene", "entity_type": "Gene", "entity_text": "BRAF", "entity_id": "3"},
+    {"entity_category": "disease", "entity_type": "Disease", "entity_text": "melanoma", "entity_id": "4"},
+]
+PASSAGE = ("The BRAF V600E mutation is the most common activating mutation in cutaneous melanoma "
+           "and predicts response to combined BRAF and MEK inhibition in patients with advanced disease.")
+RELATIONSHIPS = [{"entity_text": "melanoma", "has_relationship": True}]
+
+
+def test_normalize_passage():
+    """Test that case, punctuation and whitespace are ignored."""
+    assert normalize_passage("BRAF  V600E, in\nMelanoma.") == ["braf", "v600e", "in", "melanoma"]
+
+
+def test_near_duplicate_passage_is_reused():
+    """Test reuse for a passage differing only in formatting and one word."""
+    cache = NearDuplicateCache(threshold=0.8)
+    cache.set("V600E", ENTITIES, PASSAGE, RELATIONSHIPS)
+
+    variant = PASSAGE.upper().replace("ADVANCED", "metastatic").replace(" ", "  ")
+    relationships, similarity, source_id = cache.get("V600E", ENTITIES, variant)
+
+    assert relationships == RELATIONSHIPS
+    assert 0.8 <= similarity < 1.0
+    assert len(source_id) == 16
+    assert cache.report()["hits"] == 1
+
+
+def test_near_duplicate_requires_same_variant_and_entities():
+    """Test that the variant and the entity set must match, but not entity identifiers."""
+    cache = NearDuplicateCache(threshold=0.8)
+    cache.set("V600E", ENTITIES, PASSAGE, RELATIONSHIPS)
+    renumbered = [dict(entity, entity_id=str(index + 10)) for index, entity in enumerate(ENTITIES)]
+
+    assert cache.get("V600K", ENTITIES, PASSAGE) is None
+    assert cache.get("V600E", ENTITIES[:1], PASSAGE) is None
+    assert cache.get("V600E", renumbered, PASSAGE) is not None
+
+
+def test_dissimilar_passage_is_not_reused():
+    """Test that a passage below the threshold is a miss."""
+    cache = NearDuplicateCache(threshold=0.9)
+    cache.set("V600E", ENTITIES, PASSAGE, RELATIONSHIPS)
+
+    other = "V600E was not detected in any of the melanoma samples sequenced in this cohort of BRAF patients."
+    assert cache.get("V600E", ENTITIES, other) is None
+    report = cache.report()
+    assert report["lookups"] == 1 and report["hits"] == 0 and report["entries"] == 1
+
+
+def test_same_passage_is_stored_once():
+    """Test that storing a passage again does not add another entry."""
+    cache = NearDuplicateCache(threshold=0.8)
+    for _ in range(3):
+        cache.set("V600E", ENTITIES, PASSAGE, RELATIONSHIPS)
+
+    assert cache.report()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Test the max_size bound."""
+    cache = NearDuplicateCache(threshold=0.8, max_size=2)
+    passages = [f"Passage number {index}: {PASSAGE}" for index in range(3)]
+    cache.set("V600E", ENTITIES, passages[0], RELATIONSHIPS)
+    cache.set("V600K", ENTITIES, passages[1], RELATIONSHIPS)
+    # Mark the first passage as recently used, so the second one is evicted
+    cache.set("V600E", ENTITIES, passages[0], RELATIONSHIPS)
+    cache.set("V600E", ENTITIES[:1], passages[2], RELATIONSHIPS)
+
+    report = cache.report()
+    assert report["entries"] == 2 and report["evictions"] == 1
+    assert cache.get("V600E", ENTITIES, passages[0]) is not None
+    assert cache.get("V600K", ENTITIES, passages[1]) is None
+    assert cache.get("V600E", ENTITIES[:1], passages[2]) is not None
+
+
+def test_invalid_parameters():
+    """Test validation of the constructor arguments."""
+    with pytest.raises(ValueError):
+        NearDuplicateCache(threshold=1.5)
+    with pytest.raises(ValueError):
+        NearDuplicateCache(num_permutations=64, bands=5)
@@ -0,0 +1,111 @@
+"""
+Tests for structured (JSON) output of language models.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.data.clients.exceptions import LLMError
+from src.utils.llm.structured_output import (
+    SchemaValidationError, invoke_structured, parse_structured, validate_json
+)
+
+SCHEMA = {
+    "type": "object",
+    "required": ["relationships"],
+    "properties": {
+        "relationships": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["entity_text", "has_relationship"],
+                "properties": {
+                    "entity_text": {"type": "string"},
+                    "has_relationship": {"type": "boolean"},
+                    "relationship_score": {"type": "integer", "minimum": 0, "maximum": 10},
+                }
+            }
+        }
+    }
+}
+
+
+def test_validate_json_coerces_scalars():
+    """Test that unambiguous values of the wrong type are converted."""
+    value = {"relationships": [{"entity_text": "BRAF", "has_relationship": "True", "relationship_score": "7"}]}
+    assert validate_json(value, SCHEMA) == {
+        "relationships": [{"entity_text": "BRAF", "has_relationship": True, "relationship_score": 7}]
+    }
+
+
+def test_validate_json_accepts_null_for_nullable_types():
+    """Test type unions with null for optional values."""
+    schema = {"type": ["integer", "null"], "minimum": 0, "maximum": 10}
+    assert validate_json(None, schema) is None
+    assert validate_json("7", schema) == 7
+    with pytest.raises(SchemaValidationError) as excinfo:
+        validate_json(11, schema)
+    assert "greater than 10" in str(excinfo.value)
+    with pytest.raises(SchemaValidationError) as excinfo:
+        validate_json(None, {"type": "string"})
+    assert "expected string" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("value, expected", [(7.5, 8), (7.4, 7), ("6.6", 7), (3.0, 3)])
+def test_validate_json_rounds_fractional_integers(value, expected):
+    """Test that non-integral numbers are rounded where an integer is expected."""
+    assert validate_json(value, {"type": "integer"}) == expected
+
+
+@pytest.mark.parametrize("value, message", [
+    ([], "$: expected object"),
+    ({}, "missing required property 'relationships'"),
+    ({"relationships": [{"entity_text": "BRAF"}]}, "missing required property 'has_relationship'"),
+    ({"relationships": [{"entity_text": "BRAF", "has_relationship": "maybe"}]}, "expected boolean"),
+    ({"relationships": [{"entity_text": "BRAF", "has_relationship": True, "relationship_score": 11}]},
+     "$.relationships[0].relationship_score: 11 is greater than 10"),
+])
+def test_validate_json_rejects_invalid_values(value, message):
+    """Test error messages pointing at the invalid part of the answer."""
+    with pytest.raises(SchemaValidationError) as excinfo:
+        validate_json(value, SCHEMA)
+    assert message in str(excinfo.value)
+
+
+def test_validate_json_additional_properties():
+    """Test schemas for objects with arbitrary keys."""
+    schema = {"type": "object", "additionalProperties": {"type": "integer"}}
+    assert validate_json({"a": "1", "b": 2}, schema) == {"a": 1, "b": 2}
+    with pytest.raises(SchemaValidationError):
+        validate_json({"a": 1}, {"type": "object", "additionalProperties": False})
+
+
+def test_parse_structured_repairs_json():
+    """Test that malformed JSON is repaired before validation."""
+    assert parse_structured("```json\n{relationships: [],}\n```", SCHEMA) == {"relationships": []}
+
+
+def test_invoke_structured_retries_invalid_answer():
+    """Test that an invalid answer is sent back to the model with the error."""
+    invoke = MagicMock(side_effect=[
+        MagicMock(content="I cannot answer in JSON."),
+        MagicMock(content='{"relationships": []}'),
+    ])
+
+    assert invoke_structured(invoke, ["prompt"], SCHEMA) == {"relationships": []}
+
+    repair_messages = invoke.call_args_list[1][0][0]
+    assert repair_messages[0] == "prompt"
+    assert repair_messages[1].content == "I cannot answer in JSON."
+    assert '"required": ["relationships"]' in repair_messages[2].content
+
+
+def test_invoke_structured_raises_after_repair_attempts():
+    """Test that LLMError is raised when every answer is invalid."""
+    invoke = MagicMock(return_value='{"relationships": "none"}')
+
+    with pytest.raises(LLMError) as excinfo:
+        invoke_structured(invoke, ["prompt"], SCHEMA, max_repair_attempts=2)
+
+    assert invoke.call_count == 3
+    assert excinfo.value.response_text == '{"relationships": "none"}'